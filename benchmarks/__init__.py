@@ -0,0 +1,14 @@
+"""Benchmarks for Aegis hot paths, run from the repository root as ``python -m benchmarks.<name>``.
+
+The package puts the repository's ``src`` directory on ``sys.path``, as the
+pytest configuration does, so the benchmarks measure this checkout without
+an install.
+"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = str(Path(__file__).resolve().parents[1] / 'src')
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
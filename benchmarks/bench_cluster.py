@@ -0,0 +1,164 @@
+"""Benchmark: a cluster hardware view over several node processes on localhost.
+
+Run from the repository root with ``python -m benchmarks.bench_cluster``.
+Each node is a separate process running a ``NodeAgent`` over fake
+hardware backends, with a different amount of VRAM. The run checks that
+placement queries pick the right node, that frozen and killed nodes turn
+stale, and that a restarted node is picked up again. It also reports
+time to a full view, bytes per update on the wire, query latency,
+staleness detection and reconnect time.
+"""
+
+import argparse
+import signal
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from aegis.hardware.cluster import ClusterHardwareManager, NodeAgent, format_address, parse_address
+
+from benchmarks.fakes import FakeNVML, fake_backends
+
+
+def _serve_node(args: argparse.Namespace) -> None:
+    """Child process: serve fake hardware until killed, printing the bound address first."""
+    from aegis.hardware.manager import HardwareManager
+
+    with fake_backends(logical_cores=args.cores):
+        manager = HardwareManager(nvml=FakeNVML(gpu_count=args.gpus, vram_total_gb=args.vram), use_static_cache=False)
+        agent = NodeAgent(manager, parse_address(args.listen), name=args.name, interval=args.interval)
+        address = agent.start()
+        print(format_address(address), flush=True)
+        agent.serve_forever()
+
+
+def _spawn(name: str, listen: str, vram: float, gpus: int, interval: float) -> Tuple[subprocess.Popen, str]:
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'benchmarks.bench_cluster', '--serve-node',
+            '--name', name, '--listen', listen, '--vram', str(vram), '--gpus', str(gpus), '--interval', str(interval),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    line = process.stdout.readline().strip()
+    if not line:
+        raise RuntimeError(f"Node {name} failed to start.")
+    return process, line
+
+
+def _wait(predicate, timeout: float) -> Optional[float]:
+    """Seconds until ``predicate()`` holds, or None on timeout."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if predicate():
+            return time.perf_counter() - started
+        time.sleep(0.005)
+    return None
+
+
+def _frame_bytes(args: argparse.Namespace) -> Tuple[float, float]:
+    """Mean keyframe and delta message sizes for one fake node, measured in-process."""
+    from aegis.hardware.manager import HardwareManager
+    from aegis.hardware.snapshot import SnapshotEncoder
+
+    with fake_backends(logical_cores=args.cores):
+        manager = HardwareManager(nvml=FakeNVML(gpu_count=2, vram_total_gb=24.0), use_static_cache=False)
+        encoder = SnapshotEncoder('binary')
+        frames = [encoder.encode(manager.refresh_snapshot()) for _ in range(20)]
+        manager.close()
+    header = 5
+    return len(frames[0]) + header, sum(len(frame) + header for frame in frames[1:]) / (len(frames) - 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=4)
+    parser.add_argument('--interval', type=float, default=0.2)
+    parser.add_argument('--cores', type=int, default=16)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--serve-node', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--name', default='node')
+    parser.add_argument('--listen', default='127.0.0.1:0')
+    parser.add_argument('--vram', type=float, default=24.0)
+    parser.add_argument('--gpus', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.serve_node:
+        _serve_node(args)
+        return
+
+    processes: List[subprocess.Popen] = []
+    cluster = None
+    try:
+        addresses = {}
+        for index in range(args.nodes):
+            name = f'node{index}'
+            process, address = _spawn(name, '127.0.0.1:0', vram=8.0 * (index + 1), gpus=1 + index % 2, interval=args.interval)
+            processes.append(process)
+            addresses[name] = address
+        largest = f'node{args.nodes - 1}'
+
+        started = time.perf_counter()
+        cluster = ClusterHardwareManager(addresses, backoff_initial=0.05, backoff_max=0.5)
+        assert cluster.wait_until_ready(timeout=30.0), "not every node delivered a sample"
+        ready = time.perf_counter() - started
+
+        best = cluster.node_with_most_free_vram()
+        assert best is not None and best.node == largest, best
+        assert best.free_vram_gb == 8.0 * args.nodes * 0.75
+        assert len(cluster.gpu_candidates()) == sum(1 + index % 2 for index in range(args.nodes))
+        assert set(cluster.nodes_with_device('NPU')) == set(addresses)
+
+        started = time.perf_counter()
+        for _ in range(args.queries):
+            cluster.node_with_most_free_vram()
+        query_us = (time.perf_counter() - started) / args.queries * 1e6
+
+        # Freeze a node: its connection stays open but goes silent, so only the staleness window catches it.
+        processes[0].send_signal(signal.SIGSTOP)
+        frozen = _wait(lambda: cluster.get_snapshot('node0') is None, timeout=10.0)
+        processes[0].send_signal(signal.SIGCONT)
+        assert frozen is not None, "silent node never turned stale"
+
+        # Crash the node with the most VRAM; placement must move elsewhere once it turns stale.
+        processes[-1].kill()
+        processes[-1].wait()
+        detected = _wait(lambda: cluster.get_snapshot(largest) is None, timeout=10.0)
+        assert detected is not None, "killed node never turned stale"
+        fallback = cluster.node_with_most_free_vram()
+        assert fallback is not None and fallback.node != largest, fallback
+        time.sleep(0.3)
+        status = next(item for item in cluster.statuses() if item.name == largest)
+        assert not status.connected and status.reconnects >= 1, status
+
+        # Restart it on the same port; the manager's backoff loop should pick it up.
+        processes[-1], _ = _spawn(largest, addresses[largest], vram=8.0 * args.nodes, gpus=1 + (args.nodes - 1) % 2,
+                                  interval=args.interval)
+        reconnected = _wait(lambda: cluster.get_snapshot(largest) is not None, timeout=10.0)
+        assert reconnected is not None, "restarted node was not picked up"
+        assert cluster.node_with_most_free_vram().node == largest
+    finally:
+        if cluster is not None:
+            cluster.close()
+        for process in processes:
+            process.kill()
+            process.wait()
+
+    keyframe, delta = _frame_bytes(args)
+    print("checks passed: placement, staleness of frozen and killed nodes, reconnect after restart")
+    print(f"\n{args.nodes} node processes streaming every {args.interval * 1000:.0f} ms")
+    print(f"{'metric':<44}{'value':>12}")
+    print(f"{'time to full cluster view (ms)':<44}{ready * 1000:>12.1f}")
+    print(f"{'node_with_most_free_vram (us/query)':<44}{query_us:>12.1f}")
+    print(f"{'keyframe message (bytes)':<44}{keyframe:>12.0f}")
+    print(f"{'delta message (bytes, mean)':<44}{delta:>12.1f}")
+    print(f"{'silent node to stale (ms)':<44}{frozen * 1000:>12.1f}")
+    print(f"{'crashed node to excluded (ms)':<44}{detected * 1000:>12.1f}")
+    print(f"{'node restart to fresh view (ms)':<44}{reconnected * 1000:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
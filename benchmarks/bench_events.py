@@ -0,0 +1,102 @@
+"""Benchmark: cost per sample of many threshold subscribers, event bus against each subscriber polling.
+
+Run from the repository root with ``python -m benchmarks.bench_events``.
+The polling baseline is what consumers did before the bus: fetch the
+HardwareState and compare the fields they care about, once per subscriber.
+"""
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from aegis.hardware.events import HardwareEventBus
+from aegis.hardware.models import HardwareState, ThresholdRule
+from aegis.hardware.snapshot import HardwareSnapshot, StaticHardwareFacts
+
+
+def _snapshots(count: int, cores: int, seed: int) -> List[HardwareSnapshot]:
+    rng = np.random.default_rng(seed)
+    static = StaticHardwareFacts('Synthetic CPU', 'x86_64', cores // 2, cores, 64.0, [(0, 'Synthetic GPU', 24.0)], ['CPU'])
+    return [
+        HardwareSnapshot.build(
+            static,
+            np.round(rng.uniform(0, 100, cores), 1).tolist(),
+            round(float(rng.uniform(0.5, 8.0)), 2),
+            [(round(float(rng.uniform(10, 24)), 2), float(rng.integers(0, 100)))],
+            [()],
+            timestamp=1.7e9 + step,
+        )
+        for step in range(count)
+    ]
+
+
+def _fresh_state(snapshot: HardwareSnapshot) -> HardwareState:
+    """Build a new HardwareState for the sample, as each get_hardware_state() call used to."""
+    return HardwareSnapshot(snapshot.static, snapshot.values, snapshot.gpu_processes, (), snapshot.timestamp).to_state()
+
+
+def _poll(state: HardwareState, active: List[bool]) -> None:
+    """One subscriber's hand-written check: VRAM above 90% and RAM below 2 GB, with hysteresis."""
+    gpu = state.gpu
+    vram_percent = gpu.vram_used_gb / gpu.vram_total_gb * 100.0
+    if not active[0] and vram_percent > 90.0:
+        active[0] = True
+    elif active[0] and vram_percent <= 80.0:
+        active[0] = False
+    ram = state.system.ram_available_gb
+    if not active[1] and ram < 2.0:
+        active[1] = True
+    elif active[1] and ram >= 3.0:
+        active[1] = False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--subscribers', type=int, default=200)
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--cores', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    snapshots = _snapshots(args.samples, args.cores, args.seed)
+    rules = [
+        ThresholdRule(name='vram_high', metric='gpu0.vram_percent', threshold=90.0, clear_at=80.0),
+        ThresholdRule(name='ram_low', metric='ram_available_gb', condition='below', threshold=2.0, clear_at=3.0),
+    ]
+
+    bus = HardwareEventBus()
+    delivered = [0]
+    for _ in range(args.subscribers):
+        bus.subscribe(rules, lambda event: delivered.__setitem__(0, delivered[0] + 1))
+    started = time.perf_counter()
+    for snapshot in snapshots:
+        bus.evaluate(snapshot)
+    bus_us = (time.perf_counter() - started) / args.samples * 1e6
+
+    flags = [[False, False] for _ in range(args.subscribers)]
+    started = time.perf_counter()
+    for snapshot in snapshots:
+        for active in flags:
+            _poll(_fresh_state(snapshot), active)
+    poll_us = (time.perf_counter() - started) / args.samples * 1e6
+
+    # The fairest polling case: every subscriber shares one HardwareState per sample.
+    flags = [[False, False] for _ in range(args.subscribers)]
+    started = time.perf_counter()
+    for snapshot in snapshots:
+        state = _fresh_state(snapshot)
+        for active in flags:
+            _poll(state, active)
+    shared_us = (time.perf_counter() - started) / args.samples * 1e6
+
+    print(f"\n{args.subscribers} subscribers x {len(rules)} rules, {args.samples} samples; {delivered[0]} events delivered")
+    print(f"{'method':<44}{'us/sample':>12}")
+    print(f"{'event bus (one vectorised pass)':<44}{bus_us:>12.1f}")
+    print(f"{'polling, one state per subscriber':<44}{poll_us:>12.1f}")
+    print(f"{'polling, one shared state':<44}{shared_us:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: HttpFetcher throughput against a local server, cold cache against warm and revalidating.
+
+Run from the repository root with ``python -m benchmarks.bench_fetch``.
+A local HTTP/1.1 keep-alive server (``benchmarks.fakes.serve_site``)
+stands in for the web. The same page set is fetched through a cold cache,
+a fresh warm cache and a cache that revalidates every entry with a 304.
+A fresh connection per request without caching is the baseline. Behaviour
+is checked in ``tests/test_fetch.py``.
+"""
+
+import argparse
+import tempfile
+import time
+import urllib.request
+from typing import List
+
+from aegis.tools.fetch import HttpFetcher
+
+from benchmarks.fakes import FakeSite, serve_site
+
+
+def _timed(fetcher: HttpFetcher, urls: List[str]) -> float:
+    started = time.perf_counter()
+    for result in fetcher.fetch_many(urls):
+        assert not isinstance(result, Exception), result
+    return time.perf_counter() - started
+
+
+def _per_request_connections(urls: List[str]) -> float:
+    started = time.perf_counter()
+    for url in urls:
+        with urllib.request.urlopen(url) as response:
+            response.read()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--page-bytes', type=int, default=32 * 1024)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    site = FakeSite(args.pages, args.page_bytes, max_age=3600)
+    server, base = serve_site(site)
+    urls = [f"{base}/page/{index}" for index in range(args.pages)]
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            options = dict(max_concurrent=args.concurrency, per_host_rate=1e6, per_host_burst=1000)
+            baseline = _per_request_connections(urls)
+            uncached = HttpFetcher(use_cache=False, **options)
+            pooled = _timed(uncached, urls)
+            pooled_stats = uncached.stats()
+            uncached.close()
+
+            fetcher = HttpFetcher(cache_root=f"{root}/bench", **options)
+            cold = _timed(fetcher, urls)
+            warm = _timed(fetcher, urls)
+            fetcher.close()
+
+            # Expire every entry so each request revalidates and gets a 304.
+            site.max_age = 0
+            stale = HttpFetcher(cache_root=f"{root}/stale", **options)
+            _timed(stale, urls)
+            downloaded = stale.stats().bytes_downloaded
+            revalidate = _timed(stale, urls)
+            stats = stale.stats()
+            stale.close()
+    finally:
+        server.shutdown()
+
+    megabytes = args.pages * args.page_bytes / 1024 ** 2
+    print(f"\n{args.pages} pages x {args.page_bytes // 1024} KB, {args.concurrency} concurrent fetches")
+    print(f"{'mode':<40}{'pages/s':>10}{'MB/s':>10}")
+    for label, seconds in (
+        ('new connection per request, no cache', baseline),
+        ('pooled keep-alive, no cache', pooled),
+        ('cold cache', cold),
+        ('warm cache (fresh)', warm),
+        ('stale cache (304 revalidation)', revalidate),
+    ):
+        print(f"{label:<40}{args.pages / seconds:>10.0f}{megabytes / seconds:>10.1f}")
+    print(f"\npooled: {pooled_stats.connections_opened} connections opened, {pooled_stats.connections_reused} reused")
+    print(f"revalidation: {stats.revalidated} not-modified responses, {stats.bytes_downloaded - downloaded} body bytes downloaded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: VectorStore insert throughput, search latency and IVF recall against exact search.
+
+Run from the repository root with ``python -m benchmarks.bench_knowledge``;
+use ``--vectors 1000000`` for the large-collection figures.
+"""
+
+import argparse
+import tempfile
+import time
+from typing import List, Sequence, Set
+
+import numpy as np
+
+from aegis.knowledge.store import VectorStore
+
+
+def _clustered_vectors(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Gaussian blobs around random centres, like embeddings of a mixed-topic corpus."""
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    return centres[labels] + 0.6 * rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def _percentiles(samples: Sequence[float]) -> str:
+    p50, p99 = np.percentile(np.asarray(samples) * 1000, [50, 99])
+    return f"{p50:>9.2f}{p99:>9.2f}"
+
+
+def _timed_search(store: VectorStore, queries: np.ndarray, k: int, **options) -> tuple:
+    latencies: List[float] = []
+    results: List[Set[str]] = []
+    for query in queries:
+        started = time.perf_counter()
+        hits = store.search(query, k=k, **options)
+        latencies.append(time.perf_counter() - started)
+        results.append({hit.id for hit in hits})
+    return latencies, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vectors', type=int, default=100_000)
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--clusters', type=int, default=256)
+    parser.add_argument('--probes', type=int, nargs='+', default=[4, 16, 32])
+    parser.add_argument('--batch', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = _clustered_vectors(args.vectors, args.dim, args.clusters, rng)
+    queries = _clustered_vectors(args.queries, args.dim, args.clusters, rng)
+    ids = [f"doc-{index}" for index in range(args.vectors)]
+
+    print(f"\n{args.vectors} vectors x {args.dim} dims, {args.queries} queries, recall@{args.k} vs exact float32 search")
+    print(f"{'configuration':<30}{'p50 ms':>9}{'p99 ms':>9}{'recall':>9}")
+
+    truth: List[Set[str]] = []
+    for dtype in ('float32', 'int8'):
+        with tempfile.TemporaryDirectory() as directory:
+            store = VectorStore(directory, dim=args.dim, dtype=dtype)
+            started = time.perf_counter()
+            for start in range(0, args.vectors, args.batch):
+                store.add(ids[start:start + args.batch], data[start:start + args.batch])
+            insert_rate = args.vectors / (time.perf_counter() - started)
+
+            latencies, exact = _timed_search(store, queries, args.k, exact=True)
+            if not truth:
+                truth = exact
+            recall = np.mean([len(found & expected) / args.k for found, expected in zip(exact, truth)])
+            print(f"{dtype + ' exact':<30}{_percentiles(latencies)}{recall:>9.3f}")
+
+            started = time.perf_counter()
+            index = store.build_index()
+            build_seconds = time.perf_counter() - started
+            for probe in args.probes:
+                latencies, found = _timed_search(store, queries, args.k, n_probe=probe)
+                recall = np.mean([len(hits & expected) / args.k for hits, expected in zip(found, truth)])
+                label = f"{dtype} IVF {index.n_lists}/{probe}"
+                print(f"{label:<30}{_percentiles(latencies)}{recall:>9.3f}")
+
+            print(f"  {dtype}: {insert_rate:,.0f} inserts/s, index build {build_seconds:.2f}s")
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
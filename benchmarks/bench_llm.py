@@ -0,0 +1,134 @@
+"""Benchmark: concurrent agent calls through LLMScheduler, one at a time against continuous batching and prefix caching.
+
+Run from the repository root with ``python -m benchmarks.bench_llm``.
+The backend is ``StubLLMBackend``. Its simulated costs make a decode step
+cost nearly the same for one sequence as for a batch, and make prefill
+cost grow with the number of tokens encoded, as on a GPU. Requests come
+from a few agent personas with long system prompts and arrive
+concurrently. Every configuration must produce the same completions.
+"""
+
+import argparse
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from aegis.agents.base import AegisAgent
+from aegis.inference.llm import LLMScheduler, StubLLMBackend, system_prompt
+
+
+def _agents(count: int, backstory_words: int) -> List[AegisAgent]:
+    return [
+        AegisAgent(
+            role=f"Specialist {index}",
+            goal=f"Answer questions in domain {index} precisely and cite every source used.",
+            backstory=' '.join(f"fact{index}_{word}" for word in range(backstory_words)),
+        )
+        for index in range(count)
+    ]
+
+
+def _backend(args: argparse.Namespace) -> StubLLMBackend:
+    return StubLLMBackend(
+        mean_completion_tokens=args.max_new_tokens,
+        prefill_call_seconds=0.001,
+        prefill_token_seconds=0.00005,
+        decode_step_seconds=0.004,
+        decode_sequence_seconds=0.0002,
+    )
+
+
+def _run(
+    args: argparse.Namespace,
+    agents: List[AegisAgent],
+    max_batch_size: int,
+    prefix_cache_tokens: int,
+) -> Tuple[Dict[str, float], List[List[int]]]:
+    backend = _backend(args)
+    scheduler = LLMScheduler(
+        backend,
+        max_batch_size=max_batch_size,
+        max_batch_tokens=args.max_batch_tokens,
+        prefix_cache_tokens=prefix_cache_tokens,
+        max_new_tokens=args.max_new_tokens,
+    )
+    prefixes = [system_prompt(agent) for agent in agents]
+    rng = np.random.default_rng(args.seed)
+    arrivals = np.cumsum(rng.exponential(args.arrival_ms / 1000.0, args.requests))
+    futures = [None] * args.requests
+
+    def submit_all() -> None:
+        started = time.perf_counter()
+        for index, arrival in enumerate(arrivals):
+            delay = arrival - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            futures[index] = scheduler.submit(
+                f"Task {index}: summarise finding {index * 7 % 13} for the team.",
+                prefixes[index % len(prefixes)],
+            )
+
+    started = time.perf_counter()
+    submitter = threading.Thread(target=submit_all)
+    submitter.start()
+    submitter.join()
+    results = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    stats = scheduler.stats()
+    scheduler.close()
+    assert backend.live_states == 0, f"{backend.live_states} sequence states leaked"
+
+    generated = sum(result.completion_tokens for result in results)
+    latencies = np.array([result.total_seconds for result in results])
+    return {
+        'wall': wall,
+        'tokens_per_s': generated / wall,
+        'ttft_ms': float(np.mean([result.time_to_first_token_seconds for result in results])) * 1000,
+        'p95_ms': float(np.percentile(latencies, 95)) * 1000,
+        'batch': stats.mean_batch_size,
+        'prefill_tokens': stats.prefill_tokens,
+        'busy': backend.busy_seconds,
+    }, [result.tokens for result in results]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--agents', type=int, default=3)
+    parser.add_argument('--backstory-words', type=int, default=400)
+    parser.add_argument('--max-new-tokens', type=int, default=32)
+    parser.add_argument('--max-batch-tokens', type=int, default=4096)
+    parser.add_argument('--arrival-ms', type=float, default=5.0, help="Mean gap between request arrivals.")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    agents = _agents(args.agents, args.backstory_words)
+    configurations = [
+        ('one request at a time, no prefix cache', 1, 0),
+        ('continuous batching, no prefix cache', 16, 0),
+        ('continuous batching + prefix cache', 16, 65536),
+    ]
+    rows = []
+    reference = None
+    for label, batch_size, cache_tokens in configurations:
+        figures, completions = _run(args, agents, batch_size, cache_tokens)
+        if reference is None:
+            reference = completions
+        assert completions == reference, f"'{label}' changed the completions"
+        rows.append((label, figures))
+
+    prompt_tokens = len(_backend(args).tokenize(system_prompt(agents[0])))
+    print(f"\n{args.requests} requests from {args.agents} agents (~{prompt_tokens}-token system prompts), "
+          f"up to {args.max_new_tokens} new tokens; completions identical across configurations")
+    print(f"{'configuration':<42}{'wall s':>8}{'tok/s':>8}{'TTFT ms':>9}{'p95 ms':>8}{'batch':>7}{'prefill tok':>12}")
+    for label, figures in rows:
+        print(
+            f"{label:<42}{figures['wall']:>8.2f}{figures['tokens_per_s']:>8.0f}{figures['ttft_ms']:>9.1f}"
+            f"{figures['p95_ms']:>8.0f}{figures['batch']:>7.1f}{figures['prefill_tokens']:>12}"
+        )
+
+
+if __name__ == '__main__':
+    main()
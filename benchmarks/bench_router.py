@@ -0,0 +1,67 @@
+"""Benchmark: routing throughput of TaskRouter against sequential substring checks.
+
+Run from the repository root with ``python -m benchmarks.bench_router``.
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from aegis.core.router import TaskRouter
+
+
+def _synthetic_agents(count: int, rng: random.Random, vocabulary: List[str]) -> Dict[str, Dict[str, object]]:
+    """Generate agent definitions with a few keyword phrases and a role/goal description each."""
+    agents: Dict[str, Dict[str, object]] = {}
+    for index in range(count):
+        keywords = [" ".join(rng.sample(vocabulary, rng.randint(1, 2))) for _ in range(3)]
+        description = " ".join(rng.choices(vocabulary, k=25))
+        agents[f"agent_{index}"] = {'keywords': keywords, 'description': description}
+    return agents
+
+
+def _naive_route(agents: Dict[str, Dict[str, object]], text: str) -> List[str]:
+    """The pre-router approach: one substring check per rule, in sequence."""
+    lowered = text.lower()
+    return [name for name, spec in agents.items() if any(keyword in lowered for keyword in spec['keywords'])]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--agents', type=int, default=300)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"term{index}" for index in range(2000)]
+    agents = _synthetic_agents(args.agents, rng, vocabulary)
+    tasks = [" ".join(rng.choices(vocabulary, k=30)) for _ in range(args.tasks)]
+
+    keyword_router = TaskRouter(similarity_weight=0.0)
+    full_router = TaskRouter()
+    started = time.perf_counter()
+    keyword_router.add_routes((name, spec['keywords'], None) for name, spec in agents.items())
+    full_router.add_routes((name, spec['keywords'], spec['description']) for name, spec in agents.items())
+    compile_seconds = time.perf_counter() - started
+
+    results = {}
+    for label, func in (
+        ('sequential substring checks', lambda text: _naive_route(agents, text)),
+        ('TaskRouter (keywords only)', keyword_router.route),
+        ('TaskRouter (keywords + TF-IDF)', full_router.route),
+    ):
+        started = time.perf_counter()
+        for task in tasks:
+            func(task)
+        results[label] = args.tasks / (time.perf_counter() - started)
+
+    print(f"\n{args.agents} agents, {args.tasks} tasks; router compile time {compile_seconds * 1000:.1f} ms")
+    print(f"{'method':<36}{'tasks/s':>12}")
+    for label, throughput in results.items():
+        print(f"{label:<36}{throughput:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: bytes and CPU per hardware status update, full Pydantic JSON against delta-encoded frames.
+
+Run from the repository root with ``python -m benchmarks.bench_snapshot``.
+Samples are synthetic: each step changes RAM, the GPU metrics and a
+fraction of the CPU cores, as a busy machine sampled once a second would.
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from aegis.hardware.snapshot import HardwareSnapshot, SnapshotDecoder, SnapshotEncoder, StaticHardwareFacts
+
+
+def _samples(count: int, cores: int, gpus: int, change_fraction: float, seed: int) -> List[HardwareSnapshot]:
+    rng = np.random.default_rng(seed)
+    static = StaticHardwareFacts(
+        cpu_brand='Synthetic CPU @ 3.0GHz',
+        cpu_arch='x86_64',
+        cpu_cores_physical=cores // 2,
+        cpu_cores_logical=cores,
+        ram_total_gb=64.0,
+        gpus=[(index, f"Synthetic GPU {index}", 24.0) for index in range(gpus)],
+        intel_devices=['CPU', 'GPU.0', 'NPU'],
+    )
+    processes = [((1000 + index, 0.5), (2000 + index, 1.25)) for index in range(gpus)]
+    cpu = np.round(rng.uniform(0, 100, cores), 1)
+    snapshots = []
+    for step in range(count):
+        moved = rng.random(cores) < change_fraction
+        cpu = np.where(moved, np.round(rng.uniform(0, 100, cores), 1), cpu)
+        gpu_metrics = [(round(6.0 + rng.uniform(0, 2), 2), float(rng.integers(0, 100))) for _ in range(gpus)]
+        snapshots.append(HardwareSnapshot.build(
+            static, cpu.tolist(), round(30 + rng.uniform(0, 1), 2), gpu_metrics, processes, timestamp=1.7e9 + step,
+        ))
+    return snapshots
+
+
+def _run(snapshots: List[HardwareSnapshot], encode: Callable[[HardwareSnapshot], object]) -> Tuple[float, float]:
+    """Mean microseconds and bytes per update."""
+    total_bytes = 0
+    started = time.perf_counter()
+    for snapshot in snapshots:
+        total_bytes += len(encode(snapshot))
+    elapsed = time.perf_counter() - started
+    return elapsed / len(snapshots) * 1e6, total_bytes / len(snapshots)
+
+
+def _fresh(snapshot: HardwareSnapshot) -> HardwareSnapshot:
+    """A copy without the cached HardwareState, so model building is paid each time as in the old path."""
+    return HardwareSnapshot(snapshot.static, snapshot.values, snapshot.gpu_processes, snapshot.stale_monitors, snapshot.timestamp)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--cores', type=int, default=32)
+    parser.add_argument('--gpus', type=int, default=2)
+    parser.add_argument('--change-fraction', type=float, default=0.25, help="Share of cores whose figure moves per sample.")
+    parser.add_argument('--keyframe-interval', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    snapshots = _samples(args.samples, args.cores, args.gpus, args.change_fraction, args.seed)
+
+    json_encoder = SnapshotEncoder('json', keyframe_interval=args.keyframe_interval)
+    binary_encoder = SnapshotEncoder('binary', keyframe_interval=args.keyframe_interval)
+    results: Dict[str, Tuple[float, float]] = {
+        'HardwareState + model_dump_json(indent=2)': _run(snapshots, lambda s: _fresh(s).to_state().model_dump_json(indent=2)),
+        'HardwareState + model_dump_json()': _run(snapshots, lambda s: _fresh(s).to_state().model_dump_json()),
+        'delta frames (compact JSON)': _run(snapshots, json_encoder.encode),
+        'delta frames (binary)': _run(snapshots, binary_encoder.encode),
+    }
+
+    for encoding in ('json', 'binary'):
+        encoder = SnapshotEncoder(encoding, keyframe_interval=args.keyframe_interval)
+        frames = [encoder.encode(snapshot) for snapshot in snapshots]
+        decoder = SnapshotDecoder()
+        started = time.perf_counter()
+        for frame in frames:
+            decoder.decode(frame)
+        results[f'decode ({encoding})'] = ((time.perf_counter() - started) / len(frames) * 1e6, float('nan'))
+
+    print(
+        f"\n{args.samples} samples, {args.cores} cores, {args.gpus} GPUs, "
+        f"{args.change_fraction:.0%} of cores changing, keyframe every {args.keyframe_interval}"
+    )
+    print(f"{'method':<44}{'us/update':>12}{'bytes/update':>14}")
+    for label, (micros, size) in results.items():
+        size_text = '-' if np.isnan(size) else f"{size:.0f}"
+        print(f"{label:<44}{micros:>12.1f}{size_text:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark: import time and startup cost of the orchestrator and HAL, cold vs warm static cache.
+
+Run from the repository root with ``python -m benchmarks.bench_startup``. Every
+measurement runs in a fresh interpreter so module caches do not leak between runs.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from benchmarks import SRC_DIR
+
+_SNIPPETS: Dict[str, str] = {
+    'import aegis.main': "import aegis.main",
+    'Orchestrator()': "from aegis.core.orchestrator import Orchestrator\nTIMED\nOrchestrator()",
+    'HardwareManager()': "from aegis.hardware.manager import HardwareManager\nTIMED\nHardwareManager().close()",
+    'first hardware status': (
+        "from aegis.core.orchestrator import Orchestrator\n"
+        "orchestrator = Orchestrator()\nTIMED\norchestrator.execute_task('hardware status')"
+    ),
+}
+
+_TEMPLATE = """
+import json, time
+{setup}
+started = time.perf_counter()
+{body}
+print(json.dumps(time.perf_counter() - started))
+"""
+
+
+def _environment(cache_dir: str) -> Dict[str, str]:
+    """The child interpreters' environment: this checkout's sources on the path and the given cache directory."""
+    path = os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')]))
+    return dict(os.environ, PYTHONPATH=path, AEGIS_CACHE_DIR=cache_dir)
+
+
+def _run_once(snippet: str, env: Dict[str, str]) -> float:
+    """Run ``snippet`` in a fresh interpreter and return the timed section in seconds."""
+    setup, _, body = snippet.rpartition('TIMED\n')
+    code = _TEMPLATE.format(setup=setup, body=body)
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+def _measure(snippet: str, repeats: int, cache_dir: Optional[str]) -> List[float]:
+    """Time ``snippet`` ``repeats`` times; a None ``cache_dir`` means a fresh, cold cache per run."""
+    timings = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as cold_dir:
+            timings.append(_run_once(snippet, _environment(cache_dir or cold_dir)))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5, help="Fresh interpreters per measurement.")
+    args = parser.parse_args()
+
+    print(f"\n{'measurement':<40}{'cold cache ms':>16}{'warm cache ms':>16}")
+    with tempfile.TemporaryDirectory() as warm_dir:
+        _run_once(_SNIPPETS['HardwareManager()'], _environment(warm_dir))  # populate the warm cache
+
+        for name, snippet in _SNIPPETS.items():
+            cold = statistics.median(_measure(snippet, args.repeats, None)) * 1000
+            warm = statistics.median(_measure(snippet, args.repeats, warm_dir)) * 1000
+            print(f"{name:<40}{cold:>16.1f}{warm:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark suite: hot paths of the orchestrator, HAL, agent manager and logger, with regression checks.
+
+Run from the repository root with ``python -m benchmarks.bench_suite``.
+Hardware backends are faked (see ``benchmarks.fakes``) so results do not
+depend on the machine's GPUs or load. Record a baseline with
+``--save-baseline``; later runs exit with status 1 when a benchmark's median
+latency or peak memory exceeds the baseline by more than ``--threshold``.
+Each benchmark keeps the best of ``--repeats`` timed passes, and a
+benchmark that regresses is measured again up to ``--confirm`` times; it
+only fails the run if every attempt regresses.
+Log output goes to stderr and the log file as usual; redirect stderr to
+keep the table readable.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from benchmarks.fakes import FakeNVML, fake_backends
+from benchmarks.harness import BenchmarkResult, find_regressions, format_table, load_baseline, measure, save_baseline
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = REPO_ROOT / 'benchmarks' / 'baselines' / 'baseline.json'
+
+Benchmark = Tuple[str, Callable[[], object], int]
+
+
+def _build_benchmarks(iterations: int) -> List[Benchmark]:
+    """Construct the subsystems against the fakes and return the operations to time."""
+    from aegis.agents.agent_manager import AgentManager
+    from aegis.core.orchestrator import Orchestrator
+    from aegis.hardware.manager import HardwareManager
+    from aegis.hardware.static_cache import StaticHardwareCache
+    from aegis.utils.logger import setup_logger
+
+    hardware = HardwareManager(nvml=FakeNVML(gpu_count=2), static_cache=StaticHardwareCache(enabled=False))
+    agents = AgentManager(config_path=str(REPO_ROOT / 'config' / 'agents.yaml'), use_cache=False)
+    orchestrator = Orchestrator(hardware_manager=hardware, agent_manager=agents)
+    uncached = Orchestrator(result_cache_ttl=0, hardware_manager=hardware, agent_manager=agents)
+    state = hardware.get_hardware_state()
+    research_task = "Please research recent papers on CPU frequency scaling and find sources"
+
+    # Slow operations get fewer iterations so the suite stays quick.
+    return [
+        ('HardwareManager.get_hardware_state (fresh)', hardware.get_hardware_state, max(50, iterations // 20)),
+        ('HardwareManager.get_hardware_state (cached)', lambda: hardware.get_hardware_state(max_age=3600), iterations),
+        ('SystemMonitor.get_status', hardware.system_monitor.get_status, iterations),
+        ('setup_logger (existing logger)', lambda: setup_logger('BenchSuite', module_code='BNCH', script_code='SUIT'), iterations),
+        ('AgentManager.get_agent', lambda: agents.get_agent('research_agent'), iterations),
+        ('TaskRouter.route', lambda: orchestrator.router.route(research_task), iterations),
+        ('Orchestrator.execute_task (agent)', lambda: orchestrator.execute_task(research_task), max(50, iterations // 5)),
+        ('Orchestrator.execute_task (agent, uncached)', lambda: uncached.execute_task(research_task), max(50, iterations // 5)),
+        ('Orchestrator.execute_task (hardware)', lambda: orchestrator.execute_task("hardware status"), max(50, iterations // 5)),
+        ('HardwareState.model_dump_json', state.model_dump_json, iterations),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000, help="Timed calls per fast benchmark.")
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this text.")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%).")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed passes per benchmark; the best median is kept.")
+    parser.add_argument('--confirm', type=int, default=2, help="Re-measurements of a regressed benchmark before failing.")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results: List[BenchmarkResult] = []
+    with fake_backends():
+        benchmarks = [
+            (name, func, iterations)
+            for name, func, iterations in _build_benchmarks(args.iterations)
+            if args.filter.lower() in name.lower()
+        ]
+        for name, func, iterations in benchmarks:
+            results.append(measure(name, func, iterations, repeats=args.repeats))
+
+        if baseline and not args.save_baseline:
+            by_name = {name: (func, iterations) for name, func, iterations in benchmarks}
+            for _ in range(args.confirm):
+                suspects = {regression.name for regression in find_regressions(results, baseline, args.threshold)}
+                if not suspects:
+                    break
+                print(f"Re-measuring {len(suspects)} benchmark(s) that regressed: {', '.join(sorted(suspects))}", file=sys.stderr)
+                results = [
+                    measure(result.name, *by_name[result.name], repeats=args.repeats) if result.name in suspects else result
+                    for result in results
+                ]
+
+    print()
+    print(format_table(results, baseline))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(
+                f"  {regression.name}: {regression.metric} {regression.baseline:.1f} -> "
+                f"{regression.current:.1f} ({regression.change:+.1%})"
+            )
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == '__main__':
+    main()
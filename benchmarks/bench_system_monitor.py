@@ -0,0 +1,60 @@
+"""Microbenchmark: per-sample cost of the /proc fast path versus the psutil path.
+
+Run from the repository root with ``python -m benchmarks.bench_system_monitor``.
+"""
+
+import argparse
+import time
+from typing import Callable, Dict
+
+import psutil
+
+from aegis.hardware.monitors.procfs import create_sampler
+from aegis.hardware.monitors.system_monitor import SystemMonitor
+
+
+def _time_per_call(func: Callable[[], object], samples: int) -> float:
+    """Return the mean wall time of ``func`` in microseconds."""
+    func()
+    started = time.perf_counter_ns()
+    for _ in range(samples):
+        func()
+    return (time.perf_counter_ns() - started) / samples / 1000
+
+
+def _psutil_sample() -> None:
+    """The dynamic psutil calls SystemMonitor made per sample before the fast path (minus the sleep)."""
+    psutil.cpu_percent(interval=None, percpu=True)
+    psutil.virtual_memory()
+    psutil.cpu_count(logical=False)
+    psutil.cpu_count(logical=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=2000, help="Samples per measurement.")
+    args = parser.parse_args()
+
+    results: Dict[str, float] = {'psutil raw sample': _time_per_call(_psutil_sample, args.samples)}
+
+    sampler = create_sampler()
+    if sampler is not None:
+        results['procfs raw sample'] = _time_per_call(
+            lambda: (sampler.cpu_percent_per_core(), sampler.memory_bytes()),
+            args.samples,
+        )
+
+    psutil_monitor = SystemMonitor(use_procfs=False)
+    results['SystemMonitor.get_status (psutil)'] = _time_per_call(psutil_monitor.get_status, args.samples)
+    if sampler is not None:
+        procfs_monitor = SystemMonitor(use_procfs=True)
+        results['SystemMonitor.get_status (procfs)'] = _time_per_call(procfs_monitor.get_status, args.samples)
+
+    print(f"\n{'path':<40}{'us/sample':>12}{'core % @100Hz':>16}")
+    for name, micros in results.items():
+        print(f"{name:<40}{micros:>12.1f}{micros / 100:>16.3f}")
+    print("\nThe previous psutil path additionally slept 500000 us per sample (cpu_percent(interval=0.5)).")
+
+
+if __name__ == '__main__':
+    main()
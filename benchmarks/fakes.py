@@ -0,0 +1,223 @@
+"""Deterministic stand-ins for NVML, OpenVINO, py-cpuinfo, psutil and the web used by benchmarks and tests.
+
+They make benchmark results independent of the machine's GPUs, load and
+network, and let the suite run where those libraries are missing.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import sys
+import threading
+import types
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+from unittest import mock
+
+import psutil
+
+_GIB = 1024 ** 3
+
+
+class _Memory(NamedTuple):
+    total: int
+    free: int
+    used: int
+
+
+class _Utilization(NamedTuple):
+    gpu: int
+    memory: int
+
+
+class _Process(NamedTuple):
+    pid: int
+    usedGpuMemory: int
+
+
+class FakeNVML:
+    """An object exposing the subset of the ``pynvml`` module that ``NvidiaGpuMonitor`` calls."""
+
+    class NVMLError(Exception):
+        pass
+
+    def __init__(self, gpu_count: int = 1, vram_total_gb: float = 24.0, processes_per_gpu: int = 2) -> None:
+        self.gpu_count = gpu_count
+        self.vram_total = int(vram_total_gb * _GIB)
+        self.processes_per_gpu = processes_per_gpu
+
+    def nvmlInit(self) -> None:
+        pass
+
+    def nvmlShutdown(self) -> None:
+        pass
+
+    def nvmlDeviceGetCount(self) -> int:
+        return self.gpu_count
+
+    def nvmlDeviceGetHandleByIndex(self, index: int) -> int:
+        return index
+
+    def nvmlDeviceGetName(self, handle: int) -> bytes:
+        return f"Fake GPU {handle}".encode()
+
+    def nvmlDeviceGetMemoryInfo(self, handle: int) -> _Memory:
+        used = self.vram_total // 4
+        return _Memory(total=self.vram_total, free=self.vram_total - used, used=used)
+
+    def nvmlDeviceGetUtilizationRates(self, handle: int) -> _Utilization:
+        return _Utilization(gpu=37, memory=12)
+
+    def nvmlDeviceGetComputeRunningProcesses(self, handle: int) -> List[_Process]:
+        return [_Process(pid=1000 + slot, usedGpuMemory=512 * 1024 ** 2) for slot in range(self.processes_per_gpu)]
+
+
+class FakeOpenVINOCore:
+    """A ``openvino.runtime.Core`` that reports a fixed device list."""
+
+    available_devices = ['CPU', 'GPU.0', 'NPU']
+
+    def set_property(self, properties: dict) -> None:
+        pass
+
+
+class _VirtualMemory(NamedTuple):
+    total: int
+    available: int
+
+
+@contextlib.contextmanager
+def fake_backends(logical_cores: int = 8, ram_total_gb: float = 32.0) -> Iterator[None]:
+    """
+    Route hardware queries made inside the block to the fakes.
+
+    OpenVINO and py-cpuinfo are replaced in ``sys.modules``; psutil's
+    functions are patched and the /proc sampler disabled so ``SystemMonitor``
+    takes its psutil path. Pass a ``FakeNVML`` explicitly where an ``nvml``
+    argument is accepted.
+    """
+    openvino = types.ModuleType('openvino')
+    runtime = types.ModuleType('openvino.runtime')
+    runtime.Core = FakeOpenVINOCore
+    openvino.runtime = runtime
+
+    cpuinfo = types.ModuleType('cpuinfo')
+    cpuinfo.get_cpu_info = lambda: {'brand_raw': 'Fake CPU @ 3.0GHz', 'arch_string_raw': 'x86_64'}
+
+    per_core = [float(10 + index % 50) for index in range(logical_cores)]
+    memory = _VirtualMemory(total=int(ram_total_gb * _GIB), available=int(ram_total_gb * _GIB * 0.6))
+
+    def cpu_count(logical: bool = True) -> int:
+        return logical_cores if logical else logical_cores // 2
+
+    def cpu_percent(interval=None, percpu: bool = False):
+        return list(per_core) if percpu else sum(per_core) / len(per_core)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(sys.modules, {
+            'openvino': openvino,
+            'openvino.runtime': runtime,
+            'cpuinfo': cpuinfo,
+        }))
+        stack.enter_context(mock.patch.object(psutil, 'cpu_count', cpu_count))
+        stack.enter_context(mock.patch.object(psutil, 'cpu_percent', cpu_percent))
+        stack.enter_context(mock.patch.object(psutil, 'virtual_memory', lambda: memory))
+        stack.enter_context(mock.patch('aegis.hardware.monitors.system_monitor.create_sampler', lambda: None))
+        yield
+
+
+class FakeSite:
+    """
+    Page bodies by path for ``serve_site``, with request counters.
+
+    Besides ``/page/<n>`` it serves ``/big`` (4 MB), ``/gzip``, ``/deflate``
+    (zlib-wrapped) and ``/deflate-raw`` (bare deflate stream, as some servers
+    send), ``/corrupt`` (claims gzip but is not), ``/redirect`` (302 to
+    ``/page/0``) and 404 for anything else. Pages carry ETags and honour
+    ``If-None-Match``; ``max_age`` sets their Cache-Control lifetime.
+    """
+
+    ENCODED = {
+        '/gzip': ('gzip', gzip.compress),
+        '/deflate': ('deflate', zlib.compress),
+        '/deflate-raw': ('deflate', lambda body: zlib.compress(body)[2:-4]),
+        '/corrupt': ('gzip', lambda body: b'\x1f\x8b\x08\x00' + body),
+    }
+
+    def __init__(self, pages: int = 4, page_bytes: int = 4096, max_age: int = 3600) -> None:
+        self.max_age = max_age
+        self.pages: Dict[str, bytes] = {
+            f"/page/{index}": (f"<p>page {index}</p>".encode() * (page_bytes // 16 + 1))[:page_bytes]
+            for index in range(pages)
+        }
+        self.pages['/big'] = b'x' * (4 * 1024 ** 2)
+        for path in self.ENCODED:
+            self.pages[path] = b'compressible text ' * 4096
+        self.full = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+
+def _site_handler(site: FakeSite) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this, Nagle's
+        # algorithm and delayed ACKs stall every keep-alive response.
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == '/redirect':
+                self._empty(302, Location='/page/0')
+                return
+            body = site.pages.get(self.path)
+            if body is None:
+                self._empty(404)
+                return
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                with site.lock:
+                    site.not_modified += 1
+                self._empty(304, ETag=etag, **{'Cache-Control': f"max-age={site.max_age}"})
+                return
+            with site.lock:
+                site.full += 1
+            encoded = body
+            self.send_response(200)
+            if self.path in site.ENCODED:
+                encoding, encode = site.ENCODED[self.path]
+                encoded = encode(body)
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f"max-age={site.max_age}")
+            self.send_header('Content-Length', str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def _empty(self, status: int, **headers: str) -> None:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            pass
+
+    return Handler
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        # Clients hang up mid-body on purpose when a size cap is hit.
+        pass
+
+
+def serve_site(site: FakeSite) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve ``site`` over HTTP/1.1 keep-alive on a free localhost port; returns the server and its base URL."""
+    server = _QuietServer(('127.0.0.1', 0), _site_handler(site))
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,172 @@
+"""Measurement, baseline storage and regression checks shared by the benchmark suite."""
+
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+
+class BenchmarkResult(BaseModel):
+    """Timing and memory figures for one benchmarked operation."""
+
+    name: str
+    iterations: int
+    ops_per_second: float
+    p50_us: float
+    p99_us: float
+    mean_us: float
+    peak_memory_kb: float = Field(..., description="Peak traced allocation during a separate, traced pass.")
+
+
+class Regression(BaseModel):
+    """A metric that got worse than its baseline by more than the threshold."""
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1.0 if self.baseline else float('inf')
+
+
+def measure(
+    name: str,
+    func: Callable[[], object],
+    iterations: int,
+    warmup: int = 50,
+    memory_iterations: Optional[int] = None,
+    memory_passes: int = 3,
+    repeats: int = 1,
+) -> BenchmarkResult:
+    """
+    Time ``func`` call by call and measure its peak memory in a second pass.
+
+    The timed pass runs ``repeats`` times and the pass with the lowest median
+    is kept, so one pass disturbed by other load on the machine does not
+    decide the result. Memory is traced separately because tracemalloc slows
+    allocation-heavy code enough to distort the timings. tracemalloc also
+    sees allocations by background threads (the log listener, samplers), so
+    the smallest peak of ``memory_passes`` traced passes is reported.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = None
+    clock = time.perf_counter_ns
+    for _ in range(max(1, repeats)):
+        timings = np.empty(iterations, dtype=np.int64)
+        for index in range(iterations):
+            started = clock()
+            func()
+            timings[index] = clock() - started
+        if samples is None or np.median(timings) < np.median(samples):
+            samples = timings
+
+    peak_bytes = None
+    tracemalloc.start()
+    try:
+        for _ in range(memory_passes):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            for _ in range(memory_iterations or min(iterations, 200)):
+                func()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_bytes = peak - before if peak_bytes is None else min(peak_bytes, peak - before)
+    finally:
+        tracemalloc.stop()
+
+    micros = samples / 1000.0
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        ops_per_second=iterations / (samples.sum() / 1e9) if samples.sum() else float('inf'),
+        p50_us=float(np.percentile(micros, 50)),
+        p99_us=float(np.percentile(micros, 99)),
+        mean_us=float(micros.mean()),
+        peak_memory_kb=max(0.0, peak_bytes / 1024),
+    )
+
+
+def environment() -> Dict[str, str]:
+    """Facts that make a baseline comparable, or explain why it is not."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': str(os.cpu_count()),
+        'executable': sys.executable,
+    }
+
+
+def save_baseline(path: Path, results: List[BenchmarkResult]) -> None:
+    """Write results as the new baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'results': {result.name: result.model_dump() for result in results},
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+
+
+def load_baseline(path: Path) -> Dict[str, BenchmarkResult]:
+    """Read a baseline written by ``save_baseline``; empty if the file does not exist."""
+    if not path.exists():
+        return {}
+    payload = json.loads(path.read_text(encoding='utf-8'))
+    return {name: BenchmarkResult(**data) for name, data in payload.get('results', {}).items()}
+
+
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    threshold: float,
+    memory_slack_kb: float = 16.0,
+) -> List[Regression]:
+    """
+    Compare results with a baseline.
+
+    Median latency and peak memory regress when they exceed the baseline by
+    more than ``threshold`` (0.25 means 25%). Memory also gets
+    ``memory_slack_kb`` of absolute slack so tiny allocations do not flap.
+    p99 is reported but not gated, as it is too noisy on shared machines.
+    """
+    regressions: List[Regression] = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.p50_us > previous.p50_us * (1.0 + threshold):
+            regressions.append(Regression(name=result.name, metric='p50_us', baseline=previous.p50_us, current=result.p50_us))
+        memory_limit = previous.peak_memory_kb * (1.0 + threshold) + memory_slack_kb
+        if result.peak_memory_kb > memory_limit:
+            regressions.append(Regression(
+                name=result.name,
+                metric='peak_memory_kb',
+                baseline=previous.peak_memory_kb,
+                current=result.peak_memory_kb,
+            ))
+    return regressions
+
+
+def format_table(results: List[BenchmarkResult], baseline: Dict[str, BenchmarkResult]) -> str:
+    """Render results, with the p50 change against the baseline where one exists."""
+    lines = [f"{'benchmark':<44}{'ops/s':>12}{'p50 us':>10}{'p99 us':>10}{'peak KB':>10}{'vs base':>10}"]
+    for result in results:
+        previous = baseline.get(result.name)
+        change = f"{(result.p50_us / previous.p50_us - 1.0) * 100:+.1f}%" if previous and previous.p50_us else "-"
+        lines.append(
+            f"{result.name:<44}{result.ops_per_second:>12,.0f}{result.p50_us:>10.1f}"
+            f"{result.p99_us:>10.1f}{result.peak_memory_kb:>10.1f}{change:>10}"
+        )
+    return "\n".join(lines)
@@ -1,44 +1,226 @@
-from typing import Any, Dict, List, Optional
+import hashlib
+import importlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
+from pydantic import ValidationError
 
 from aegis.agents.base import AegisAgent, AegisTool
+from aegis.agents.registry import AgentRegistry
 from aegis.utils.logger import setup_logger
+from aegis.utils.paths import cache_dir
+from aegis.utils.tracing import traced
+
+_TOOL_OPTIONS = ('executor', 'timeout_seconds', 'max_concurrency', 'cacheable', 'cache_ttl_seconds')
+
+_CACHE_FORMAT_VERSION = 1
 
 
 class AgentManager:
-    """Manage agent configuration and provide agent instances on request."""
+    """Manage agent configuration and provide agent instances on request.
+
+    Agent definitions are read from ``config_path`` plus any ``*.yaml`` files in
+    ``config_dir`` (``agents.d`` next to the main file by default; later files
+    override earlier ones). They are validated once into an ``AgentRegistry``
+    whose shared, immutable agents ``get_agent`` returns. The parsed
+    definitions are cached on disk keyed by the source files' size and mtime,
+    so an unchanged configuration skips YAML parsing at startup.
+    ``start_watching`` polls the sources and swaps in a rebuilt registry
+    without blocking callers.
+    """
 
-    def __init__(self, config_path: str = "config/agents.yaml") -> None:
+    def __init__(
+        self,
+        config_path: str = "config/agents.yaml",
+        config_dir: Optional[str] = None,
+        watch_interval: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> None:
         self.logger = setup_logger('AgentManager', module_code='AGNT', script_code='MGR')
+        self.config_path = config_path
+        self.config_dir = config_dir if config_dir is not None else os.path.join(
+            os.path.dirname(config_path) or '.', 'agents.d'
+        )
+        self.use_cache = use_cache
+        self._registry = AgentRegistry({}, {})
+        self._failed_fingerprint = ''
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher_thread: Optional[threading.Thread] = None
+
         self.logger.info("Loading agent configurations from '%s'...", config_path)
-        self.agent_configs: Dict[str, Dict[str, Any]] = {}
+        self.reload(force=True)
 
-        try:
-            with open(config_path, 'r', encoding='utf-8') as file:
-                data = yaml.safe_load(file) or {}
+        if watch_interval is not None:
+            self.start_watching(watch_interval)
+
+    @property
+    def registry(self) -> AgentRegistry:
+        """The currently active compiled registry."""
+        return self._registry
+
+    @property
+    def agent_configs(self) -> Dict[str, Dict[str, Any]]:
+        """Raw agent definitions backing the active registry."""
+        return dict(self._registry.configs)
+
+    @traced('AgentManager.get_agent', category='agents')
+    def get_agent(self, agent_name: str) -> Optional[AegisAgent]:
+        """Return the shared, precompiled agent for the requested name, if available."""
+
+        registry = self._registry
+        agent = registry.get(agent_name)
+        if agent is not None:
+            return agent
+
+        if agent_name in registry.invalid:
+            self.logger.error(
+                "Failed to instantiate '%s' agent due to missing or invalid configuration.",
+                agent_name,
+                extra={'error_code': 'CONF-AGENT-INIT'}
+            )
+        else:
+            self.logger.warning("Agent '%s' not found in configuration.", agent_name)
+        return None
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the registry if the configuration changed; return True if a new one was swapped in."""
+
+        with self._reload_lock:
+            sources = self._config_sources()
+            fingerprint = self._fingerprint(sources)
+            if not force and fingerprint == self._registry.fingerprint:
+                return False
+
+            if not force and fingerprint == self._failed_fingerprint:
+                # Already reported; wait for the files to change again.
+                return False
+
+            configs = self._load_cached_configs(fingerprint)
+            if configs is None:
+                configs, complete = self._parse_sources(sources)
+                if not complete:
+                    self._failed_fingerprint = fingerprint
+                    if self._registry.fingerprint:
+                        # Keep serving the previous registry rather than dropping agents.
+                        self.logger.warning("Keeping the previous agent registry until the configuration is fixed.")
+                        return False
+                else:
+                    self._store_cached_configs(fingerprint, configs)
 
-            if not isinstance(data, dict):
+            registry = self._compile(configs, fingerprint)
+            self._registry = registry
+            self.logger.info(
+                "Agent registry compiled: %d valid, %d invalid agent definition(s).",
+                len(registry),
+                len(registry.invalid),
+            )
+            return True
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Poll the configuration sources every ``interval`` seconds and hot-swap changes."""
+
+        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._watcher_thread = threading.Thread(
+            target=self._watch_loop,
+            args=(interval,),
+            name='aegis-agent-config-watcher',
+            daemon=True,
+        )
+        self._watcher_thread.start()
+        self.logger.info("Watching agent configuration for changes every %.1fs.", interval)
+
+    def stop_watching(self, timeout: Optional[float] = None) -> None:
+        """Stop the configuration watcher thread."""
+
+        thread = self._watcher_thread
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join(timeout)
+        self._watcher_thread = None
+
+    def _watch_loop(self, interval: float) -> None:
+        """Body of the watcher thread."""
+
+        while not self._stop_event.wait(interval):
+            try:
+                if self.reload():
+                    self.logger.info("Agent configuration change detected; registry reloaded.")
+            except Exception as exc:  # noqa: BLE001
                 self.logger.error(
-                    "Agent configuration file '%s' must contain a mapping.",
-                    config_path,
-                    extra={'error_code': 'CONF-TYPE'}
+                    "Agent configuration reload failed: %s",
+                    exc,
+                    extra={'error_code': 'CONF-RELOAD-FAIL'}
                 )
-                return
+
+    def _config_sources(self) -> List[Tuple[str, int, int]]:
+        """Return ``(path, mtime_ns, size)`` for every configuration file, in merge order."""
+
+        paths = [self.config_path]
+        if os.path.isdir(self.config_dir):
+            paths.extend(
+                str(path) for path in sorted(Path(self.config_dir).glob('*.yaml')) if path.is_file()
+            )
+
+        sources: List[Tuple[str, int, int]] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                sources.append((path, -1, -1))
+                continue
+            sources.append((path, stat.st_mtime_ns, stat.st_size))
+        return sources
+
+    @staticmethod
+    def _fingerprint(sources: List[Tuple[str, int, int]]) -> str:
+        """Hash the source list so that any added, removed or modified file changes it."""
+
+        digest = hashlib.sha256(repr((_CACHE_FORMAT_VERSION, sources)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _parse_sources(self, sources: List[Tuple[str, int, int]]) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """Parse and merge every source file; the flag is False if any file could not be used."""
+
+        configs: Dict[str, Dict[str, Any]] = {}
+        complete = True
+        for path, _, _ in sources:
+            data = self._parse_file(path)
+            if data is None:
+                complete = False
+                continue
 
             # ensure nested structures are dictionaries to avoid mutation surprises
-            self.agent_configs = {
+            configs.update({
                 str(name): dict(config) if isinstance(config, dict) else {}
                 for name, config in data.items()
-            }
+            })
+
+        if complete:
             self.logger.info("Agent configurations loaded successfully.")
+        return configs, complete
+
+    def _parse_file(self, config_path: str) -> Optional[Dict[str, Any]]:
+        """Load one YAML file, logging and returning None on any problem."""
 
+        try:
+            with open(config_path, 'r', encoding='utf-8') as file:
+                data = yaml.safe_load(file) or {}
         except FileNotFoundError:
             self.logger.error(
                 "Agent configuration file not found at '%s'.",
                 config_path,
                 extra={'error_code': 'CONF-404'}
             )
+            return None
         except yaml.YAMLError as exc:
             self.logger.error(
                 "Error parsing YAML in '%s': %s",
@@ -46,26 +228,88 @@ class AgentManager:
                 exc,
                 extra={'error_code': 'CONF-YAML-ERR'}
             )
-
-    def get_agent(self, agent_name: str) -> Optional[AegisAgent]:
-        """Return a fully instantiated agent for the requested name, if available."""
-
-        config = self.agent_configs.get(agent_name)
-        if not config:
-            self.logger.warning("Agent '%s' not found in configuration.", agent_name)
             return None
 
-        agent = self._build_agent(agent_name, config)
-        if agent is None:
+        if not isinstance(data, dict):
             self.logger.error(
-                "Failed to instantiate '%s' agent due to missing or invalid configuration.",
-                agent_name,
-                extra={'error_code': 'CONF-AGENT-INIT'}
+                "Agent configuration file '%s' must contain a mapping.",
+                config_path,
+                extra={'error_code': 'CONF-TYPE'}
             )
-        else:
-            self.logger.info("Instantiated '%s' agent with role '%s'.", agent_name, agent.role)
+            return None
+
+        return data
+
+    def _compile(self, configs: Dict[str, Dict[str, Any]], fingerprint: str) -> AgentRegistry:
+        """Validate every definition once and build an immutable registry."""
+
+        agents: Dict[str, AegisAgent] = {}
+        invalid: List[str] = []
+        for agent_name, config in configs.items():
+            agent = self._build_agent(agent_name, config)
+            if agent is None:
+                self.logger.error(
+                    "Failed to instantiate '%s' agent due to missing or invalid configuration.",
+                    agent_name,
+                    extra={'error_code': 'CONF-AGENT-INIT'}
+                )
+                invalid.append(agent_name)
+                continue
+            agents[agent_name] = agent
+            self.logger.info("Compiled '%s' agent with role '%s'.", agent_name, agent.role)
+
+        return AgentRegistry(agents, configs, invalid=invalid, fingerprint=fingerprint)
+
+    def _cache_path(self) -> Optional[Path]:
+        """Location of the precompiled definition cache for this configuration file."""
+
+        if not self.use_cache:
+            return None
+        key = hashlib.sha256(os.path.abspath(self.config_path).encode('utf-8')).hexdigest()[:16]
+        try:
+            return cache_dir() / f"agents-{key}.json"
+        except OSError:
+            return None
+
+    def _load_cached_configs(self, fingerprint: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return cached definitions if they were produced from the current sources."""
+
+        path = self._cache_path()
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                payload = json.load(file)
+        except (OSError, ValueError):
+            return None
 
-        return agent
+        if not isinstance(payload, dict) or payload.get('fingerprint') != fingerprint:
+            return None
+        configs = payload.get('configs')
+        if not isinstance(configs, dict):
+            return None
+
+        self.logger.info("Loaded precompiled agent definitions from cache; skipping YAML parsing.")
+        return configs
+
+    def _store_cached_configs(self, fingerprint: str, configs: Dict[str, Dict[str, Any]]) -> None:
+        """Persist parsed definitions; definitions that are not plain JSON are simply not cached."""
+
+        path = self._cache_path()
+        if path is None:
+            return
+        try:
+            encoded = json.dumps({'fingerprint': fingerprint, 'configs': configs})
+        except (TypeError, ValueError):
+            self.logger.debug("Agent definitions are not JSON-serialisable; skipping definition cache.")
+            return
+
+        temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            temp_path.write_text(encoded, encoding='utf-8')
+            os.replace(temp_path, path)
+        except OSError as exc:
+            self.logger.warning("Could not write agent definition cache '%s': %s", path, exc)
 
     def _build_agent(self, agent_name: str, config: Dict[str, Any]) -> Optional[AegisAgent]:
         """Construct an AegisAgent from raw configuration data."""
@@ -79,7 +323,7 @@ class AgentManager:
 
         tools = self._build_tools(agent_name, config.get('tools', []))
 
-        return AegisAgent(role=role, goal=goal, backstory=backstory, tools=tools)
+        return AegisAgent(role=role, goal=goal, backstory=backstory, tools=tuple(tools))
 
     def _build_tools(self, agent_name: str, tools_data: Any) -> List[AegisTool]:
         """Build a list of tools from configuration, ignoring malformed entries."""
@@ -109,6 +353,8 @@ class AgentManager:
             name = tool_entry.get('name')
             description = tool_entry.get('description')
             func = tool_entry.get('func')
+            if isinstance(func, str):
+                func = self._resolve_tool_func(agent_name, func)
 
             if not all([name, description, callable(func)]):
                 self.logger.warning(
@@ -118,10 +364,33 @@ class AgentManager:
                 )
                 continue
 
-            tools.append(AegisTool(name=str(name), description=str(description), func=func))
+            options = {key: tool_entry[key] for key in _TOOL_OPTIONS if tool_entry.get(key) is not None}
+            try:
+                tools.append(AegisTool(name=str(name), description=str(description), func=func, **options))
+            except ValidationError as exc:
+                self.logger.warning(
+                    "Invalid tool options for agent '%s' tool '%s': %s",
+                    agent_name,
+                    name,
+                    exc
+                )
 
         return tools
 
+    def _resolve_tool_func(self, agent_name: str, path: str) -> Any:
+        """Import a tool function given as ``package.module.function``; None if it cannot be found."""
+        module_name, _, attribute = path.rpartition('.')
+        try:
+            return getattr(importlib.import_module(module_name), attribute)
+        except (ImportError, AttributeError, ValueError) as exc:
+            self.logger.warning(
+                "Cannot import tool function '%s' for agent '%s': %s",
+                path,
+                agent_name,
+                exc
+            )
+            return None
+
     def _extract_str_field(self, agent_name: str, config: Dict[str, Any], field_name: str) -> str:
         """Pull a string field from the configuration while providing logging."""
 
@@ -1,4 +1,6 @@
-from typing import Any, Callable, List
+import uuid
+from enum import Enum
+from typing import Any, Callable, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -7,29 +9,70 @@ from aegis.utils.logger import setup_logger
 _logger = setup_logger('AgentBase', module_code='AGNT', script_code='BASE')
 
 
-def _default_tools() -> List['AegisTool']:
-    """Return a fresh tool list for agent initialization."""
+def _new_task_id() -> str:
+    """Return a short unique identifier for a task."""
 
-    return []
+    return uuid.uuid4().hex[:12]
 
 
 class AegisTool(BaseModel):
-    """A data contract for a tool that an agent can use."""
+    """A data contract for a tool that an agent can use.
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    The execution fields are read by ``aegis.tools.runtime.ToolRuntime``.
+    Tools run in a process pool must have a picklable, module-level ``func``.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
 
     name: str
     description: str
     func: Callable[..., Any]
+    executor: Literal['thread', 'process'] = Field('thread', description="Pool the tool runs on.")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Per-call timeout; None waits indefinitely.")
+    max_concurrency: Optional[int] = Field(None, gt=0, description="Maximum simultaneous calls of this tool.")
+    cacheable: bool = Field(False, description="Whether results may be memoized; only for deterministic tools.")
+    cache_ttl_seconds: Optional[float] = Field(None, gt=0, description="Lifetime of memoized results; None uses the runtime default.")
 
 
 class AegisAgent(BaseModel):
-    """A data contract representing a specialized agent in the Aegis system."""
+    """A data contract representing a specialized agent in the Aegis system.
+
+    Agents are immutable, tools included, so that a single validated instance
+    can be shared by every caller of ``AgentManager.get_agent``.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     role: str
     goal: str
     backstory: str
-    tools: List[AegisTool] = Field(default_factory=_default_tools)
+    tools: Tuple[AegisTool, ...] = ()
+
+
+class DeviceKind(str, Enum):
+    """Compute devices a task can be placed on."""
+
+    CPU = 'CPU'
+    NVIDIA_GPU = 'NVIDIA_GPU'
+    INTEL_GPU = 'INTEL_GPU'
+    INTEL_NPU = 'INTEL_NPU'
+
+
+class ResourceRequest(BaseModel):
+    """The resources a task declares it needs in order to run."""
+
+    ram_gb: float = Field(0.0, ge=0.0, description="System RAM the task needs, in gigabytes.")
+    vram_gb: float = Field(0.0, ge=0.0, description="Dedicated GPU memory the task needs, in gigabytes.")
+    device: DeviceKind = Field(DeviceKind.CPU, description="The preferred device to run on.")
+    allow_cpu_fallback: bool = Field(
+        True,
+        description="Whether the task may run on the CPU when the preferred device cannot take it. Ignored for tasks that need VRAM.",
+    )
+
+    @property
+    def is_empty(self) -> bool:
+        """True when the task declares no resource needs beyond a CPU."""
+        return self.ram_gb == 0.0 and self.vram_gb == 0.0 and self.device == DeviceKind.CPU
 
 
 class AegisTask(BaseModel):
@@ -38,6 +81,12 @@ class AegisTask(BaseModel):
     description: str
     expected_output: str
     agent: AegisAgent
+    task_id: str = Field(default_factory=_new_task_id)
+    resources: ResourceRequest = Field(default_factory=ResourceRequest)
+    depends_on: List[str] = Field(
+        default_factory=list,
+        description="task_ids of tasks in the same plan whose outputs this task consumes.",
+    )
 
     def log_creation(self) -> None:
         _logger.info("Created task for agent '%s' with goal '%s'.", self.agent.role, self.agent.goal)
@@ -0,0 +1,40 @@
+import time
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional
+
+from aegis.agents.base import AegisAgent
+
+
+class AgentRegistry:
+    """
+    An immutable, precompiled set of agents.
+
+    Every definition is validated once when the registry is built; lookups
+    then hand out the shared, frozen ``AegisAgent`` instances. A new registry
+    is built and swapped in whole whenever the configuration changes.
+    """
+
+    __slots__ = ('agents', 'configs', 'invalid', 'fingerprint', 'loaded_at')
+
+    def __init__(
+        self,
+        agents: Dict[str, AegisAgent],
+        configs: Dict[str, Dict[str, Any]],
+        invalid: Iterable[str] = (),
+        fingerprint: str = '',
+    ) -> None:
+        self.agents: Mapping[str, AegisAgent] = MappingProxyType(dict(agents))
+        self.configs: Mapping[str, Dict[str, Any]] = MappingProxyType(dict(configs))
+        self.invalid: FrozenSet[str] = frozenset(invalid)
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+
+    def get(self, agent_name: str) -> Optional[AegisAgent]:
+        """Return the compiled agent for ``agent_name``, if it exists and is valid."""
+        return self.agents.get(agent_name)
+
+    def __contains__(self, agent_name: object) -> bool:
+        return agent_name in self.agents
+
+    def __len__(self) -> int:
+        return len(self.agents)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+_EPSILON = 1e-10
+
+
+class RingBuffer:
+    """
+    A preallocated float32 ring addressed by absolute sample position.
+
+    Holds the most recent ``capacity`` samples of an unbounded stream;
+    ``read`` copies a span out as long as it has not yet been overwritten.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive.")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample still held."""
+        return max(0, self.written - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples, overwriting the oldest ones once full."""
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        start = self.written % self.capacity
+        head = min(len(samples), self.capacity - start)
+        self._data[start:start + head] = samples[:head]
+        self._data[:len(samples) - head] = samples[head:]
+        self.written += len(samples)
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Copy of samples ``[start, stop)``; raises IndexError if any were overwritten or not yet written."""
+        if start < self.oldest or stop > self.written or start > stop:
+            raise IndexError(f"Samples [{start}, {stop}) are not held (buffer holds [{self.oldest}, {self.written})).")
+        offset = start % self.capacity
+        length = stop - start
+        if offset + length <= self.capacity:
+            return self._data[offset:offset + length].copy()
+        return np.concatenate((self._data[offset:], self._data[:length - (self.capacity - offset)]))
+
+
+class Resampler:
+    """
+    Streaming sample-rate converter for mono float32 audio.
+
+    Uses linear interpolation, preceded when downsampling by a windowed-sinc
+    low-pass filter to limit aliasing. Filter history and the interpolation
+    phase carry across calls, so chunk boundaries leave no artefacts.
+    """
+
+    FILTER_TAPS = 31
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.step = source_rate / target_rate
+        self._position = 0.0
+        self._tail: Optional[np.ndarray] = None
+        self._taps: Optional[np.ndarray] = None
+        self._history = np.zeros(0, dtype=np.float32)
+
+        if self.step > 1.0:
+            cutoff = 0.45 / self.step
+            n = np.arange(self.FILTER_TAPS) - (self.FILTER_TAPS - 1) / 2
+            taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(self.FILTER_TAPS)
+            self._taps = (taps / taps.sum()).astype(np.float32)
+            self._history = np.zeros(self.FILTER_TAPS - 1, dtype=np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Convert the next chunk of the stream."""
+        if self.source_rate == self.target_rate or not len(samples):
+            return samples
+
+        if self._taps is not None:
+            padded = np.concatenate((self._history, samples))
+            self._history = padded[-(self.FILTER_TAPS - 1):]
+            samples = np.convolve(padded, self._taps, mode='valid').astype(np.float32)
+
+        buffer = samples if self._tail is None else np.concatenate((self._tail, samples))
+        last = len(buffer) - 1
+        count = int(np.floor((last - self._position) / self.step)) + 1 if last >= self._position else 0
+        positions = self._position + self.step * np.arange(count)
+        output = np.interp(positions, np.arange(len(buffer)), buffer).astype(np.float32)
+
+        self._position = self._position + self.step * count - last
+        self._tail = buffer[-1:]
+        return output
+
+
+def frame_energies_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Mean-square energy in dBFS of each whole ``frame_length`` frame of ``samples``."""
+    frames = samples[:len(samples) - len(samples) % frame_length].reshape(-1, frame_length)
+    return 10.0 * np.log10(np.einsum('ij,ij->i', frames, frames) / frame_length + _EPSILON)
@@ -0,0 +1,58 @@
+from typing import Literal
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AudioFormat(BaseModel):
+    """Layout of interleaved integer PCM audio."""
+
+    sample_rate: int = Field(..., gt=0)
+    channels: int = Field(1, gt=0)
+    sample_width: Literal[1, 2, 4] = Field(2, description="Bytes per sample: 1 (unsigned), 2 or 4 (signed).")
+
+    @property
+    def frame_bytes(self) -> int:
+        """Bytes per multi-channel sample frame."""
+        return self.channels * self.sample_width
+
+
+class SpeechSegment(BaseModel):
+    """A span of detected speech, as mono float32 samples at the pipeline's rate."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: int = Field(..., description="Position of the segment within its stream, from 0.")
+    start_seconds: float
+    end_seconds: float
+    sample_rate: int
+    samples: np.ndarray
+    truncated: bool = Field(False, description="Cut at the pipeline's maximum segment length rather than at silence.")
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.end_seconds - self.start_seconds
+
+
+class Transcript(BaseModel):
+    """The recogniser's output for one speech segment."""
+
+    segment_index: int
+    start_seconds: float
+    end_seconds: float
+    text: str
+    recognition_seconds: float = Field(0.0, description="Time the recogniser took for this segment.")
+
+
+class PipelineStats(BaseModel):
+    """Throughput and memory figures for one pipeline run."""
+
+    audio_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    segments: int = 0
+    buffer_bytes: int = Field(0, description="Size of the preallocated ring buffer.")
+
+    @property
+    def real_time_factor(self) -> float:
+        """Processing time per second of audio; below 1.0 keeps up with a live stream."""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
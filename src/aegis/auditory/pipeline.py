@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+from aegis.auditory.dsp import Resampler, RingBuffer
+from aegis.auditory.models import PipelineStats, SpeechSegment, Transcript
+from aegis.auditory.vad import EnergyVAD, SpeechSegmenter
+from aegis.utils.logger import setup_logger
+
+
+class Recognizer(Protocol):
+    """Anything that turns a speech segment into text, such as a speech-to-text model wrapper."""
+
+    def transcribe(self, segment: SpeechSegment) -> str:
+        ...
+
+
+class NullRecognizer:
+    """Placeholder recogniser that returns no text; useful for measuring the pipeline itself."""
+
+    def transcribe(self, segment: SpeechSegment) -> str:
+        return ''
+
+
+class AudioPipeline:
+    """
+    Streaming ingestion for the Auditory Cortex: resample, detect speech, recognise.
+
+    Input is an iterable (or async iterable) of mono float32 chunks at
+    ``source_rate``, such as the generators in ``aegis.auditory.sources``.
+    Audio is resampled to ``target_rate`` and written to a preallocated ring
+    buffer sized for the longest segment, framed and classified by an energy
+    VAD, and each speech segment is handed to the recogniser as soon as it
+    closes. Memory use is fixed by ``max_segment_seconds`` and does not grow
+    with the length of the input.
+
+    A pipeline holds per-stream state; use one instance per stream.
+    """
+
+    BLOCK_SECONDS = 1.0
+
+    def __init__(
+        self,
+        source_rate: int,
+        recognizer: Optional[Recognizer] = None,
+        target_rate: int = 16000,
+        frame_ms: int = 30,
+        min_speech_ms: int = 90,
+        min_silence_ms: int = 300,
+        padding_ms: int = 150,
+        max_segment_seconds: float = 30.0,
+        vad: Optional[EnergyVAD] = None,
+    ) -> None:
+        self.logger = setup_logger('AudioPipeline', module_code='AUD', script_code='PIPE')
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.recognizer: Recognizer = recognizer or NullRecognizer()
+        self.frame_length = int(target_rate * frame_ms / 1000)
+        self.block_length = int(target_rate * self.BLOCK_SECONDS) // self.frame_length * self.frame_length
+
+        self.resampler = Resampler(source_rate, target_rate)
+        self.vad = vad or EnergyVAD(self.frame_length)
+        self.segmenter = SpeechSegmenter(
+            min_speech_frames=round(min_speech_ms / frame_ms),
+            min_silence_frames=round(min_silence_ms / frame_ms),
+            padding_frames=round(padding_ms / frame_ms),
+            max_segment_frames=int(max_segment_seconds * 1000 / frame_ms),
+        )
+
+        # A segment can begin up to max_segment + padding before the frame that
+        # closes it, which may sit at the end of a block still being processed.
+        frames_needed = self.segmenter.max_segment_frames + self.segmenter.padding_frames
+        self.ring = RingBuffer(frames_needed * self.frame_length + 2 * self.block_length)
+        self.stats = PipelineStats(buffer_bytes=self.ring.nbytes)
+
+        self._pending = np.zeros(self.block_length, dtype=np.float32)
+        self._pending_length = 0
+        self._segment_index = 0
+
+    def run(self, chunks: Iterable[np.ndarray]) -> Iterator[Transcript]:
+        """Process a stream and lazily yield a transcript per speech segment."""
+        started = time.perf_counter()
+        for chunk in chunks:
+            for segment in self._feed(chunk):
+                yield self._recognise(segment)
+        for segment in self._finish():
+            yield self._recognise(segment)
+        self._log_summary(time.perf_counter() - started)
+
+    def segments(self, chunks: Iterable[np.ndarray]) -> Iterator[SpeechSegment]:
+        """Process a stream and lazily yield its speech segments without recognising them."""
+        started = time.perf_counter()
+        for chunk in chunks:
+            yield from self._feed(chunk)
+        yield from self._finish()
+        self._log_summary(time.perf_counter() - started)
+
+    async def arun(self, chunks: AsyncIterable[np.ndarray]) -> AsyncIterator[Transcript]:
+        """Async counterpart of ``run``; recognition runs on a worker thread."""
+        started = time.perf_counter()
+        async for chunk in chunks:
+            for segment in self._feed(chunk):
+                yield await asyncio.to_thread(self._recognise, segment)
+        for segment in self._finish():
+            yield await asyncio.to_thread(self._recognise, segment)
+        self._log_summary(time.perf_counter() - started)
+
+    def _feed(self, chunk: np.ndarray) -> List[SpeechSegment]:
+        """Resample a chunk and process every whole block it completes."""
+        began = time.perf_counter()
+        self.stats.audio_seconds += len(chunk) / self.source_rate
+        samples = self.resampler.process(np.asarray(chunk, dtype=np.float32))
+
+        segments: List[SpeechSegment] = []
+        while len(samples):
+            take = min(len(samples), self.block_length - self._pending_length)
+            self._pending[self._pending_length:self._pending_length + take] = samples[:take]
+            self._pending_length += take
+            samples = samples[take:]
+            if self._pending_length == self.block_length:
+                segments.extend(self._process_block(self._pending))
+                self._pending_length = 0
+
+        self.stats.processing_seconds += time.perf_counter() - began
+        return segments
+
+    def _finish(self) -> List[SpeechSegment]:
+        """Process the final partial block and close any open segment."""
+        began = time.perf_counter()
+        usable = self._pending_length - self._pending_length % self.frame_length
+        segments = self._process_block(self._pending[:usable]) if usable else []
+        self._pending_length = 0
+        segments.extend(self._extract(span) for span in self.segmenter.flush())
+        self.stats.processing_seconds += time.perf_counter() - began
+        return segments
+
+    def _process_block(self, block: np.ndarray) -> List[SpeechSegment]:
+        """Buffer one block of frames and return the segments it closes."""
+        self.ring.write(block)
+        flags = self.vad.classify(block)
+        return [self._extract(span) for span in self.segmenter.push(flags)]
+
+    def _extract(self, span: Tuple[int, int, bool]) -> SpeechSegment:
+        """Copy a segment's samples out of the ring buffer."""
+        start_frame, stop_frame, truncated = span
+        start = max(start_frame * self.frame_length, self.ring.oldest)
+        stop = min(stop_frame * self.frame_length, self.ring.written)
+        segment = SpeechSegment(
+            index=self._segment_index,
+            start_seconds=start / self.target_rate,
+            end_seconds=stop / self.target_rate,
+            sample_rate=self.target_rate,
+            samples=self.ring.read(start, stop),
+            truncated=truncated,
+        )
+        self._segment_index += 1
+        self.stats.segments += 1
+        return segment
+
+    def _recognise(self, segment: SpeechSegment) -> Transcript:
+        """Run the recogniser on one segment, counting its time as processing time."""
+        began = time.perf_counter()
+        text = self.recognizer.transcribe(segment)
+        elapsed = time.perf_counter() - began
+        self.stats.processing_seconds += elapsed
+        return Transcript(
+            segment_index=segment.index,
+            start_seconds=segment.start_seconds,
+            end_seconds=segment.end_seconds,
+            text=text,
+            recognition_seconds=elapsed,
+        )
+
+    def _log_summary(self, wall_seconds: float) -> None:
+        self.logger.info(
+            "Processed %.1fs of audio into %d segment(s) in %.2fs (real-time factor %.4f).",
+            self.stats.audio_seconds,
+            self.stats.segments,
+            wall_seconds,
+            self.stats.real_time_factor,
+        )
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import wave
+from typing import AsyncIterator, BinaryIO, Iterator, Tuple, Union
+
+import numpy as np
+
+from aegis.auditory.models import AudioFormat
+
+DEFAULT_CHUNK_FRAMES = 4096
+
+_PCM_DTYPES = {1: np.uint8, 2: np.dtype('<i2'), 4: np.dtype('<i4')}
+
+
+def pcm_to_float(data: bytes, audio_format: AudioFormat) -> np.ndarray:
+    """Decode interleaved PCM bytes into mono float32 samples in [-1, 1]."""
+    usable = len(data) - len(data) % audio_format.frame_bytes
+    samples = np.frombuffer(data[:usable], dtype=_PCM_DTYPES[audio_format.sample_width]).astype(np.float32)
+    if audio_format.sample_width == 1:
+        samples -= 128.0
+    samples *= 1.0 / float(2 ** (8 * audio_format.sample_width - 1))
+    if audio_format.channels > 1:
+        samples = samples.reshape(-1, audio_format.channels).mean(axis=1)
+    return samples
+
+
+def iter_pcm(
+    stream: BinaryIO,
+    audio_format: AudioFormat,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+) -> Iterator[np.ndarray]:
+    """Yield mono float32 chunks of up to ``chunk_frames`` samples from a raw PCM stream."""
+    chunk_bytes = chunk_frames * audio_format.frame_bytes
+    remainder = b''
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            return
+        data = remainder + data
+        usable = len(data) - len(data) % audio_format.frame_bytes
+        remainder = data[usable:]
+        if usable:
+            yield pcm_to_float(data[:usable], audio_format)
+
+
+def open_wav(path: Union[str, os.PathLike], chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> Tuple[AudioFormat, Iterator[np.ndarray]]:
+    """Return a WAV file's format and a generator of its mono float32 chunks."""
+    reader = wave.open(os.fspath(path), 'rb')
+    try:
+        audio_format = AudioFormat(
+            sample_rate=reader.getframerate(),
+            channels=reader.getnchannels(),
+            sample_width=reader.getsampwidth(),
+        )
+    except Exception:
+        reader.close()
+        raise
+
+    def chunks() -> Iterator[np.ndarray]:
+        with reader:
+            while True:
+                data = reader.readframes(chunk_frames)
+                if not data:
+                    return
+                yield pcm_to_float(data, audio_format)
+
+    return audio_format, chunks()
+
+
+async def aiter_pcm(
+    reader: asyncio.StreamReader,
+    audio_format: AudioFormat,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+) -> AsyncIterator[np.ndarray]:
+    """Async counterpart of ``iter_pcm`` for sockets, subprocess pipes and other stream readers."""
+    chunk_bytes = chunk_frames * audio_format.frame_bytes
+    remainder = b''
+    while True:
+        data = await reader.read(chunk_bytes)
+        if not data:
+            return
+        data = remainder + data
+        usable = len(data) - len(data) % audio_format.frame_bytes
+        remainder = data[usable:]
+        if usable:
+            yield pcm_to_float(data[:usable], audio_format)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from aegis.auditory.dsp import frame_energies_db
+
+
+class EnergyVAD:
+    """
+    Energy-based voice-activity detection over fixed-length frames.
+
+    A frame is speech when its energy exceeds both ``min_threshold_db`` and
+    the running noise floor plus ``margin_db``. The noise floor follows a low
+    percentile of each block's frame energies, so it adapts to steady
+    background noise without following speech.
+    """
+
+    def __init__(
+        self,
+        frame_length: int,
+        margin_db: float = 12.0,
+        min_threshold_db: float = -50.0,
+        noise_percentile: float = 10.0,
+        noise_adaptation: float = 0.9,
+    ) -> None:
+        self.frame_length = frame_length
+        self.margin_db = margin_db
+        self.min_threshold_db = min_threshold_db
+        self.noise_percentile = noise_percentile
+        self.noise_adaptation = noise_adaptation
+        self.noise_floor_db: Optional[float] = None
+
+    def classify(self, samples: np.ndarray) -> np.ndarray:
+        """Speech flags for each whole frame in ``samples``."""
+        energies = frame_energies_db(samples, self.frame_length)
+        if not len(energies):
+            return np.zeros(0, dtype=bool)
+
+        block_floor = float(np.percentile(energies, self.noise_percentile))
+        if self.noise_floor_db is None or block_floor < self.noise_floor_db:
+            self.noise_floor_db = block_floor
+        else:
+            alpha = self.noise_adaptation
+            self.noise_floor_db = alpha * self.noise_floor_db + (1.0 - alpha) * block_floor
+
+        threshold = max(self.min_threshold_db, self.noise_floor_db + self.margin_db)
+        return energies > threshold
+
+
+class SpeechSegmenter:
+    """
+    Turn per-frame speech flags into ``(start_frame, stop_frame, truncated)`` segments.
+
+    Speech must persist for ``min_speech_frames`` to open a segment and
+    silence for ``min_silence_frames`` to close it; ``padding_frames`` of
+    context are kept on each side. Segments longer than ``max_segment_frames``
+    are cut. Flags are processed as runs, so the cost grows with the number
+    of speech/silence transitions rather than the number of frames.
+    """
+
+    def __init__(
+        self,
+        min_speech_frames: int,
+        min_silence_frames: int,
+        padding_frames: int,
+        max_segment_frames: int,
+    ) -> None:
+        self.min_speech_frames = max(1, min_speech_frames)
+        self.min_silence_frames = max(1, min_silence_frames)
+        self.padding_frames = padding_frames
+        self.max_segment_frames = max(1, max_segment_frames)
+
+        self.frames_seen = 0
+        self._in_speech = False
+        self._segment_start = 0
+        self._speech_start = 0
+        self._speech_count = 0
+        self._silence_start = 0
+        self._silence_count = 0
+        self._last_stop = 0
+
+    def push(self, flags: np.ndarray) -> List[Tuple[int, int, bool]]:
+        """Consume the next frames' flags and return the segments they complete."""
+        segments: List[Tuple[int, int, bool]] = []
+        if not len(flags):
+            return segments
+
+        change = np.flatnonzero(np.diff(flags.astype(np.int8))) + 1
+        starts = np.concatenate(([0], change))
+        stops = np.concatenate((change, [len(flags)]))
+        offset = self.frames_seen
+
+        for is_speech, start, stop in zip(flags[starts].tolist(), (starts + offset).tolist(), (stops + offset).tolist()):
+            if is_speech:
+                self._on_speech(start, stop, segments)
+            else:
+                self._on_silence(start, stop, segments)
+
+        self.frames_seen += len(flags)
+        return segments
+
+    def flush(self) -> List[Tuple[int, int, bool]]:
+        """Close any open segment at the end of the stream."""
+        if not self._in_speech:
+            return []
+        stop = self._silence_start if self._silence_count else self.frames_seen
+        self._in_speech = False
+        self._speech_count = 0
+        self._last_stop = min(stop + self.padding_frames, self.frames_seen)
+        return [(self._segment_start, self._last_stop, False)]
+
+    def _on_speech(self, start: int, stop: int, segments: List[Tuple[int, int, bool]]) -> None:
+        if not self._in_speech:
+            if self._speech_count == 0:
+                self._speech_start = start
+            self._speech_count += stop - start
+            if self._speech_count < self.min_speech_frames:
+                return
+            self._in_speech = True
+            self._segment_start = max(self._last_stop, self._speech_start - self.padding_frames)
+
+        self._silence_count = 0
+        while stop - self._segment_start > self.max_segment_frames:
+            cut = self._segment_start + self.max_segment_frames
+            segments.append((self._segment_start, cut, True))
+            self._segment_start = self._last_stop = cut
+
+    def _on_silence(self, start: int, stop: int, segments: List[Tuple[int, int, bool]]) -> None:
+        if not self._in_speech:
+            self._speech_count = 0
+            return
+
+        if self._silence_count == 0:
+            self._silence_start = start
+        self._silence_count += stop - start
+        if self._silence_count >= self.min_silence_frames:
+            end = min(self._silence_start + self.padding_frames, self._segment_start + self.max_segment_frames, stop)
+            segments.append((self._segment_start, end, False))
+            self._last_stop = end
+            self._in_speech = False
+            self._speech_count = 0
+            self._silence_count = 0
@@ -1,66 +1,418 @@
-from aegis.agents.agent_manager import AgentManager
-from aegis.agents.base import AegisTask
-from aegis.hardware.manager import HardwareManager
+import asyncio
+import hashlib
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from aegis.agents.base import AegisTask, ResourceRequest
+from aegis.core.planner import Plan, PlanExecutor, PlanResult
+from aegis.core.profiler import TaskProfiler
+from aegis.core.result_cache import TaskResultCache, config_hash, normalise_description
+from aegis.core.router import TaskRouter
+from aegis.core.scheduler import AdmissionError, HardwareScheduler
+from aegis.core.task_queue import PRIORITY_NORMAL, TaskQueue
+from aegis.tools.runtime import ToolRuntime
 from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import traced
+
+if TYPE_CHECKING:
+	from aegis.agents.agent_manager import AgentManager
+	from aegis.hardware.manager import HardwareManager
+	from aegis.inference.llm import LLMScheduler
+	from aegis.inference.session import InferenceSessionManager
+
+HARDWARE_STATUS_ROUTE = 'hardware_status'
+HARDWARE_STATUS_KEYWORDS = ("hardware status",)
+DEFAULT_EXPECTED_OUTPUT = "A complete response addressing the request."
 
 
 class Orchestrator:
-	"""Coordinate hardware awareness and agent delegation for Aegis."""
+	"""Coordinate hardware awareness and agent delegation for Aegis.
+
+	Subsystems are created lazily on first use, so work that never touches the
+	HAL does not pay for hardware discovery. A ``hardware_manager`` or
+	``agent_manager`` passed in is used instead of creating one.
+
+	Besides the blocking ``execute_task``, tasks can be submitted to a bounded
+	priority queue served by ``max_concurrent_tasks`` workers through
+	``submit`` and ``execute_task_async``.
+
+	Every task run is measured by ``profiler``; ``profiler.get(task_id)``
+	returns its usage and ``profiler.summary()`` the rolling figures per
+	agent role.
+
+	``execute_task`` results go through ``result_cache``. Identical requests
+	in flight share one execution, and results are reused for a per-route
+	TTL. Requests are identical when they have the same route, normalised
+	description and agent configuration. Hardware status is never stored;
+	its report is cached on the HAL snapshot, which is reused for up to
+	``HARDWARE_STATUS_MAX_AGE``. Agent routes use ``result_cache_ttl`` unless
+	the agent's configuration sets ``cache_ttl_seconds`` (0 disables caching).
+	Passing ``result_cache_path`` adds a SQLite tier that survives restarts.
+
+	With an ``llm`` scheduler, agent tasks are answered by the model, with
+	the agent's system prompt as the cached prefix, and fail with
+	``TimeoutError`` after ``llm_timeout`` seconds. Without one, tasks only
+	report their delegation.
+	"""
 
-	def __init__(self) -> None:
+	# Hardware status reports may reuse a snapshot up to this many seconds old.
+	HARDWARE_STATUS_MAX_AGE = 1.0
+	# Placement decisions may reuse a snapshot up to this many seconds old.
+	PLACEMENT_MAX_AGE = 0.5
+	# Every Nth task runs under tracemalloc for its allocation figures.
+	TRACE_ALLOCATIONS_EVERY = 100
+
+	def __init__(
+		self,
+		hardware_sample_interval: Optional[float] = None,
+		max_concurrent_tasks: int = 4,
+		max_queued_tasks: int = 100,
+		placement_timeout: Optional[float] = 30.0,
+		result_cache_ttl: Optional[float] = 3600.0,
+		result_cache_path: Optional[str] = None,
+		llm: Optional['LLMScheduler'] = None,
+		llm_timeout: Optional[float] = 300.0,
+		hardware_manager: Optional['HardwareManager'] = None,
+		agent_manager: Optional['AgentManager'] = None,
+	) -> None:
 		self.logger = setup_logger('Orchestrator', module_code='CORE', script_code='ORCH')
 		self.logger.info("Orchestrator initializing...")
-		self.hardware_manager = HardwareManager()
-		self.agent_manager = AgentManager()
+		self.hardware_sample_interval = hardware_sample_interval
+		self._hardware_manager: Optional['HardwareManager'] = hardware_manager
+		self._agent_manager: Optional['AgentManager'] = agent_manager
+		self._router: Optional[TaskRouter] = None
+		self._router_fingerprint = ''
+		self.max_concurrent_tasks = max_concurrent_tasks
+		self.max_queued_tasks = max_queued_tasks
+		self._task_queue: Optional[TaskQueue] = None
+		self.placement_timeout = placement_timeout
+		self._scheduler: Optional[HardwareScheduler] = None
+		self._tool_runtime: Optional[ToolRuntime] = None
+		self._inference: Optional['InferenceSessionManager'] = None
+		self.llm = llm
+		self.llm_timeout = llm_timeout
+		self._init_lock = threading.Lock()
+		self.profiler = TaskProfiler(
+			trace_allocations_every=self.TRACE_ALLOCATIONS_EVERY,
+			gpu_memory=self._process_gpu_memory,
+		)
+		self.result_cache = TaskResultCache(
+			default_ttl=result_cache_ttl,
+			# The snapshot's max_age already bounds staleness; a result TTL on top would double it.
+			route_ttls={HARDWARE_STATUS_ROUTE: 0},
+			path=result_cache_path,
+		)
+		self._config_hashes: Dict[str, str] = {}
 		self.logger.info("Orchestrator initialization complete.")
 
+	@property
+	def hardware_manager(self) -> 'HardwareManager':
+		"""The hardware abstraction layer, created on first access."""
+		if self._hardware_manager is None:
+			with self._init_lock:
+				if self._hardware_manager is None:
+					from aegis.hardware.manager import HardwareManager
+
+					self.logger.info("Initializing hardware subsystem on first use.")
+					self._hardware_manager = HardwareManager(sample_interval=self.hardware_sample_interval)
+		return self._hardware_manager
+
+	@property
+	def agent_manager(self) -> 'AgentManager':
+		"""The agent registry, created on first access."""
+		if self._agent_manager is None:
+			with self._init_lock:
+				if self._agent_manager is None:
+					from aegis.agents.agent_manager import AgentManager
+
+					self._agent_manager = AgentManager()
+		return self._agent_manager
+
+	@property
+	def scheduler(self) -> HardwareScheduler:
+		"""The hardware-aware placement component, created on first access."""
+		if self._scheduler is None:
+			with self._init_lock:
+				if self._scheduler is None:
+					self._scheduler = HardwareScheduler(
+						lambda: self.hardware_manager.get_hardware_state(max_age=self.PLACEMENT_MAX_AGE)
+					)
+		return self._scheduler
+
+	@property
+	def tool_runtime(self) -> ToolRuntime:
+		"""The shared tool execution runtime, created on first access."""
+		if self._tool_runtime is None:
+			with self._init_lock:
+				if self._tool_runtime is None:
+					self._tool_runtime = ToolRuntime()
+		return self._tool_runtime
+
+	@property
+	def inference(self) -> 'InferenceSessionManager':
+		"""The OpenVINO compiled-model session manager, created on first access."""
+		if self._inference is None:
+			monitor = self.hardware_manager.intel_monitor
+			with self._init_lock:
+				if self._inference is None:
+					from aegis.inference.session import InferenceSessionManager
+
+					self._inference = InferenceSessionManager(monitor)
+		return self._inference
+
+	@traced('Orchestrator.execute_task', category='orchestrator')
 	def execute_task(self, task_description: str) -> str:
 		"""Route the task to the appropriate subsystem or agent."""
 
 		self.logger.info("Received task: '%s'", task_description)
-		lowered_task = task_description.lower()
+		candidates = self.router.route(task_description)
+		if not candidates:
+			self.logger.warning("Task not yet implemented: '%s'", task_description)
+			return "Task not recognized."
+
+		best = candidates[0]
+		self.logger.info(
+			"Routed task to '%s' (score %.3f, keywords %s).",
+			best.route,
+			best.score,
+			best.matched_keywords,
+		)
+
+		return self.result_cache.get_or_compute(
+			best.route,
+			self._result_key(best.route, task_description),
+			lambda: self._run_route(best.route, task_description),
+		)
 
-		if "hardware status" in lowered_task:
+	def _run_route(self, route: str, task_description: str) -> Tuple[str, bool]:
+		"""Produce a routed task's result and whether it may be cached."""
+
+		if route == HARDWARE_STATUS_ROUTE:
 			self.logger.info("Task identified as hardware status query. Accessing HAL.")
-			state = self.hardware_manager.get_hardware_state()
-			report = state.model_dump_json(indent=2)
+			# The rendered report is cached on the snapshot, so repeated queries within max_age reuse it.
+			snapshot = self.hardware_manager.get_snapshot(max_age=self.HARDWARE_STATUS_MAX_AGE)
+			report = snapshot.report_json()
 			self.logger.info("Successfully generated hardware status report.")
-			return report
+			return report, True
+
+		return self._delegate_task(route, task_description)
+
+	def _result_key(self, route: str, task_description: str) -> str:
+		"""Identify requests that must produce the same result."""
+
+		if route == HARDWARE_STATUS_ROUTE:
+			return route
+		digest = hashlib.sha1(normalise_description(task_description).encode('utf-8')).hexdigest()
+		return f"{route}:{self._config_hashes.get(route, '')}:{digest}"
+
+	async def submit(
+		self,
+		task: Union[str, AegisTask],
+		priority: int = PRIORITY_NORMAL,
+		timeout: Optional[float] = None,
+		block: bool = True,
+	) -> 'asyncio.Future[str]':
+		"""Queue a task description or an ``AegisTask`` and return a future for its result.
+
+		Lower ``priority`` values run first. When the queue is full this waits
+		for space, or raises ``asyncio.QueueFull`` if ``block`` is False.
+		"""
+
+		if self._task_queue is None:
+			self._task_queue = TaskQueue(
+				self._run_queued_task,
+				workers=self.max_concurrent_tasks,
+				maxsize=self.max_queued_tasks,
+				name='OrchestratorQueue',
+			)
+		return await self._task_queue.submit(task, priority=priority, timeout=timeout, block=block)
 
-		if "research" in lowered_task:
-			return self._handle_research_task(task_description)
+	async def execute_task_async(
+		self,
+		task: Union[str, AegisTask],
+		priority: int = PRIORITY_NORMAL,
+		timeout: Optional[float] = None,
+	) -> str:
+		"""Queue a task and wait for its result."""
 
-		self.logger.warning("Task not yet implemented: '%s'", task_description)
-		return "Task not recognized."
+		future = await self.submit(task, priority=priority, timeout=timeout)
+		return await future
 
-	def _handle_research_task(self, task_description: str) -> str:
-		"""Delegate research-centric tasks to the configured research agent."""
+	async def shutdown(self, drain: bool = True) -> None:
+		"""Stop the task queue, finishing queued work first if ``drain`` is True."""
 
-		researcher = self.agent_manager.get_agent('research_agent')
-		if researcher is None:
+		if self._task_queue is not None:
+			await self._task_queue.shutdown(drain=drain)
+			self._task_queue = None
+
+	async def execute_plan_async(self, plan: Plan) -> PlanResult:
+		"""Run a dependency graph of tasks, at most ``max_concurrent_tasks`` at a time."""
+
+		executor = PlanExecutor(self._run_plan_task, max_concurrency=self.max_concurrent_tasks)
+		result = await executor.run(plan)
+		for node in result.results.values():
+			if node.reused_from is None and node.started_at is not None:
+				node.usage = self.profiler.get(node.task_id)
+		return result
+
+	def execute_plan(self, plan: Plan) -> PlanResult:
+		"""Blocking counterpart of ``execute_plan_async``."""
+
+		return asyncio.run(self.execute_plan_async(plan))
+
+	def _run_plan_task(self, task: AegisTask, inputs: Dict[str, Any]) -> str:
+		"""Run one plan task with its upstream outputs appended to the description."""
+
+		if inputs:
+			context = "\n".join(f"[{task_id}] {output}" for task_id, output in inputs.items())
+			task = task.model_copy(update={
+				'description': f"{task.description}\n\nInputs from upstream tasks:\n{context}",
+			})
+		return self.run_task(task)
+
+	def _run_queued_task(self, task: Union[str, AegisTask]) -> str:
+		"""Worker-thread entry point for queued tasks."""
+
+		if isinstance(task, AegisTask):
+			return self.run_task(task)
+		return self.execute_task(task)
+
+	@property
+	def router(self) -> TaskRouter:
+		"""The task router, rebuilt whenever the agent registry is reloaded."""
+		registry = self.agent_manager.registry
+		router = self._router
+		if router is None or self._router_fingerprint != registry.fingerprint:
+			with self._init_lock:
+				router = self._router
+				if router is None or self._router_fingerprint != registry.fingerprint:
+					router = TaskRouter.from_registry(registry)
+					# Built-in routes outrank agent keywords, as hardware queries always have.
+					router.add_route(HARDWARE_STATUS_ROUTE, HARDWARE_STATUS_KEYWORDS, weight=10.0)
+					self._refresh_result_cache_settings(registry.configs)
+					self._router = router
+					self._router_fingerprint = registry.fingerprint
+		return router
+
+	def _refresh_result_cache_settings(self, configs: Dict[str, Dict[str, Any]]) -> None:
+		"""Recompute agent config hashes and per-agent result TTLs after a registry reload."""
+
+		self._config_hashes = {name: config_hash(config) for name, config in configs.items()}
+		for name, config in configs.items():
+			ttl = config.get('cache_ttl_seconds')
+			if ttl is not None:
+				self.result_cache.route_ttls[name] = float(ttl)
+			else:
+				self.result_cache.route_ttls.pop(name, None)
+
+	def _delegate_task(self, agent_name: str, task_description: str) -> Tuple[str, bool]:
+		"""Delegate a task to the named agent; the flag is False when delegation failed."""
+
+		agent = self.agent_manager.get_agent(agent_name)
+		if agent is None:
 			self.logger.error(
-				"Delegation failed: Research agent could not be instantiated.",
+				"Delegation failed: agent '%s' could not be instantiated.",
+				agent_name,
 				extra={'error_code': 'ORCH-NO-AGENT'}
 			)
-			return "Delegation failed: ResearchAgent not available."
+			return f"Delegation failed: agent '{agent_name}' not available.", False
 
+		config = self.agent_manager.agent_configs.get(agent_name, {})
 		task = AegisTask(
 			description=task_description,
-			expected_output="A comprehensive research briefing addressing the request.",
-			agent=researcher,
+			expected_output=str(config.get('expected_output', DEFAULT_EXPECTED_OUTPUT)).strip(),
+			agent=agent,
+			resources=self._resource_request(agent_name, config.get('resources')),
 		)
-		task.log_creation()
+		return self._run_task(task)
 
-		self.logger.info(
-			"Delegated research task to agent role '%s' with goal '%s'.",
-			researcher.role,
-			researcher.goal,
-		)
+	def _resource_request(self, agent_name: str, raw_resources: object) -> ResourceRequest:
+		"""Build the resource request an agent declares in its configuration."""
 
-		return (
-			"Task execution initiated via custom agent framework.\n"
-			f"Agent Role: {researcher.role}\n"
-			f"Agent Goal: {researcher.goal}\n"
-			f"Expected Output: {task.expected_output}"
-		)
+		if raw_resources is None:
+			return ResourceRequest()
+		try:
+			return ResourceRequest.model_validate(raw_resources)
+		except ValidationError as exc:
+			self.logger.warning(
+				"Ignoring invalid resources for agent '%s': %s",
+				agent_name,
+				exc,
+				extra={'error_code': 'ORCH-BAD-RESOURCES'}
+			)
+			return ResourceRequest()
 
+	@traced('Orchestrator.run_task', category='orchestrator')
+	def run_task(self, task: AegisTask) -> str:
+		"""Execute a fully specified task with the agent it names.
+
+		Tasks that declare resource needs are first placed by the hardware
+		scheduler and hold their reservation while they run.
+		"""
+
+		return self._run_task(task)[0]
+
+	def _run_task(self, task: AegisTask) -> Tuple[str, bool]:
+		"""``run_task`` plus whether the task actually ran, as opposed to being rejected."""
+
+		if task.resources.is_empty:
+			return self._execute_placed_task(task), True
+
+		try:
+			with self.scheduler.reserve(task, timeout=self.placement_timeout) as placement:
+				self.logger.info(
+					"Task '%s' running on %s:%s.",
+					task.task_id,
+					placement.device.value,
+					placement.device_id,
+				)
+				return self._execute_placed_task(task), True
+		except AdmissionError as exc:
+			return f"Task rejected: {exc}", False
+
+	def _execute_placed_task(self, task: AegisTask) -> str:
+		"""Hand a task to its agent once any resources it needs are reserved."""
+
+		with self.profiler.profile(task.task_id, task.agent.role):
+			task.log_creation()
+
+			self.logger.info(
+				"Delegated task to agent role '%s' with goal '%s'.",
+				task.agent.role,
+				task.agent.goal,
+			)
+
+			if self.llm is not None:
+				prompt = f"{task.description}\n\nExpected output: {task.expected_output}"
+				return self.llm.generate_for_agent(task.agent, prompt, timeout=self.llm_timeout).text
+
+			return (
+				"Task execution initiated via custom agent framework.\n"
+				f"Agent Role: {task.agent.role}\n"
+				f"Agent Goal: {task.agent.goal}\n"
+				f"Expected Output: {task.expected_output}"
+			)
+
+	def _process_gpu_memory(self) -> Optional[Tuple[float, float]]:
+		"""
+		GPU memory held by this process in the latest HAL snapshot, and when it was sampled.
+
+		Reading the snapshot's process list avoids an NVML sweep per task; the
+		profiler uses the timestamp to tell whether a sample landed during the
+		task. None until the HAL is up, has a GPU and has taken a sample.
+		"""
+
+		manager = self._hardware_manager
+		if manager is None or not manager.gpu_monitor.devices:
+			return None
+		snapshot = manager.latest_snapshot
+		if snapshot is None:
+			return None
+		pid = os.getpid()
+		used = sum(
+			(vram for processes in snapshot.gpu_processes for process_pid, vram in processes if process_pid == pid), 0.0
+		)
+		return round(used, 3), snapshot.timestamp
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from aegis.agents.base import AegisTask
+from aegis.core.profiler import ResourceUsage
+from aegis.utils.logger import setup_logger
+
+PlanRunner = Callable[[AegisTask, Dict[str, Any]], Union[Any, Awaitable[Any]]]
+
+
+class NodeStatus(str, Enum):
+    """Final state of a task within a plan."""
+
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+    CANCELLED = 'cancelled'
+
+
+class NodeResult(BaseModel):
+    """The outcome and timing of one task in a plan."""
+
+    task_id: str
+    status: NodeStatus
+    output: Any = None
+    error: Optional[str] = None
+    started_at: Optional[float] = Field(None, description="Seconds after plan start that the task began running.")
+    finished_at: float = Field(0.0, description="Seconds after plan start that the task's result was known.")
+    reused_from: Optional[str] = Field(None, description="task_id of an identical task whose result was reused.")
+    usage: Optional[ResourceUsage] = Field(None, description="Resources the task consumed, when it was profiled.")
+
+    @property
+    def duration_seconds(self) -> float:
+        """Time the task spent running, excluding waits for inputs and concurrency slots."""
+        return 0.0 if self.started_at is None else self.finished_at - self.started_at
+
+
+class PlanResult(BaseModel):
+    """Results of every task in a plan, with its critical path."""
+
+    results: Dict[str, NodeResult]
+    wall_seconds: float
+    critical_path: List[str] = Field(
+        default_factory=list,
+        description="Chain of task_ids, each waiting on the previous, that determined the plan's finish time.",
+    )
+
+    @property
+    def succeeded(self) -> bool:
+        """True when every task succeeded."""
+        return all(result.status == NodeStatus.SUCCEEDED for result in self.results.values())
+
+
+class Plan(BaseModel):
+    """A set of tasks forming a dependency graph through ``AegisTask.depends_on``."""
+
+    tasks: List[AegisTask] = Field(default_factory=list)
+
+    def add(self, task: AegisTask) -> AegisTask:
+        """Append ``task`` to the plan and return it for chaining dependencies."""
+        self.tasks.append(task)
+        return task
+
+    def topological_order(self) -> List[str]:
+        """Return task_ids with every task after its dependencies; raise ValueError on a bad graph."""
+        by_id: Dict[str, AegisTask] = {}
+        for task in self.tasks:
+            if task.task_id in by_id:
+                raise ValueError(f"Duplicate task_id '{task.task_id}' in plan.")
+            by_id[task.task_id] = task
+
+        remaining: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in by_id}
+        for task in self.tasks:
+            for dependency in task.depends_on:
+                if dependency not in by_id:
+                    raise ValueError(f"Task '{task.task_id}' depends on unknown task '{dependency}'.")
+                dependents[dependency].append(task.task_id)
+            remaining[task.task_id] = len(task.depends_on)
+
+        ready = deque(task.task_id for task in self.tasks if remaining[task.task_id] == 0)
+        order: List[str] = []
+        while ready:
+            task_id = ready.popleft()
+            order.append(task_id)
+            for dependent in dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(by_id):
+            cyclic = sorted(task_id for task_id, count in remaining.items() if count > 0)
+            raise ValueError(f"Plan contains a dependency cycle among tasks {cyclic}.")
+        return order
+
+
+class PlanExecutor:
+    """
+    Execute a ``Plan`` with maximal parallelism under a global concurrency cap.
+
+    Every task starts as soon as all of its dependencies have succeeded and
+    receives their outputs keyed by task_id. A failed or cancelled task marks
+    its transitive dependents as skipped; ``cancel`` stops one task of a
+    running plan without stopping the rest. Tasks identical in description,
+    expected output, agent and inputs run once and share the result.
+
+    ``runner`` may be a regular function, which runs on a worker thread, or a
+    coroutine function.
+    """
+
+    def __init__(self, runner: PlanRunner, max_concurrency: int = 4) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("Plan concurrency must be at least one.")
+
+        self.logger = setup_logger('PlanExecutor', module_code='CORE', script_code='PLAN')
+        self.runner = runner
+        self.max_concurrency = max_concurrency
+        self._active: Dict[str, Tuple[asyncio.AbstractEventLoop, Callable[[str], None]]] = {}
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Cancel ``task_id`` in a running plan, whether it is waiting or running.
+
+        The task finishes as cancelled and its dependents as skipped. A
+        synchronous runner already on its worker thread cannot be interrupted;
+        its result is discarded. Safe to call from any thread. Returns False
+        if no running plan has an unfinished task with that ID.
+        """
+        entry = self._active.get(task_id)
+        if entry is None:
+            return False
+        loop, cancel_node = entry
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            cancel_node(task_id)
+        else:
+            loop.call_soon_threadsafe(cancel_node, task_id)
+        return True
+
+    def run_sync(self, plan: Plan) -> PlanResult:
+        """Blocking convenience wrapper around ``run`` for callers without an event loop."""
+        return asyncio.run(self.run(plan))
+
+    async def run(self, plan: Plan) -> PlanResult:
+        """Execute every task in ``plan`` and return their results."""
+        order = plan.topological_order()
+        tasks = {task.task_id: task for task in plan.tasks}
+
+        identities: Dict[str, str] = {}
+        owners: Dict[str, str] = {}
+        for task_id in order:
+            identities[task_id] = self._identity(tasks[task_id], [identities[dep] for dep in tasks[task_id].depends_on])
+            owners.setdefault(identities[task_id], task_id)
+
+        plan_started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        nodes: Dict[str, asyncio.Task] = {}
+        bodies: Dict[str, asyncio.Task] = {}
+        started: Dict[str, float] = {}
+        cancelled: Set[str] = set()
+
+        def cancel_node(task_id: str) -> None:
+            cancelled.add(task_id)
+            body = bodies.get(task_id)
+            if body is not None:
+                body.cancel()
+
+        async def run_node(task_id: str) -> NodeResult:
+            body = asyncio.create_task(node_body(task_id), name=f'aegis-plan-body-{task_id}')
+            bodies[task_id] = body
+            if task_id in cancelled:
+                body.cancel()
+            try:
+                return await body
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    body.cancel()
+                    raise
+                self.logger.info("Plan task '%s' was cancelled.", task_id)
+                return NodeResult(
+                    task_id=task_id,
+                    status=NodeStatus.CANCELLED,
+                    error="Task was cancelled.",
+                    started_at=started.get(task_id),
+                    finished_at=time.perf_counter() - plan_started,
+                )
+
+        async def node_body(task_id: str) -> NodeResult:
+            task = tasks[task_id]
+            # Shielded so that cancelling this task does not cancel the dependency it is waiting on.
+            dependency_results = [await asyncio.shield(nodes[dependency]) for dependency in task.depends_on]
+
+            for dependency in dependency_results:
+                if dependency.status != NodeStatus.SUCCEEDED:
+                    return NodeResult(
+                        task_id=task_id,
+                        status=NodeStatus.SKIPPED,
+                        error=f"Upstream task '{dependency.task_id}' {dependency.status.value}.",
+                        finished_at=time.perf_counter() - plan_started,
+                    )
+
+            owner = owners[identities[task_id]]
+            if owner != task_id:
+                original = await asyncio.shield(nodes[owner])
+                return original.model_copy(update={
+                    'task_id': task_id,
+                    'reused_from': owner,
+                    'started_at': None,
+                    'finished_at': time.perf_counter() - plan_started,
+                })
+
+            inputs = {dependency.task_id: dependency.output for dependency in dependency_results}
+            async with semaphore:
+                started_at = started[task_id] = time.perf_counter() - plan_started
+                try:
+                    output = await self._invoke(task, inputs)
+                except asyncio.CancelledError:
+                    current = asyncio.current_task()
+                    if current is not None and current.cancelling():
+                        raise
+                    status, error, output = NodeStatus.CANCELLED, "Task was cancelled.", None
+                except Exception as exc:  # noqa: BLE001 - failures are recorded per node
+                    self.logger.error(
+                        "Plan task '%s' failed: %s",
+                        task_id,
+                        exc,
+                        extra={'error_code': 'PLAN-NODE-FAIL'}
+                    )
+                    status, error, output = NodeStatus.FAILED, f"{type(exc).__name__}: {exc}", None
+                else:
+                    status, error = NodeStatus.SUCCEEDED, None
+
+            result = NodeResult(
+                task_id=task_id,
+                status=status,
+                output=output,
+                error=error,
+                started_at=started_at,
+                finished_at=time.perf_counter() - plan_started,
+            )
+            self.logger.debug("Plan task '%s' %s in %.3fs.", task_id, status.value, result.duration_seconds)
+            return result
+
+        loop = asyncio.get_running_loop()
+        for task_id in order:
+            nodes[task_id] = asyncio.create_task(run_node(task_id), name=f'aegis-plan-{task_id}')
+            self._active[task_id] = (loop, cancel_node)
+            nodes[task_id].add_done_callback(lambda _, task_id=task_id: self._active.pop(task_id, None))
+
+        try:
+            await asyncio.gather(*nodes.values())
+        except asyncio.CancelledError:
+            for node in nodes.values():
+                node.cancel()
+            raise
+        finally:
+            for task_id in order:
+                self._active.pop(task_id, None)
+
+        results = {task_id: nodes[task_id].result() for task_id in order}
+        plan_result = PlanResult(
+            results=results,
+            wall_seconds=time.perf_counter() - plan_started,
+            critical_path=self._critical_path(tasks, results),
+        )
+        self.logger.info(
+            "Plan of %d task(s) finished in %.3fs; critical path: %s.",
+            len(order),
+            plan_result.wall_seconds,
+            " -> ".join(plan_result.critical_path) or "none",
+        )
+        return plan_result
+
+    async def _invoke(self, task: AegisTask, inputs: Dict[str, Any]) -> Any:
+        """Call the runner on the event loop or a worker thread, as appropriate."""
+        if inspect.iscoroutinefunction(self.runner):
+            return await self.runner(task, inputs)
+        result = await asyncio.to_thread(self.runner, task, inputs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    @staticmethod
+    def _identity(task: AegisTask, dependency_identities: List[str]) -> str:
+        """Key under which identical subtasks share a result."""
+        payload = repr((
+            task.description,
+            task.expected_output,
+            task.agent.role,
+            task.agent.goal,
+            task.resources.model_dump_json(),
+            tuple(dependency_identities),
+        ))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _critical_path(tasks: Dict[str, AegisTask], results: Dict[str, NodeResult]) -> List[str]:
+        """Walk back from the last task to finish through the dependency that finished last."""
+        if not results:
+            return []
+
+        path: List[str] = []
+        current: Optional[str] = max(results, key=lambda task_id: results[task_id].finished_at)
+        while current is not None:
+            path.append(current)
+            dependencies = tasks[current].depends_on
+            current = max(dependencies, key=lambda task_id: results[task_id].finished_at) if dependencies else None
+        path.reverse()
+        return path
@@ -0,0 +1,270 @@
+"""Request coalescing and a tiered cache for task results.
+
+``SingleFlight`` makes concurrent callers that ask for the same key share
+one execution. ``TaskResultCache`` puts an in-memory LRU and an optional
+SQLite tier in front of it, with a time-to-live per route.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple, Union
+
+from aegis.utils.logger import setup_logger
+from aegis.utils.ttl_cache import TTLCache
+
+_MISS = object()
+_WHITESPACE = re.compile(r'\s+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    route TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS results_expiry ON results (expires_at);
+"""
+
+
+def normalise_description(description: str) -> str:
+    """Case- and whitespace-insensitive form of a task description."""
+    return _WHITESPACE.sub(' ', description).strip().lower()
+
+
+def config_hash(config: Optional[Mapping[str, Any]]) -> str:
+    """Stable hash of an agent configuration."""
+    encoded = json.dumps(config or {}, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+class _Flight:
+    """One in-progress execution that other callers may wait on."""
+
+    __slots__ = ('done', 'value', 'error', 'waiters')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return ``func()``, or the result of an identical call already running.
+
+        The flag is True when the result came from another caller's
+        execution. That caller's exception is re-raised in every waiter.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value, False
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+class DiskResultTier:
+    """SQLite-backed string results with absolute expiry times; shared across processes and restarts."""
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        """The stored value and its expiry time, or ``(None, None)`` if absent or expired."""
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None, None
+        return value, expires_at
+
+    def set(self, key: str, route: str, value: str, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, route, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, route, value, expires_at),
+            )
+
+    def prune(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        with self._lock, self._db:
+            cursor = self._db.execute("DELETE FROM results WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def clear(self, route: Optional[str] = None) -> None:
+        with self._lock, self._db:
+            if route is None:
+                self._db.execute("DELETE FROM results")
+            else:
+                self._db.execute("DELETE FROM results WHERE route = ?", (route,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class TaskResultCache:
+    """
+    Serve repeated task results from memory or disk and coalesce concurrent duplicates.
+
+    ``route_ttls`` maps a route to its result lifetime in seconds; other
+    routes use ``default_ttl``. A TTL of 0 disables caching for that route,
+    though concurrent duplicates are still coalesced. The disk tier is used
+    only when ``path`` is given and only holds string results.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        default_ttl: Optional[float] = 3600.0,
+        route_ttls: Optional[Mapping[str, float]] = None,
+        path: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        self.logger = setup_logger('TaskResultCache', module_code='CORE', script_code='RCCH')
+        self.default_ttl = default_ttl
+        self.route_ttls: Dict[str, float] = dict(route_ttls or {})
+        self.memory = TTLCache(maxsize=maxsize, ttl=default_ttl)
+        self.disk: Optional[DiskResultTier] = DiskResultTier(path) if path is not None else None
+        self._flight = SingleFlight()
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl_for(self, route: str) -> Optional[float]:
+        return self.route_ttls.get(route, self.default_ttl)
+
+    def get_or_compute(self, route: str, key: str, compute: Callable[[], Tuple[Any, bool]]) -> Any:
+        """
+        Return the cached result for ``key`` or compute it once for all concurrent callers.
+
+        ``compute`` returns ``(result, cacheable)``; failures should report
+        ``cacheable=False`` so they are shared with concurrent callers but
+        not stored.
+        """
+        ttl = self.ttl_for(route)
+        if ttl != 0:
+            value = self._lookup(key)
+            if value is not _MISS:
+                return value
+
+        def run() -> Tuple[Any, bool]:
+            # A flight for this key may have stored the result and finished since the lookup above.
+            if ttl != 0:
+                value = self._lookup(key)
+                if value is not _MISS:
+                    return value, True
+            value, cacheable = compute()
+            if cacheable and ttl != 0:
+                self._store(route, key, value, ttl)
+            return value, False
+
+        (value, cached), shared = self._flight.do(key, run)
+        with self._counter_lock:
+            if shared:
+                self.coalesced += 1
+            elif not cached:
+                self.misses += 1
+        return value
+
+    def invalidate(self, route: Optional[str] = None) -> None:
+        """Forget every cached result, or only those of ``route``. Memory entries are dropped wholesale."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear(route)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and coalescing counters plus the memory tier's own counters."""
+        memory = self.memory.stats()
+        with self._counter_lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'in_flight': self._flight.in_flight,
+                'size': memory['size'],
+                'evictions': memory['evictions'],
+                'expirations': memory['expirations'],
+            }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def _lookup(self, key: str) -> Any:
+        value = self.memory.get(key, _MISS)
+        if value is not _MISS:
+            with self._counter_lock:
+                self.hits += 1
+            return value
+        if self.disk is None:
+            return _MISS
+
+        try:
+            stored, expires_at = self.disk.get(key)
+        except sqlite3.Error as exc:
+            self.logger.warning("Disk result cache read failed: %s", exc, extra={'error_code': 'RCACHE-DISK-FAIL'})
+            return _MISS
+        if stored is None:
+            return _MISS
+        # Promote to memory for the rest of the entry's lifetime.
+        self.memory.set(key, stored, ttl=None if expires_at is None else max(0.0, expires_at - time.time()))
+        with self._counter_lock:
+            self.hits += 1
+            self.disk_hits += 1
+        return stored
+
+    def _store(self, route: str, key: str, value: Any, ttl: Optional[float]) -> None:
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is None or not isinstance(value, str):
+            return
+        try:
+            self.disk.set(key, route, value, ttl)
+        except sqlite3.Error as exc:
+            self.logger.warning("Disk result cache write failed: %s", exc, extra={'error_code': 'RCACHE-DISK-FAIL'})
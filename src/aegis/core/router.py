@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import traced
+
+if TYPE_CHECKING:
+    from aegis.agents.registry import AgentRegistry
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the their this to with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase ``text`` and split it into alphanumeric tokens, dropping stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class RouteCandidate(BaseModel):
+    """A ranked routing decision for a task description."""
+
+    route: str = Field(..., description="Agent name or built-in route the task could be sent to.")
+    score: float = Field(..., description="Combined keyword and similarity score; higher is better.")
+    matched_keywords: List[str] = Field(default_factory=list, description="Keyword rules found in the task.")
+    similarity: float = Field(0.0, description="TF-IDF cosine similarity between the task and the route's description.")
+
+
+class AhoCorasick:
+    """
+    A multi-pattern substring matcher.
+
+    All patterns are compiled into one automaton, so a text is scanned once
+    regardless of how many patterns there are. Matching is case-insensitive.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        pending_outputs: List[List[int]] = [[]]
+        for pattern in patterns:
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            pattern_id = len(self.patterns)
+            self.patterns.append(pattern)
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    pending_outputs.append([])
+                node = next_node
+            pending_outputs[node].append(pattern_id)
+
+        self._build_failure_links(pending_outputs)
+
+    def _build_failure_links(self, pending_outputs: List[List[int]]) -> None:
+        """Breadth-first construction of failure links and merged outputs."""
+        queue: deque = deque()
+        for child in self._goto[0].values():
+            queue.append(child)
+
+        order: List[int] = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[child] = candidate if candidate != child else 0
+                queue.append(child)
+
+        self._output = [tuple(outputs) for outputs in pending_outputs]
+        # Parents are processed before children, so each fail target's output is already complete.
+        for node in order:
+            fail_output = self._output[self._fail[node]]
+            if fail_output:
+                self._output[node] = self._output[node] + fail_output
+
+    def find(self, text: str) -> Set[int]:
+        """Return the IDs of every pattern occurring in ``text``."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found: Set[int] = set()
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+class TfidfScorer:
+    """Cosine similarity between a query and a fixed set of documents using TF-IDF weights."""
+
+    def __init__(self, documents: Dict[str, str]) -> None:
+        self.names: List[str] = list(documents)
+        tokenized = [Counter(tokenize(text)) for text in documents.values()]
+
+        document_frequency: Counter = Counter()
+        for counts in tokenized:
+            document_frequency.update(counts.keys())
+        total = len(tokenized)
+        self.idf: Dict[str, float] = {
+            token: math.log((1 + total) / (1 + frequency)) + 1.0
+            for token, frequency in document_frequency.items()
+        }
+
+        # Inverted index: token -> [(document index, normalised weight)].
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for index, counts in enumerate(tokenized):
+            weights = {token: count * self.idf[token] for token, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for token, weight in weights.items():
+                self._postings.setdefault(token, []).append((index, weight / norm))
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Return the non-zero cosine similarity of ``text`` to each document, keyed by name."""
+        counts = Counter(token for token in tokenize(text) if token in self.idf)
+        if not counts:
+            return {}
+
+        weights = {token: count * self.idf[token] for token, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        scores: Dict[int, float] = {}
+        for token, weight in weights.items():
+            query_weight = weight / norm
+            for index, document_weight in self._postings[token]:
+                scores[index] = scores.get(index, 0.0) + query_weight * document_weight
+        return {self.names[index]: score for index, score in scores.items()}
+
+
+class TaskRouter:
+    """
+    Rank the routes a task description could be sent to.
+
+    Keyword and phrase rules for every route are compiled into one
+    Aho-Corasick automaton; each distinct rule found adds its weight to the
+    route's score. An optional TF-IDF scorer over each route's description
+    (an agent's role and goal) adds ``similarity_weight`` times the cosine
+    similarity, so tasks that use none of the keywords can still be routed.
+
+    Routes may be added from several threads. Writers are serialised;
+    ``route`` reads the last published tables without taking a lock.
+    """
+
+    def __init__(
+        self,
+        similarity_weight: float = 1.0,
+        min_similarity: float = 0.15,
+    ) -> None:
+        self.logger = setup_logger('TaskRouter', module_code='CORE', script_code='ROUT')
+        self.similarity_weight = similarity_weight
+        self.min_similarity = min_similarity
+        self._rules: List[Tuple[str, str, float]] = []
+        self._descriptions: Dict[str, str] = {}
+        self._write_lock = threading.Lock()
+        # Matcher, per-pattern rules and scorer, swapped as one tuple so readers never see a mix.
+        self._compiled: Tuple[AhoCorasick, List[List[Tuple[str, float]]], Optional[TfidfScorer]] = (
+            AhoCorasick(()), [], None,
+        )
+
+    @classmethod
+    def from_registry(cls, registry: 'AgentRegistry', **kwargs) -> 'TaskRouter':
+        """
+        Build a router with one route per valid agent in ``registry``.
+
+        Agents contribute the ``keywords`` list from their configuration and
+        their role and goal as the fuzzy-match description. Agents configured
+        with ``routable: false`` are skipped.
+        """
+        router = cls(**kwargs)
+        routes = []
+        for name, agent in registry.agents.items():
+            config = registry.configs.get(name, {})
+            if config.get('routable', True) is False:
+                continue
+            keywords = config.get('keywords') or []
+            if not isinstance(keywords, list):
+                router.logger.warning("Keywords for agent '%s' must be a list; ignoring them.", name)
+                keywords = []
+            routes.append((name, [str(keyword) for keyword in keywords], f"{agent.role} {agent.goal}"))
+        router.add_routes(routes)
+        return router
+
+    def add_route(
+        self,
+        route: str,
+        keywords: Iterable[str] = (),
+        description: Optional[str] = None,
+        weight: float = 1.0,
+    ) -> None:
+        """
+        Register keyword rules and an optional fuzzy-match description for ``route``.
+
+        The automaton and scorer are rebuilt before this returns, so lookups
+        never pay for compilation. Use ``add_routes`` to register many routes
+        with a single rebuild.
+        """
+        with self._write_lock:
+            self._add_rules(route, keywords, description, weight)
+            self._compile()
+
+    def add_routes(self, routes: Iterable[Tuple[str, Iterable[str], Optional[str]]], weight: float = 1.0) -> None:
+        """Register several ``(route, keywords, description)`` entries and compile once."""
+        with self._write_lock:
+            for route, keywords, description in routes:
+                self._add_rules(route, keywords, description, weight)
+            self._compile()
+
+    @traced('TaskRouter.route', category='routing')
+    def route(self, text: str, limit: Optional[int] = 5) -> List[RouteCandidate]:
+        """Return up to ``limit`` candidate routes for ``text``, best first."""
+        matcher, pattern_rules, scorer = self._compiled
+
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        for pattern_id in matcher.find(text):
+            pattern = matcher.patterns[pattern_id]
+            for route, weight in pattern_rules[pattern_id]:
+                scores[route] = scores.get(route, 0.0) + weight
+                matched.setdefault(route, []).append(pattern)
+
+        similarities: Dict[str, float] = {}
+        if scorer is not None and self.similarity_weight > 0:
+            similarities = scorer.score(text)
+            for route, similarity in similarities.items():
+                if similarity >= self.min_similarity or route in scores:
+                    scores[route] = scores.get(route, 0.0) + self.similarity_weight * similarity
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            RouteCandidate(
+                route=route,
+                score=round(score, 6),
+                matched_keywords=sorted(matched.get(route, [])),
+                similarity=round(similarities.get(route, 0.0), 6),
+            )
+            for route, score in ranked
+        ]
+
+    def _add_rules(self, route: str, keywords: Iterable[str], description: Optional[str], weight: float) -> None:
+        """Record rules for ``route`` without recompiling; called with the write lock held."""
+        for keyword in keywords:
+            if keyword.strip():
+                self._rules.append((keyword.strip().lower(), route, weight))
+        if description:
+            self._descriptions[route] = description
+
+    def _compile(self) -> None:
+        """Build the automaton and scorer from the current rules and publish them together; called with the write lock held."""
+        pattern_ids: Dict[str, int] = {}
+        pattern_rules: List[List[Tuple[str, float]]] = []
+        for pattern, route, weight in self._rules:
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(pattern_ids)
+                pattern_rules.append([])
+            pattern_rules[pattern_ids[pattern]].append((route, weight))
+        matcher = AhoCorasick(pattern_ids)
+        scorer = TfidfScorer(self._descriptions) if self._descriptions else None
+        self._compiled = (matcher, pattern_rules, scorer)
+        self.logger.debug("Compiled %d routing pattern(s) into one automaton.", len(pattern_ids))
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from aegis.agents.base import AegisTask, DeviceKind, ResourceRequest
+from aegis.hardware.models import HardwareState
+from aegis.utils.logger import setup_logger
+
+
+class AdmissionError(RuntimeError):
+    """Raised when a task cannot be placed on any device."""
+
+
+class Placement(BaseModel):
+    """Where a task was placed and the resources reserved for it."""
+
+    reservation_id: str = Field(default_factory=lambda: uuid.uuid4().hex[:12])
+    task_id: str
+    device: DeviceKind
+    device_id: str = Field(..., description="NVML index for NVIDIA GPUs, OpenVINO name for Intel devices, 'CPU' otherwise.")
+    ram_gb: float
+    vram_gb: float
+    snapshot_timestamp: float = Field(..., description="Timestamp of the HardwareState the decision was based on.")
+
+
+class HardwareScheduler:
+    """
+    Place tasks on devices according to their declared needs and the current hardware state.
+
+    Reservations are held until released, so concurrent tasks cannot together
+    oversubscribe RAM, a GPU's free VRAM, or an Intel accelerator's slots.
+    Reservations are counted against the free figures of each new snapshot,
+    which is conservative once a reserved task has actually allocated its
+    memory. ``state_provider`` can return synthetic states for testing.
+    """
+
+    INTEL_DEVICE_PREFIX = {
+        DeviceKind.INTEL_GPU: 'GPU',
+        DeviceKind.INTEL_NPU: 'NPU',
+    }
+
+    def __init__(
+        self,
+        state_provider: Callable[[], HardwareState],
+        ram_headroom_gb: float = 1.0,
+        vram_headroom_gb: float = 0.5,
+        accelerator_slots: int = 2,
+        recheck_interval: float = 0.5,
+    ) -> None:
+        self.logger = setup_logger('HardwareScheduler', module_code='CORE', script_code='SCHD')
+        self.state_provider = state_provider
+        self.ram_headroom_gb = ram_headroom_gb
+        self.vram_headroom_gb = vram_headroom_gb
+        self.accelerator_slots = accelerator_slots
+        self.recheck_interval = recheck_interval
+        self._reservations: Dict[str, Placement] = {}
+        self._condition = threading.Condition()
+
+    @property
+    def reservations(self) -> List[Placement]:
+        """Placements currently holding resources."""
+        with self._condition:
+            return list(self._reservations.values())
+
+    def try_place(self, task: AegisTask) -> Optional[Placement]:
+        """Place and reserve ``task`` now, or return None if it does not currently fit."""
+        placement, _ = self._attempt(task)
+        return placement
+
+    def admit(self, task: AegisTask, timeout: Optional[float] = None) -> Placement:
+        """
+        Place ``task``, waiting up to ``timeout`` seconds (forever if None) for resources.
+
+        Raises ``AdmissionError`` immediately if the task could never fit on this
+        machine, and when the wait times out.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            placement, feasible = self._attempt(task)
+            if placement is not None:
+                return placement
+            if not feasible:
+                self.logger.error(
+                    "Rejected task '%s': %s exceeds this machine's capacity.",
+                    task.task_id,
+                    self._describe(task.resources),
+                    extra={'error_code': 'SCHD-REJECT'}
+                )
+                raise AdmissionError(f"Task '{task.task_id}' can never fit: {self._describe(task.resources)}.")
+
+            wait = self.recheck_interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.logger.warning(
+                        "Timed out waiting to place task '%s' (%s).",
+                        task.task_id,
+                        self._describe(task.resources),
+                        extra={'error_code': 'SCHD-TIMEOUT'}
+                    )
+                    raise AdmissionError(f"Timed out waiting for resources for task '{task.task_id}'.")
+                wait = min(wait, remaining)
+
+            self.logger.debug("Task '%s' queued for resources.", task.task_id)
+            with self._condition:
+                self._condition.wait(wait)
+
+    def release(self, placement: Placement) -> None:
+        """Return the resources held by ``placement``."""
+        with self._condition:
+            if self._reservations.pop(placement.reservation_id, None) is not None:
+                self.logger.info(
+                    "Released reservation %s for task '%s' on %s:%s.",
+                    placement.reservation_id,
+                    placement.task_id,
+                    placement.device.value,
+                    placement.device_id,
+                )
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def reserve(self, task: AegisTask, timeout: Optional[float] = None) -> Iterator[Placement]:
+        """Context manager that admits ``task`` and releases its reservation on exit."""
+        placement = self.admit(task, timeout)
+        try:
+            yield placement
+        finally:
+            self.release(placement)
+
+    def _attempt(self, task: AegisTask) -> Tuple[Optional[Placement], bool]:
+        """Try each candidate device; return the placement and whether the task could ever fit."""
+        state = self.state_provider()
+        request = task.resources
+        devices = [request.device]
+        if request.device != DeviceKind.CPU and request.allow_cpu_fallback and request.vram_gb == 0.0:
+            devices.append(DeviceKind.CPU)
+
+        with self._condition:
+            feasible = False
+            for device in devices:
+                device_id, fits_now, fits_ever = self._find_device(device, request, state)
+                feasible = feasible or fits_ever
+                if device_id is None or not fits_now:
+                    continue
+
+                placement = Placement(
+                    task_id=task.task_id,
+                    device=device,
+                    device_id=device_id,
+                    ram_gb=request.ram_gb,
+                    vram_gb=request.vram_gb if device == DeviceKind.NVIDIA_GPU else 0.0,
+                    snapshot_timestamp=state.timestamp,
+                )
+                self._reservations[placement.reservation_id] = placement
+                self.logger.info(
+                    "Placed task '%s' on %s:%s (%s) using snapshot at %.3f: %s.",
+                    task.task_id,
+                    device.value,
+                    device_id,
+                    self._describe(request),
+                    state.timestamp,
+                    self._describe_state(state),
+                )
+                return placement, True
+            return None, feasible
+
+    def _find_device(
+        self,
+        device: DeviceKind,
+        request: ResourceRequest,
+        state: HardwareState,
+    ) -> Tuple[Optional[str], bool, bool]:
+        """Return ``(device_id, fits_now, fits_ever)`` for the best instance of ``device``."""
+        reserved_ram = sum(placement.ram_gb for placement in self._reservations.values())
+        ram_free = state.system.ram_available_gb - self.ram_headroom_gb - reserved_ram
+        ram_fits_now = request.ram_gb <= ram_free
+        ram_fits_ever = request.ram_gb <= state.system.ram_total_gb - self.ram_headroom_gb
+
+        if device == DeviceKind.CPU:
+            return 'CPU', ram_fits_now, ram_fits_ever
+
+        if device == DeviceKind.NVIDIA_GPU:
+            best: Optional[Tuple[float, int]] = None
+            fits_ever = False
+            for gpu in state.gpus:
+                reserved = sum(
+                    placement.vram_gb
+                    for placement in self._reservations.values()
+                    if placement.device == DeviceKind.NVIDIA_GPU and placement.device_id == str(gpu.index)
+                )
+                free = gpu.vram_total_gb - gpu.vram_used_gb - self.vram_headroom_gb - reserved
+                fits_ever = fits_ever or request.vram_gb <= gpu.vram_total_gb - self.vram_headroom_gb
+                if request.vram_gb <= free and (best is None or free > best[0]):
+                    best = (free, gpu.index)
+            if best is None:
+                return None, False, fits_ever and ram_fits_ever
+            return str(best[1]), ram_fits_now, ram_fits_ever
+
+        prefix = self.INTEL_DEVICE_PREFIX[device]
+        available = state.intel_devices.available_devices if state.intel_devices else []
+        candidates = [name for name in available if name.split('.')[0] == prefix]
+        if not candidates:
+            return None, False, False
+
+        in_use = {name: 0 for name in candidates}
+        for placement in self._reservations.values():
+            if placement.device_id in in_use:
+                in_use[placement.device_id] += 1
+        name, used = min(in_use.items(), key=lambda item: item[1])
+        if used >= self.accelerator_slots:
+            return None, False, ram_fits_ever
+        return name, ram_fits_now, ram_fits_ever
+
+    @staticmethod
+    def _describe(request: ResourceRequest) -> str:
+        """Short human-readable form of a resource request."""
+        return f"{request.device.value}, RAM {request.ram_gb:.2f} GB, VRAM {request.vram_gb:.2f} GB"
+
+    @staticmethod
+    def _describe_state(state: HardwareState) -> str:
+        """Short summary of the snapshot figures a placement decision used."""
+        gpus = ", ".join(
+            f"GPU{gpu.index} {gpu.vram_total_gb - gpu.vram_used_gb:.2f}/{gpu.vram_total_gb:.2f} GB free"
+            for gpu in state.gpus
+        ) or "no NVIDIA GPU"
+        intel = state.intel_devices.available_devices if state.intel_devices else []
+        return f"RAM {state.system.ram_available_gb:.2f} GB available, {gpus}, Intel devices {intel}"
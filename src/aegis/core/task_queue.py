@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import Any, Callable, List, Optional, Tuple
+
+from aegis.utils.logger import setup_logger
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BATCH = 10
+
+
+class _QueuedItem:
+    """A unit of work waiting in the queue, with the future its submitter awaits."""
+
+    __slots__ = ('item', 'future', 'started')
+
+    def __init__(self, item: Any, future: asyncio.Future) -> None:
+        self.item = item
+        self.future = future
+        self.started = False
+
+    def expire(self) -> None:
+        """Fail the future with a timeout unless it already settled."""
+        if not self.future.done():
+            stage = 'while it was running' if self.started else 'before it started'
+            self.future.set_exception(asyncio.TimeoutError(f"Task deadline expired {stage}."))
+
+
+class TaskQueue:
+    """
+    A bounded, prioritised asyncio work queue served by a fixed pool of workers.
+
+    Lower priority numbers run first; items of equal priority run in
+    submission order. ``handler`` is a blocking callable and is run on a
+    thread so the event loop stays responsive. Each submission gets a future
+    that can be cancelled, and an optional timeout that covers both queueing
+    and execution. A handler already running on its thread cannot be
+    interrupted; cancelling or timing out only fails its future, and the
+    worker stays busy until the handler returns, so no more than ``workers``
+    handlers ever run at once.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Any],
+        workers: int = 4,
+        maxsize: int = 100,
+        name: str = 'TaskQueue',
+    ) -> None:
+        if workers <= 0:
+            raise ValueError("A task queue needs at least one worker.")
+
+        self.logger = setup_logger(name, module_code='CORE', script_code='TQUE')
+        self.handler = handler
+        self.worker_count = workers
+        self._queue: asyncio.PriorityQueue[Tuple[int, int, _QueuedItem]] = asyncio.PriorityQueue(maxsize)
+        self._sequence = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        """Number of items waiting to start."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Spawn the worker tasks on the running event loop."""
+        if self._workers:
+            return
+        self._closing = False
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f'aegis-task-worker-{index}')
+            for index in range(self.worker_count)
+        ]
+        self.logger.info("Task queue started with %d worker(s).", self.worker_count)
+
+    async def submit(
+        self,
+        item: Any,
+        priority: int = PRIORITY_NORMAL,
+        timeout: Optional[float] = None,
+        block: bool = True,
+    ) -> asyncio.Future:
+        """
+        Enqueue ``item`` and return a future for its result.
+
+        When the queue is full, waits for space if ``block`` is True and raises
+        ``asyncio.QueueFull`` otherwise. If the item has not finished within
+        ``timeout`` seconds of submission its future fails with
+        ``asyncio.TimeoutError``.
+        """
+        if self._closing:
+            raise RuntimeError("Task queue is shutting down and no longer accepts work.")
+        self.start()
+
+        loop = asyncio.get_running_loop()
+        queued = _QueuedItem(item, loop.create_future())
+        if timeout is not None:
+            timer = loop.call_at(loop.time() + timeout, queued.expire)
+            queued.future.add_done_callback(lambda _: timer.cancel())
+        entry = (priority, next(self._sequence), queued)
+
+        try:
+            if block:
+                await self._queue.put(entry)
+            else:
+                self._queue.put_nowait(entry)
+        except BaseException:
+            queued.future.cancel()
+            raise
+        return queued.future
+
+    async def shutdown(self, drain: bool = True) -> None:
+        """
+        Stop accepting work and stop the workers.
+
+        With ``drain`` the queued items are completed first; otherwise they
+        are cancelled along with any items that are running.
+        """
+        self._closing = True
+        if drain:
+            await self._queue.join()
+        else:
+            while not self._queue.empty():
+                _, _, queued = self._queue.get_nowait()
+                queued.future.cancel()
+                self._queue.task_done()
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.logger.info("Task queue shut down (%s).", 'drained' if drain else 'cancelled')
+
+    async def _worker(self) -> None:
+        """Pull items in priority order and run them until cancelled."""
+        while True:
+            _, _, queued = await self._queue.get()
+            try:
+                await self._run(queued)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, queued: _QueuedItem) -> None:
+        """Execute one item and settle its future unless it was cancelled or timed out meanwhile."""
+        future = queued.future
+        if future.done():
+            # Cancelled by the submitter or expired while it was waiting.
+            return
+
+        queued.started = True
+        try:
+            # Awaited to completion even if the future settles first, so the worker slot is held while the thread runs.
+            result = await asyncio.to_thread(self.handler, queued.item)
+        except asyncio.CancelledError:
+            # The worker itself is being stopped.
+            future.cancel()
+            raise
+        except Exception as exc:  # noqa: BLE001 - failures belong to the submitter
+            if not future.done():
+                future.set_exception(exc)
+        else:
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,541 @@
+"""Hardware inventory across machines.
+
+``NodeAgent`` runs on each machine and streams its hardware samples to
+any connected manager over TCP or a Unix socket. Each connection gets its
+own ``SnapshotEncoder``, so a stream is a binary keyframe followed by
+deltas. Every message on the wire carries a 4-byte length and a 1-byte
+kind. A connection opens with a JSON hello, and snapshot frames follow.
+
+``ClusterHardwareManager`` holds one connection per node and keeps the
+latest snapshot of each. It tracks staleness from arrival times, not from
+the nodes' clocks, and reconnects with exponential backoff. It answers
+placement queries such as the GPU with the most free VRAM.
+
+Run a node with ``python -m aegis.hardware.cluster --listen 0.0.0.0:7341``.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from aegis.utils.logger import setup_logger
+from .manager import HardwareManager
+from .models import ClusterNodeStatus, GpuCandidate, HardwareState
+from .snapshot import HardwareSnapshot, SnapshotDecoder, SnapshotEncoder
+
+Address = Union[Tuple[str, int], str]
+
+PROTOCOL_VERSION = 1
+
+_MESSAGE = struct.Struct('>IB')
+_HELLO = 0
+_FRAME = 1
+_MAX_MESSAGE_BYTES = 16 * 1024 ** 2
+
+
+def parse_address(text: str) -> Address:
+    """``host:port`` for TCP, ``unix:/path`` (or any path containing '/') for a Unix socket."""
+    if text.startswith('unix:'):
+        return text[len('unix:'):]
+    if '/' in text:
+        return text
+    host, _, port = text.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid node address '{text}'. Expected host:port or unix:/path.")
+    return host.strip('[]'), int(port)
+
+
+def format_address(address: Address) -> str:
+    return f"unix:{address}" if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+
+def _socket_for(address: Address) -> socket.socket:
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    family = socket.AF_INET6 if ':' in address[0] else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def _send_message(sock: socket.socket, kind: int, payload: bytes) -> None:
+    sock.sendall(_MESSAGE.pack(len(payload), kind) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("Node closed the connection.")
+        received += count
+    return bytes(buffer)
+
+
+def _recv_message(sock: socket.socket) -> Tuple[int, bytes]:
+    length, kind = _MESSAGE.unpack(_recv_exact(sock, _MESSAGE.size))
+    if length > _MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {length} bytes exceeds the {_MAX_MESSAGE_BYTES}-byte limit.")
+    return kind, _recv_exact(sock, length)
+
+
+class _Subscriber:
+    __slots__ = ('sock', 'peer', 'encoder')
+
+    def __init__(self, sock: socket.socket, peer: str, encoder: SnapshotEncoder) -> None:
+        self.sock = sock
+        self.peer = peer
+        self.encoder = encoder
+
+
+class NodeAgent:
+    """
+    Streams this machine's hardware samples to every connected cluster manager.
+
+    One sample is taken every ``interval`` seconds and sent to all
+    subscribers, each encoded against what that subscriber has already
+    received. A new subscriber gets a hello and a keyframe straight away.
+    Subscribers that cannot take a frame within ``send_timeout`` seconds
+    are dropped; their manager reconnects and starts from a keyframe.
+    """
+
+    def __init__(
+        self,
+        manager: HardwareManager,
+        address: Address = ('127.0.0.1', 0),
+        name: Optional[str] = None,
+        interval: float = 1.0,
+        keyframe_interval: int = 60,
+        tolerance: float = 0.0,
+        send_timeout: float = 2.0,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("Streaming interval must be a positive number of seconds.")
+        self.logger = setup_logger('NodeAgent', module_code='HW', script_code='NODE')
+        self.manager = manager
+        self.name = name or socket.gethostname()
+        self.interval = interval
+        self.keyframe_interval = keyframe_interval
+        self.tolerance = tolerance
+        self.send_timeout = send_timeout
+        self._requested_address = address
+        self._listener: Optional[socket.socket] = None
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Address:
+        """The bound address, with the actual port when port 0 was requested."""
+        if self._listener is None:
+            return self._requested_address
+        bound = self._listener.getsockname()
+        return bound if isinstance(bound, str) else (bound[0], bound[1])
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def start(self) -> Address:
+        """Bind, start accepting and streaming in background threads, and return the bound address."""
+        if self._listener is not None:
+            return self.address
+        address = self._requested_address
+        listener = _socket_for(address)
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+        else:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(address)
+        listener.listen()
+        # Closing a socket does not wake a blocked accept() on every platform, so poll for stop instead.
+        listener.settimeout(0.5)
+        self._listener = listener
+        self._stop_event.clear()
+
+        for target, label in ((self._accept_loop, 'accept'), (self._publish_loop, 'publish')):
+            thread = threading.Thread(target=target, name=f'aegis-node-{label}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info("Node '%s' streaming hardware status on %s.", self.name, format_address(self.address))
+        return self.address
+
+    def serve_forever(self) -> None:
+        """Start and block until ``stop`` is called from another thread or the process is interrupted."""
+        self.start()
+        try:
+            while not self._stop_event.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Close the listener and every subscriber connection."""
+        self._stop_event.set()
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            bound = listener.getsockname()
+            listener.close()
+            if isinstance(bound, str) and bound and os.path.exists(bound):
+                os.unlink(bound)
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.sock.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=self.interval + self.send_timeout)
+        self._threads = []
+
+    def _accept_loop(self) -> None:
+        listener = self._listener
+        while not self._stop_event.is_set() and listener is not None:
+            try:
+                sock, peer = listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            sock.settimeout(self.send_timeout)
+            if sock.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            subscriber = _Subscriber(
+                sock,
+                str(peer) if peer else 'unix',
+                SnapshotEncoder('binary', keyframe_interval=self.keyframe_interval, tolerance=self.tolerance),
+            )
+            hello = {'version': PROTOCOL_VERSION, 'node': self.name, 'interval': self.interval}
+            try:
+                _send_message(sock, _HELLO, json.dumps(hello).encode('utf-8'))
+                snapshot = self.manager.get_snapshot(max_age=self.interval)
+                _send_message(sock, _FRAME, subscriber.encoder.encode(snapshot))
+            except Exception as exc:  # noqa: BLE001 - a failed sample must not stop the accept loop
+                self.logger.warning("Could not greet subscriber %s: %s", subscriber.peer, exc)
+                sock.close()
+                continue
+            with self._lock:
+                self._subscribers.append(subscriber)
+            self.logger.info("Subscriber %s connected.", subscriber.peer)
+
+    def _publish_loop(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                subscribers = list(self._subscribers)
+            if not subscribers:
+                continue
+            try:
+                snapshot = self.manager.get_snapshot(max_age=self.interval)
+            except Exception as exc:  # noqa: BLE001
+                self.logger.error("Hardware sample failed: %s", exc, extra={'error_code': 'HAL-NODE-SAMPLE-FAIL'})
+                continue
+            for subscriber in subscribers:
+                try:
+                    _send_message(subscriber.sock, _FRAME, subscriber.encoder.encode(snapshot))
+                except OSError as exc:
+                    self.logger.warning("Dropping subscriber %s: %s", subscriber.peer, exc)
+                    subscriber.sock.close()
+                    with self._lock:
+                        if subscriber in self._subscribers:
+                            self._subscribers.remove(subscriber)
+
+
+class _NodeLink:
+    """Connection state and latest sample of one remote node."""
+
+    def __init__(self, name: str, address: Address) -> None:
+        self.name = name
+        self.address = address
+        self.reported_name: Optional[str] = None
+        self.interval: Optional[float] = None
+        # (snapshot, monotonic arrival time), replaced as a whole so readers never see a torn pair.
+        self.latest: Optional[Tuple[HardwareSnapshot, float]] = None
+        self.connected = False
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self.sock: Optional[socket.socket] = None
+        self.thread: Optional[threading.Thread] = None
+
+
+class ClusterHardwareManager:
+    """
+    A cluster-wide hardware view fed by ``NodeAgent`` streams.
+
+    ``nodes`` maps a node name to its address: a ``(host, port)`` tuple,
+    a Unix socket path or a string accepted by ``parse_address``. An
+    optional ``local`` manager joins the view as ``local_name`` without a
+    socket. A node is stale when no sample has arrived for ``stale_after``
+    seconds. By default that is three of its streaming intervals. A
+    connection silent for that long is dropped and reopened. The local
+    manager's snapshot is reused for the same window (three of its sampling
+    intervals by default) before it samples again. Failed connections are
+    retried after ``backoff_initial`` seconds, doubling up to
+    ``backoff_max``, with jitter so managers do not reconnect in step.
+    """
+
+    def __init__(
+        self,
+        nodes: Mapping[str, Union[Address, str]],
+        local: Optional[HardwareManager] = None,
+        local_name: str = 'local',
+        stale_after: Optional[float] = None,
+        connect_timeout: float = 2.0,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        self.logger = setup_logger('ClusterHardwareManager', module_code='HW', script_code='CLST')
+        self.local = local
+        self.local_name = local_name
+        self.stale_after = stale_after
+        self.connect_timeout = connect_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._stop_event = threading.Event()
+        self._links: Dict[str, _NodeLink] = {}
+        for name, address in nodes.items():
+            if name == local_name and local is not None:
+                raise ValueError(f"Node name '{name}' is reserved for the local manager.")
+            address = parse_address(address) if isinstance(address, str) else (address[0], int(address[1]))
+            self._links[name] = _NodeLink(name, address)
+
+        for link in self._links.values():
+            link.thread = threading.Thread(target=self._follow, args=(link,), name=f'aegis-cluster-{link.name}', daemon=True)
+            link.thread.start()
+
+    def close(self) -> None:
+        """Disconnect from every node and stop the reader threads."""
+        self._stop_event.set()
+        for link in self._links.values():
+            sock = link.sock
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        for link in self._links.values():
+            if link.thread is not None:
+                link.thread.join(timeout=self.connect_timeout + 1.0)
+
+    def wait_until_ready(self, timeout: float = 10.0) -> bool:
+        """Block until every remote node has delivered a sample; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(link.latest is not None for link in self._links.values()):
+                return True
+            time.sleep(0.01)
+        return all(link.latest is not None for link in self._links.values())
+
+    def node_names(self) -> List[str]:
+        names = list(self._links)
+        if self.local is not None:
+            names.insert(0, self.local_name)
+        return names
+
+    def statuses(self) -> List[ClusterNodeStatus]:
+        """Connection state and sample age of every node."""
+        now = time.monotonic()
+        statuses = []
+        if self.local is not None:
+            statuses.append(ClusterNodeStatus(name=self.local_name, address='local', connected=True, stale=False))
+        for link in self._links.values():
+            latest = link.latest
+            age = now - latest[1] if latest is not None else None
+            statuses.append(ClusterNodeStatus(
+                name=link.name,
+                address=format_address(link.address),
+                connected=link.connected,
+                stale=age is None or not link.connected or age > self._stale_window(link),
+                age_seconds=age,
+                reconnects=link.reconnects,
+                last_error=link.last_error,
+            ))
+        return statuses
+
+    def get_snapshot(self, node: str, allow_stale: bool = False) -> Optional[HardwareSnapshot]:
+        """
+        The latest snapshot of ``node``, or None if there is none.
+
+        Unless ``allow_stale``, None is also returned while the node is
+        disconnected or its last sample is older than the staleness window,
+        so placement queries skip nodes that cannot take work.
+        """
+        if node == self.local_name and self.local is not None:
+            return self.local.get_snapshot(max_age=self._local_max_age())
+        link = self._links.get(node)
+        if link is None:
+            raise KeyError(f"Unknown node '{node}'.")
+        latest = link.latest
+        if latest is None:
+            return None
+        if not allow_stale and (not link.connected or time.monotonic() - latest[1] > self._stale_window(link)):
+            return None
+        return latest[0]
+
+    def get_hardware_state(self, node: str, allow_stale: bool = False) -> Optional[HardwareState]:
+        snapshot = self.get_snapshot(node, allow_stale=allow_stale)
+        return snapshot.to_state() if snapshot is not None else None
+
+    def snapshots(self, include_stale: bool = False) -> Dict[str, HardwareSnapshot]:
+        """Latest snapshot per node; stale nodes are left out unless ``include_stale``."""
+        result = {}
+        for name in self.node_names():
+            snapshot = self.get_snapshot(name, allow_stale=include_stale)
+            if snapshot is not None:
+                result[name] = snapshot
+        return result
+
+    def gpu_candidates(self, min_free_vram_gb: float = 0.0) -> List[GpuCandidate]:
+        """Every GPU on a fresh node with at least ``min_free_vram_gb`` free, most free VRAM first."""
+        rows = sorted(self._gpu_rows(min_free_vram_gb))
+        return [self._candidate(row) for row in rows]
+
+    def node_with_most_free_vram(self, min_free_vram_gb: float = 0.0) -> Optional[GpuCandidate]:
+        """The single GPU with the most free VRAM across fresh nodes, or None if none qualifies."""
+        rows = self._gpu_rows(min_free_vram_gb)
+        return self._candidate(min(rows)) if rows else None
+
+    def least_loaded_node(self, device: Optional[str] = None) -> Optional[str]:
+        """The fresh node with the lowest mean CPU utilisation, optionally among those offering ``device``."""
+        eligible = set(self.nodes_with_device(device)) if device is not None else None
+        best: Optional[Tuple[float, str]] = None
+        for name, snapshot in self.snapshots().items():
+            if eligible is not None and name not in eligible:
+                continue
+            cores = snapshot.cpu_utilization
+            load = float(cores.mean()) if len(cores) else 0.0
+            if best is None or load < best[0]:
+                best = (load, name)
+        return best[1] if best is not None else None
+
+    def nodes_with_device(self, device: str) -> List[str]:
+        """Fresh nodes whose OpenVINO devices include ``device`` (e.g. 'NPU', or 'GPU' matching 'GPU.0')."""
+        prefix = device.upper()
+        return [
+            name for name, snapshot in self.snapshots().items()
+            if any(
+                candidate.upper() == prefix or candidate.upper().startswith(prefix + '.')
+                for candidate in snapshot.static.intel_devices or ()
+            )
+        ]
+
+    def _gpu_rows(self, min_free_vram_gb: float) -> List[Tuple[float, float, str, int, str]]:
+        """``(-free_vram_gb, utilization, node, index, name)`` per qualifying GPU, so the best row sorts first."""
+        rows = []
+        for name, snapshot in self.snapshots().items():
+            gpus = snapshot.static.gpus
+            if not gpus:
+                continue
+            free = np.array([total for _, _, total in gpus]) - snapshot.gpu_vram_used_gb
+            utilization = snapshot.gpu_utilization_percent
+            for position in np.flatnonzero(free >= min_free_vram_gb):
+                index, gpu_name, _ = gpus[position]
+                rows.append((-round(float(free[position]), 3), float(utilization[position]), name, index, gpu_name))
+        return rows
+
+    @staticmethod
+    def _candidate(row: Tuple[float, float, str, int, str]) -> GpuCandidate:
+        free, utilization, node, index, name = row
+        return GpuCandidate(node=node, gpu_index=index, name=name, free_vram_gb=-free, utilization_percent=utilization)
+
+    def _local_max_age(self) -> float:
+        """Snapshot age the local node accepts before sampling again, matching the remote staleness window."""
+        if self.stale_after is not None:
+            return self.stale_after
+        return 3.0 * (self.local.sample_interval or 1.0)
+
+    def _stale_window(self, link: _NodeLink) -> float:
+        if self.stale_after is not None:
+            return self.stale_after
+        return 3.0 * (link.interval or 1.0)
+
+    def _follow(self, link: _NodeLink) -> None:
+        """Keep one node's stream open, reconnecting with backoff until closed."""
+        failures = 0
+        while not self._stop_event.is_set():
+            try:
+                sock = _socket_for(link.address)
+                link.sock = sock
+                sock.settimeout(self.connect_timeout)
+                sock.connect(link.address)
+                kind, payload = _recv_message(sock)
+                if kind != _HELLO:
+                    raise ValueError("Node did not open with a hello message.")
+                hello = json.loads(payload)
+                if hello.get('version') != PROTOCOL_VERSION:
+                    raise ValueError(f"Unsupported node protocol version {hello.get('version')}.")
+                link.reported_name = hello.get('node')
+                link.interval = float(hello.get('interval') or 1.0)
+                link.connected = True
+                link.last_error = None
+                failures = 0
+                self.logger.info("Connected to node '%s' at %s.", link.name, format_address(link.address))
+
+                sock.settimeout(self._stale_window(link))
+                decoder = SnapshotDecoder()
+                while not self._stop_event.is_set():
+                    kind, payload = _recv_message(sock)
+                    if kind == _FRAME:
+                        link.latest = (decoder.decode(payload), time.monotonic())
+            except (OSError, ValueError, KeyError, struct.error) as exc:
+                if self._stop_event.is_set():
+                    break
+                link.last_error = str(exc) or type(exc).__name__
+                self.logger.warning(
+                    "Lost node '%s' at %s: %s",
+                    link.name,
+                    format_address(link.address),
+                    link.last_error,
+                    extra={'error_code': 'HAL-NODE-LINK-FAIL'}
+                )
+            finally:
+                link.connected = False
+                if link.sock is not None:
+                    link.sock.close()
+                    link.sock = None
+
+            failures += 1
+            link.reconnects += 1
+            delay = min(self.backoff_max, self.backoff_initial * 2 ** (failures - 1))
+            self._stop_event.wait(delay * random.uniform(0.5, 1.0))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Stream this machine's hardware status to Aegis cluster managers.")
+    parser.add_argument('--listen', default='127.0.0.1:7341', help="host:port or unix:/path to listen on.")
+    parser.add_argument('--name', default=None, help="Node name reported to managers; defaults to the hostname.")
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--keyframe-interval', type=int, default=60)
+    parser.add_argument('--tolerance', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    manager = HardwareManager()
+    agent = NodeAgent(
+        manager,
+        parse_address(args.listen),
+        name=args.name,
+        interval=args.interval,
+        keyframe_interval=args.keyframe_interval,
+        tolerance=args.tolerance,
+    )
+    try:
+        agent.serve_forever()
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
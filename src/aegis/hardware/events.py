@@ -0,0 +1,317 @@
+"""Threshold events published from hardware samples.
+
+Subscribers register ``ThresholdRule`` objects with a ``HardwareEventBus``
+instead of polling ``HardwareManager`` themselves. The bus listens to the
+manager's samples and checks every rule of every subscriber in one
+vectorised pass per sample. It then delivers ``HardwareEvent`` objects to
+callbacks or asyncio queues.
+"""
+
+import asyncio
+import itertools
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import traced
+from .models import HardwareEvent, ThresholdRule
+from .snapshot import HardwareSnapshot, StaticHardwareFacts
+
+if TYPE_CHECKING:
+    from .manager import HardwareManager
+
+_AGGREGATE_METRICS = ('ram_used_percent', 'cpu_mean', 'cpu_max', 'gpu_vram_percent_max', 'gpu_utilization_max')
+_METRIC_PATTERN = re.compile(
+    r'^(ram_available_gb|cpu\d+|gpu\d+\.(vram_used_gb|vram_percent|utilization_percent)|'
+    + '|'.join(_AGGREGATE_METRICS) + r')$'
+)
+_SUBSCRIPTION_IDS = itertools.count(1)
+
+
+class _MetricLayout:
+    """Maps metric names to positions in the metric vector of snapshots sharing one static layout."""
+
+    __slots__ = ('static', 'length', 'gpu_count', 'names', 'index')
+
+    def __init__(self, snapshot: HardwareSnapshot) -> None:
+        self.static = snapshot.static
+        self.length = len(snapshot.values)
+        self.gpu_count = snapshot.gpu_count
+        self.names = snapshot.field_names
+        self.names += [f'gpu{index}.vram_percent' for index, _, _ in snapshot.static.gpus]
+        self.names += list(_AGGREGATE_METRICS)
+        self.index = {name: position for position, name in enumerate(self.names)}
+
+    def matches(self, snapshot: HardwareSnapshot) -> bool:
+        return self.static is snapshot.static or (
+            self.static == snapshot.static and self.length == len(snapshot.values)
+        )
+
+    def metrics(self, snapshot: HardwareSnapshot) -> np.ndarray:
+        """The snapshot's values followed by derived metrics, plus a trailing NaN for absent metrics."""
+        static: StaticHardwareFacts = self.static
+        gpu_count = self.gpu_count
+        cores = snapshot.cpu_utilization
+
+        metrics = np.empty(len(self.names) + 1, dtype=np.float64)
+        metrics[:self.length] = snapshot.values
+        position = self.length
+        if gpu_count:
+            totals = np.array([total for _, _, total in static.gpus], dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                vram_percent = snapshot.gpu_vram_used_gb / totals * 100.0
+            metrics[position:position + gpu_count] = vram_percent
+            position += gpu_count
+        ram_total = static.ram_total_gb
+        metrics[position] = (ram_total - snapshot.values[0]) / ram_total * 100.0 if ram_total else np.nan
+        metrics[position + 1] = cores.mean() if len(cores) else np.nan
+        metrics[position + 2] = cores.max() if len(cores) else np.nan
+        metrics[position + 3] = vram_percent.max() if gpu_count else np.nan
+        metrics[position + 4] = snapshot.gpu_utilization_percent.max() if gpu_count else np.nan
+        metrics[-1] = np.nan
+        return metrics
+
+
+class Subscription:
+    """A subscriber's rules and where their events go; ``queue`` is set for queue subscriptions."""
+
+    def __init__(
+        self,
+        bus: 'HardwareEventBus',
+        rules: List[ThresholdRule],
+        callback: Optional[Callable[[HardwareEvent], None]] = None,
+        queue: Optional['asyncio.Queue[HardwareEvent]'] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self.id = next(_SUBSCRIPTION_IDS)
+        self.bus = bus
+        self.rules = rules
+        self.callback = callback
+        self.queue = queue
+        self.loop = loop
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.bus.unsubscribe(self)
+
+
+class HardwareEventBus:
+    """
+    Evaluates subscribers' threshold rules against each hardware sample.
+
+    Rules are edge-triggered: a ``triggered`` event is raised when a rule
+    starts to hold and a ``cleared`` event once the metric is back past
+    ``clear_at``. A rule that already holds in the first sample it sees
+    triggers straight away. Rate rules compare the change per second
+    between consecutive samples.
+
+    All rules are compiled into arrays and checked together once per
+    sample, so the cost of a sample barely grows with the number of
+    subscribers. Callbacks run on the sampling thread and must be quick.
+    They are called outside the bus lock and after the manager's sample
+    lock is released, so they may query or refresh the manager. Events
+    may be shared between subscribers and should not be modified.
+    Queue subscribers receive events through their event loop, and events
+    that do not fit a full queue are dropped.
+    """
+
+    def __init__(self, manager: Optional['HardwareManager'] = None) -> None:
+        self.logger = setup_logger('HardwareEventBus', module_code='HW', script_code='EVNT')
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._active: Dict[Tuple[int, int], bool] = {}
+
+        # Compiled form of every rule, rebuilt when subscriptions or the metric layout change.
+        self._compiled_layout: Optional[_MetricLayout] = None
+        self._owners: List[Tuple[Subscription, int]] = []
+        self._metric_index = np.zeros(0, dtype=np.intp)
+        self._sign = np.zeros(0, dtype=np.float64)
+        self._threshold = np.zeros(0, dtype=np.float64)
+        self._clear_at = np.zeros(0, dtype=np.float64)
+        self._is_rate = np.zeros(0, dtype=bool)
+        self._active_mask = np.zeros(0, dtype=bool)
+        self._dirty = True
+
+        self._previous_metrics: Optional[np.ndarray] = None
+        self._previous_timestamp = 0.0
+
+        self.manager = manager
+        if manager is not None:
+            manager.add_sample_listener(self.evaluate, compact=True)
+
+    def close(self) -> None:
+        """Detach from the manager and drop every subscription."""
+        if self.manager is not None:
+            self.manager.remove_sample_listener(self.evaluate)
+        with self._lock:
+            self._subscriptions.clear()
+            self._active.clear()
+            self._dirty = True
+
+    def subscribe(
+        self,
+        rules: Union[ThresholdRule, Iterable[ThresholdRule]],
+        callback: Callable[[HardwareEvent], None],
+    ) -> Subscription:
+        """Call ``callback`` with every event raised by ``rules``."""
+        return self._add(Subscription(self, self._validate(rules), callback=callback))
+
+    def subscribe_queue(
+        self,
+        rules: Union[ThresholdRule, Iterable[ThresholdRule]],
+        maxsize: int = 0,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> Subscription:
+        """Put every event raised by ``rules`` on a new ``subscription.queue``; call from the loop that will consume it."""
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        queue: 'asyncio.Queue[HardwareEvent]' = asyncio.Queue(maxsize)
+        return self._add(Subscription(self, self._validate(rules), queue=queue, loop=loop))
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if self._subscriptions.pop(subscription.id, None) is not None:
+                for position in range(len(subscription.rules)):
+                    self._active.pop((subscription.id, position), None)
+                self._dirty = True
+
+    @property
+    def subscription_count(self) -> int:
+        return len(self._subscriptions)
+
+    @traced('HardwareEventBus.evaluate', category='hal')
+    def evaluate(self, snapshot: HardwareSnapshot) -> List[HardwareEvent]:
+        """Check every rule against one sample, deliver the resulting events and return the distinct ones."""
+        with self._lock:
+            layout = self._compiled_layout
+            if layout is None or not layout.matches(snapshot):
+                layout = _MetricLayout(snapshot)
+                self._previous_metrics = None
+                self._dirty = True
+            if self._dirty:
+                self._compile(layout)
+            if not self._owners:
+                return []
+
+            metrics = layout.metrics(snapshot)
+            values = metrics[self._metric_index]
+            if self._is_rate.any():
+                elapsed = snapshot.timestamp - self._previous_timestamp
+                if self._previous_metrics is not None and elapsed > 0:
+                    rates = (metrics - self._previous_metrics)[self._metric_index] / elapsed
+                else:
+                    rates = np.full(len(values), np.nan)
+                values = np.where(self._is_rate, rates, values)
+            self._previous_metrics = metrics
+            self._previous_timestamp = snapshot.timestamp
+
+            # Multiplying by the sign turns every rule into an "above" check; NaN compares False.
+            signed = self._sign * values
+            active = self._active_mask
+            triggered = ~active & (signed > self._sign * self._threshold)
+            cleared = active & (signed <= self._sign * self._clear_at)
+            self._active_mask = (active | triggered) & ~cleared
+
+            fired = np.flatnonzero(triggered | cleared)
+            pending: List[Tuple[Subscription, HardwareEvent]] = []
+            # Subscribers with identical rules share one event object per sample.
+            events: Dict[Tuple, HardwareEvent] = {}
+            for position in fired.tolist():
+                subscription, rule_position = self._owners[position]
+                rule = subscription.rules[rule_position]
+                is_trigger = bool(triggered[position])
+                self._active[(subscription.id, rule_position)] = is_trigger
+                key = (rule.name, rule.metric, is_trigger, rule.threshold, rule.clear_at, rule.rate)
+                event = events.get(key)
+                if event is None:
+                    event = events[key] = HardwareEvent(
+                        rule=rule.name,
+                        metric=rule.metric,
+                        kind='triggered' if is_trigger else 'cleared',
+                        value=float(values[position]),
+                        threshold=rule.threshold if is_trigger else float(self._clear_at[position]),
+                        timestamp=snapshot.timestamp,
+                    )
+                pending.append((subscription, event))
+
+        for subscription, event in pending:
+            self._deliver(subscription, event)
+        return list(events.values())
+
+    def _add(self, subscription: Subscription) -> Subscription:
+        with self._lock:
+            self._subscriptions[subscription.id] = subscription
+            self._dirty = True
+        self.logger.info("Subscription %d registered with %d rule(s).", subscription.id, len(subscription.rules))
+        return subscription
+
+    @staticmethod
+    def _validate(rules: Union[ThresholdRule, Iterable[ThresholdRule]]) -> List[ThresholdRule]:
+        rules = [rules] if isinstance(rules, ThresholdRule) else list(rules)
+        if not rules:
+            raise ValueError("A subscription needs at least one rule.")
+        for rule in rules:
+            if not _METRIC_PATTERN.match(rule.metric):
+                raise ValueError(f"Rule '{rule.name}' uses unknown metric '{rule.metric}'.")
+            if rule.clear_at is not None:
+                if rule.condition == 'above' and rule.clear_at > rule.threshold:
+                    raise ValueError(f"Rule '{rule.name}': clear_at must not be above the threshold.")
+                if rule.condition == 'below' and rule.clear_at < rule.threshold:
+                    raise ValueError(f"Rule '{rule.name}': clear_at must not be below the threshold.")
+        return rules
+
+    def _compile(self, layout: _MetricLayout) -> None:
+        """Flatten every subscription's rules into arrays indexed like the metric vector."""
+        owners: List[Tuple[Subscription, int]] = []
+        for subscription in self._subscriptions.values():
+            owners.extend((subscription, position) for position in range(len(subscription.rules)))
+        rules = [subscription.rules[position] for subscription, position in owners]
+
+        missing = len(layout.names)  # the trailing NaN slot
+        self._owners = owners
+        self._metric_index = np.array([layout.index.get(rule.metric, missing) for rule in rules], dtype=np.intp)
+        self._sign = np.array([1.0 if rule.condition == 'above' else -1.0 for rule in rules])
+        self._threshold = np.array([rule.threshold for rule in rules], dtype=np.float64)
+        self._clear_at = np.array(
+            [rule.threshold if rule.clear_at is None else rule.clear_at for rule in rules], dtype=np.float64
+        )
+        self._is_rate = np.array([rule.rate for rule in rules], dtype=bool)
+        self._active_mask = np.array(
+            [self._active.get((subscription.id, position), False) for subscription, position in owners], dtype=bool
+        )
+        self._compiled_layout = layout
+        self._dirty = False
+
+    def _deliver(self, subscription: Subscription, event: HardwareEvent) -> None:
+        if subscription.callback is not None:
+            try:
+                subscription.callback(event)
+            except Exception as exc:  # noqa: BLE001
+                self.logger.error(
+                    "Event callback of subscription %d failed: %s",
+                    subscription.id,
+                    exc,
+                    extra={'error_code': 'HAL-EVENT-CALLBACK-FAIL'}
+                )
+            return
+
+        try:
+            subscription.loop.call_soon_threadsafe(self._enqueue, subscription, event)
+        except RuntimeError:
+            self.logger.warning("Event loop of subscription %d is closed; unsubscribing.", subscription.id)
+            self.unsubscribe(subscription)
+
+    def _enqueue(self, subscription: Subscription, event: HardwareEvent) -> None:
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.logger.warning(
+                "Queue of subscription %d is full; dropped %s event of rule '%s'.",
+                subscription.id,
+                event.kind,
+                event.rule,
+                extra={'error_code': 'HAL-EVENT-DROPPED'}
+            )
@@ -1,42 +1,392 @@
-from typing import Optional
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from aegis.utils.logger import setup_logger
-from .models import HardwareState, GPUStatus, IntelComputeStatus, SystemStatus
+from aegis.utils.tracing import traced
+from .models import HardwareState
+from .snapshot import HardwareSnapshot, SnapshotEncoder, StaticHardwareFacts
+from .static_cache import StaticHardwareCache
 from .monitors.nvidia_monitor import NvidiaGpuMonitor
 from .monitors.system_monitor import SystemMonitor
 from .monitors.intel_monitor import IntelComputeMonitor
 
+if TYPE_CHECKING:
+    from .events import HardwareEventBus
+    from .telemetry import TelemetryBuffer
+
 
 class HardwareManager:
     """
     A façade class that provides a unified interface to all hardware monitors.
     It orchestrates data collection from individual monitors and composes
     it into a single, comprehensive HardwareState object.
+
+    When background sampling is enabled, a daemon thread refreshes the state at
+    a fixed cadence and ``get_hardware_state`` returns the latest snapshot
+    without touching the monitors.
+
+    Monitors are polled concurrently, each with its own deadline. A monitor that
+    misses its deadline or fails has its last known value carried forward and
+    is listed in ``HardwareState.stale_monitors``.
+
+    Samples are kept as compact ``HardwareSnapshot`` objects; the Pydantic
+    ``HardwareState`` is built only when ``get_hardware_state`` or a
+    listener asks for it. ``status_stream`` serves the samples as
+    delta-encoded frames.
+
+    Every fresh snapshot is passed to the registered sample listeners, such as
+    an attached ``TelemetryBuffer`` that keeps a rolling history.
     """
 
-    def __init__(self) -> None:
+    # Per-monitor deadlines in seconds, keyed by HardwareState field name.
+    DEFAULT_MONITOR_TIMEOUTS: Dict[str, float] = {
+        'gpus': 1.0,
+        'system': 2.0,
+        'intel_devices': 1.0,
+    }
+
+    def __init__(
+        self,
+        sample_interval: Optional[float] = None,
+        monitor_timeouts: Optional[Dict[str, float]] = None,
+        telemetry: Optional['TelemetryBuffer'] = None,
+        nvml: Optional[Any] = None,
+        static_cache: Optional[StaticHardwareCache] = None,
+        use_static_cache: bool = True,
+    ) -> None:
         self.logger = setup_logger('HardwareManager')
         self.logger.info("Initializing HardwareManager and its monitors...")
-        self.gpu_monitor: NvidiaGpuMonitor = NvidiaGpuMonitor()
-        self.system_monitor: SystemMonitor = SystemMonitor()
-        self.intel_monitor: IntelComputeMonitor = IntelComputeMonitor()
+        if static_cache is None:
+            static_cache = StaticHardwareCache(enabled=use_static_cache)
+        self.static_cache: StaticHardwareCache = static_cache
+        self.gpu_monitor: NvidiaGpuMonitor = NvidiaGpuMonitor(nvml=nvml, static_cache=static_cache)
+        self.system_monitor: SystemMonitor = SystemMonitor(static_cache=static_cache)
+        self.intel_monitor: IntelComputeMonitor = IntelComputeMonitor(static_cache=static_cache)
+
+        self._monitors: Dict[str, Any] = {
+            'gpus': self.gpu_monitor,
+            'system': self.system_monitor,
+            'intel_devices': self.intel_monitor,
+        }
+        self.monitor_timeouts: Dict[str, float] = dict(self.DEFAULT_MONITOR_TIMEOUTS)
+        if monitor_timeouts:
+            self.monitor_timeouts.update(monitor_timeouts)
+
+        # One worker per monitor: a hung call is never resubmitted while in flight,
+        # so it can occupy at most its own worker.
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self._monitors),
+            thread_name_prefix='aegis-hal-monitor',
+        )
+        self._in_flight: Dict[str, Future] = {}
+        self._last_values: Dict[str, Any] = {}
+
+        self._latest_snapshot: Optional[HardwareSnapshot] = None
+        self._static_facts: Optional[StaticHardwareFacts] = None
+        self._sample_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler_thread: Optional[threading.Thread] = None
+        self.sample_interval: Optional[float] = None
+
+        # (listener, compact) pairs; compact listeners receive the HardwareSnapshot itself.
+        self._sample_listeners: List[Tuple[Callable[[Any], None], bool]] = []
+        self.telemetry: Optional['TelemetryBuffer'] = telemetry
+        if telemetry is not None:
+            self.add_sample_listener(telemetry.record_snapshot, compact=True)
+        self._events: Optional['HardwareEventBus'] = None
+        self._events_lock = threading.Lock()
+
         self.logger.info("HardwareManager initialized.")
 
-    def get_hardware_state(self) -> HardwareState:
+        if sample_interval is not None:
+            self.start_sampling(sample_interval)
+
+    @property
+    def events(self) -> 'HardwareEventBus':
+        """The threshold event bus fed by this manager's samples, created on first use.
+
+        Events are only raised for samples that are taken, so subscribers
+        usually want background sampling running.
+        """
+        if self._events is None:
+            with self._events_lock:
+                if self._events is None:
+                    from .events import HardwareEventBus
+
+                    self._events = HardwareEventBus(self)
+        return self._events
+
+    @property
+    def latest_snapshot(self) -> Optional[HardwareSnapshot]:
+        """The most recent snapshot, however old, without sampling; None before the first sample."""
+        return self._latest_snapshot
+
+    @property
+    def is_sampling(self) -> bool:
+        """Whether the background sampler thread is currently running."""
+        return self._sampler_thread is not None and self._sampler_thread.is_alive()
+
+    def start_sampling(self, interval: float = 1.0) -> None:
+        """Start refreshing the hardware state every ``interval`` seconds in the background."""
+        if interval <= 0:
+            raise ValueError("Sampling interval must be a positive number of seconds.")
+
+        self.sample_interval = interval
+        if self.is_sampling:
+            if self._stop_event.is_set():
+                # An earlier stop timed out while the sampler was busy; keep that thread rather than start a second.
+                self._stop_event.clear()
+                self.logger.info("Background sampling resumed every %.3fs.", interval)
+                return
+            self.logger.info("Background sampling cadence changed to %.3fs.", interval)
+            return
+
+        self._stop_event.clear()
+        self._sampler_thread = threading.Thread(
+            target=self._sampling_loop,
+            name='aegis-hal-sampler',
+            daemon=True,
+        )
+        self._sampler_thread.start()
+        self.logger.info("Background hardware sampling started every %.3fs.", interval)
+
+    def stop_sampling(self, timeout: Optional[float] = None) -> None:
+        """Stop the background sampler and wait up to ``timeout`` seconds for it to exit."""
+        thread = self._sampler_thread
+        if thread is None:
+            return
+
+        self._stop_event.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            # Keep the reference so a later start_sampling does not run a second sampler beside this one.
+            self.logger.warning(
+                "Background sampler did not exit within %.2fs; it will stop after its current sample.",
+                timeout,
+                extra={'error_code': 'HAL-SAMPLER-STUCK'}
+            )
+            return
+        self._sampler_thread = None
+        self.logger.info("Background hardware sampling stopped.")
+
+    def close(self) -> None:
+        """Stop background sampling and release the monitor worker threads and NVML session."""
+        self.stop_sampling()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.gpu_monitor.close()
+
+    def add_sample_listener(self, listener: Callable[[Any], None], compact: bool = False) -> None:
+        """
+        Register a callable invoked with every fresh sample.
+
+        The listener receives a ``HardwareState``, or the ``HardwareSnapshot``
+        itself when ``compact`` is True, which spares building the models.
         """
-        Queries all underlying hardware monitors and returns a composite
-        state of the entire system.
+        self._sample_listeners.append((listener, compact))
+
+    def remove_sample_listener(self, listener: Callable[[Any], None]) -> None:
+        """Unregister a previously added sample listener."""
+        self._sample_listeners = [entry for entry in self._sample_listeners if entry[0] != listener]
+
+    def get_hardware_state(self, max_age: Optional[float] = None) -> HardwareState:
+        """
+        Returns a composite state of the entire system.
+
+        While background sampling is running the latest snapshot is returned
+        immediately. If ``max_age`` is given, a cached snapshot is accepted only
+        when it is at most ``max_age`` seconds old; otherwise the monitors are
+        queried synchronously.
+        """
+        return self.get_snapshot(max_age).to_state()
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> HardwareSnapshot:
+        """Like ``get_hardware_state`` but returns the compact snapshot."""
+        cached = self._latest_snapshot
+        if cached is not None:
+            if max_age is None and self.is_sampling:
+                return cached
+            if max_age is not None and cached.age_seconds() <= max_age:
+                return cached
+
+        return self.refresh_snapshot()
+
+    def refresh(self) -> HardwareState:
+        """Query all monitors now and store the result as the latest snapshot."""
+        return self.refresh_snapshot().to_state()
+
+    @traced('HardwareManager.refresh', category='hal')
+    def refresh_snapshot(self) -> HardwareSnapshot:
+        """
+        Like ``refresh`` but returns the compact snapshot.
+
+        Listeners are notified after the sample lock is released, so they may
+        query the manager again without deadlocking it.
+        """
+        requested_at = time.time()
+        with self._sample_lock:
+            # Another caller may have completed a sample while we waited for the lock.
+            cached = self._latest_snapshot
+            if cached is not None and cached.timestamp >= requested_at:
+                return cached
+
+            snapshot = self._collect_snapshot()
+            self._latest_snapshot = snapshot
+
+        self._notify_listeners(snapshot)
+        return snapshot
+
+    def status_stream(
+        self,
+        interval: float = 1.0,
+        encoding: str = 'json',
+        keyframe_interval: int = 60,
+        tolerance: float = 0.0,
+        max_frames: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Yield the hardware status every ``interval`` seconds as delta-encoded frames.
+
+        The first frame is a keyframe; later ones carry only what changed (see
+        ``SnapshotEncoder``). Each call has its own encoder, so every subscriber
+        gets a consistent stream. Decode with ``SnapshotDecoder``.
         """
+        encoder = SnapshotEncoder(encoding, keyframe_interval=keyframe_interval, tolerance=tolerance)
+        sent = 0
+        while max_frames is None or sent < max_frames:
+            started = time.monotonic()
+            yield encoder.encode(self.get_snapshot(max_age=interval))
+            sent += 1
+            remaining = interval - (time.monotonic() - started)
+            if remaining > 0 and (max_frames is None or sent < max_frames):
+                time.sleep(remaining)
+
+    def _notify_listeners(self, snapshot: HardwareSnapshot) -> None:
+        """Deliver a fresh snapshot to every sample listener, isolating their failures."""
+        for listener, compact in list(self._sample_listeners):
+            try:
+                listener(snapshot if compact else snapshot.to_state())
+            except Exception as exc:  # noqa: BLE001
+                self.logger.error(
+                    "Hardware sample listener %r failed: %s",
+                    listener,
+                    exc,
+                    extra={'error_code': 'HAL-LISTENER-FAIL'}
+                )
+
+    def _collect_snapshot(self) -> HardwareSnapshot:
+        """Queries all underlying hardware monitors in parallel and composes their results."""
         self.logger.debug("Fetching full hardware state...")
 
-        gpu_state: Optional[GPUStatus] = self.gpu_monitor.get_status()
-        system_state: SystemStatus = self.system_monitor.get_status()
-        intel_state: Optional[IntelComputeStatus] = self.intel_monitor.get_status()
+        futures: Dict[str, Future] = {}
+        for name, monitor in self._monitors.items():
+            future = self._in_flight.get(name)
+            if future is None:
+                # Run under a copy of the caller's context so monitor spans nest under the refresh.
+                future = self._executor.submit(contextvars.copy_context().run, monitor.sample)
+                self._in_flight[name] = future
+            futures[name] = future
+
+        started = time.monotonic()
+        values: Dict[str, Any] = {}
+        stale: List[str] = []
+
+        for name, future in futures.items():
+            remaining = max(0.0, started + self.monitor_timeouts.get(name, 1.0) - time.monotonic())
+            try:
+                values[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                self.logger.warning(
+                    "Monitor '%s' missed its %.2fs deadline; carrying forward last known value.",
+                    name,
+                    self.monitor_timeouts.get(name, 1.0),
+                    extra={'error_code': 'HAL-MON-TIMEOUT'}
+                )
+                stale.append(name)
+                continue
+            except Exception as exc:  # noqa: BLE001
+                self._in_flight.pop(name, None)
+                self.logger.error(
+                    "Monitor '%s' failed: %s",
+                    name,
+                    exc,
+                    extra={'error_code': 'HAL-MON-FAIL'}
+                )
+                stale.append(name)
+                continue
 
-        hardware_state = HardwareState(
-            gpu=gpu_state,
-            system=system_state,
-            intel_devices=intel_state,
+            self._in_flight.pop(name, None)
+            self._last_values[name] = values[name]
+
+        for name in stale:
+            values[name] = self._last_values.get(name)
+
+        if values.get('system') is None:
+            # There is no earlier system status to fall back on; the snapshot cannot be built without one.
+            # Give the monitor one more deadline, then fail rather than block on a hung call forever.
+            grace = self.monitor_timeouts.get('system', 2.0)
+            self.logger.warning("No system status available yet; waiting up to %.2fs more for the system monitor.", grace)
+            try:
+                values['system'] = futures['system'].result(timeout=grace)
+            except FutureTimeoutError:
+                self.logger.error(
+                    "System monitor produced no first sample within %.2fs.",
+                    self.monitor_timeouts.get('system', 2.0) + grace,
+                    extra={'error_code': 'HAL-MON-COLD-TIMEOUT'}
+                )
+                raise TimeoutError("The system monitor has not produced a first sample; hardware state is unavailable.")
+            except Exception:
+                self._in_flight.pop('system', None)
+                raise
+            self._in_flight.pop('system', None)
+            self._last_values['system'] = values['system']
+            stale.remove('system')
+
+        gpus = values.get('gpus') or []
+        cpu_utilization, ram_available_gb = values['system']
+        snapshot = HardwareSnapshot.build(
+            self._static_facts_for(gpus, values.get('intel_devices')),
+            cpu_utilization,
+            ram_available_gb,
+            [(gpu.vram_used_gb, gpu.utilization_percent) for gpu in gpus],
+            [gpu.processes for gpu in gpus],
+            stale,
         )
         self.logger.debug("Hardware state compiled.")
-        return hardware_state
+        return snapshot
+
+    def _static_facts_for(self, gpus: List[Any], intel_devices: Optional[List[str]]) -> StaticHardwareFacts:
+        """Reuse the previous static facts unless the set of devices changed."""
+        system = self.system_monitor
+        facts = StaticHardwareFacts(
+            cpu_brand=system.cpu_brand,
+            cpu_arch=system.cpu_arch,
+            cpu_cores_physical=system.cpu_cores_physical,
+            cpu_cores_logical=system.cpu_cores_logical,
+            ram_total_gb=system.ram_total_gb,
+            gpus=[(gpu.index, gpu.name, gpu.vram_total_gb) for gpu in gpus],
+            intel_devices=intel_devices,
+        )
+        if facts != self._static_facts:
+            self._static_facts = facts
+        return self._static_facts
+
+    def _sampling_loop(self) -> None:
+        """Body of the background sampler thread."""
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh_snapshot()
+            except Exception as exc:  # noqa: BLE001
+                self.logger.error(
+                    "Background hardware sample failed: %s",
+                    exc,
+                    extra={'error_code': 'HAL-SAMPLE-FAIL'}
+                )
+
+            interval = self.sample_interval or 1.0
+            remaining = interval - (time.monotonic() - started)
+            if remaining > 0:
+                self._stop_event.wait(remaining)
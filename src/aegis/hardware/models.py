@@ -1,14 +1,27 @@
+import time
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
+
+
+class GPUProcessStatus(BaseModel):
+    """VRAM held by a single process running on a GPU."""
+
+    pid: int = Field(..., description="Operating system process ID.")
+    vram_used_gb: float = Field(..., description="Dedicated VRAM used by the process in gigabytes.")
 
 
 class GPUStatus(BaseModel):
     """Represents the status of a single GPU."""
 
+    index: int = Field(0, description="NVML device index of the GPU.")
     name: str = Field(..., description="The official name of the GPU model.")
     vram_total_gb: float = Field(..., description="Total dedicated VRAM in gigabytes.")
     vram_used_gb: float = Field(..., description="Used dedicated VRAM in gigabytes.")
     utilization_percent: float = Field(..., description="Current GPU core utilization percentage.")
+    processes: List[GPUProcessStatus] = Field(
+        default_factory=list,
+        description="Compute processes currently holding VRAM on this GPU.",
+    )
 
 
 class SystemStatus(BaseModel):
@@ -35,9 +48,80 @@ class IntelComputeStatus(BaseModel):
 class HardwareState(BaseModel):
     """A composite model that provides a complete snapshot of the system's hardware state. This is the primary data contract for the entire Hardware Abstraction Layer."""
 
-    gpu: Optional[GPUStatus] = Field(None, description="Status of the primary dedicated GPU.")
+    gpus: List[GPUStatus] = Field(default_factory=list, description="Status of every detected dedicated GPU.")
     system: SystemStatus = Field(..., description="Status of the core system CPU and RAM.")
     intel_devices: Optional[IntelComputeStatus] = Field(
         None,
         description="Status of available Intel compute devices (iGPU, NPU).",
     )
+    stale_monitors: List[str] = Field(
+        default_factory=list,
+        description="Fields carried forward from an earlier sample because their monitor missed its deadline or failed.",
+    )
+    timestamp: float = Field(
+        default_factory=time.time,
+        description="Unix time at which the snapshot was sampled.",
+    )
+
+    @property
+    def gpu(self) -> Optional[GPUStatus]:
+        """The primary dedicated GPU, if any."""
+        return self.gpus[0] if self.gpus else None
+
+    def age_seconds(self) -> float:
+        """Return how many seconds have elapsed since this snapshot was sampled."""
+        return max(0.0, time.time() - self.timestamp)
+
+
+class ThresholdRule(BaseModel):
+    """A condition on one hardware metric; an event is raised when it starts to hold and when it clears."""
+
+    name: str = Field(..., description="Name reported in the events of this rule.")
+    metric: str = Field(
+        ...,
+        description=(
+            "Metric name: 'ram_available_gb', 'ram_used_percent', 'cpu_mean', 'cpu_max', 'cpu<N>', "
+            "'gpu<N>.vram_used_gb', 'gpu<N>.vram_percent', 'gpu<N>.utilization_percent', "
+            "'gpu_vram_percent_max' or 'gpu_utilization_max'."
+        ),
+    )
+    condition: Literal['above', 'below'] = Field('above', description="Direction in which the threshold is crossed.")
+    threshold: float = Field(..., description="Level at which the rule triggers.")
+    clear_at: Optional[float] = Field(
+        None,
+        description="Level the metric must return past before the rule clears (hysteresis); defaults to the threshold.",
+    )
+    rate: bool = Field(False, description="Compare the metric's change per second instead of its value.")
+
+
+class HardwareEvent(BaseModel):
+    """A threshold rule starting or ceasing to hold."""
+
+    rule: str
+    metric: str
+    kind: Literal['triggered', 'cleared']
+    value: float = Field(..., description="Metric value, or change per second for rate rules, in the sample that fired.")
+    threshold: float
+    timestamp: float = Field(..., description="Timestamp of the sample that fired.")
+
+
+class ClusterNodeStatus(BaseModel):
+    """Connection and freshness of one node in a cluster view."""
+
+    name: str
+    address: str
+    connected: bool
+    stale: bool = Field(..., description="Disconnected, or no sample arrived within the staleness window.")
+    age_seconds: Optional[float] = Field(None, description="Seconds since the last sample arrived; None before the first.")
+    reconnects: int = 0
+    last_error: Optional[str] = None
+
+
+class GpuCandidate(BaseModel):
+    """One GPU on one node, as ranked by cluster placement queries."""
+
+    node: str
+    gpu_index: int
+    name: str
+    free_vram_gb: float
+    utilization_percent: float
@@ -1,41 +1,84 @@
 from __future__ import annotations
 
-from typing import Any, Iterable, Optional
+import threading
+from typing import Any, Iterable, List, Optional
 
 from aegis.hardware.models import IntelComputeStatus
+from aegis.hardware.static_cache import StaticHardwareCache
 from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import traced
 
 
 class IntelComputeMonitor:
-    """Discovers available Intel compute devices using the OpenVINO runtime."""
+    """
+    Discovers available Intel compute devices using the OpenVINO runtime.
 
-    def __init__(self) -> None:
+    The device list cannot change until reboot, so it is taken from the static
+    hardware cache when available. ``openvino.runtime`` is only imported and a
+    ``Core`` only created when the list must be discovered or ``core`` is used.
+    """
+
+    def __init__(self, static_cache: Optional[StaticHardwareCache] = None) -> None:
         self.logger = setup_logger('IntelComputeMonitor', module_code='HW', script_code='INTL')
-        self.core: Optional[Any] = None
-
-        try:
-            from openvino.runtime import Core  # type: ignore[import-not-found]
-
-            self.core = Core()
-            self.logger.info("OpenVINO runtime initialized successfully.")
-        except ImportError:
-            self.logger.warning(
-                "OpenVINO library not found. Intel device monitoring will be disabled."
-            )
-        except Exception as exc:  # noqa: BLE001
-            self.logger.error(
-                "Error initializing OpenVINO Core: %s",
-                exc,
-                extra={'error_code': 'OV-INIT-FAIL'}
-            )
+        self.static_cache = static_cache
+        self._core: Optional[Any] = None
+        self._core_lock = threading.Lock()
+        self._core_unavailable = False
+        self.devices: Optional[List[str]] = None
+
+        cached = static_cache.get('openvino_devices') if static_cache is not None else None
+        if isinstance(cached, list):
+            self.devices = [str(device) for device in cached]
+            self.logger.info("Loaded Intel device list from static hardware cache: %s", self.devices)
+
+    @property
+    def core(self) -> Optional[Any]:
+        """The shared OpenVINO ``Core``, created on first access; None if OpenVINO is unavailable."""
+        if self._core is not None or self._core_unavailable:
+            return self._core
+
+        with self._core_lock:
+            if self._core is not None or self._core_unavailable:
+                return self._core
+            try:
+                from openvino.runtime import Core  # type: ignore[import-not-found]
+
+                self._core = Core()
+                self.logger.info("OpenVINO runtime initialized successfully.")
+            except ImportError:
+                self._core_unavailable = True
+                self.logger.warning(
+                    "OpenVINO library not found. Intel device monitoring will be disabled."
+                )
+            except Exception as exc:  # noqa: BLE001
+                self._core_unavailable = True
+                self.logger.error(
+                    "Error initializing OpenVINO Core: %s",
+                    exc,
+                    extra={'error_code': 'OV-INIT-FAIL'}
+                )
+        return self._core
 
     def get_status(self) -> IntelComputeStatus | None:
         """Retrieve the list of available Intel compute devices."""
-        if not self.core:
+        devices = self.sample()
+        if devices is None:
             return None
+        return IntelComputeStatus(available_devices=list(devices))
+
+    @traced('IntelComputeMonitor.sample', category='hal')
+    def sample(self) -> Optional[List[str]]:
+        """The available device identifiers, or None if OpenVINO is unavailable."""
+        if self.devices is None:
+            core = self.core
+            if not core:
+                return None
+
+            self.logger.debug("Querying for available Intel devices...")
+            devices_raw: Iterable[Any] = getattr(core, "available_devices", [])
+            self.devices = [str(device) for device in devices_raw]
+            self.logger.info("Discovered Intel devices: %s", self.devices)
+            if self.static_cache is not None:
+                self.static_cache.put('openvino_devices', self.devices)
 
-        self.logger.debug("Querying for available Intel devices...")
-        devices_raw: Iterable[Any] = getattr(self.core, "available_devices", [])
-        devices = [str(device) for device in devices_raw]
-        self.logger.info("Discovered Intel devices: %s", devices)
-        return IntelComputeStatus(available_devices=devices)
+        return self.devices
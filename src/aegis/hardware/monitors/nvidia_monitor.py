@@ -1,61 +1,215 @@
-import pynvml
-from aegis.hardware.models import GPUStatus
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from aegis.hardware.models import GPUProcessStatus, GPUStatus
+from aegis.hardware.static_cache import StaticHardwareCache
 from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import traced
+
+_BYTES_TO_GB = 1024 ** 3
+
+# NVML is process-wide state: nvmlInit/nvmlShutdown calls are reference counted
+# per NVML module so that several monitors can share one session.
+_SESSION_LOCK = threading.Lock()
+_SESSION_REFCOUNTS: Dict[int, int] = {}
+
+
+def acquire_nvml_session(nvml: Any) -> None:
+    """Initialise NVML on first use and take a reference to the shared session."""
+    with _SESSION_LOCK:
+        count = _SESSION_REFCOUNTS.get(id(nvml), 0)
+        if count == 0:
+            nvml.nvmlInit()
+        _SESSION_REFCOUNTS[id(nvml)] = count + 1
+
+
+def release_nvml_session(nvml: Any) -> None:
+    """Drop a reference to the shared session, shutting NVML down with the last one."""
+    with _SESSION_LOCK:
+        count = _SESSION_REFCOUNTS.get(id(nvml), 0)
+        if count <= 0:
+            return
+        if count == 1:
+            del _SESSION_REFCOUNTS[id(nvml)]
+            nvml.nvmlShutdown()
+        else:
+            _SESSION_REFCOUNTS[id(nvml)] = count - 1
+
+
+class _GpuDevice(NamedTuple):
+    """Static facts about a GPU, discovered once at monitor initialization."""
+
+    index: int
+    handle: Any
+    name: str
+    vram_total_gb: float
+
+
+class GpuReading(NamedTuple):
+    """One GPU's metrics as returned by ``NvidiaGpuMonitor.sample``."""
+
+    index: int
+    name: str
+    vram_total_gb: float
+    vram_used_gb: float
+    utilization_percent: float
+    processes: Tuple[Tuple[int, float], ...]
 
 
 class NvidiaGpuMonitor:
-    """Monitors an NVIDIA GPU using the pynvml library."""
+    """
+    Monitors every NVIDIA GPU in the system using NVML.
+
+    Devices are discovered once and their static data (name, total VRAM) is
+    cached, across runs too when a static hardware cache is supplied;
+    ``get_status`` then collects the dynamic metrics for all GPUs in a
+    single pass. The NVML binding defaults to ``pynvml`` but any module exposing
+    the same functions (e.g. a fake for machines without a GPU) can be injected.
+    """
+
+    def __init__(self, nvml: Optional[Any] = None, static_cache: Optional[StaticHardwareCache] = None):
+        self.logger = setup_logger('NvidiaGpuMonitor', module_code='HW', script_code='NVDA')
+        self.devices: List[_GpuDevice] = []
+        self.nvml: Optional[Any] = nvml
+        self._session_held = False
+
+        if self.nvml is None:
+            try:
+                import pynvml  # type: ignore[import-not-found]
+
+                self.nvml = pynvml
+            except ImportError:
+                self.logger.warning("pynvml library not found. GPU monitoring will be disabled.")
+                return
 
-    def __init__(self, device_index: int = 0):
-        self.logger = setup_logger(f'NvidiaGpuMonitor_Device{device_index}')
-        self.handle = None
         try:
-            pynvml.nvmlInit()
-            self.handle = pynvml.nvmlDeviceGetHandleByIndex(device_index)
-            gpu_name = self._decode_name(pynvml.nvmlDeviceGetName(self.handle))
-            self.logger.info(f"Successfully initialized monitor for GPU: {gpu_name}")
-        except pynvml.NVMLError as e:
-            self.logger.warning(f"Could not initialize NVML or find GPU at index {device_index}. GPU monitoring will be disabled. Error: {e}")
-
-    def get_status(self) -> GPUStatus | None:
+            acquire_nvml_session(self.nvml)
+            self._session_held = True
+            device_count = self.nvml.nvmlDeviceGetCount()
+
+            cached = static_cache.get('gpus') if static_cache is not None else None
+            if not isinstance(cached, list) or len(cached) != device_count:
+                cached = None
+
+            for index in range(device_count):
+                handle = self.nvml.nvmlDeviceGetHandleByIndex(index)
+                if cached is not None:
+                    name, vram_total_gb = str(cached[index]['name']), float(cached[index]['vram_total_gb'])
+                else:
+                    name = self._decode_name(self.nvml.nvmlDeviceGetName(handle))
+                    vram_total_gb = round(self.nvml.nvmlDeviceGetMemoryInfo(handle).total / _BYTES_TO_GB, 2)
+                device = _GpuDevice(index=index, handle=handle, name=name, vram_total_gb=vram_total_gb)
+                self.devices.append(device)
+                self.logger.info("Successfully initialized monitor for GPU %d: %s", index, device.name)
+
+            if cached is None and static_cache is not None:
+                static_cache.put('gpus', [
+                    {'name': device.name, 'vram_total_gb': device.vram_total_gb} for device in self.devices
+                ])
+        except self._nvml_error as e:
+            self.logger.warning(f"Could not initialize NVML or enumerate GPUs. GPU monitoring will be disabled. Error: {e}")
+            self.devices = []
+            self.close()
+
+    @property
+    def _nvml_error(self) -> type:
+        """The NVML error type raised by the active binding."""
+        return getattr(self.nvml, 'NVMLError', Exception)
+
+    def get_status(self) -> List[GPUStatus]:
         """
-        Retrieves the current status of the NVIDIA GPU.
+        Retrieves the current status of every discovered NVIDIA GPU.
 
         Returns:
-            GPUStatus | None: A Pydantic model with the GPU's state, or None if initialization failed.
+            List[GPUStatus]: One Pydantic model per GPU; empty if no GPU is available.
+            A GPU whose query fails is omitted from the list.
         """
-        if not self.handle:
-            return None
+        return [
+            GPUStatus(
+                index=reading.index,
+                name=reading.name,
+                vram_total_gb=reading.vram_total_gb,
+                vram_used_gb=reading.vram_used_gb,
+                utilization_percent=reading.utilization_percent,
+                processes=[GPUProcessStatus(pid=pid, vram_used_gb=vram) for pid, vram in reading.processes],
+            )
+            for reading in self.sample()
+        ]
 
-        try:
-            self.logger.debug("Fetching NVIDIA GPU status.")
-            memory_info = pynvml.nvmlDeviceGetMemoryInfo(self.handle)
-            utilization = pynvml.nvmlDeviceGetUtilizationRates(self.handle)
+    @traced('NvidiaGpuMonitor.sample', category='hal')
+    def sample(self) -> List[GpuReading]:
+        """Like ``get_status`` but returns plain tuples instead of models."""
+        if not self.devices:
+            return []
 
-            bytes_to_gb = 1024 ** 3
+        self.logger.debug("Fetching status for %d NVIDIA GPU(s).", len(self.devices))
+        readings: List[GpuReading] = []
+        for device in self.devices:
+            try:
+                readings.append(self._query_device(device))
+            except self._nvml_error as e:
+                self.logger.error(
+                    f"Failed to get status for GPU {device.index}: {e}",
+                    extra={'error_code': 'NVML-QUERY-FAIL'}
+                )
+        self.logger.debug("Successfully fetched NVIDIA GPU status.")
+        return readings
 
-            status = GPUStatus(
-                name=self._decode_name(pynvml.nvmlDeviceGetName(self.handle)),
-                vram_total_gb=round(memory_info.total / bytes_to_gb, 2),
-                vram_used_gb=round(memory_info.used / bytes_to_gb, 2),
-                utilization_percent=float(utilization.gpu)
-            )
-            self.logger.debug("Successfully fetched NVIDIA GPU status.")
-            return status
-        except pynvml.NVMLError as e:
-            self.logger.error(f"Failed to get GPU status: {e}")
+    def process_vram_gb(self, pid: int) -> Optional[float]:
+        """VRAM held by process ``pid`` across all GPUs; None if no GPU is monitored."""
+        if not self.devices:
             return None
+        total = 0
+        for device in self.devices:
+            try:
+                for process in self.nvml.nvmlDeviceGetComputeRunningProcesses(device.handle):
+                    if int(process.pid) == pid and getattr(process, 'usedGpuMemory', None) is not None:
+                        total += process.usedGpuMemory
+            except self._nvml_error as e:
+                self.logger.debug("Per-process VRAM unavailable for GPU %d: %s", device.index, e)
+        return round(total / _BYTES_TO_GB, 3)
+
+    def close(self) -> None:
+        """Release this monitor's reference to the shared NVML session."""
+        if self._session_held:
+            self._session_held = False
+            try:
+                release_nvml_session(self.nvml)
+            except self._nvml_error:
+                pass
 
     def __del__(self):
-        """Ensures nvmlShutdown is called when the object is destroyed."""
+        """Ensures the NVML session reference is released when the object is destroyed."""
         try:
-            if self.handle:
-                pynvml.nvmlShutdown()
-                self.logger.info("NVML shutdown successful.")
-                self.handle = None
-        except pynvml.NVMLError:
+            self.close()
+        except Exception:  # noqa: BLE001 - interpreter may be shutting down
             pass
 
+    def _query_device(self, device: _GpuDevice) -> GpuReading:
+        """Collect the dynamic metrics of one device."""
+        memory_info = self.nvml.nvmlDeviceGetMemoryInfo(device.handle)
+        utilization = self.nvml.nvmlDeviceGetUtilizationRates(device.handle)
+
+        processes: List[Tuple[int, float]] = []
+        try:
+            for process in self.nvml.nvmlDeviceGetComputeRunningProcesses(device.handle):
+                used = getattr(process, 'usedGpuMemory', None)
+                if used is None:
+                    # NVML reports None when per-process accounting is unavailable (e.g. in containers).
+                    continue
+                processes.append((int(process.pid), round(used / _BYTES_TO_GB, 3)))
+        except self._nvml_error as e:
+            self.logger.debug("Per-process VRAM unavailable for GPU %d: %s", device.index, e)
+
+        return GpuReading(
+            index=device.index,
+            name=device.name,
+            vram_total_gb=device.vram_total_gb,
+            vram_used_gb=round(memory_info.used / _BYTES_TO_GB, 2),
+            utilization_percent=float(utilization.gpu),
+            processes=tuple(processes),
+        )
+
     @staticmethod
     def _decode_name(raw_name: bytes | str) -> str:
         """Decode raw GPU name bytes into a human-readable string."""
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from aegis.utils.logger import setup_logger
+
+# /proc/stat CPU columns: user nice system idle iowait irq softirq steal guest guest_nice.
+# guest time is already included in user/nice, so only the first eight are summed.
+_CPU_FIELDS = 8
+_IDLE_FIELDS = (3, 4)
+
+
+class ProcStatSampler:
+    """
+    A low-overhead Linux sampler for CPU and memory figures.
+
+    ``/proc/stat`` and ``/proc/meminfo`` are opened once and re-read with
+    ``os.pread`` on every sample. Per-core utilisation is derived from the
+    jiffy deltas between consecutive reads, so no sleep is required.
+    """
+
+    def __init__(self, proc_root: str = '/proc') -> None:
+        self.logger = setup_logger('ProcStatSampler', module_code='HW', script_code='PROC')
+        self._stat_fd = os.open(os.path.join(proc_root, 'stat'), os.O_RDONLY)
+        try:
+            self._meminfo_fd = os.open(os.path.join(proc_root, 'meminfo'), os.O_RDONLY)
+        except OSError:
+            os.close(self._stat_fd)
+            self._stat_fd = -1
+            raise
+
+        self._read_sizes: Dict[int, int] = {self._stat_fd: 16384, self._meminfo_fd: 4096}
+        self._previous_times: List[Tuple[int, int]] = self._read_cpu_times()
+        self._last_percentages: List[float] = [0.0] * len(self._previous_times)
+        self.logger.info("Initialized /proc sampler for %d logical CPUs.", len(self._previous_times))
+
+    @staticmethod
+    def is_supported(proc_root: str = '/proc') -> bool:
+        """Return True when the procfs files the sampler needs are readable."""
+        return all(
+            os.access(os.path.join(proc_root, name), os.R_OK) for name in ('stat', 'meminfo')
+        )
+
+    def cpu_percent_per_core(self) -> List[float]:
+        """Utilisation of each logical core since the previous call, as percentages."""
+        current = self._read_cpu_times()
+        previous = self._previous_times
+
+        if len(current) != len(previous):
+            # A CPU went on- or offline; restart the delta window.
+            self.logger.info("Logical CPU count changed from %d to %d.", len(previous), len(current))
+            self._previous_times = current
+            self._last_percentages = [0.0] * len(current)
+            return list(self._last_percentages)
+
+        percentages: List[float] = []
+        for (total, idle), (prev_total, prev_idle), last in zip(current, previous, self._last_percentages):
+            total_delta = total - prev_total
+            if total_delta <= 0:
+                # No jiffies elapsed since the last read; repeat the previous figure.
+                percentages.append(last)
+                continue
+            busy_delta = total_delta - (idle - prev_idle)
+            percentages.append(round(100.0 * busy_delta / total_delta, 1))
+
+        self._previous_times = current
+        self._last_percentages = percentages
+        return list(percentages)
+
+    def memory_bytes(self) -> Tuple[int, int]:
+        """Return ``(total, available)`` system memory in bytes."""
+        total = available = 0
+        for line in self._pread(self._meminfo_fd).splitlines():
+            if line.startswith(b'MemTotal:'):
+                total = int(line.split()[1]) * 1024
+            elif line.startswith(b'MemAvailable:'):
+                available = int(line.split()[1]) * 1024
+                break
+        return total, available
+
+    def close(self) -> None:
+        """Close the persistent procfs descriptors."""
+        for fd in (self._stat_fd, self._meminfo_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._stat_fd = self._meminfo_fd = -1
+
+    def __del__(self) -> None:
+        if getattr(self, '_stat_fd', -1) >= 0:
+            self.close()
+
+    def _read_cpu_times(self) -> List[Tuple[int, int]]:
+        """Return ``(total, idle)`` jiffies for each logical core listed in /proc/stat."""
+        times: List[Tuple[int, int]] = []
+        for line in self._pread(self._stat_fd).splitlines():
+            if not line.startswith(b'cpu'):
+                break
+            if line[3:4] == b' ':
+                # Aggregate line for all CPUs.
+                continue
+            fields = [int(value) for value in line.split()[1:_CPU_FIELDS + 1]]
+            times.append((sum(fields), sum(fields[index] for index in _IDLE_FIELDS if index < len(fields))))
+        return times
+
+    def _pread(self, fd: int) -> bytes:
+        """Read a whole procfs file from offset zero, growing the read size if needed."""
+        size = self._read_sizes[fd]
+        while True:
+            data = os.pread(fd, size, 0)
+            if len(data) < size:
+                return data
+            size *= 2
+            self._read_sizes[fd] = size
+
+
+def create_sampler(proc_root: str = '/proc') -> Optional[ProcStatSampler]:
+    """Return a ProcStatSampler when procfs is available, otherwise None."""
+    if not ProcStatSampler.is_supported(proc_root):
+        return None
+    try:
+        return ProcStatSampler(proc_root)
+    except OSError:
+        return None
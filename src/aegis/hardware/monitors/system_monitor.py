@@ -1,46 +1,105 @@
-import cpuinfo
+import sys
+
 import psutil
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 from aegis.hardware.models import SystemStatus
+from aegis.hardware.static_cache import StaticHardwareCache
 from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import traced
+from .procfs import ProcStatSampler, create_sampler
 
 
 class SystemMonitor:
-    """Monitors core system resources like CPU and RAM using psutil and py-cpuinfo."""
+    """
+    Monitors core system resources like CPU and RAM using psutil and py-cpuinfo.
+
+    Static facts (CPU brand, architecture, core counts, total RAM) are read once
+    at construction, from the static hardware cache when possible since
+    py-cpuinfo is slow. On Linux, dynamic figures come from a ``ProcStatSampler``
+    that re-reads ``/proc`` through persistent descriptors; elsewhere psutil is
+    used. Both paths compute CPU utilisation from deltas between consecutive
+    samples instead of sleeping.
+    """
 
-    def __init__(self):
+    def __init__(self, use_procfs: Optional[bool] = None, static_cache: Optional[StaticHardwareCache] = None):
         self.logger = setup_logger('SystemMonitor')
-        self.info = cpuinfo.get_cpu_info()
-        self.logger.info("SystemMonitor initialized.")
+
+        self.sampler: Optional[ProcStatSampler] = None
+        if use_procfs is None:
+            use_procfs = sys.platform.startswith('linux')
+        if use_procfs:
+            self.sampler = create_sampler()
+            if self.sampler is None:
+                self.logger.warning("/proc sampling unavailable; falling back to psutil.")
+
+        facts = static_cache.get('cpu') if static_cache is not None else None
+        if not isinstance(facts, dict):
+            facts = self._discover_static_facts()
+            if static_cache is not None:
+                static_cache.put('cpu', facts)
+
+        self.cpu_brand: str = facts.get('cpu_brand', 'N/A')
+        self.cpu_arch: str = facts.get('cpu_arch', 'N/A')
+        self.cpu_cores_physical: int = int(facts.get('cpu_cores_physical', 0))
+        self.cpu_cores_logical: int = int(facts.get('cpu_cores_logical', 0))
+        self.ram_total_gb: float = float(facts.get('ram_total_gb', 0.0))
+
+        if self.sampler is None:
+            # Prime psutil so the first get_status() reports utilisation since construction.
+            psutil.cpu_percent(interval=None, percpu=True)
+
+        self.logger.info(
+            "SystemMonitor initialized (%s backend).",
+            'procfs' if self.sampler is not None else 'psutil',
+        )
 
     def get_status(self) -> SystemStatus:
         """
         Retrieves the current status of the CPU and RAM.
 
+        CPU utilisation covers the interval since the previous call (or since
+        construction for the first call).
+
         Returns:
             SystemStatus: A Pydantic model instance with the system's state.
         """
-        self.logger.debug("Fetching CPU and RAM status.")
+        cpu_utilization, ram_available_gb = self.sample()
+        return SystemStatus(
+            cpu_brand=self.cpu_brand,
+            cpu_arch=self.cpu_arch,
+            cpu_cores_physical=self.cpu_cores_physical,
+            cpu_cores_logical=self.cpu_cores_logical,
+            cpu_utilization_per_core=cpu_utilization,
+            ram_total_gb=self.ram_total_gb,
+            ram_available_gb=ram_available_gb,
+        )
 
-        cpu_util_per_core = psutil.cpu_percent(interval=0.5, percpu=True)
-        mem_info = psutil.virtual_memory()
+    @traced('SystemMonitor.sample', category='hal')
+    def sample(self) -> Tuple[List[float], float]:
+        """Return ``(cpu_utilization_per_core, ram_available_gb)`` without building a model."""
+        self.logger.debug("Fetching CPU and RAM status.")
 
         bytes_to_gb = 1024 ** 3
-        ram_total_gb = mem_info.total / bytes_to_gb
-        ram_available_gb = mem_info.available / bytes_to_gb
-
-        cpu_cores_physical = psutil.cpu_count(logical=False) or 0
-        cpu_cores_logical = psutil.cpu_count(logical=True) or 0
-        cpu_utilization: List[float] = [float(p) for p in cpu_util_per_core]
-
-        status = SystemStatus(
-            cpu_brand=self.info.get('brand_raw', 'N/A'),
-            cpu_arch=self.info.get('arch_string_raw', 'N/A'),
-            cpu_cores_physical=cpu_cores_physical,
-            cpu_cores_logical=cpu_cores_logical,
-            cpu_utilization_per_core=cpu_utilization,
-            ram_total_gb=round(ram_total_gb, 2),
-            ram_available_gb=round(ram_available_gb, 2)
-        )
+        if self.sampler is not None:
+            cpu_utilization: List[float] = self.sampler.cpu_percent_per_core()
+            _, ram_available_bytes = self.sampler.memory_bytes()
+        else:
+            cpu_utilization = [float(p) for p in psutil.cpu_percent(interval=None, percpu=True)]
+            ram_available_bytes = psutil.virtual_memory().available
+
         self.logger.debug("Successfully fetched CPU and RAM status.")
-        return status
+        return cpu_utilization, round(ram_available_bytes / bytes_to_gb, 2)
+
+    @staticmethod
+    def _discover_static_facts() -> Dict[str, Any]:
+        """Query py-cpuinfo and psutil for facts that do not change until reboot."""
+        import cpuinfo
+
+        info = cpuinfo.get_cpu_info()
+        return {
+            'cpu_brand': info.get('brand_raw', 'N/A'),
+            'cpu_arch': info.get('arch_string_raw', 'N/A'),
+            'cpu_cores_physical': psutil.cpu_count(logical=False) or 0,
+            'cpu_cores_logical': psutil.cpu_count(logical=True) or 0,
+            'ram_total_gb': round(psutil.virtual_memory().total / 1024 ** 3, 2),
+        }
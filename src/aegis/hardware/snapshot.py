@@ -0,0 +1,450 @@
+"""Compact hardware snapshots and a delta-encoded status stream.
+
+``HardwareSnapshot`` is the sampler's internal representation: every
+changing number sits in one float64 array and the facts that rarely change
+sit in a shared ``StaticHardwareFacts``. The Pydantic ``HardwareState`` is
+built from it only when an API asks for one.
+
+``SnapshotEncoder`` turns a sequence of snapshots into frames: a keyframe
+carrying everything, then deltas carrying only the values that changed.
+Frames are compact JSON text or a binary layout; ``SnapshotDecoder``
+rebuilds the snapshots on the receiving side.
+"""
+
+import json
+import struct
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .models import GPUProcessStatus, GPUStatus, HardwareState, IntelComputeStatus, SystemStatus
+
+# Per-GPU process list: ((pid, vram_used_gb), ...).
+GpuProcesses = Tuple[Tuple[int, float], ...]
+Frame = Union[str, bytes]
+
+FRAME_ENCODINGS = ('json', 'binary')
+
+_KEYFRAME = 0
+_DELTA = 1
+_FLAG_EXTRA = 1
+
+# kind, flags, sequence number, timestamp, value count.
+_HEADER = struct.Struct('<BBIdH')
+_EXTRA_LENGTH = struct.Struct('<I')
+_DELTA_ENTRY = np.dtype([('index', '<u2'), ('value', '<f4')])
+_COMPACT_SEPARATORS = (',', ':')
+
+
+class StaticHardwareFacts:
+    """Facts that only change when hardware appears or disappears; shared by consecutive snapshots."""
+
+    __slots__ = (
+        'cpu_brand', 'cpu_arch', 'cpu_cores_physical', 'cpu_cores_logical',
+        'ram_total_gb', 'gpus', 'intel_devices', '_key',
+    )
+
+    def __init__(
+        self,
+        cpu_brand: str,
+        cpu_arch: str,
+        cpu_cores_physical: int,
+        cpu_cores_logical: int,
+        ram_total_gb: float,
+        gpus: Sequence[Tuple[int, str, float]] = (),
+        intel_devices: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.cpu_brand = cpu_brand
+        self.cpu_arch = cpu_arch
+        self.cpu_cores_physical = cpu_cores_physical
+        self.cpu_cores_logical = cpu_cores_logical
+        self.ram_total_gb = ram_total_gb
+        # (index, name, vram_total_gb) per GPU, in report order.
+        self.gpus: Tuple[Tuple[int, str, float], ...] = tuple(
+            (int(index), str(name), float(total)) for index, name, total in gpus
+        )
+        self.intel_devices: Optional[Tuple[str, ...]] = tuple(intel_devices) if intel_devices is not None else None
+        self._key = (
+            cpu_brand, cpu_arch, cpu_cores_physical, cpu_cores_logical,
+            ram_total_gb, self.gpus, self.intel_devices,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, StaticHardwareFacts) and self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'cpu_brand': self.cpu_brand,
+            'cpu_arch': self.cpu_arch,
+            'cpu_cores_physical': self.cpu_cores_physical,
+            'cpu_cores_logical': self.cpu_cores_logical,
+            'ram_total_gb': self.ram_total_gb,
+            'gpus': [list(gpu) for gpu in self.gpus],
+            'intel_devices': list(self.intel_devices) if self.intel_devices is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StaticHardwareFacts':
+        return cls(
+            cpu_brand=data['cpu_brand'],
+            cpu_arch=data['cpu_arch'],
+            cpu_cores_physical=data['cpu_cores_physical'],
+            cpu_cores_logical=data['cpu_cores_logical'],
+            ram_total_gb=data['ram_total_gb'],
+            gpus=[tuple(gpu) for gpu in data['gpus']],
+            intel_devices=data.get('intel_devices'),
+        )
+
+
+class HardwareSnapshot:
+    """
+    One hardware sample held as a flat float64 array plus shared static facts.
+
+    ``values`` is laid out as ``[ram_available_gb, (vram_used_gb,
+    utilization_percent) per GPU..., utilisation per logical core...]``;
+    ``field_names`` names each position. ``to_state`` builds the equivalent
+    ``HardwareState`` on first use and caches it.
+    """
+
+    __slots__ = ('timestamp', 'static', 'values', 'gpu_processes', 'stale_monitors', '_state', '_report')
+
+    def __init__(
+        self,
+        static: StaticHardwareFacts,
+        values: np.ndarray,
+        gpu_processes: Sequence[GpuProcesses] = (),
+        stale_monitors: Sequence[str] = (),
+        timestamp: Optional[float] = None,
+    ) -> None:
+        self.static = static
+        self.values = values
+        self.gpu_processes: Tuple[GpuProcesses, ...] = tuple(gpu_processes)
+        self.stale_monitors: Tuple[str, ...] = tuple(stale_monitors)
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._state: Optional[HardwareState] = None
+        self._report: Optional[str] = None
+
+    @classmethod
+    def build(
+        cls,
+        static: StaticHardwareFacts,
+        cpu_utilization: Sequence[float],
+        ram_available_gb: float,
+        gpu_metrics: Sequence[Tuple[float, float]] = (),
+        gpu_processes: Sequence[GpuProcesses] = (),
+        stale_monitors: Sequence[str] = (),
+        timestamp: Optional[float] = None,
+    ) -> 'HardwareSnapshot':
+        """Assemble a snapshot from raw monitor readings; ``gpu_metrics`` is ``(vram_used_gb, utilization_percent)`` per GPU."""
+        gpu_count = len(gpu_metrics)
+        values = np.empty(1 + 2 * gpu_count + len(cpu_utilization), dtype=np.float64)
+        values[0] = ram_available_gb
+        if gpu_count:
+            values[1:1 + 2 * gpu_count] = np.asarray(gpu_metrics, dtype=np.float64).ravel()
+        values[1 + 2 * gpu_count:] = cpu_utilization
+        return cls(static, values, gpu_processes, stale_monitors, timestamp)
+
+    @classmethod
+    def from_state(cls, state: HardwareState) -> 'HardwareSnapshot':
+        """Compact an existing ``HardwareState``."""
+        system = state.system
+        static = StaticHardwareFacts(
+            cpu_brand=system.cpu_brand,
+            cpu_arch=system.cpu_arch,
+            cpu_cores_physical=system.cpu_cores_physical,
+            cpu_cores_logical=system.cpu_cores_logical,
+            ram_total_gb=system.ram_total_gb,
+            gpus=[(gpu.index, gpu.name, gpu.vram_total_gb) for gpu in state.gpus],
+            intel_devices=state.intel_devices.available_devices if state.intel_devices is not None else None,
+        )
+        snapshot = cls.build(
+            static,
+            system.cpu_utilization_per_core,
+            system.ram_available_gb,
+            [(gpu.vram_used_gb, gpu.utilization_percent) for gpu in state.gpus],
+            [tuple((process.pid, process.vram_used_gb) for process in gpu.processes) for gpu in state.gpus],
+            state.stale_monitors,
+            state.timestamp,
+        )
+        snapshot._state = state
+        return snapshot
+
+    @property
+    def gpu_count(self) -> int:
+        return len(self.static.gpus)
+
+    @property
+    def ram_available_gb(self) -> float:
+        return float(self.values[0])
+
+    @property
+    def gpu_vram_used_gb(self) -> np.ndarray:
+        return self.values[1:1 + 2 * self.gpu_count:2]
+
+    @property
+    def gpu_utilization_percent(self) -> np.ndarray:
+        return self.values[2:2 + 2 * self.gpu_count:2]
+
+    @property
+    def cpu_utilization(self) -> np.ndarray:
+        return self.values[1 + 2 * self.gpu_count:]
+
+    @property
+    def field_names(self) -> List[str]:
+        """Name of each position in ``values``."""
+        names = ['ram_available_gb']
+        for index, _, _ in self.static.gpus:
+            names += [f'gpu{index}.vram_used_gb', f'gpu{index}.utilization_percent']
+        names += [f'cpu{core}' for core in range(len(self.values) - len(names))]
+        return names
+
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.timestamp)
+
+    def to_state(self) -> HardwareState:
+        """The equivalent ``HardwareState``, built once per snapshot."""
+        state = self._state
+        if state is None:
+            state = self._state = self._build_state()
+        return state
+
+    def report_json(self) -> str:
+        """``to_state().model_dump_json(indent=2)``, rendered once per snapshot."""
+        report = self._report
+        if report is None:
+            report = self._report = self.to_state().model_dump_json(indent=2)
+        return report
+
+    def _build_state(self) -> HardwareState:
+        static = self.static
+        values = self.values.tolist()
+        gpus = [
+            GPUStatus(
+                index=index,
+                name=name,
+                vram_total_gb=vram_total_gb,
+                vram_used_gb=values[1 + 2 * slot],
+                utilization_percent=values[2 + 2 * slot],
+                processes=[
+                    GPUProcessStatus(pid=pid, vram_used_gb=vram_used_gb)
+                    for pid, vram_used_gb in (self.gpu_processes[slot] if slot < len(self.gpu_processes) else ())
+                ],
+            )
+            for slot, (index, name, vram_total_gb) in enumerate(static.gpus)
+        ]
+        system = SystemStatus(
+            cpu_brand=static.cpu_brand,
+            cpu_arch=static.cpu_arch,
+            cpu_cores_physical=static.cpu_cores_physical,
+            cpu_cores_logical=static.cpu_cores_logical,
+            cpu_utilization_per_core=values[1 + 2 * len(gpus):],
+            ram_total_gb=static.ram_total_gb,
+            ram_available_gb=values[0],
+        )
+        intel_devices = (
+            IntelComputeStatus(available_devices=list(static.intel_devices))
+            if static.intel_devices is not None else None
+        )
+        return HardwareState(
+            gpus=gpus,
+            system=system,
+            intel_devices=intel_devices,
+            stale_monitors=list(self.stale_monitors),
+            timestamp=self.timestamp,
+        )
+
+
+class SnapshotEncoder:
+    """
+    Encodes successive snapshots for one subscriber as keyframes and deltas.
+
+    A keyframe is sent first, every ``keyframe_interval`` frames, whenever the
+    static facts change and after ``request_keyframe``. Other frames carry
+    only the values that moved by more than ``tolerance`` since they were last
+    sent, plus GPU process lists and stale monitors when those changed.
+    Binary frames carry values as float32; JSON frames carry them exactly.
+    """
+
+    def __init__(self, encoding: str = 'json', keyframe_interval: int = 60, tolerance: float = 0.0) -> None:
+        if encoding not in FRAME_ENCODINGS:
+            raise ValueError(f"Unknown frame encoding '{encoding}'. Expected one of {FRAME_ENCODINGS}.")
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1.")
+        self.encoding = encoding
+        self.keyframe_interval = keyframe_interval
+        self.tolerance = tolerance
+        self._sequence = 0
+        self._since_keyframe = 0
+        self._static: Optional[StaticHardwareFacts] = None
+        self._sent: Optional[np.ndarray] = None
+        self._processes: Tuple[GpuProcesses, ...] = ()
+        self._stale: Tuple[str, ...] = ()
+
+    def request_keyframe(self) -> None:
+        """Make the next frame a keyframe, e.g. after a subscriber reconnects."""
+        self._static = None
+
+    def encode(self, snapshot: HardwareSnapshot) -> Frame:
+        """Encode ``snapshot`` relative to the frames already produced."""
+        values = snapshot.values
+        if self.encoding == 'binary':
+            values = values.astype(np.float32)
+
+        keyframe = (
+            self._static is None
+            or self._since_keyframe >= self.keyframe_interval
+            or self._static != snapshot.static
+            or self._sent is None
+            or len(self._sent) != len(values)
+        )
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+
+        if keyframe:
+            self._static = snapshot.static
+            self._sent = values.copy()
+            self._processes = snapshot.gpu_processes
+            self._stale = snapshot.stale_monitors
+            self._since_keyframe = 1
+            extra = {
+                'static': snapshot.static.to_dict(),
+                'procs': _plain_processes(snapshot.gpu_processes),
+                'stale': list(snapshot.stale_monitors),
+            }
+            return self._keyframe(snapshot.timestamp, values, extra)
+
+        self._since_keyframe += 1
+        if self.tolerance > 0:
+            changed = np.flatnonzero(np.abs(values - self._sent) > self.tolerance)
+        else:
+            changed = np.flatnonzero(values != self._sent)
+        self._sent[changed] = values[changed]
+
+        extra: Dict[str, Any] = {}
+        if snapshot.gpu_processes != self._processes:
+            self._processes = snapshot.gpu_processes
+            extra['procs'] = _plain_processes(snapshot.gpu_processes)
+        if snapshot.stale_monitors != self._stale:
+            self._stale = snapshot.stale_monitors
+            extra['stale'] = list(snapshot.stale_monitors)
+        return self._delta(snapshot.timestamp, changed, values[changed], extra)
+
+    def _keyframe(self, timestamp: float, values: np.ndarray, extra: Dict[str, Any]) -> Frame:
+        if self.encoding == 'json':
+            payload = {'k': 1, 'seq': self._sequence, 'ts': timestamp, 'v': values.tolist()}
+            payload.update(extra)
+            return json.dumps(payload, separators=_COMPACT_SEPARATORS)
+        return b''.join((
+            _HEADER.pack(_KEYFRAME, _FLAG_EXTRA, self._sequence, timestamp, len(values)),
+            values.astype('<f4').tobytes(),
+            _pack_extra(extra),
+        ))
+
+    def _delta(self, timestamp: float, indices: np.ndarray, values: np.ndarray, extra: Dict[str, Any]) -> Frame:
+        if self.encoding == 'json':
+            payload = {'seq': self._sequence, 'ts': timestamp}
+            if len(indices):
+                payload['i'] = indices.tolist()
+                payload['v'] = values.tolist()
+            payload.update(extra)
+            return json.dumps(payload, separators=_COMPACT_SEPARATORS)
+        entries = np.empty(len(indices), dtype=_DELTA_ENTRY)
+        entries['index'] = indices
+        entries['value'] = values
+        return b''.join((
+            _HEADER.pack(_DELTA, _FLAG_EXTRA if extra else 0, self._sequence, timestamp, len(indices)),
+            entries.tobytes(),
+            _pack_extra(extra) if extra else b'',
+        ))
+
+
+class SnapshotDecoder:
+    """Rebuilds snapshots from the frames of one ``SnapshotEncoder``; the encoding is detected per frame."""
+
+    def __init__(self) -> None:
+        self._static: Optional[StaticHardwareFacts] = None
+        self._values: Optional[np.ndarray] = None
+        self._processes: Tuple[GpuProcesses, ...] = ()
+        self._stale: Tuple[str, ...] = ()
+        self._sequence: Optional[int] = None
+
+    def decode(self, frame: Frame) -> HardwareSnapshot:
+        """
+        Apply one frame and return the resulting snapshot.
+
+        Raises ``ValueError`` for a delta that arrives before any keyframe or
+        after a gap in sequence numbers; the subscriber should then ask the
+        encoder side for a keyframe.
+        """
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            keyframe, sequence, timestamp, indices, values, extra = _unpack_binary(bytes(frame))
+        else:
+            payload = json.loads(frame)
+            keyframe = bool(payload.get('k'))
+            sequence = payload['seq']
+            timestamp = payload['ts']
+            indices = payload.get('i')
+            values = np.asarray(payload.get('v', ()), dtype=np.float64)
+            extra = payload
+
+        if keyframe:
+            self._static = StaticHardwareFacts.from_dict(extra['static'])
+            self._values = np.array(values, dtype=np.float64)
+        else:
+            if self._values is None:
+                raise ValueError("Received a delta frame before any keyframe.")
+            if self._sequence is not None and sequence != (self._sequence + 1) & 0xFFFFFFFF:
+                raise ValueError(f"Frame {sequence} does not follow frame {self._sequence}; a keyframe is needed.")
+            self._values = self._values.copy()
+            if indices is not None and len(indices):
+                self._values[np.asarray(indices, dtype=np.intp)] = values
+
+        if 'procs' in extra:
+            self._processes = tuple(
+                tuple((int(pid), float(vram)) for pid, vram in processes) for processes in extra['procs']
+            )
+        if 'stale' in extra:
+            self._stale = tuple(extra['stale'])
+        self._sequence = sequence
+
+        return HardwareSnapshot(self._static, self._values, self._processes, self._stale, timestamp)
+
+
+def _plain_processes(gpu_processes: Tuple[GpuProcesses, ...]) -> List[List[List[float]]]:
+    return [[[pid, vram] for pid, vram in processes] for processes in gpu_processes]
+
+
+def _pack_extra(extra: Dict[str, Any]) -> bytes:
+    data = json.dumps(extra, separators=_COMPACT_SEPARATORS).encode('utf-8')
+    return _EXTRA_LENGTH.pack(len(data)) + data
+
+
+def _widen(values: np.ndarray) -> np.ndarray:
+    """float32 values as the float64 nearest their shortest decimal form, so 12.3 does not come back as 12.3000002."""
+    return values.astype(str).astype(np.float64)
+
+
+def _unpack_binary(frame: bytes):
+    kind, flags, sequence, timestamp, count = _HEADER.unpack_from(frame)
+    offset = _HEADER.size
+    if kind == _KEYFRAME:
+        values = _widen(np.frombuffer(frame, dtype='<f4', count=count, offset=offset))
+        indices = None
+        offset += 4 * count
+    elif kind == _DELTA:
+        entries = np.frombuffer(frame, dtype=_DELTA_ENTRY, count=count, offset=offset)
+        indices = entries['index']
+        values = _widen(entries['value'])
+        offset += _DELTA_ENTRY.itemsize * count
+    else:
+        raise ValueError(f"Unknown frame kind {kind}.")
+
+    extra: Dict[str, Any] = {}
+    if flags & _FLAG_EXTRA:
+        (length,) = _EXTRA_LENGTH.unpack_from(frame, offset)
+        offset += _EXTRA_LENGTH.size
+        extra = json.loads(frame[offset:offset + length].decode('utf-8'))
+    return kind == _KEYFRAME, sequence, timestamp, indices, values, extra
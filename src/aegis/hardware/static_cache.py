@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from aegis.utils.logger import setup_logger
+from aegis.utils.paths import cache_dir
+
+CACHE_FILENAME = "hardware-static.json"
+
+
+def current_cache_key() -> Dict[str, str]:
+    """
+    Identify the current boot of this machine.
+
+    Static hardware facts are only reused while the host name, kernel release
+    and boot ID all match, so a reboot or kernel upgrade invalidates the cache.
+    """
+    boot_id = ''
+    try:
+        with open('/proc/sys/kernel/random/boot_id', 'r', encoding='utf-8') as file:
+            boot_id = file.read().strip()
+    except OSError:
+        try:
+            import psutil
+
+            boot_id = f"boot-time-{int(psutil.boot_time())}"
+        except Exception:  # noqa: BLE001
+            boot_id = ''
+
+    return {
+        'host': platform.node(),
+        'kernel': platform.release(),
+        'boot_id': boot_id,
+    }
+
+
+class StaticHardwareCache:
+    """
+    A small on-disk cache of hardware facts that cannot change until the next boot.
+
+    Facts are stored per section (``cpu``, ``gpus``, ``openvino_devices``) as
+    plain JSON next to a key describing the current boot. A cache written for a
+    different boot is ignored and overwritten.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True) -> None:
+        self.logger = setup_logger('StaticHardwareCache', module_code='HW', script_code='SCCH')
+        self.enabled = enabled
+        self.path: Optional[Path] = None
+        self._key = current_cache_key() if enabled else {}
+        self._facts: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        if not enabled:
+            return
+
+        try:
+            self.path = Path(path) if path else cache_dir() / CACHE_FILENAME
+        except OSError as exc:
+            self.logger.warning("Static hardware cache disabled; cache directory unavailable: %s", exc)
+            self.enabled = False
+            return
+
+        self._load()
+
+    def get(self, section: str) -> Optional[Any]:
+        """Return the cached value for ``section``, or None on a miss."""
+        if not self.enabled:
+            return None
+        return self._facts.get(section)
+
+    def put(self, section: str, value: Any) -> None:
+        """Store ``value`` for ``section`` and persist the cache atomically."""
+        if not self.enabled or self.path is None:
+            return
+
+        with self._lock:
+            self._facts[section] = value
+            payload = {'key': self._key, 'facts': self._facts}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix='.hardware-static-')
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump(payload, file)
+                os.replace(temp_path, self.path)
+            except OSError as exc:
+                self.logger.warning(
+                    "Could not write static hardware cache '%s': %s",
+                    self.path,
+                    exc,
+                    extra={'error_code': 'HWCACHE-WRITE'}
+                )
+
+    def _load(self) -> None:
+        """Read the cache file, keeping its facts only if they belong to this boot."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                payload = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            self.logger.warning("Ignoring unreadable static hardware cache '%s': %s", self.path, exc)
+            return
+
+        if not isinstance(payload, dict) or payload.get('key') != self._key:
+            self.logger.info("Static hardware cache is from a different boot; it will be rebuilt.")
+            return
+
+        facts = payload.get('facts')
+        if isinstance(facts, dict):
+            self._facts = facts
+            self.logger.debug("Loaded static hardware cache sections: %s", sorted(facts))
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import threading
+import time
+import warnings
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from aegis.hardware.models import HardwareState
+from aegis.hardware.snapshot import HardwareSnapshot
+from aegis.utils.logger import setup_logger
+
+MetricValue = Union[float, np.ndarray]
+
+
+class TelemetryBuffer:
+    """
+    A fixed-memory history of hardware samples backed by preallocated NumPy ring buffers.
+
+    Each sample occupies one row: one column per logical CPU core followed by
+    the scalar metrics in ``SCALAR_METRICS``. GPU metrics aggregate every
+    detected GPU: mean utilisation and total VRAM used. Missing values (for example GPU
+    metrics on a machine without a GPU) are stored as NaN and ignored by the
+    rolling statistics. Metrics are addressed by column name (``cpu0``,
+    ``ram_available_gb``...) or by the group name ``cpu`` for all cores at once.
+    """
+
+    SCALAR_METRICS = ('ram_available_gb', 'gpu_utilization_percent', 'vram_used_gb')
+
+    def __init__(
+        self,
+        capacity: int = 86400,
+        num_cores: Optional[int] = None,
+        dtype: np.dtype = np.float32,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("Telemetry capacity must be a positive number of samples.")
+
+        self.logger = setup_logger('TelemetryBuffer', module_code='HW', script_code='TLM')
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.num_cores = 0
+        self.columns: List[str] = []
+
+        self._column_index: Dict[str, Union[int, slice]] = {}
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values: Optional[np.ndarray] = None
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if num_cores is not None:
+            self._allocate(num_cores)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the preallocated buffers, in bytes."""
+        values_bytes = self._values.nbytes if self._values is not None else 0
+        return self._timestamps.nbytes + values_bytes
+
+    def record(self, state: HardwareState) -> None:
+        """Append one hardware state, overwriting the oldest sample when full."""
+        self.record_snapshot(HardwareSnapshot.from_state(state))
+
+    def record_snapshot(self, snapshot: HardwareSnapshot) -> None:
+        """Append one compact snapshot, overwriting the oldest sample when full."""
+        cores = snapshot.cpu_utilization
+
+        with self._lock:
+            if self._values is None:
+                self._allocate(len(cores))
+
+            row = self._values[self._head]
+            count = min(len(cores), self.num_cores)
+            row[:count] = cores[:count]
+            row[count:self.num_cores] = np.nan
+            row[self.num_cores] = snapshot.values[0]
+            if snapshot.gpu_count:
+                row[self.num_cores + 1] = snapshot.gpu_utilization_percent.mean()
+                row[self.num_cores + 2] = snapshot.gpu_vram_used_gb.sum()
+            else:
+                row[self.num_cores + 1:self.num_cores + 3] = np.nan
+
+            self._timestamps[self._head] = snapshot.timestamp
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def window(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> np.ndarray:
+        """
+        Return the samples of ``metric`` from the last ``seconds``, oldest first.
+
+        The result is a 1-D array for a single column and a 2-D ``(samples, cores)``
+        array for the ``cpu`` group. ``seconds=None`` returns the whole history.
+        """
+        values, _ = self._window(metric, seconds, now)
+        return values
+
+    def mean(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> MetricValue:
+        """Mean of ``metric`` over the window, ignoring missing samples."""
+        values, _ = self._window(metric, seconds, now)
+        return self._reduce(np.nanmean, values)
+
+    def max(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None) -> MetricValue:
+        """Maximum of ``metric`` over the window, ignoring missing samples."""
+        values, _ = self._window(metric, seconds, now)
+        return self._reduce(np.nanmax, values)
+
+    def percentile(
+        self,
+        metric: str,
+        q: Union[float, Sequence[float]],
+        seconds: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> MetricValue:
+        """Percentile(s) ``q`` (0-100) of ``metric`` over the window, e.g. ``q=(50, 95, 99)``."""
+        values, _ = self._window(metric, seconds, now)
+        return self._reduce(np.nanpercentile, values, q)
+
+    def ewma(
+        self,
+        metric: str,
+        halflife: float = 30.0,
+        seconds: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> MetricValue:
+        """
+        Exponentially weighted mean of ``metric`` with a ``halflife`` in seconds.
+
+        Weights are derived from sample timestamps, so irregular sampling
+        cadences are handled correctly.
+        """
+        if halflife <= 0:
+            raise ValueError("EWMA halflife must be a positive number of seconds.")
+
+        values, timestamps = self._window(metric, seconds, now)
+        if values.shape[0] == 0:
+            return self._empty_result(values)
+
+        weights = np.exp2((timestamps - timestamps[-1]) / halflife)
+        if values.ndim == 2:
+            weights = weights[:, np.newaxis]
+        mask = ~np.isnan(values)
+        weighted_sum = np.sum(np.where(mask, values, 0.0) * weights, axis=0)
+        weight_total = np.sum(np.where(mask, weights, 0.0), axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return weighted_sum / weight_total
+
+    def summary(self, metric: str, seconds: Optional[float] = None, halflife: float = 30.0) -> Dict[str, MetricValue]:
+        """Return mean, EWMA, p50/p95/p99 and max of ``metric`` over the window."""
+        now = time.time()
+        p50, p95, p99 = self.percentile(metric, (50, 95, 99), seconds, now)
+        return {
+            'mean': self.mean(metric, seconds, now),
+            'ewma': self.ewma(metric, halflife, seconds, now),
+            'p50': p50,
+            'p95': p95,
+            'p99': p99,
+            'max': self.max(metric, seconds, now),
+        }
+
+    def export(self, path: str) -> int:
+        """
+        Write the history, oldest first, to an ``.npy`` file of a structured array.
+
+        The file can be memory-mapped with :func:`load_telemetry`. Returns the
+        number of samples written.
+        """
+        with self._lock:
+            if self._values is None:
+                values = np.zeros((0, 0), dtype=self.dtype)
+            else:
+                values = self._ordered(self._values).copy()
+            timestamps = self._ordered(self._timestamps).copy()
+
+        record_dtype = np.dtype(
+            [('timestamp', np.float64)] + [(column, self.dtype) for column in self.columns]
+        )
+        exported = np.lib.format.open_memmap(path, mode='w+', dtype=record_dtype, shape=(len(timestamps),))
+        exported['timestamp'] = timestamps
+        for offset, column in enumerate(self.columns):
+            exported[column] = values[:, offset]
+        exported.flush()
+        del exported
+
+        self.logger.info("Exported %d telemetry samples to '%s'.", len(timestamps), path)
+        return len(timestamps)
+
+    def _allocate(self, num_cores: int) -> None:
+        """Allocate the value buffer once the number of logical cores is known."""
+        self.num_cores = num_cores
+        self.columns = [f'cpu{core}' for core in range(num_cores)] + list(self.SCALAR_METRICS)
+        self._column_index = {column: offset for offset, column in enumerate(self.columns)}
+        self._column_index['cpu'] = slice(0, num_cores)
+        self._values = np.full((self.capacity, len(self.columns)), np.nan, dtype=self.dtype)
+        self.logger.info(
+            "Allocated telemetry buffer: %d samples x %d columns (%.1f MB).",
+            self.capacity,
+            len(self.columns),
+            self.nbytes / 1024 ** 2,
+        )
+
+    def _window(self, metric: str, seconds: Optional[float], now: Optional[float]):
+        """Copy the samples of ``metric`` inside the window along with their timestamps."""
+        with self._lock:
+            if self._values is None:
+                return np.zeros(0, dtype=self.dtype), np.zeros(0, dtype=np.float64)
+
+            column = self._column_index.get(metric)
+            if column is None:
+                raise KeyError(f"Unknown telemetry metric '{metric}'. Known metrics: {['cpu'] + self.columns}")
+
+            count = self._size if seconds is None else self._count_since((now or time.time()) - seconds)
+            rows = (self._head - count + np.arange(count)) % self.capacity
+            return self._values[rows, column], self._timestamps[rows]
+
+    def _count_since(self, cutoff: float) -> int:
+        """Number of stored samples with a timestamp at or after ``cutoff``."""
+        newer = self._timestamps[:self._head]
+        older = self._timestamps[self._head:self._size] if self._size == self.capacity else newer[:0]
+        # Both segments are sorted and every ``older`` sample precedes every ``newer`` one.
+        return (
+            len(newer) - int(np.searchsorted(newer, cutoff, side='left'))
+            + len(older) - int(np.searchsorted(older, cutoff, side='left'))
+        )
+
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        """Return the stored rows of ``array`` in chronological order."""
+        if self._size < self.capacity:
+            return array[:self._size]
+        return np.concatenate((array[self._head:], array[:self._head]))
+
+    @staticmethod
+    def _reduce(func, values: np.ndarray, *args) -> MetricValue:
+        """Apply a NaN-aware reduction over samples, returning NaN for empty or all-missing columns."""
+        if values.shape[0] == 0:
+            return TelemetryBuffer._empty_result(values, np.shape(args[0]) if args else ())
+        with warnings.catch_warnings():
+            # All-NaN columns (e.g. GPU metrics without a GPU) are expected and reduce to NaN.
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            return func(values, *args, axis=0)
+
+    @staticmethod
+    def _empty_result(values: np.ndarray, leading_shape: tuple = ()) -> MetricValue:
+        """NaN result shaped like a reduction of ``values`` over its first axis."""
+        shape = tuple(leading_shape) + values.shape[1:]
+        return np.full(shape, np.nan) if shape else float('nan')
+
+
+def load_telemetry(path: str) -> np.ndarray:
+    """Memory-map a file written by :meth:`TelemetryBuffer.export` as a read-only structured array."""
+    return np.load(path, mmap_mode='r')
@@ -0,0 +1,575 @@
+"""Batched text generation with continuous batching and a prompt-prefix cache.
+
+An ``LLMBackend`` encodes tokens into per-sequence states (its KV cache)
+and advances many sequences one token per decode step. ``LLMScheduler``
+feeds a backend from concurrent callers. Between decode steps it admits
+waiting requests while the step's token budget allows, and retires
+finished sequences. New requests therefore join a running batch instead
+of waiting for it to drain.
+
+Every request may carry a prefix, normally the agent's system prompt
+built from its role, goal and backstory. Encoded prefix states are kept in
+``PrefixCache``, keyed on the prefix text, so a recurring persona is
+encoded once and each request only prefills its own prompt.
+
+``StubLLMBackend`` is a deterministic CPU stand-in that charges simulated
+time per prefill token and per decode step, for offline tests and
+benchmarks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from aegis.agents.base import AegisAgent
+from aegis.inference.models import GenerationResult, LLMSchedulerStats
+from aegis.utils.logger import setup_logger
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Remembered prefix lengths, used to charge uncached prefixes against the step budget at admission.
+_MAX_PREFIX_COUNTS = 4096
+
+
+def system_prompt(agent: AegisAgent) -> str:
+    """The fixed prompt prefix of every task ``agent`` runs."""
+    return (
+        f"You are {agent.role.strip()}.\n"
+        f"Goal: {' '.join(agent.goal.split())}\n"
+        f"Background: {' '.join(agent.backstory.split())}\n"
+    )
+
+
+class LLMBackend(Protocol):
+    """A model that prefills token runs into sequence states and decodes them in batches."""
+
+    eos_token: int
+
+    def tokenize(self, text: str) -> List[int]:
+        ...
+
+    def detokenize(self, tokens: Sequence[int]) -> str:
+        ...
+
+    def prefill(self, items: Sequence[Tuple[Optional[Any], Sequence[int]]]) -> List[Any]:
+        """
+        Encode each ``(base_state, tokens)`` pair in one batch and return the new states.
+
+        ``base_state`` is None to start a sequence, or a state to extend.
+        Base states may be shared cached prefixes and must not be modified.
+        """
+        ...
+
+    def decode(self, states: Sequence[Any]) -> List[int]:
+        """Advance every state by one token, in place, and return the sampled tokens."""
+        ...
+
+    def release(self, state: Any) -> None:
+        """Free the memory held by a state that is no longer needed."""
+        ...
+
+
+class PrefixCache:
+    """
+    LRU cache of encoded prefix states, bounded by their total token count.
+
+    Entries are keyed on the prefix text, so equal prompts share one state.
+    Only the scheduler thread reads and writes it.
+    """
+
+    def __init__(self, backend: LLMBackend, max_tokens: int = 65536) -> None:
+        self.backend = backend
+        self.max_tokens = max_tokens
+        self._entries: 'OrderedDict[str, Tuple[Any, int]]' = OrderedDict()
+        self._tokens = 0
+
+    @staticmethod
+    def key(prefix: str) -> str:
+        return hashlib.sha1(prefix.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Any, int]]:
+        """The cached ``(state, token_count)`` for ``key``, marking it recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, state: Any, tokens: int) -> List[Any]:
+        """
+        Keep ``state`` and return the states the caller must now release.
+
+        Those are the entries evicted to make room, or ``state`` itself when
+        it alone exceeds the cache. Releasing is left to the caller because
+        an evicted prefix may still be about to seed a prefill.
+        """
+        if tokens > self.max_tokens:
+            return [state]
+        if key in self._entries:
+            return [state] if self._entries[key][0] is not state else []
+        self._entries[key] = (state, tokens)
+        self._tokens += tokens
+        evicted = []
+        while self._tokens > self.max_tokens:
+            _, (old_state, count) = self._entries.popitem(last=False)
+            self._tokens -= count
+            evicted.append(old_state)
+        return evicted
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        for state, _ in self._entries.values():
+            self.backend.release(state)
+        self._entries.clear()
+        self._tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def token_count(self) -> int:
+        return self._tokens
+
+
+class _Request:
+    """A submitted request and, once admitted, its running sequence."""
+
+    __slots__ = (
+        'prompt_tokens', 'prefix', 'prefix_key', 'max_new_tokens', 'future', 'submitted_at',
+        'started_at', 'first_token_at', 'state', 'generated', 'prefix_tokens', 'prefix_cached',
+    )
+
+    def __init__(self, prompt_tokens: List[int], prefix: str, max_new_tokens: int, future: Future) -> None:
+        self.prompt_tokens = prompt_tokens
+        self.prefix = prefix
+        self.prefix_key = PrefixCache.key(prefix) if prefix else None
+        self.max_new_tokens = max_new_tokens
+        self.future = future
+        self.submitted_at = time.perf_counter()
+        self.started_at = 0.0
+        self.first_token_at = 0.0
+        self.state: Any = None
+        self.generated: List[int] = []
+        self.prefix_tokens = 0
+        self.prefix_cached = False
+
+
+class LLMScheduler:
+    """
+    Serves generation requests from many callers through one backend with continuous batching.
+
+    A background thread alternates admission and decode steps. Each step
+    may process at most ``max_batch_tokens`` tokens: one per running
+    sequence plus the prefill of newly admitted prompts, counting prefixes
+    only when they are not cached. At most ``max_batch_size`` sequences run
+    at once. A request too large for the budget on its own is admitted
+    alone rather than starved. Prefix states are cached up to
+    ``prefix_cache_tokens`` tokens; 0 disables the cache.
+
+    Cancelling a future before its request is admitted withdraws the
+    request. Once admitted, it runs to completion and the result is
+    dropped if nobody is waiting for it.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        max_batch_size: int = 16,
+        max_batch_tokens: int = 4096,
+        prefix_cache_tokens: int = 65536,
+        max_new_tokens: int = 256,
+    ) -> None:
+        if max_batch_size < 1 or max_batch_tokens < 1:
+            raise ValueError("max_batch_size and max_batch_tokens must be at least 1.")
+        self.logger = setup_logger('LLMScheduler', module_code='INF', script_code='LLM')
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_new_tokens = max_new_tokens
+        self.prefix_cache = PrefixCache(backend, prefix_cache_tokens)
+        self._waiting: Deque[_Request] = deque()
+        self._running: List[_Request] = []
+        self._prefix_token_counts: Dict[str, int] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._requests = 0
+        self._completed = 0
+        self._failed = 0
+        self._decode_steps = 0
+        self._decoded = 0
+        self._prefill_tokens = 0
+        self._prefix_hits = 0
+        self._prefix_misses = 0
+        self._prefix_tokens_saved = 0
+
+    def submit(self, prompt: str, prefix: str = '', max_new_tokens: Optional[int] = None) -> 'Future[GenerationResult]':
+        """Queue a request and return a future for its result."""
+        limit = self.max_new_tokens if max_new_tokens is None else max_new_tokens
+        if limit < 1:
+            raise ValueError("max_new_tokens must be at least 1.")
+        request = _Request(self.backend.tokenize(prompt), prefix, limit, Future())
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("LLMScheduler is closed.")
+            self._waiting.append(request)
+            self._requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='aegis-llm-scheduler', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return request.future
+
+    def generate(
+        self,
+        prompt: str,
+        prefix: str = '',
+        max_new_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> GenerationResult:
+        """
+        Blocking counterpart of ``submit``.
+
+        Raises ``TimeoutError`` after ``timeout`` seconds and withdraws the
+        request if it has not been admitted yet.
+        """
+        future = self.submit(prompt, prefix, max_new_tokens)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"LLM generation timed out after {timeout}s.") from None
+
+    async def generate_async(self, prompt: str, prefix: str = '', max_new_tokens: Optional[int] = None) -> GenerationResult:
+        """Await a result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(prompt, prefix, max_new_tokens))
+
+    def generate_for_agent(
+        self,
+        agent: AegisAgent,
+        prompt: str,
+        max_new_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> GenerationResult:
+        """Generate with ``agent``'s system prompt as the cached prefix."""
+        return self.generate(prompt, system_prompt(agent), max_new_tokens, timeout)
+
+    def stats(self) -> LLMSchedulerStats:
+        with self._condition:
+            return LLMSchedulerStats(
+                requests=self._requests,
+                completed=self._completed,
+                failed=self._failed,
+                waiting=len(self._waiting),
+                running=len(self._running),
+                decode_steps=self._decode_steps,
+                mean_batch_size=self._decoded / self._decode_steps if self._decode_steps else 0.0,
+                prefill_tokens=self._prefill_tokens,
+                generated_tokens=self._decoded,
+                prefix_hits=self._prefix_hits,
+                prefix_misses=self._prefix_misses,
+                prefix_tokens_saved=self._prefix_tokens_saved,
+                cached_prefixes=len(self.prefix_cache),
+                cached_prefix_tokens=self.prefix_cache.token_count,
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish admitted and queued requests, then stop the scheduler thread and free cached prefixes."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.prefix_cache.clear()
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._waiting and not self._running and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._waiting and not self._running:
+                    return
+                admitted = self._admit()
+
+            try:
+                if admitted:
+                    self._prefill(admitted)
+                if self._running:
+                    self._decode()
+            except Exception as exc:  # noqa: BLE001
+                # A bug here must not kill the thread and strand every waiting caller.
+                self.logger.error("Scheduler step failed: %s", exc, extra={'error_code': 'LLM-SCHEDULER-FAIL'})
+                with self._condition:
+                    stranded = [request for request in dict.fromkeys(admitted + self._running) if not request.future.done()]
+                    self._running = []
+                self._fail(stranded, exc)
+
+    def _admit(self) -> List[_Request]:
+        """Pop waiting requests that fit this step's budgets; called with the lock held."""
+        budget = self.max_batch_tokens - len(self._running)
+        slots = self.max_batch_size - len(self._running)
+        admitted: List[_Request] = []
+        pending_prefixes = set()
+        while self._waiting and slots > 0:
+            request = self._waiting[0]
+            if request.future.cancelled():
+                self._waiting.popleft()
+                continue
+            cost = len(request.prompt_tokens)
+            key = request.prefix_key
+            if key is not None and key not in pending_prefixes and key not in self.prefix_cache:
+                cost += self._prefix_token_counts.get(key, 0)
+            if cost > budget and (admitted or self._running):
+                break
+            self._waiting.popleft()
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            admitted.append(request)
+            if key is not None:
+                pending_prefixes.add(key)
+            budget -= cost
+            slots -= 1
+        return admitted
+
+    def _prefill(self, admitted: List[_Request]) -> None:
+        """Encode missing prefixes in one batch, then every admitted prompt on top of its prefix in another."""
+        started = time.perf_counter()
+        for request in admitted:
+            request.started_at = started
+
+        prefix_states: Dict[str, Any] = {}
+        missing: Dict[str, List[int]] = {}
+        to_release: List[Any] = []
+        try:
+            for request in admitted:
+                key = request.prefix_key
+                if key is None or key in prefix_states or key in missing:
+                    continue
+                entry = self.prefix_cache.get(key)
+                if entry is not None:
+                    prefix_states[key] = entry[0]
+                else:
+                    missing[key] = self.backend.tokenize(request.prefix)
+
+            if missing:
+                states = self.backend.prefill([(None, tokens) for tokens in missing.values()])
+                self._prefill_tokens += sum(len(tokens) for tokens in missing.values())
+                for (key, tokens), state in zip(missing.items(), states):
+                    prefix_states[key] = state
+                    if len(self._prefix_token_counts) >= _MAX_PREFIX_COUNTS:
+                        self._prefix_token_counts.clear()
+                    self._prefix_token_counts[key] = len(tokens)
+                    to_release.extend(self.prefix_cache.put(key, state, len(tokens)))
+
+            states = self.backend.prefill([
+                (prefix_states.get(request.prefix_key) if request.prefix_key else None, request.prompt_tokens)
+                for request in admitted
+            ])
+            self._prefill_tokens += sum(len(request.prompt_tokens) for request in admitted)
+        except Exception as exc:  # noqa: BLE001
+            self.logger.error("Prefill failed: %s", exc, extra={'error_code': 'LLM-BACKEND-FAIL'})
+            self._fail(admitted, exc)
+            return
+        finally:
+            # Evicted prefixes, and prefixes too large to cache, were only needed for this batch.
+            for state in to_release:
+                self.backend.release(state)
+
+        encoded = set()
+        hits = saved = 0
+        for request, state in zip(admitted, states):
+            request.state = state
+            key = request.prefix_key
+            if key is None:
+                continue
+            request.prefix_tokens = self._prefix_token_counts.get(key, 0)
+            request.prefix_cached = key not in missing
+            # Requests sharing a prefix encoded in this batch reuse it too; only the first paid for it.
+            if key in missing and key not in encoded:
+                encoded.add(key)
+            else:
+                hits += 1
+                saved += request.prefix_tokens
+        with self._condition:
+            self._running.extend(admitted)
+            self._prefix_hits += hits
+            self._prefix_misses += len(missing)
+            self._prefix_tokens_saved += saved
+
+    def _decode(self) -> None:
+        running = self._running
+        try:
+            tokens = self.backend.decode([request.state for request in running])
+        except Exception as exc:  # noqa: BLE001
+            self.logger.error("Decode step failed: %s", exc, extra={'error_code': 'LLM-BACKEND-FAIL'})
+            with self._condition:
+                self._running = []
+            self._fail(running, exc)
+            return
+
+        now = time.perf_counter()
+        still_running: List[_Request] = []
+        finished: List[Tuple[_Request, str]] = []
+        for request, token in zip(running, tokens):
+            if not request.generated:
+                request.first_token_at = now
+            if token == self.backend.eos_token:
+                finished.append((request, 'stop'))
+                continue
+            request.generated.append(token)
+            if len(request.generated) >= request.max_new_tokens:
+                finished.append((request, 'length'))
+            else:
+                still_running.append(request)
+
+        # Finished requests stay in ``_running`` until settled, so a failure here still reaches their callers.
+        for request, reason in finished:
+            self.backend.release(request.state)
+            request.state = None
+            _settle(request.future, GenerationResult(
+                text=self.backend.detokenize(request.generated),
+                tokens=request.generated,
+                prompt_tokens=len(request.prompt_tokens),
+                prefix_tokens=request.prefix_tokens,
+                prefix_cached=request.prefix_cached,
+                finish_reason=reason,
+                queue_seconds=request.started_at - request.submitted_at,
+                time_to_first_token_seconds=request.first_token_at - request.submitted_at,
+                total_seconds=now - request.submitted_at,
+            ))
+
+        with self._condition:
+            self._running = still_running
+            self._decode_steps += 1
+            self._decoded += len(running)
+            self._completed += len(finished)
+
+    def _fail(self, requests: List[_Request], exc: BaseException) -> None:
+        for request in requests:
+            if request.state is not None:
+                self.backend.release(request.state)
+                request.state = None
+            _settle(request.future, exc=exc)
+        with self._condition:
+            self._failed += len(requests)
+
+
+def _settle(future: Future, result: Any = None, exc: Optional[BaseException] = None) -> None:
+    """Complete ``future`` unless it is already done."""
+    try:
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class _StubSequence:
+    __slots__ = ('length', 'digest')
+
+    def __init__(self, length: int, digest: int) -> None:
+        self.length = length
+        self.digest = digest
+
+
+class StubLLMBackend:
+    """
+    Deterministic CPU stand-in for a local LLM with a GPU-like cost profile.
+
+    Tokens are words and punctuation hashed into ``vocab_size`` ids. A
+    sequence's state is its length and a rolling hash of its tokens, and
+    each decoded token is a function of that hash. The same context always
+    produces the same completion, whether or not its prefix came from a
+    cache. Roughly one completion in ``mean_completion_tokens`` tokens
+    ends with EOS.
+
+    Time is simulated with ``sleep`` and accumulated in ``busy_seconds``:
+    a prefill call costs ``prefill_call_seconds`` plus
+    ``prefill_token_seconds`` per new token. A decode step costs
+    ``decode_step_seconds`` plus ``decode_sequence_seconds`` per sequence,
+    so like a memory-bound GPU, a batch costs little more than one sequence.
+    """
+
+    eos_token = 0
+
+    def __init__(
+        self,
+        vocab_size: int = 32000,
+        mean_completion_tokens: int = 64,
+        prefill_call_seconds: float = 0.002,
+        prefill_token_seconds: float = 0.0001,
+        decode_step_seconds: float = 0.01,
+        decode_sequence_seconds: float = 0.0005,
+        simulate_time: bool = True,
+    ) -> None:
+        self.vocab_size = vocab_size
+        self.mean_completion_tokens = max(1, mean_completion_tokens)
+        self.prefill_call_seconds = prefill_call_seconds
+        self.prefill_token_seconds = prefill_token_seconds
+        self.decode_step_seconds = decode_step_seconds
+        self.decode_sequence_seconds = decode_sequence_seconds
+        self.simulate_time = simulate_time
+        self.busy_seconds = 0.0
+        self.live_states = 0
+        self._lock = threading.Lock()
+
+    def tokenize(self, text: str) -> List[int]:
+        return [zlib.crc32(word.encode('utf-8')) % (self.vocab_size - 1) + 1 for word in _TOKEN_PATTERN.findall(text)]
+
+    def detokenize(self, tokens: Sequence[int]) -> str:
+        return ' '.join(f"w{token}" for token in tokens)
+
+    def prefill(self, items: Sequence[Tuple[Optional[_StubSequence], Sequence[int]]]) -> List[_StubSequence]:
+        states = []
+        new_tokens = 0
+        for base, tokens in items:
+            length, digest = (base.length, base.digest) if base is not None else (0, 0)
+            for token in tokens:
+                digest = _mix(digest, token)
+            states.append(_StubSequence(length + len(tokens), digest))
+            new_tokens += len(tokens)
+        self._spend(self.prefill_call_seconds + self.prefill_token_seconds * new_tokens)
+        with self._lock:
+            self.live_states += len(states)
+        return states
+
+    def decode(self, states: Sequence[_StubSequence]) -> List[int]:
+        tokens = []
+        for state in states:
+            state.digest = _mix(state.digest, state.length)
+            token = state.digest % self.vocab_size
+            if (state.digest >> 20) % self.mean_completion_tokens == 0:
+                token = self.eos_token
+            elif token == self.eos_token:
+                token = 1
+            state.digest = _mix(state.digest, token)
+            state.length += 1
+            tokens.append(token)
+        self._spend(self.decode_step_seconds + self.decode_sequence_seconds * len(states))
+        return tokens
+
+    def release(self, state: _StubSequence) -> None:
+        with self._lock:
+            self.live_states -= 1
+
+    def _spend(self, seconds: float) -> None:
+        with self._lock:
+            self.busy_seconds += seconds
+        if self.simulate_time and seconds > 0:
+            time.sleep(seconds)
+
+
+def _mix(digest: int, value: int) -> int:
+    """64-bit FNV-1a style step; deterministic across processes, unlike ``hash``."""
+    return ((digest ^ (value & 0xFFFFFFFF)) * 0x100000001B3) & 0xFFFFFFFFFFFFFFFF
@@ -0,0 +1,63 @@
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+
+class SessionInfo(BaseModel):
+    """A compiled model held by the session manager."""
+
+    key: str = Field(..., description="Hash of the model contents, device and compile config.")
+    model_path: str
+    device: str
+    memory_bytes: int = Field(..., description="Estimated host memory held by the compiled model.")
+    compile_seconds: float
+    config: Dict[str, Any] = Field(default_factory=dict)
+
+
+class SessionCacheStats(BaseModel):
+    """Counters for the live compiled-model cache."""
+
+    models: int
+    memory_bytes: int
+    max_memory_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    device_fallbacks: int
+
+
+class GenerationResult(BaseModel):
+    """The completion of one request served by ``LLMScheduler``."""
+
+    text: str
+    tokens: List[int] = Field(default_factory=list, description="Generated token ids.")
+    prompt_tokens: int = Field(..., description="Tokens in the request's own prompt.")
+    prefix_tokens: int = Field(0, description="Tokens in the shared system-prompt prefix.")
+    prefix_cached: bool = Field(False, description="Whether the prefix was served from the prefix cache.")
+    finish_reason: Literal['stop', 'length']
+    queue_seconds: float = Field(..., description="Time from submission to the start of prefill.")
+    time_to_first_token_seconds: float
+    total_seconds: float
+
+    @property
+    def completion_tokens(self) -> int:
+        return len(self.tokens)
+
+
+class LLMSchedulerStats(BaseModel):
+    """Counters for an ``LLMScheduler`` and its prefix cache."""
+
+    requests: int
+    completed: int
+    failed: int
+    waiting: int
+    running: int
+    decode_steps: int
+    mean_batch_size: float = Field(..., description="Sequences advanced per decode step, on average.")
+    prefill_tokens: int = Field(..., description="Tokens actually encoded by prefill, excluding cached prefixes.")
+    generated_tokens: int
+    prefix_hits: int = Field(..., description="Requests whose prefix was already encoded, by the cache or a batch-mate.")
+    prefix_misses: int = Field(..., description="Prefix encodings performed.")
+    prefix_tokens_saved: int = Field(..., description="Prefix tokens not re-encoded thanks to sharing.")
+    cached_prefixes: int
+    cached_prefix_tokens: int
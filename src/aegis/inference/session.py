@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import psutil
+
+from aegis.hardware.monitors.intel_monitor import IntelComputeMonitor
+from aegis.inference.models import SessionCacheStats, SessionInfo
+from aegis.utils.logger import setup_logger
+from aegis.utils.paths import cache_dir
+
+ModelInputs = Union[Mapping[Any, Any], Sequence[Any], Any]
+
+
+class InferenceUnavailableError(RuntimeError):
+    """Raised when no OpenVINO runtime is available to compile models."""
+
+
+def _collect_outputs(request: Any) -> Dict[str, np.ndarray]:
+    """Copy a finished request's outputs, keyed by output name, before the request is reused."""
+    outputs: Dict[str, np.ndarray] = {}
+    for index, (port, value) in enumerate(request.results.items()):
+        try:
+            name = port.get_any_name()
+        except Exception:  # noqa: BLE001 - unnamed outputs
+            name = f"output_{index}"
+        outputs[name] = np.array(value, copy=True)
+    return outputs
+
+
+class CompiledSession:
+    """
+    A compiled model with a pool of reusable infer requests.
+
+    ``infer`` and ``infer_async`` each borrow one request, so concurrent
+    callers run in parallel up to the device's capacity. ``infer_many`` keeps
+    ``optimal_requests`` requests in flight through an ``AsyncInferQueue``,
+    which is the fastest way to push a batch of independent inputs through.
+    """
+
+    def __init__(self, info: SessionInfo, compiled_model: Any) -> None:
+        self.info = info
+        self.compiled_model = compiled_model
+        self._idle: queue.SimpleQueue = queue.SimpleQueue()
+        self._batch_lock = threading.Lock()
+        self._batch_queue: Optional[Any] = None
+        try:
+            self.optimal_requests = max(1, int(compiled_model.get_property('OPTIMAL_NUMBER_OF_INFER_REQUESTS')))
+        except Exception:  # noqa: BLE001 - property unsupported by the plugin
+            self.optimal_requests = 1
+
+    def infer(self, inputs: ModelInputs) -> Dict[str, np.ndarray]:
+        """Run one synchronous inference."""
+        request = self._acquire()
+        try:
+            request.infer(inputs)
+            return _collect_outputs(request)
+        finally:
+            self._idle.put(request)
+
+    async def infer_async(self, inputs: ModelInputs) -> Dict[str, np.ndarray]:
+        """Run one inference without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+        request = self._acquire()
+
+        def on_complete(_: Any) -> None:
+            loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+
+        request.set_callback(on_complete, None)
+        try:
+            request.start_async(inputs)
+            await finished
+        except asyncio.CancelledError:
+            # The request may still be running; return it to the pool from a worker once it has stopped.
+            request.cancel()
+            loop.run_in_executor(None, self._recycle, request)
+            raise
+        request.wait()
+        outputs = _collect_outputs(request)
+        self._idle.put(request)
+        return outputs
+
+    def infer_many(self, batch: Sequence[ModelInputs]) -> List[Dict[str, np.ndarray]]:
+        """Run independent inferences with the device's optimal number of requests in flight."""
+        from openvino.runtime import AsyncInferQueue  # type: ignore[import-not-found]
+
+        results: List[Optional[Dict[str, np.ndarray]]] = [None] * len(batch)
+
+        def on_complete(request: Any, index: int) -> None:
+            results[index] = _collect_outputs(request)
+
+        with self._batch_lock:
+            if self._batch_queue is None:
+                self._batch_queue = AsyncInferQueue(self.compiled_model, self.optimal_requests)
+            self._batch_queue.set_callback(on_complete)
+            for index, inputs in enumerate(batch):
+                self._batch_queue.start_async(inputs, index)
+            self._batch_queue.wait_all()
+        return results  # type: ignore[return-value]
+
+    def _acquire(self) -> Any:
+        """Borrow an idle infer request, creating one if none is free."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.compiled_model.create_infer_request()
+
+    def _recycle(self, request: Any) -> None:
+        """Wait for a cancelled request to stop, then return it to the idle pool."""
+        try:
+            request.wait()
+        except Exception:  # noqa: BLE001 - a cancelled request reports its cancellation on wait
+            pass
+        self._idle.put(request)
+
+
+class InferenceSessionManager:
+    """
+    Compile OpenVINO models once and share them across callers.
+
+    Models are compiled on the ``Core`` owned by ``IntelComputeMonitor``, with
+    OpenVINO's compiled-blob cache pointed at ``<cache dir>/openvino`` so a
+    restart loads compiled blobs instead of recompiling. Live compiled models
+    are kept in an LRU keyed by model contents, device and config, and the
+    least recently used are released once their estimated memory exceeds
+    ``max_memory_bytes``. Concurrent requests for the same model wait for a
+    single compilation.
+
+    Without a device argument, the first available device in
+    ``DEVICE_PREFERENCE`` is used. A model that fails to compile on an
+    accelerator is compiled for CPU instead, and is not retried on that
+    accelerator after eviction.
+    """
+
+    DEVICE_PREFERENCE = ('NPU', 'GPU', 'CPU')
+    _HASH_CHUNK_BYTES = 1 << 20
+    _CONTENT_HASH_ENTRIES = 256
+
+    def __init__(
+        self,
+        monitor: IntelComputeMonitor,
+        model_cache_dir: Optional[Union[str, os.PathLike]] = None,
+        max_memory_bytes: int = 2 * 1024 ** 3,
+        performance_hint: Optional[str] = 'THROUGHPUT',
+    ) -> None:
+        self.logger = setup_logger('InferenceSessionManager', module_code='INF', script_code='SESS')
+        self.monitor = monitor
+        self.model_cache_dir = Path(model_cache_dir) if model_cache_dir else cache_dir() / 'openvino'
+        self.max_memory_bytes = max_memory_bytes
+        self.performance_hint = performance_hint
+
+        self._sessions: "OrderedDict[str, CompiledSession]" = OrderedDict()
+        self._compile_locks: Dict[str, threading.Lock] = {}
+        self._content_hashes: "OrderedDict[Tuple[Tuple[str, int, int], ...], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._core_configured = False
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._fallbacks = 0
+        self._cpu_only_keys: Set[str] = set()
+
+    @property
+    def core(self) -> Any:
+        """The monitor's OpenVINO ``Core``, configured with the compiled-blob cache directory."""
+        core = self.monitor.core
+        if core is None:
+            raise InferenceUnavailableError("OpenVINO runtime is not available; cannot compile models.")
+        if not self._core_configured:
+            with self._lock:
+                if not self._core_configured:
+                    self.model_cache_dir.mkdir(parents=True, exist_ok=True)
+                    core.set_property({'CACHE_DIR': str(self.model_cache_dir)})
+                    self._core_configured = True
+                    self.logger.info("OpenVINO compiled-model cache at %s.", self.model_cache_dir)
+        return core
+
+    def select_device(self, preferred: Optional[str] = None) -> str:
+        """Return ``preferred`` if available, else the first available device in preference order, else CPU."""
+        status = self.monitor.get_status()
+        available = status.available_devices if status is not None else []
+        if preferred is not None:
+            if preferred in available or preferred == 'CPU':
+                return preferred
+            self.logger.warning("Requested device '%s' is not available; selecting automatically.", preferred)
+
+        for family in self.DEVICE_PREFERENCE:
+            for device in available:
+                if device.split('.')[0] == family:
+                    return device
+        return 'CPU'
+
+    def session(
+        self,
+        model_path: Union[str, os.PathLike],
+        device: Optional[str] = None,
+        config: Optional[Mapping[str, Any]] = None,
+    ) -> CompiledSession:
+        """Return the compiled session for a model, compiling it on first use."""
+        core = self.core
+        device = self.select_device(device)
+        compile_config = self._compile_config(config)
+        key = self._session_key(Path(model_path), device, compile_config)
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                self._hits += 1
+                return session
+            compile_lock = self._compile_locks.setdefault(key, threading.Lock())
+
+        with compile_lock:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is not None:
+                    self._sessions.move_to_end(key)
+                    self._hits += 1
+                    return session
+                self._misses += 1
+
+            session = self._compile(core, key, Path(model_path), device, compile_config)
+            with self._lock:
+                self._sessions[key] = session
+                self._compile_locks.pop(key, None)
+                self._evict_over_budget()
+        return session
+
+    def infer(
+        self,
+        model_path: Union[str, os.PathLike],
+        inputs: ModelInputs,
+        device: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Compile (or reuse) a model and run one synchronous inference."""
+        return self.session(model_path, device).infer(inputs)
+
+    async def infer_async(
+        self,
+        model_path: Union[str, os.PathLike],
+        inputs: ModelInputs,
+        device: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Async counterpart of ``infer``; compilation runs on a worker thread."""
+        session = await asyncio.to_thread(self.session, model_path, device)
+        return await session.infer_async(inputs)
+
+    def sessions(self) -> List[SessionInfo]:
+        """Live compiled models, least recently used first."""
+        with self._lock:
+            return [session.info for session in self._sessions.values()]
+
+    def evict(self, key: str) -> bool:
+        """Release one compiled model by key; returns whether it was loaded."""
+        with self._lock:
+            return self._sessions.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Release every compiled model."""
+        with self._lock:
+            self._sessions.clear()
+
+    def stats(self) -> SessionCacheStats:
+        """Cache size and hit, miss, eviction and fallback counters."""
+        with self._lock:
+            return SessionCacheStats(
+                models=len(self._sessions),
+                memory_bytes=self._memory_in_use(),
+                max_memory_bytes=self.max_memory_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                device_fallbacks=self._fallbacks,
+            )
+
+    def _compile(
+        self,
+        core: Any,
+        key: str,
+        model_path: Path,
+        device: str,
+        config: Dict[str, Any],
+    ) -> CompiledSession:
+        """Compile a model, falling back to CPU if the chosen accelerator rejects it."""
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        started = time.perf_counter()
+        if key in self._cpu_only_keys:
+            device = 'CPU'
+        try:
+            compiled = core.compile_model(str(model_path), device, config)
+        except Exception as exc:  # noqa: BLE001 - plugin errors are not typed
+            if device == 'CPU':
+                self.logger.error(
+                    "Failed to compile %s for CPU: %s",
+                    model_path,
+                    exc,
+                    extra={'error_code': 'INF-COMPILE-FAIL'}
+                )
+                raise
+            self.logger.warning(
+                "Failed to compile %s for %s (%s); falling back to CPU.",
+                model_path,
+                device,
+                exc,
+                extra={'error_code': 'INF-DEVICE-FALLBACK'}
+            )
+            with self._lock:
+                self._fallbacks += 1
+                self._cpu_only_keys.add(key)
+            device = 'CPU'
+            compiled = core.compile_model(str(model_path), device, config)
+
+        compile_seconds = time.perf_counter() - started
+        memory = max(process.memory_info().rss - rss_before, self._model_file_bytes(model_path))
+        info = SessionInfo(
+            key=key,
+            model_path=str(model_path),
+            device=device,
+            memory_bytes=memory,
+            compile_seconds=compile_seconds,
+            config=config,
+        )
+        self.logger.info(
+            "Compiled %s for %s in %.2fs (~%.1f MB).",
+            model_path.name,
+            device,
+            compile_seconds,
+            memory / 1024 ** 2,
+        )
+        return CompiledSession(info, compiled)
+
+    def _compile_config(self, config: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        """The manager's defaults overlaid with the caller's compile properties."""
+        merged: Dict[str, Any] = {}
+        if self.performance_hint:
+            merged['PERFORMANCE_HINT'] = self.performance_hint
+        merged.update(config or {})
+        return merged
+
+    def _session_key(self, model_path: Path, device: str, config: Mapping[str, Any]) -> str:
+        """Hash of the model's contents, the device and the compile config."""
+        payload = json.dumps(
+            {'model': self._content_hash(model_path), 'device': device, 'config': config},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def _content_hash(self, model_path: Path) -> str:
+        """Hash of a model file and its IR weights, memoised by path, size and mtime in a bounded LRU."""
+        digest = hashlib.sha256()
+        files = [model_path]
+        weights = model_path.with_suffix('.bin')
+        if model_path.suffix == '.xml' and weights.exists():
+            files.append(weights)
+
+        signature = tuple((str(path), path.stat().st_size, path.stat().st_mtime_ns) for path in files)
+        with self._lock:
+            cached = self._content_hashes.get(signature)
+            if cached is not None:
+                self._content_hashes.move_to_end(signature)
+                return cached
+
+        for path in files:
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(self._HASH_CHUNK_BYTES), b''):
+                    digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            self._content_hashes[signature] = content_hash
+            self._content_hashes.move_to_end(signature)
+            while len(self._content_hashes) > self._CONTENT_HASH_ENTRIES:
+                self._content_hashes.popitem(last=False)
+        return content_hash
+
+    @staticmethod
+    def _model_file_bytes(model_path: Path) -> int:
+        """Size of a model file plus its IR weights, a lower bound on its compiled size."""
+        total = model_path.stat().st_size
+        weights = model_path.with_suffix('.bin')
+        if model_path.suffix == '.xml' and weights.exists():
+            total += weights.stat().st_size
+        return total
+
+    def _memory_in_use(self) -> int:
+        return sum(session.info.memory_bytes for session in self._sessions.values())
+
+    def _evict_over_budget(self) -> None:
+        """Release least recently used models until within budget; the newest is always kept."""
+        while len(self._sessions) > 1 and self._memory_in_use() > self.max_memory_bytes:
+            _, session = self._sessions.popitem(last=False)
+            self._evictions += 1
+            self.logger.info(
+                "Evicted compiled model %s (%s) to stay within %.0f MB.",
+                Path(session.info.model_path).name,
+                session.info.device,
+                self.max_memory_bytes / 1024 ** 2,
+            )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length; all-zero rows are left as zeros."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def train_centroids(
+    vectors: np.ndarray,
+    n_lists: int,
+    iterations: int = 10,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Cluster unit vectors with spherical k-means and return ``n_lists`` unit centroids.
+
+    Centroids are seeded from distinct random samples; a cluster that empties
+    during training is reseeded with the sample its centroid fits worst.
+    """
+    count = len(vectors)
+    if count == 0:
+        raise ValueError("Cannot train an index on an empty collection.")
+    n_lists = min(n_lists, count)
+
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(count, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign_lists(centroids, vectors)
+        order = np.argsort(assignments, kind='stable')
+        sizes = np.bincount(assignments, minlength=n_lists)
+        sums = np.zeros_like(centroids)
+        filled = np.flatnonzero(sizes)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        sums[filled] = np.add.reduceat(vectors[order], starts[filled], axis=0)
+
+        empty = np.flatnonzero(sizes == 0)
+        if len(empty):
+            fit = np.einsum('ij,ij->i', vectors, centroids[assignments])
+            sums[empty] = vectors[np.argsort(fit)[:len(empty)]]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_lists(centroids: np.ndarray, vectors: np.ndarray, chunk_rows: int = 65536) -> np.ndarray:
+    """Index of the most similar centroid for each vector."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_rows):
+        block = vectors[start:start + chunk_rows]
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """
+    An inverted-file index over the rows of a vector store.
+
+    Rows are grouped by their nearest k-means centroid; a query scans only the
+    ``n_probe`` lists whose centroids are closest to it. New rows are assigned
+    to the existing centroids, so inserts never require retraining. Deleted
+    rows stay in their lists and are filtered out by the store.
+    """
+
+    def __init__(self, centroids: np.ndarray, n_probe: Optional[int] = None) -> None:
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.n_probe = n_probe or max(1, int(round(np.sqrt(self.n_lists))))
+        self._lists: List[np.ndarray] = [np.empty(0, dtype=np.int64) for _ in range(self.n_lists)]
+        self._pending: Dict[int, List[np.ndarray]] = {}
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def add(self, rows: np.ndarray, assignments: np.ndarray) -> None:
+        """Record ``rows`` as members of the lists in ``assignments``."""
+        rows = np.asarray(rows, dtype=np.int64)
+        assignments = np.asarray(assignments)
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+        grouped = rows[order]
+        for list_id in np.flatnonzero(np.diff(bounds)).tolist():
+            self._pending.setdefault(list_id, []).append(grouped[bounds[list_id]:bounds[list_id + 1]])
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest list for each of ``vectors``."""
+        return assign_lists(self.centroids, vectors)
+
+    def candidates(self, query: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """Sorted rows of the lists nearest to ``query``."""
+        self._merge_pending()
+        probe = min(n_probe or self.n_probe, self.n_lists)
+        scores = self.centroids @ query
+        nearest = np.argpartition(-scores, probe - 1)[:probe]
+        rows = np.concatenate([self._lists[list_id] for list_id in nearest])
+        rows.sort()
+        return rows
+
+    def list_sizes(self) -> np.ndarray:
+        """Number of rows, including deleted ones, in each list."""
+        self._merge_pending()
+        return np.array([len(rows) for rows in self._lists], dtype=np.int64)
+
+    def _merge_pending(self) -> None:
+        """Fold rows added since the last query into the list arrays."""
+        if not self._pending:
+            return
+        for list_id, rows in self._pending.items():
+            self._lists[list_id] = np.concatenate([self._lists[list_id], *rows])
+        self._pending = {}
@@ -0,0 +1,24 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    """A stored entry returned by a similarity search."""
+
+    id: str
+    score: float = Field(..., description="Cosine similarity to the query, in [-1, 1].")
+    text: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class IndexStats(BaseModel):
+    """Size and layout of a vector store."""
+
+    count: int = Field(..., description="Live entries.")
+    rows: int = Field(..., description="Rows written to the vector file, including deleted ones.")
+    dim: int
+    dtype: str
+    index_lists: int = Field(0, description="Number of IVF lists; 0 when no index has been built.")
+    index_probe: int = 0
+    largest_list: int = 0
@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from aegis.knowledge.ivf import IVFIndex, normalize_rows, train_centroids
+from aegis.knowledge.models import IndexStats, SearchHit
+from aegis.utils.logger import setup_logger
+
+SUPPORTED_DTYPES = ('float32', 'int8')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    row INTEGER NOT NULL UNIQUE,
+    list INTEGER,
+    text TEXT,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL
+);
+"""
+
+
+class _MappedArray:
+    """A growable array of fixed-width rows kept in a memory-mapped file."""
+
+    def __init__(self, path: Path, dtype: np.dtype, width: Optional[int] = None, capacity: int = 1024) -> None:
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self.row_bytes = self.dtype.itemsize * (width or 1)
+
+        if path.exists() and path.stat().st_size >= self.row_bytes:
+            capacity = path.stat().st_size // self.row_bytes
+        else:
+            with open(path, 'wb') as file:
+                file.truncate(capacity * self.row_bytes)
+        self.array = self._map(capacity)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.array)
+
+    def ensure(self, rows: int) -> None:
+        """Grow the file, at least doubling it, so that it holds ``rows`` rows."""
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity * 2)
+        self.array.flush()
+        with open(self.path, 'r+b') as file:
+            file.truncate(capacity * self.row_bytes)
+        self.array = self._map(capacity)
+
+    def flush(self) -> None:
+        self.array.flush()
+
+    def _map(self, capacity: int) -> np.memmap:
+        shape = (capacity, self.width) if self.width else (capacity,)
+        return np.memmap(self.path, dtype=self.dtype, mode='r+', shape=shape)
+
+
+class VectorStore:
+    """
+    A local, CPU-only store of embeddings with metadata, searchable by cosine similarity.
+
+    Vectors are L2-normalised on insert and kept in a memory-mapped file in
+    the store directory, either as float32 or as int8 with one scale per
+    vector (a quarter of the size, at a small cost in accuracy). Ids, text,
+    metadata and row positions live in SQLite alongside it. ``dim`` and
+    ``dtype`` are fixed when the store is created and read back on reopen.
+
+    Searches scan every vector in chunks until ``build_index`` trains an IVF
+    index, after which only the nearest lists are scanned. Inserts are
+    appended and assigned to the existing index lists; deletes only mark the
+    row, so neither requires a rebuild. ``compact`` reclaims deleted rows and
+    ``build_index`` can be re-run when the collection's shape has drifted.
+    """
+
+    VECTOR_FILE = 'vectors.bin'
+    SCALE_FILE = 'scales.bin'
+    CENTROID_FILE = 'ivf-centroids.npy'
+    METADATA_FILE = 'metadata.sqlite'
+    SCAN_CHUNK_ROWS = 65536
+
+    def __init__(self, path: Union[str, os.PathLike], dim: Optional[int] = None, dtype: Optional[str] = None) -> None:
+        self.logger = setup_logger('VectorStore', module_code='KNOW', script_code='VSTR')
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+        self._db = sqlite3.connect(self.path / self.METADATA_FILE, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        settings = dict(self._db.execute("SELECT key, value FROM settings"))
+
+        if settings:
+            stored_dim, stored_dtype = int(settings['dim']), settings['dtype']
+            if (dim is not None and dim != stored_dim) or (dtype is not None and dtype != stored_dtype):
+                self.logger.error(
+                    "Store at %s holds %d-dim %s vectors, not %s-dim %s.",
+                    self.path,
+                    stored_dim,
+                    stored_dtype,
+                    dim,
+                    dtype,
+                    extra={'error_code': 'KNOW-LAYOUT-MISMATCH'}
+                )
+                raise ValueError(f"Vector store at {self.path} holds {stored_dim}-dim {stored_dtype} vectors.")
+            dim, dtype = stored_dim, stored_dtype
+            self._rows = int(settings['rows'])
+        else:
+            if dim is None or dim <= 0:
+                raise ValueError("A new vector store needs a positive embedding dimension.")
+            dtype = dtype or 'float32'
+            if dtype not in SUPPORTED_DTYPES:
+                raise ValueError(f"Unsupported vector dtype '{dtype}'; choose one of {SUPPORTED_DTYPES}.")
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO settings (key, value) VALUES (?, ?)",
+                    [('dim', str(dim)), ('dtype', dtype), ('rows', '0')],
+                )
+            self._rows = 0
+
+        self.dim = dim
+        self.dtype = dtype
+        self._vectors = _MappedArray(self.path / self.VECTOR_FILE, np.dtype(dtype), width=dim)
+        self._scales = _MappedArray(self.path / self.SCALE_FILE, np.float32) if dtype == 'int8' else None
+        self._live = np.zeros(self._vectors.capacity, dtype=bool)
+        live_rows = np.fromiter((row for (row,) in self._db.execute("SELECT row FROM entries")), dtype=np.int64)
+        self._live[live_rows] = True
+        self._count = len(live_rows)
+
+        self.index: Optional[IVFIndex] = None
+        self._load_index()
+        self.logger.info(
+            "Opened vector store at %s: %d entries, %d-dim %s%s.",
+            self.path,
+            self._count,
+            self.dim,
+            self.dtype,
+            f", IVF index with {self.index.n_lists} lists" if self.index else "",
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, entry_id: str) -> bool:
+        return self._db.execute("SELECT 1 FROM entries WHERE id = ?", (entry_id,)).fetchone() is not None
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        texts: Optional[Sequence[Optional[str]]] = None,
+        metadata: Optional[Sequence[Optional[Mapping[str, Any]]]] = None,
+    ) -> None:
+        """Insert entries, replacing any existing entries with the same ids."""
+        if not len(ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(vectors) != len(ids) or len(set(ids)) != len(ids):
+            raise ValueError("Each vector needs exactly one unique id.")
+        texts = list(texts) if texts is not None else [None] * len(ids)
+        metadata = list(metadata) if metadata is not None else [None] * len(ids)
+
+        unit = normalize_rows(vectors)
+        with self._lock:
+            replaced = self._rows_for(ids)
+            start = self._rows
+            rows = np.arange(start, start + len(ids), dtype=np.int64)
+            self._ensure_capacity(start + len(ids))
+            self._write_rows(rows, unit)
+
+            assignments = self.index.assign(unit) if self.index is not None else None
+            now = time.time()
+            records = [
+                (
+                    entry_id,
+                    int(row),
+                    int(assignments[position]) if assignments is not None else None,
+                    texts[position],
+                    json.dumps(dict(metadata[position] or {})),
+                    now,
+                )
+                for position, (entry_id, row) in enumerate(zip(ids, rows.tolist()))
+            ]
+            with self._db:
+                self._db.executemany(
+                    """
+                    INSERT INTO entries (id, row, list, text, metadata, created_at) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        row = excluded.row, list = excluded.list, text = excluded.text,
+                        metadata = excluded.metadata, created_at = excluded.created_at
+                    """,
+                    records,
+                )
+                self._db.execute("UPDATE settings SET value = ? WHERE key = 'rows'", (str(start + len(ids)),))
+
+            self._rows = start + len(ids)
+            self._live[replaced] = False
+            self._live[rows] = True
+            self._count += len(ids) - len(replaced)
+            if self.index is not None:
+                self.index.add(rows, assignments)
+
+        self.logger.debug("Added %d entries (%d replaced).", len(ids), len(replaced))
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove entries by id and return how many existed."""
+        with self._lock:
+            rows = self._rows_for(ids)
+            if not len(rows):
+                return 0
+            with self._db:
+                self._db.executemany("DELETE FROM entries WHERE id = ?", [(entry_id,) for entry_id in ids])
+            self._live[rows] = False
+            self._count -= len(rows)
+        self.logger.debug("Deleted %d entries.", len(rows))
+        return len(rows)
+
+    def get(self, entry_id: str) -> Optional[SearchHit]:
+        """Return the text and metadata stored under ``entry_id``, scored 1.0, or None."""
+        row = self._db.execute("SELECT text, metadata FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None
+        return SearchHit(id=entry_id, score=1.0, text=row[0], metadata=json.loads(row[1]))
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        exact: Optional[bool] = None,
+        n_probe: Optional[int] = None,
+    ) -> List[SearchHit]:
+        """
+        Return up to ``k`` entries most similar to ``query``, best first.
+
+        Uses the IVF index when one has been built unless ``exact`` is True;
+        ``n_probe`` overrides the number of lists scanned.
+        """
+        query = normalize_rows(np.asarray(query, dtype=np.float32).reshape(self.dim))
+        with self._lock:
+            if self._count == 0 or k <= 0:
+                return []
+            if self.index is not None and not exact:
+                rows = self.index.candidates(query, n_probe)
+                rows = rows[self._live[rows]]
+                scores = self._score_rows(rows, query)
+            else:
+                rows = None
+                scores = self._score_all(query)
+
+            take = min(k, len(scores))
+            if take == 0:
+                return []
+            best = np.argpartition(-scores, take - 1)[:take]
+            best = best[np.argsort(-scores[best], kind='stable')]
+            best = best[np.isfinite(scores[best])]
+            hit_rows = rows[best] if rows is not None else best
+            return self._hits(hit_rows.tolist(), scores[best].tolist())
+
+    def build_index(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        sample_size: int = 100_000,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> IVFIndex:
+        """
+        Train an IVF index over the live entries and assign every entry to a list.
+
+        ``n_lists`` defaults to about 4·sqrt(n); k-means is trained on at most
+        ``sample_size`` entries. Replaces any previous index.
+        """
+        with self._lock:
+            live_rows = np.flatnonzero(self._live[:self._rows])
+            if not len(live_rows):
+                raise ValueError("Cannot build an index over an empty vector store.")
+
+            started = time.perf_counter()
+            n_lists = n_lists or max(1, int(4 * np.sqrt(len(live_rows))))
+            rng = np.random.default_rng(seed)
+            sample = live_rows if len(live_rows) <= sample_size else np.sort(rng.choice(live_rows, sample_size, replace=False))
+            centroids = train_centroids(self._read_rows(sample), n_lists, iterations=iterations, seed=seed)
+
+            index = IVFIndex(centroids, n_probe)
+            assignments = np.empty(len(live_rows), dtype=np.int32)
+            for start in range(0, len(live_rows), self.SCAN_CHUNK_ROWS):
+                chunk = live_rows[start:start + self.SCAN_CHUNK_ROWS]
+                assignments[start:start + len(chunk)] = index.assign(self._read_rows(chunk))
+            index.add(live_rows, assignments)
+
+            with self._db:
+                self._db.executemany(
+                    "UPDATE entries SET list = ? WHERE row = ?",
+                    zip(assignments.tolist(), live_rows.tolist()),
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES ('index_probe', ?)",
+                    (str(index.n_probe),),
+                )
+            np.save(self.path / self.CENTROID_FILE, centroids)
+            self.index = index
+
+        self.logger.info(
+            "Built IVF index with %d lists over %d entries in %.2fs.",
+            index.n_lists,
+            len(live_rows),
+            time.perf_counter() - started,
+        )
+        return index
+
+    def drop_index(self) -> None:
+        """Discard the IVF index and return to exact search."""
+        with self._lock:
+            self.index = None
+            with self._db:
+                self._db.execute("UPDATE entries SET list = NULL")
+                self._db.execute("DELETE FROM settings WHERE key = 'index_probe'")
+            (self.path / self.CENTROID_FILE).unlink(missing_ok=True)
+
+    def compact(self) -> int:
+        """Move live entries over deleted rows and return how many rows were reclaimed."""
+        with self._lock:
+            live_rows = np.flatnonzero(self._live[:self._rows])
+            reclaimed = self._rows - len(live_rows)
+            if reclaimed == 0:
+                return 0
+
+            # Destinations never exceed sources and are processed in ascending
+            # order, so no row is overwritten before it has been moved.
+            for start in range(0, len(live_rows), self.SCAN_CHUNK_ROWS):
+                chunk = live_rows[start:start + self.SCAN_CHUNK_ROWS]
+                targets = np.arange(start, start + len(chunk))
+                self._vectors.array[targets] = self._vectors.array[chunk]
+                if self._scales is not None:
+                    self._scales.array[targets] = self._scales.array[chunk]
+            self._flush_vectors()
+
+            with self._db:
+                self._db.executemany(
+                    "UPDATE entries SET row = ? WHERE row = ?",
+                    ((new, old) for new, old in enumerate(live_rows.tolist())),
+                )
+                self._db.execute("UPDATE settings SET value = ? WHERE key = 'rows'", (str(len(live_rows)),))
+
+            self._rows = len(live_rows)
+            self._live[:] = False
+            self._live[:self._rows] = True
+            self._load_index()
+
+        self.logger.info("Compacted vector store: reclaimed %d rows.", reclaimed)
+        return reclaimed
+
+    def stats(self) -> IndexStats:
+        """Current size and index layout."""
+        with self._lock:
+            sizes = self.index.list_sizes() if self.index is not None else None
+            return IndexStats(
+                count=self._count,
+                rows=self._rows,
+                dim=self.dim,
+                dtype=self.dtype,
+                index_lists=self.index.n_lists if self.index is not None else 0,
+                index_probe=self.index.n_probe if self.index is not None else 0,
+                largest_list=int(sizes.max()) if sizes is not None and len(sizes) else 0,
+            )
+
+    def close(self) -> None:
+        """Flush the vector files and close the metadata database."""
+        with self._lock:
+            self._flush_vectors()
+            self._db.close()
+
+    def _rows_for(self, ids: Sequence[str]) -> np.ndarray:
+        """Rows currently holding any of ``ids``."""
+        rows: List[int] = []
+        for start in range(0, len(ids), 500):
+            batch = list(ids[start:start + 500])
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(row for (row,) in self._db.execute(f"SELECT row FROM entries WHERE id IN ({placeholders})", batch))
+        return np.asarray(rows, dtype=np.int64)
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grow the vector files and the live mask to hold ``rows`` rows."""
+        self._vectors.ensure(rows)
+        if self._scales is not None:
+            self._scales.ensure(self._vectors.capacity)
+        if len(self._live) < self._vectors.capacity:
+            live = np.zeros(self._vectors.capacity, dtype=bool)
+            live[:len(self._live)] = self._live
+            self._live = live
+
+    def _write_rows(self, rows: np.ndarray, unit: np.ndarray) -> None:
+        """Store unit vectors at ``rows``, quantising them for int8 stores."""
+        if self._scales is None:
+            self._vectors.array[rows] = unit
+        else:
+            scales = np.abs(unit).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors.array[rows] = np.rint(unit / scales[:, None]).astype(np.int8)
+            self._scales.array[rows] = scales
+        self._flush_vectors()
+
+    def _read_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Float32 copies of the vectors at ``rows``."""
+        vectors = np.asarray(self._vectors.array[rows], dtype=np.float32)
+        if self._scales is not None:
+            vectors *= self._scales.array[rows][:, None]
+        return vectors
+
+    def _score_rows(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity between ``query`` and the vectors at ``rows``."""
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), self.SCAN_CHUNK_ROWS):
+            chunk = rows[start:start + self.SCAN_CHUNK_ROWS]
+            scores[start:start + len(chunk)] = self._score_block(self._vectors.array[chunk], query, chunk)
+        return scores
+
+    def _score_all(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity for every row, with deleted rows scored -inf."""
+        scores = np.empty(self._rows, dtype=np.float32)
+        for start in range(0, self._rows, self.SCAN_CHUNK_ROWS):
+            stop = min(start + self.SCAN_CHUNK_ROWS, self._rows)
+            scores[start:stop] = self._score_block(self._vectors.array[start:stop], query, slice(start, stop))
+        scores[~self._live[:self._rows]] = -np.inf
+        return scores
+
+    def _score_block(self, block: np.ndarray, query: np.ndarray, rows: Union[np.ndarray, slice]) -> np.ndarray:
+        """Dot products of a block of stored vectors with ``query``."""
+        if self._scales is None:
+            return block @ query
+        return (block.astype(np.float32) @ query) * self._scales.array[rows]
+
+    def _hits(self, rows: List[int], scores: List[float]) -> List[SearchHit]:
+        """Attach ids, text and metadata to the best rows."""
+        if not rows:
+            return []
+        placeholders = ",".join("?" * len(rows))
+        records = {
+            row: (entry_id, text, metadata)
+            for row, entry_id, text, metadata in self._db.execute(
+                f"SELECT row, id, text, metadata FROM entries WHERE row IN ({placeholders})",
+                rows,
+            )
+        }
+        return [
+            SearchHit(id=records[row][0], score=score, text=records[row][1], metadata=json.loads(records[row][2]))
+            for row, score in zip(rows, scores)
+            if row in records
+        ]
+
+    def _load_index(self) -> None:
+        """Restore the IVF index from its centroids and the stored list assignments."""
+        centroid_path = self.path / self.CENTROID_FILE
+        if not centroid_path.exists():
+            self.index = None
+            return
+
+        probe = self._db.execute("SELECT value FROM settings WHERE key = 'index_probe'").fetchone()
+        index = IVFIndex(np.load(centroid_path), int(probe[0]) if probe else None)
+        assigned = np.array(
+            self._db.execute("SELECT row, list FROM entries WHERE list IS NOT NULL").fetchall(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        index.add(assigned[:, 0], assigned[:, 1])
+        self.index = index
+
+    def _flush_vectors(self) -> None:
+        """Write dirty vector pages to disk."""
+        self._vectors.flush()
+        if self._scales is not None:
+            self._scales.flush()
@@ -0,0 +1,638 @@
+"""Pooled, rate-limited HTTP fetching with a content-addressed response cache.
+
+``HttpFetcher`` keeps idle keep-alive connections per host and bounds the
+number of fetches in progress. It spaces requests to each host with a
+token bucket and streams bodies to disk in chunks, stopping at a size cap.
+Responses are kept in a content-addressed blob store indexed by URL in
+SQLite. Cached responses are served while fresh under Cache-Control or
+Expires, and revalidated with If-None-Match / If-Modified-Since after that.
+
+``fetch_url`` wraps a shared fetcher for agents; ``FETCH_TOOL`` is the
+ready-made ``AegisTool``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+
+from pydantic import BaseModel, Field
+
+from aegis.agents.base import AegisTool
+from aegis.utils.logger import setup_logger
+from aegis.utils.paths import cache_dir
+
+_STATE: Dict[str, Any] = {"fetcher": None}
+_STATE_LOCK = threading.Lock()
+
+_CHUNK_BYTES = 64 * 1024
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Errors meaning a pooled keep-alive connection was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fresh_until REAL NOT NULL,
+    stored_at REAL NOT NULL
+);
+"""
+
+HostKey = Tuple[str, str, int]
+
+
+class FetchError(RuntimeError):
+    """Raised when a URL cannot be fetched: bad URL, network failure or too many redirects."""
+
+
+class FetchResponse(BaseModel):
+    """A fetched (or cached) response; the body lives in ``body_path`` or, with caching off, ``body``."""
+
+    url: str = Field(..., description="Final URL after redirects.")
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict, description="Response headers, lower-cased names.")
+    size: int = Field(0, description="Body bytes kept, after decompression.")
+    content_hash: Optional[str] = Field(None, description="SHA-256 of the kept body.")
+    truncated: bool = Field(False, description="Whether the body was cut off at the size cap.")
+    from_cache: bool = False
+    revalidated: bool = Field(False, description="Served from cache after a 304 Not Modified.")
+    elapsed_seconds: float = 0.0
+    body_path: Optional[str] = None
+    body: Optional[bytes] = None
+
+    def read(self, limit: Optional[int] = None) -> bytes:
+        """Up to ``limit`` bytes of the body (all of it when None)."""
+        if self.body is not None:
+            return self.body if limit is None else self.body[:limit]
+        if self.body_path is None:
+            return b''
+        with open(self.body_path, 'rb') as file:
+            return file.read() if limit is None else file.read(limit)
+
+    def text(self, limit: Optional[int] = None) -> str:
+        """The body decoded with the charset from Content-Type, defaulting to UTF-8."""
+        charset = 'utf-8'
+        for parameter in self.headers.get('content-type', '').split(';')[1:]:
+            name, _, value = parameter.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"\'')
+        try:
+            return self.read(limit).decode(charset, errors='replace')
+        except LookupError:
+            return self.read(limit).decode('utf-8', errors='replace')
+
+
+class FetcherStats(BaseModel):
+    """Counters of an ``HttpFetcher``."""
+
+    requests: int = 0
+    cache_hits: int = Field(0, description="Served from cache without contacting the server.")
+    revalidated: int = Field(0, description="Served from cache after a 304.")
+    network_fetches: int = Field(0, description="Full responses downloaded.")
+    bytes_downloaded: int = 0
+    truncated: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    rate_limited_seconds: float = Field(0.0, description="Total time spent waiting on per-host rate limits.")
+
+
+class _DeflateDecoder:
+    """
+    Decoder for ``Content-Encoding: deflate``.
+
+    The encoding is meant to be zlib-wrapped, but some servers send a bare
+    deflate stream; if the zlib header is rejected the buffered input is
+    replayed through a raw decoder.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = zlib.decompressobj()
+        self._head: Optional[bytes] = b''
+
+    def decompress(self, data: bytes, max_length: int = 0) -> bytes:
+        if self._head is None:
+            return self._decoder.decompress(data, max_length)
+        self._head += data
+        try:
+            output = self._decoder.decompress(data, max_length)
+        except zlib.error:
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            head, self._head = self._head, None
+            return self._decoder.decompress(head, max_length)
+        if len(self._head) >= 2:
+            # The two-byte zlib header has been accepted.
+            self._head = None
+        return output
+
+
+class _TokenBucket:
+    """Allow ``rate`` requests per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; return the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class _ResponseCache:
+    """URL index in SQLite over a directory of bodies named by their SHA-256."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.blobs = root / 'blobs'
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(root / 'index.sqlite', check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few index writes on a crash only costs refetches.
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def blob_path(self, content_hash: str) -> Path:
+        return self.blobs / content_hash[:2] / content_hash
+
+    def new_temp(self) -> Any:
+        return tempfile.NamedTemporaryFile(dir=self.blobs, prefix='.partial-', delete=False)
+
+    def commit_blob(self, temp_path: str, content_hash: str) -> Path:
+        """Move a finished download into place; identical content is stored once."""
+        target = self.blob_path(content_hash)
+        if target.exists():
+            os.unlink(temp_path)
+        else:
+            target.parent.mkdir(exist_ok=True)
+            os.replace(temp_path, target)
+        return target
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, content_hash, size, etag, last_modified, fresh_until FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, content_hash, size, etag, last_modified, fresh_until = row
+        if not self.blob_path(content_hash).exists():
+            self.forget(url)
+            return None
+        return {
+            'status': status,
+            'headers': json.loads(headers),
+            'content_hash': content_hash,
+            'size': size,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh_until': fresh_until,
+        }
+
+    def store(self, url: str, status: int, headers: Dict[str, str], content_hash: str, size: int, fresh_until: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, status, headers, content_hash, size, etag, last_modified, fresh_until, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(headers), content_hash, size, headers.get('etag'),
+                 headers.get('last-modified'), fresh_until, time.time()),
+            )
+
+    def refresh(self, url: str, headers: Dict[str, str], fresh_until: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE responses SET headers = ?, etag = ?, last_modified = ?, fresh_until = ?, stored_at = ? WHERE url = ?",
+                (json.dumps(headers), headers.get('etag'), headers.get('last-modified'), fresh_until, time.time(), url),
+            )
+
+    def forget(self, url: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def prune(self, max_bytes: int) -> int:
+        """Drop the least recently stored entries beyond ``max_bytes`` and delete unreferenced blobs."""
+        with self._lock, self._db:
+            rows = self._db.execute("SELECT url, content_hash, size FROM responses ORDER BY stored_at DESC").fetchall()
+            kept, total, dropped = set(), 0, []
+            for url, content_hash, size in rows:
+                if content_hash in kept or total + size <= max_bytes:
+                    if content_hash not in kept:
+                        total += size
+                        kept.add(content_hash)
+                else:
+                    dropped.append((url,))
+            self._db.executemany("DELETE FROM responses WHERE url = ?", dropped)
+
+        removed = 0
+        cutoff = time.time() - 3600
+        for path in self.blobs.glob('*/*'):
+            if path.name not in kept:
+                path.unlink(missing_ok=True)
+                removed += 1
+        for path in self.blobs.glob('.partial-*'):
+            # Abandoned partial downloads; recent ones may still be in progress.
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class HttpFetcher:
+    """
+    Fetch URLs over pooled keep-alive connections with rate limits, size caps and caching.
+
+    At most ``max_concurrent`` requests are on the wire at once. Each host
+    gets ``per_host_rate`` requests per second with bursts of
+    ``per_host_burst``. Bodies beyond ``max_bytes`` (after decompression)
+    are cut off and reported as truncated; truncated bodies are not cached.
+    Responses without freshness information are treated as stale after
+    ``default_freshness`` seconds and revalidated if they carry a
+    validator. ``cache_root`` defaults to ``http`` under the Aegis cache
+    directory; ``use_cache=False`` keeps bodies in memory instead.
+    """
+
+    def __init__(
+        self,
+        cache_root: Optional[Union[str, os.PathLike]] = None,
+        use_cache: bool = True,
+        max_concurrent: int = 16,
+        per_host_rate: float = 10.0,
+        per_host_burst: int = 10,
+        max_idle_per_host: int = 4,
+        timeout: float = 15.0,
+        max_bytes: int = 10 * 1024 ** 2,
+        max_redirects: int = 5,
+        default_freshness: float = 0.0,
+        user_agent: str = 'Aegis/0.1',
+    ) -> None:
+        self.logger = setup_logger('HttpFetcher', module_code='TOOL', script_code='HTTP')
+        self.max_concurrent = max_concurrent
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_redirects = max_redirects
+        self.default_freshness = default_freshness
+        self.user_agent = user_agent
+
+        self.cache: Optional[_ResponseCache] = None
+        if use_cache:
+            self.cache = _ResponseCache(Path(cache_root) if cache_root is not None else cache_dir() / 'http')
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._idle: Dict[HostKey, Deque[http.client.HTTPConnection]] = {}
+        self._buckets: Dict[HostKey, _TokenBucket] = {}
+        self._stats = FetcherStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def fetch(self, url: str, headers: Optional[Mapping[str, str]] = None, max_bytes: Optional[int] = None) -> FetchResponse:
+        """GET ``url``, from the cache when fresh, following redirects."""
+        started = time.perf_counter()
+        self._count('requests')
+        limit = self.max_bytes if max_bytes is None else max_bytes
+
+        current = url
+        for _ in range(self.max_redirects + 1):
+            response, location = self._fetch_once(current, dict(headers or {}), limit)
+            if location is None:
+                return response.model_copy(update={'elapsed_seconds': time.perf_counter() - started})
+            current = urljoin(current, location)
+        raise FetchError(f"Too many redirects fetching {url}.")
+
+    def fetch_many(self, urls: Sequence[str], max_bytes: Optional[int] = None) -> List[Union[FetchResponse, FetchError]]:
+        """Fetch URLs concurrently; failures are returned in place as ``FetchError``."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='aegis-fetch')
+
+        def run(target: str) -> Union[FetchResponse, FetchError]:
+            try:
+                return self.fetch(target, max_bytes=max_bytes)
+            except FetchError as exc:
+                return exc
+
+        return list(self._executor.map(run, urls))
+
+    def stats(self) -> FetcherStats:
+        with self._lock:
+            return self._stats.model_copy()
+
+    def close(self) -> None:
+        """Close pooled connections, worker threads and the cache index."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
+    def _fetch_once(self, url: str, headers: Dict[str, str], limit: int) -> Tuple[FetchResponse, Optional[str]]:
+        """One request/response exchange; returns the redirect target instead of following it."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise FetchError(f"Unsupported URL '{url}'.")
+        key: HostKey = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        path = parts.path or '/'
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        cached = self.cache.lookup(url) if self.cache is not None else None
+        if cached is not None:
+            if cached['fresh_until'] > time.time() and 'no-cache' not in headers.get('cache-control', ''):
+                self._count('cache_hits')
+                return self._cached_response(url, cached, revalidated=False), None
+            if cached['etag']:
+                headers.setdefault('If-None-Match', cached['etag'])
+            if cached['last_modified']:
+                headers.setdefault('If-Modified-Since', cached['last_modified'])
+
+        headers.setdefault('User-Agent', self.user_agent)
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+
+        waited = self._bucket(key).acquire()
+        if waited:
+            with self._lock:
+                self._stats.rate_limited_seconds += waited
+
+        with self._slots:
+            connection, response = self._send(key, path, headers)
+            reusable = False
+            try:
+                response_headers = {name.lower(): value for name, value in response.getheaders()}
+
+                if response.status in _REDIRECT_STATUSES and 'location' in response_headers:
+                    reusable = self._drain(response, 64 * 1024)
+                    return FetchResponse(url=url, status=response.status, headers=response_headers), response_headers['location']
+
+                if response.status == 304 and cached is not None:
+                    reusable = self._drain(response, 64 * 1024)
+                    merged = dict(cached['headers'], **response_headers)
+                    self.cache.refresh(url, merged, self._fresh_until(merged))
+                    self._count('revalidated')
+                    cached['headers'] = merged
+                    return self._cached_response(url, cached, revalidated=True), None
+
+                result, reusable = self._download(url, response, response_headers, limit)
+                return result, None
+            except (OSError, http.client.HTTPException) as exc:
+                raise FetchError(f"Fetching {url} failed: {exc}") from exc
+            except zlib.error as exc:
+                raise FetchError(f"Could not decode the body of {url}: {exc}") from exc
+            finally:
+                self._release(key, connection, reusable and not response.will_close)
+
+    def _send(self, key: HostKey, path: str, headers: Dict[str, str]) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send the request on a pooled connection, retrying once on a fresh one if the pooled one went stale."""
+        connection, reused = self._acquire(key)
+        try:
+            connection.request('GET', path, headers=headers)
+            return connection, connection.getresponse()
+        except _STALE_CONNECTION_ERRORS as exc:
+            connection.close()
+            if not reused:
+                raise FetchError(f"Request to {key[1]} failed: {exc}") from exc
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise FetchError(f"Request to {key[1]} failed: {exc}") from exc
+
+        connection = self._connect(key)
+        try:
+            connection.request('GET', path, headers=headers)
+            return connection, connection.getresponse()
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise FetchError(f"Request to {key[1]} failed: {exc}") from exc
+
+    def _download(
+        self,
+        url: str,
+        response: http.client.HTTPResponse,
+        headers: Dict[str, str],
+        limit: int,
+    ) -> Tuple[FetchResponse, bool]:
+        """Stream the body through decompression and hashing to disk (or memory), stopping at ``limit``."""
+        encoding = headers.get('content-encoding', '').lower()
+        decoder = None
+        if encoding == 'gzip':
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            decoder = _DeflateDecoder()
+
+        digest = hashlib.sha256()
+        sink = self.cache.new_temp() if self.cache is not None else None
+        buffer = bytearray() if sink is None else None
+        size = 0
+        downloaded = 0
+        truncated = False
+        try:
+            while True:
+                chunk = response.read(_CHUNK_BYTES)
+                if not chunk:
+                    break
+                downloaded += len(chunk)
+                if decoder is not None:
+                    chunk = decoder.decompress(chunk, max(0, limit - size) + 1)
+                if size + len(chunk) > limit:
+                    chunk = chunk[:limit - size]
+                    truncated = True
+                digest.update(chunk)
+                if sink is not None:
+                    sink.write(chunk)
+                else:
+                    buffer.extend(chunk)
+                size += len(chunk)
+                if truncated:
+                    break
+            if sink is not None:
+                sink.close()
+        except BaseException:
+            if sink is not None:
+                sink.close()
+                os.unlink(sink.name)
+            raise
+
+        content_hash = digest.hexdigest()
+        with self._lock:
+            self._stats.network_fetches += 1
+            self._stats.bytes_downloaded += downloaded
+            self._stats.truncated += int(truncated)
+
+        body_path = None
+        if sink is not None:
+            body_path = str(self.cache.commit_blob(sink.name, content_hash))
+            cache_control = _parse_cache_control(headers.get('cache-control', ''))
+            if response.status == 200 and not truncated and 'no-store' not in cache_control:
+                self.cache.store(url, response.status, headers, content_hash, size, self._fresh_until(headers))
+
+        result = FetchResponse(
+            url=url,
+            status=response.status,
+            headers=headers,
+            size=size,
+            content_hash=content_hash,
+            truncated=truncated,
+            body_path=body_path,
+            body=bytes(buffer) if buffer is not None else None,
+        )
+        # A truncated body leaves unread data on the connection, so it cannot be reused.
+        return result, not truncated
+
+    def _cached_response(self, url: str, cached: Dict[str, Any], revalidated: bool) -> FetchResponse:
+        return FetchResponse(
+            url=url,
+            status=cached['status'],
+            headers=cached['headers'],
+            size=cached['size'],
+            content_hash=cached['content_hash'],
+            from_cache=True,
+            revalidated=revalidated,
+            body_path=str(self.cache.blob_path(cached['content_hash'])),
+        )
+
+    def _fresh_until(self, headers: Mapping[str, str]) -> float:
+        """Expiry time from Cache-Control max-age or Expires, else ``default_freshness`` from now."""
+        now = time.time()
+        cache_control = _parse_cache_control(headers.get('cache-control', ''))
+        if 'no-cache' in cache_control:
+            return now
+        max_age = cache_control.get('max-age')
+        if max_age is not None:
+            try:
+                return now + max(0, int(max_age))
+            except ValueError:
+                pass
+        expires = headers.get('expires')
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now + self.default_freshness
+
+    @staticmethod
+    def _drain(response: http.client.HTTPResponse, limit: int) -> bool:
+        """Discard a small body so the connection can be reused; False if it was too large."""
+        read = 0
+        while read <= limit:
+            chunk = response.read(_CHUNK_BYTES)
+            if not chunk:
+                return True
+            read += len(chunk)
+        return False
+
+    def _bucket(self, key: HostKey) -> _TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _TokenBucket(self.per_host_rate, self.per_host_burst)
+            return bucket
+
+    def _acquire(self, key: HostKey) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._stats.connections_reused += 1
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _connect(self, key: HostKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        with self._lock:
+            self._stats.connections_opened += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _release(self, key: HostKey, connection: http.client.HTTPConnection, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, deque())
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(connection)
+                    return
+        connection.close()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self._stats, counter, getattr(self._stats, counter) + 1)
+
+
+def get_fetcher() -> HttpFetcher:
+    """The process-wide fetcher used by ``fetch_url``, created on first use."""
+    if _STATE["fetcher"] is None:
+        with _STATE_LOCK:
+            if _STATE["fetcher"] is None:
+                _STATE["fetcher"] = HttpFetcher()
+    return _STATE["fetcher"]
+
+
+def fetch_url(url: str, max_chars: int = 20000) -> str:
+    """Fetch a web page and return up to ``max_chars`` characters of its text."""
+    response = get_fetcher().fetch(url)
+    if response.status >= 400:
+        return f"HTTP {response.status} fetching {response.url}."
+    text = response.text(limit=max_chars * 4)[:max_chars]
+    if response.truncated or len(text) == max_chars:
+        text += "\n[truncated]"
+    return text
+
+
+FETCH_TOOL = AegisTool(
+    name='fetch_url',
+    description="Fetch a web page by URL and return its text content.",
+    func=fetch_url,
+    timeout_seconds=60.0,
+    max_concurrency=16,
+)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from aegis.agents.base import AegisTool
+from aegis.core.profiler import record_tool_usage
+from aegis.utils.logger import setup_logger
+from aegis.utils.tracing import record_span, traced
+from aegis.utils.ttl_cache import TTLCache
+
+_CACHE_MISS = object()
+
+ToolCall = Tuple[AegisTool, Mapping[str, Any]]
+
+
+class ToolResult(BaseModel):
+    """The outcome of one tool call."""
+
+    tool_name: str
+    success: bool
+    output: Any = None
+    error: Optional[str] = None
+    duration_seconds: float = Field(0.0, description="Wall time from dispatch to completion.")
+    cpu_seconds: float = Field(0.0, description="CPU time the call used on its worker thread or process.")
+    cached: bool = Field(False, description="Whether the output was served from the result cache.")
+    timed_out: bool = False
+
+
+def _measured_call(func: Any, arguments: Dict[str, Any]) -> Tuple[Any, float]:
+    """Run a tool function and return its output with the CPU time it used; module-level so it pickles."""
+    started = time.thread_time()
+    output = func(**arguments)
+    return output, time.thread_time() - started
+
+
+class _PendingCall:
+    """A dispatched call awaiting collection."""
+
+    __slots__ = ('tool', 'cache_key', 'future', 'started', 'result')
+
+    def __init__(self, tool: AegisTool, cache_key: Optional[str]) -> None:
+        self.tool = tool
+        self.cache_key = cache_key
+        self.future: Optional[Future] = None
+        self.started = time.perf_counter()
+        self.result: Optional[ToolResult] = None
+
+
+class ToolRuntime:
+    """
+    Execute ``AegisTool`` calls on shared worker pools.
+
+    Each tool selects the thread or process pool and may set a per-call
+    timeout, a concurrency limit and opt in to result memoization keyed by
+    tool name and normalised arguments. ``run_many`` dispatches independent
+    calls together so they run in parallel.
+
+    A timed-out call keeps its worker and concurrency slot until the
+    underlying function returns; Python cannot interrupt it. A call waits at
+    most its timeout for a free concurrency slot before it times out too.
+    """
+
+    def __init__(
+        self,
+        max_threads: int = 8,
+        max_processes: Optional[int] = None,
+        cache_size: int = 256,
+        default_cache_ttl: Optional[float] = 300.0,
+    ) -> None:
+        self.logger = setup_logger('ToolRuntime', module_code='TOOL', script_code='RUN')
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.cache = TTLCache(maxsize=cache_size, ttl=default_cache_ttl)
+        self._threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='aegis-tool')
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def run(self, tool: AegisTool, arguments: Optional[Mapping[str, Any]] = None) -> ToolResult:
+        """Run a single tool call and wait for its result."""
+        return self.run_many([(tool, arguments or {})])[0]
+
+    @traced('ToolRuntime.run_many', category='tool')
+    def run_many(self, calls: Sequence[ToolCall]) -> List[ToolResult]:
+        """Run independent tool calls in parallel and return their results in order."""
+        pending = [self._dispatch(tool, arguments) for tool, arguments in calls]
+        results = [self._collect(call) for call in pending]
+        for call, result in zip(pending, results):
+            record_tool_usage(result.cpu_seconds)
+            record_span(
+                f"tool:{result.tool_name}",
+                'tool',
+                int(call.started * 1e9),
+                int((call.started + result.duration_seconds) * 1e9),
+                success=result.success,
+                cached=result.cached,
+            )
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Result cache counters."""
+        return self.cache.stats()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pools."""
+        self._threads.shutdown(wait=wait, cancel_futures=not wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _dispatch(self, tool: AegisTool, arguments: Mapping[str, Any]) -> _PendingCall:
+        """Serve a call from the cache or submit it to its pool."""
+        cache_key = self._cache_key(tool, arguments) if tool.cacheable else None
+        call = _PendingCall(tool, cache_key)
+
+        if cache_key is not None:
+            cached = self.cache.get(cache_key, _CACHE_MISS)
+            if cached is not _CACHE_MISS:
+                self.logger.debug("Cache hit for tool '%s'.", tool.name)
+                call.result = ToolResult(tool_name=tool.name, success=True, output=cached, cached=True)
+                return call
+
+        semaphore = self._semaphore_for(tool)
+        if semaphore is not None and not semaphore.acquire(timeout=tool.timeout_seconds):
+            self.logger.warning(
+                "Tool '%s' waited %.2fs for a concurrency slot without getting one.",
+                tool.name,
+                tool.timeout_seconds,
+                extra={'error_code': 'TOOL-SLOT-TIMEOUT'}
+            )
+            call.result = self._timed_out(
+                tool, f"Timed out after {tool.timeout_seconds}s waiting for a concurrency slot.", call.started
+            )
+            return call
+
+        try:
+            call.started = time.perf_counter()
+            call.future = self._executor_for(tool).submit(_measured_call, tool.func, dict(arguments))
+        except Exception as exc:  # noqa: BLE001 - e.g. pool shut down or unpicklable arguments
+            if semaphore is not None:
+                semaphore.release()
+            call.result = self._failure(tool, f"Dispatch failed: {exc}", call.started)
+            return call
+
+        if semaphore is not None:
+            call.future.add_done_callback(lambda _: semaphore.release())
+        return call
+
+    def _collect(self, call: _PendingCall) -> ToolResult:
+        """Wait for a dispatched call within its timeout and build its result."""
+        if call.result is not None:
+            return call.result
+
+        tool = call.tool
+        timeout = None
+        if tool.timeout_seconds is not None:
+            timeout = max(0.0, tool.timeout_seconds - (time.perf_counter() - call.started))
+
+        try:
+            output, cpu_seconds = call.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            call.future.cancel()
+            self.logger.warning(
+                "Tool '%s' timed out after %.2fs.",
+                tool.name,
+                tool.timeout_seconds,
+                extra={'error_code': 'TOOL-TIMEOUT'}
+            )
+            return self._timed_out(tool, f"Timed out after {tool.timeout_seconds}s.", call.started)
+        except Exception as exc:  # noqa: BLE001 - tool failures are reported, not raised
+            self.logger.error(
+                "Tool '%s' raised %s: %s",
+                tool.name,
+                type(exc).__name__,
+                exc,
+                extra={'error_code': 'TOOL-FAIL'}
+            )
+            return self._failure(tool, f"{type(exc).__name__}: {exc}", call.started)
+
+        if call.cache_key is not None:
+            self.cache.set(call.cache_key, output, ttl=tool.cache_ttl_seconds)
+
+        return ToolResult(
+            tool_name=tool.name,
+            success=True,
+            output=output,
+            duration_seconds=time.perf_counter() - call.started,
+            cpu_seconds=cpu_seconds,
+        )
+
+    def _executor_for(self, tool: AegisTool) -> Executor:
+        """Return the pool a tool runs on, starting the process pool on first use."""
+        if tool.executor != 'process':
+            return self._threads
+        if self._processes is None:
+            with self._lock:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(max_workers=self.max_processes)
+                    self.logger.info("Started process pool for tool execution.")
+        return self._processes
+
+    def _semaphore_for(self, tool: AegisTool) -> Optional[threading.BoundedSemaphore]:
+        """Return the semaphore enforcing a tool's concurrency limit, if it has one."""
+        if tool.max_concurrency is None:
+            return None
+        with self._lock:
+            semaphore = self._semaphores.get(tool.name)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(tool.max_concurrency)
+                self._semaphores[tool.name] = semaphore
+            return semaphore
+
+    @staticmethod
+    def _cache_key(tool: AegisTool, arguments: Mapping[str, Any]) -> str:
+        """Normalise a call into a cache key independent of argument order."""
+        normalised = json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=repr)
+        return f"{tool.name}:{normalised}"
+
+    @staticmethod
+    def _failure(tool: AegisTool, error: str, started: float) -> ToolResult:
+        """Build a failed result."""
+        return ToolResult(
+            tool_name=tool.name,
+            success=False,
+            error=error,
+            duration_seconds=time.perf_counter() - started,
+        )
+
+    @classmethod
+    def _timed_out(cls, tool: AegisTool, error: str, started: float) -> ToolResult:
+        """Build a failed result flagged as a timeout."""
+        return cls._failure(tool, error, started).model_copy(update={'timed_out': True})
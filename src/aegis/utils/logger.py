@@ -1,18 +1,34 @@
+import atexit
+import copy
 import logging
 import os
+import queue
+import threading
 import time
 from datetime import datetime
 from logging import LogRecord
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 LOG_DIR = "logs"
 LOG_LEVEL = logging.DEBUG
 LOG_RETENTION_DAYS = 7
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_ROTATION_INTERVAL_SECONDS = 24 * 60 * 60
+LOG_BACKUP_COUNT = 10
+
+LOG_FORMAT = (
+    "%(asctime)s | %(levelname)-8s | %(module_code)s-%(script_code)s | %(error_code)s | "
+    "%(name)-15s | %(message)s"
+)
+DATE_FORMAT = "%d/%m/%Y - %H:%M:%S"
 
 _LOGGER_METADATA: Dict[str, Tuple[str, str]] = {}
 _ORIGINAL_RECORD_FACTORY = logging.getLogRecordFactory()
-_STATE = {"record_factory_initialized": False}
+_STATE: Dict[str, Any] = {"record_factory_initialized": False, "queue_handler": None, "listener": None}
+_BACKEND_LOCK = threading.Lock()
+_TRACEBACK_FORMATTER = logging.Formatter()
 
 
 def _ensure_record_factory_initialized() -> None:
@@ -41,6 +57,79 @@ class _DefaultErrorCodeFilter(logging.Filter):
         return True
 
 
+class _SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """A buffered file handler that rotates on size or elapsed time, whichever comes first.
+
+    Records are written without a flush per line; the queue listener flushes
+    the sink whenever its queue drains.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, interval_seconds: float, backup_count: int) -> None:
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval_seconds = interval_seconds
+        self.rollover_at = time.time() + interval_seconds
+
+    def shouldRollover(self, record: LogRecord) -> bool:  # noqa: N802 - logging API name
+        if self.interval_seconds > 0 and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:  # noqa: N802 - logging API name
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval_seconds
+
+    def emit(self, record: LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:  # noqa: BLE001 - logging must never raise into callers
+            self.handleError(record)
+
+
+class _RawQueueHandler(QueueHandler):
+    """A queue handler that enqueues records with their message rendered but not formatted.
+
+    The message and any traceback are rendered on the calling thread, as the
+    stock handler does, so the log shows arguments as they were when logged.
+    Applying the line format and writing are left to the listener thread.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+        # Copy so other handlers of the same record still see the original.
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _flush_quietly(handler: logging.Handler) -> None:
+    """Flush ``handler``, ignoring a stream that was already closed (e.g. at interpreter exit)."""
+
+    try:
+        handler.flush()
+    except (OSError, ValueError):
+        pass
+
+
+class _FlushingQueueListener(QueueListener):
+    """A queue listener that flushes its handlers each time the queue runs empty."""
+
+    def dequeue(self, block: bool) -> LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                _flush_quietly(handler)
+            return self.queue.get(block)
+
+
 def prune_old_logs(log_dir: str, max_age_days: int) -> None:
     """Delete log files in ``log_dir`` older than ``max_age_days`` days."""
 
@@ -52,7 +141,8 @@ def prune_old_logs(log_dir: str, max_age_days: int) -> None:
         return
 
     cutoff = time.time() - (max_age_days * 86400)
-    for log_file in directory.glob("*.log"):
+    # Match rotated backups (``*.log.1``...) as well as active files.
+    for log_file in directory.glob("*.log*"):
         try:
             if log_file.stat().st_mtime < cutoff:
                 log_file.unlink()
@@ -61,6 +151,68 @@ def prune_old_logs(log_dir: str, max_age_days: int) -> None:
             continue
 
 
+def _ensure_backend_initialized(max_log_age_days: int) -> QueueHandler:
+    """Set up the process-wide queue, sinks and listener thread exactly once."""
+
+    with _BACKEND_LOCK:
+        queue_handler: Optional[QueueHandler] = _STATE["queue_handler"]
+        if queue_handler is not None:
+            return queue_handler
+
+        prune_old_logs(LOG_DIR, max_log_age_days)
+        os.makedirs(LOG_DIR, exist_ok=True)
+
+        timestamp = datetime.now().strftime("%d-%m-%Y--%H-%M-%S")
+        log_file = os.path.join(LOG_DIR, f"aegis-run--{timestamp}.log")
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        console_handler.addFilter(_DefaultErrorCodeFilter())
+
+        file_handler = _SizeAndTimeRotatingFileHandler(
+            log_file,
+            max_bytes=LOG_MAX_BYTES,
+            interval_seconds=LOG_ROTATION_INTERVAL_SECONDS,
+            backup_count=LOG_BACKUP_COUNT,
+        )
+        file_handler.setFormatter(formatter)
+        file_handler.addFilter(_DefaultErrorCodeFilter())
+
+        log_queue: "queue.SimpleQueue[LogRecord]" = queue.SimpleQueue()
+        queue_handler = _RawQueueHandler(log_queue)
+        listener = _FlushingQueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+        listener.start()
+
+        _STATE["queue_handler"] = queue_handler
+        _STATE["listener"] = listener
+        atexit.register(shutdown_logging)
+        return queue_handler
+
+
+def shutdown_logging() -> None:
+    """Drain queued records, flush the sinks and stop the listener thread.
+
+    The queue handler is detached from every configured logger so nothing is
+    enqueued after the listener stops; the next ``setup_logger`` call starts a
+    fresh backend and reattaches it.
+    """
+
+    with _BACKEND_LOCK:
+        listener: Optional[QueueListener] = _STATE["listener"]
+        if listener is None:
+            return
+        queue_handler: Optional[QueueHandler] = _STATE["queue_handler"]
+        for name in _LOGGER_METADATA:
+            logging.getLogger(name).removeHandler(queue_handler)
+        listener.stop()
+        for handler in listener.handlers:
+            _flush_quietly(handler)
+            handler.close()
+        _STATE["listener"] = None
+        _STATE["queue_handler"] = None
+
+
 def setup_logger(
     name: str,
     module_code: str = "0000",
@@ -69,43 +221,23 @@ def setup_logger(
 ):
     """Configure and return a centralized logger.
 
-    The logger writes to a fresh timestamped log file on every run and uses a
-    console handler for immediate feedback. Log files older than ``max_log_age_days``
-    are automatically pruned at startup.
+    All loggers share one process-wide backend: records are enqueued on the
+    caller's thread and written by a single listener thread to the console and
+    to one timestamped log file per run, rotated by size and age. Log files
+    older than ``max_log_age_days`` are pruned once, when the backend is first
+    set up.
     """
 
     _LOGGER_METADATA[name] = (module_code, script_code)
     _ensure_record_factory_initialized()
-
-    prune_old_logs(LOG_DIR, max_log_age_days)
-
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-
-    timestamp = datetime.now().strftime("%d-%m-%Y--%H-%M-%S")
-    log_file = os.path.join(LOG_DIR, f"aegis-run--{timestamp}.log")
-
-    log_format = (
-        "%(asctime)s | %(levelname)-8s | %(module_code)s-%(script_code)s | %(error_code)s | "
-        "%(name)-15s | %(message)s"
-    )
-    date_format = "%d/%m/%Y - %H:%M:%S"
+    queue_handler = _ensure_backend_initialized(max_log_age_days)
 
     logger = logging.getLogger(name)
     logger.setLevel(LOG_LEVEL)
     logger.propagate = False
 
-    if logger.hasHandlers():
+    if logger.handlers != [queue_handler]:
         logger.handlers.clear()
-
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
-    console_handler.addFilter(_DefaultErrorCodeFilter())
-    logger.addHandler(console_handler)
-
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
-    file_handler.addFilter(_DefaultErrorCodeFilter())
-    logger.addHandler(file_handler)
+        logger.addHandler(queue_handler)
 
     return logger
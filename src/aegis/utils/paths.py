@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """Return the directory for Aegis's on-disk caches, creating it if needed.
+
+    ``AEGIS_CACHE_DIR`` takes precedence, then ``$XDG_CACHE_HOME/aegis``, then
+    ``~/.cache/aegis``.
+    """
+
+    override = os.environ.get("AEGIS_CACHE_DIR")
+    if override:
+        directory = Path(override)
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+        directory = Path(base) / "aegis"
+
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
@@ -0,0 +1,301 @@
+"""Lightweight span tracing with in-process latency histograms and Chrome-trace export.
+
+Tracing is off unless ``AEGIS_TRACE`` is set or ``enable_tracing`` is called.
+While off, ``span`` returns a shared no-op context manager and ``traced``
+functions make one flag check before calling straight through.
+
+Spans nest through a context variable, so parentage follows the caller into
+asyncio tasks and ``asyncio.to_thread``; work handed to other threads keeps
+its parent when submitted through ``contextvars.copy_context().run``. Each
+thread, and each asyncio task, gets its own track in the exported trace.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar, Union
+
+from pydantic import BaseModel
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+_STATE: Dict[str, Any] = {"enabled": False, "tracer": None}
+_CURRENT_SPAN: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('aegis_current_span', default=None)
+_SPAN_IDS = itertools.count(1)
+
+
+class Span:
+    """One timed operation; ``start_ns``/``end_ns`` are ``time.perf_counter_ns`` readings."""
+
+    __slots__ = ('span_id', 'parent_id', 'name', 'category', 'start_ns', 'end_ns', 'track', 'args', '_token')
+
+    def __init__(self, name: str, category: str, args: Optional[Dict[str, Any]] = None) -> None:
+        self.span_id = next(_SPAN_IDS)
+        parent = _CURRENT_SPAN.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.category = category
+        self.args = args
+        self.track = _current_track()
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    def __enter__(self) -> 'Span':
+        self._token = _CURRENT_SPAN.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.end_ns = time.perf_counter_ns()
+        if self._token is not None:
+            _CURRENT_SPAN.reset(self._token)
+            self._token = None
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        tracer = _STATE["tracer"]
+        if tracer is not None:
+            tracer.record(self)
+
+
+class _NoopSpan:
+    """Stand-in returned by ``span`` while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class LatencySummary(BaseModel):
+    """Aggregated latency of every span with one name."""
+
+    name: str
+    count: int
+    mean_us: float
+    p50_us: float
+    p99_us: float
+    max_us: float
+
+
+class LatencyHistogram:
+    """
+    Counts of span durations in power-of-two microsecond buckets.
+
+    Bucket ``i`` holds durations below ``2**i`` microseconds, so percentiles
+    are upper bounds within a factor of two; count, mean and max are exact.
+    """
+
+    BUCKETS = 40
+
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, duration_ns: int) -> None:
+        self.counts[min((duration_ns // 1000).bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile_us(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q``-th percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(float(2 ** index), self.max_ns / 1000.0)
+        return self.max_ns / 1000.0
+
+
+class Tracer:
+    """Collects finished spans in a bounded buffer and per-name latency histograms."""
+
+    def __init__(self, capacity: int = 100_000) -> None:
+        self.capacity = capacity
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, finished: Span) -> None:
+        """Store a finished span and add it to its histogram."""
+        with self._lock:
+            self._spans.append(finished)
+            histogram = self._histograms.get(finished.name)
+            if histogram is None:
+                histogram = self._histograms[finished.name] = LatencyHistogram()
+            histogram.add(finished.duration_ns)
+
+    def spans(self) -> List[Span]:
+        """Finished spans still held, oldest first."""
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self) -> List[LatencySummary]:
+        """Latency figures per span name, slowest total time first."""
+        with self._lock:
+            histograms = list(self._histograms.items())
+        summaries = [
+            LatencySummary(
+                name=name,
+                count=histogram.count,
+                mean_us=histogram.total_ns / histogram.count / 1000.0,
+                p50_us=histogram.percentile_us(50),
+                p99_us=histogram.percentile_us(99),
+                max_us=histogram.max_ns / 1000.0,
+            )
+            for name, histogram in histograms
+            if histogram.count
+        ]
+        summaries.sort(key=lambda item: item.mean_us * item.count, reverse=True)
+        return summaries
+
+    def reset(self) -> None:
+        """Discard recorded spans and histograms."""
+        with self._lock:
+            self._spans.clear()
+            self._histograms.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The held spans as a Chrome trace / Perfetto JSON object."""
+        pid = os.getpid()
+        spans = self.spans()
+        events: List[Dict[str, Any]] = []
+        track_ids: Dict[Tuple[int, Optional[int]], int] = {}
+        for item in spans:
+            thread_id, task_id, label = item.track
+            key = (thread_id, task_id)
+            tid = track_ids.get(key)
+            if tid is None:
+                tid = track_ids[key] = len(track_ids) + 1
+                events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid, 'args': {'name': label}})
+            args = {'span_id': item.span_id, 'parent_id': item.parent_id}
+            if item.args:
+                args.update({arg: value if isinstance(value, (int, float, bool)) else str(value) for arg, value in item.args.items()})
+            events.append({
+                'ph': 'X',
+                'name': item.name,
+                'cat': item.category,
+                'ts': item.start_ns / 1000.0,
+                'dur': item.duration_ns / 1000.0,
+                'pid': pid,
+                'tid': tid,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path: Union[str, os.PathLike]) -> Path:
+        """Write the held spans as a trace file loadable in chrome://tracing or ui.perfetto.dev."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(self.chrome_trace()), encoding='utf-8')
+        return target
+
+
+def _current_track() -> Tuple[int, Optional[int], str]:
+    """Identify the thread, and asyncio task if any, that a span runs on."""
+    thread = threading.current_thread()
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is None:
+        return thread.ident or 0, None, thread.name
+    return thread.ident or 0, id(task), f"{thread.name} / {task.get_name()}"
+
+
+def enable_tracing(capacity: int = 100_000) -> Tracer:
+    """Start recording spans, keeping the existing tracer if there is one."""
+    if _STATE["tracer"] is None:
+        _STATE["tracer"] = Tracer(capacity)
+    _STATE["enabled"] = True
+    return _STATE["tracer"]
+
+
+def disable_tracing() -> None:
+    """Stop recording spans; recorded data is kept until ``get_tracer().reset()``."""
+    _STATE["enabled"] = False
+
+
+def tracing_enabled() -> bool:
+    return _STATE["enabled"]
+
+
+def get_tracer() -> Optional[Tracer]:
+    """The process-wide tracer, or None if tracing was never enabled."""
+    return _STATE["tracer"]
+
+
+def span(name: str, category: str = 'aegis', **args: Any) -> Union[Span, _NoopSpan]:
+    """Context manager timing the enclosed block as a span named ``name``."""
+    if not _STATE["enabled"]:
+        return _NOOP_SPAN
+    return Span(name, category, args or None)
+
+
+def record_span(name: str, category: str, start_ns: int, end_ns: int, **args: Any) -> None:
+    """Record a span measured elsewhere, such as work timed on another thread or process."""
+    if not _STATE["enabled"]:
+        return
+    finished = Span(name, category, args or None)
+    finished.start_ns = start_ns
+    finished.end_ns = end_ns
+    _STATE["tracer"].record(finished)
+
+
+def traced(name: Optional[str] = None, category: str = 'aegis') -> Callable[[F], F]:
+    """Decorator recording each call of a function or coroutine function as a span."""
+
+    def decorate(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not _STATE["enabled"]:
+                    return await func(*args, **kwargs)
+                with Span(span_name, category):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _STATE["enabled"]:
+                return func(*args, **kwargs)
+            with Span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+if os.environ.get("AEGIS_TRACE", "").strip().lower() not in ("", "0", "false", "no"):
+    enable_tracing()
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries also expire after a time-to-live.
+
+    ``maxsize`` bounds the number of entries; the least recently used entry is
+    evicted first. ``ttl`` (seconds) is the default lifetime, overridable per
+    entry; ``None`` means entries only leave through LRU eviction.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` if absent or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` with ``ttl`` seconds to live (the cache default if None)."""
+
+        lifetime = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + lifetime if lifetime is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove ``key`` and return its value, or ``default`` if absent."""
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        """Remove every entry; counters are kept."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss, eviction and expiration counters plus the current size."""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+            }
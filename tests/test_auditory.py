@@ -0,0 +1,103 @@
+"""AudioPipeline segmentation on synthetic audio: speech bursts in background noise."""
+
+import io
+
+import numpy as np
+
+from aegis.auditory.models import AudioFormat
+from aegis.auditory.pipeline import AudioPipeline
+from aegis.auditory.sources import iter_pcm
+from aegis.auditory.vad import SpeechSegmenter
+
+
+def _synthetic(rate, seconds, spans, seed=3):
+    """Low-level noise with a loud harmonic tone wherever ``spans`` say."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    audio = 0.003 * rng.normal(size=len(t))
+    for start, stop in spans:
+        voiced = (t >= start) & (t < stop)
+        audio[voiced] += 0.2 * np.sin(2 * np.pi * 150 * t[voiced]) + 0.1 * np.sin(2 * np.pi * 450 * t[voiced])
+    return audio.astype(np.float32)
+
+
+def _chunks(audio, size=4096):
+    return (audio[offset:offset + size] for offset in range(0, len(audio), size))
+
+
+def test_segments_follow_speech_bursts():
+    spans = [(1.0, 2.5), (4.0, 4.6), (6.0, 8.0)]
+    audio = _synthetic(16000, 10.0, spans)
+    pipeline = AudioPipeline(16000)
+    segments = list(pipeline.segments(_chunks(audio)))
+
+    assert len(segments) == len(spans)
+    for segment, (start, stop) in zip(segments, spans):
+        assert abs(segment.start_seconds - start) < 0.25
+        assert abs(segment.end_seconds - stop) < 0.25
+        assert not segment.truncated
+        assert len(segment.samples) == round(segment.duration_seconds * 16000)
+    assert [segment.index for segment in segments] == [0, 1, 2]
+    assert pipeline.stats.segments == 3
+    assert abs(pipeline.stats.audio_seconds - 10.0) < 1e-6
+
+
+def test_resampled_stream_keeps_timing():
+    spans = [(1.0, 2.0), (3.5, 5.0)]
+    segments = list(AudioPipeline(44100).segments(_chunks(_synthetic(44100, 6.0, spans), size=1000)))
+    assert len(segments) == 2
+    for segment, (start, stop) in zip(segments, spans):
+        assert segment.sample_rate == 16000
+        assert abs(segment.start_seconds - start) < 0.25
+        assert abs(segment.end_seconds - stop) < 0.25
+
+
+def test_silence_and_short_clicks_produce_no_segments():
+    audio = _synthetic(16000, 5.0, [(2.0, 2.03)])
+    assert list(AudioPipeline(16000).segments(_chunks(audio))) == []
+
+
+def test_long_speech_is_cut_at_max_segment_length():
+    audio = _synthetic(16000, 9.0, [(1.0, 8.0)])
+    pipeline = AudioPipeline(16000, max_segment_seconds=2.0)
+    segments = list(pipeline.segments(_chunks(audio)))
+
+    assert len(segments) == 4
+    assert all(segment.truncated for segment in segments[:-1])
+    assert not segments[-1].truncated
+    assert all(segment.duration_seconds <= 2.0 + 1e-9 for segment in segments)
+    for previous, current in zip(segments, segments[1:]):
+        assert current.start_seconds == previous.end_seconds
+    assert abs(segments[0].start_seconds - 1.0) < 0.25
+    assert abs(segments[-1].end_seconds - 8.0) < 0.25
+    assert pipeline.stats.buffer_bytes == pipeline.ring.nbytes
+
+
+def test_segmenter_is_independent_of_block_boundaries():
+    rng = np.random.default_rng(11)
+    flags = np.repeat(rng.random(200) < 0.5, rng.integers(1, 20, size=200))
+
+    def run(block):
+        segmenter = SpeechSegmenter(min_speech_frames=3, min_silence_frames=10, padding_frames=2, max_segment_frames=40)
+        spans = []
+        for offset in range(0, len(flags), block):
+            spans.extend(segmenter.push(flags[offset:offset + block]))
+        return spans + segmenter.flush()
+
+    reference = run(len(flags))
+    assert reference
+    for block in (1, 7, 33, 100):
+        assert run(block) == reference
+    assert all(stop - start <= 40 for start, stop, _ in reference)
+
+
+def test_pcm_stream_decodes_stereo_to_mono():
+    audio_format = AudioFormat(sample_rate=8000, channels=2, sample_width=2)
+    left = np.array([0, 16384, -16384, 32767], dtype='<i2')
+    right = np.array([0, 16384, 16384, 32767], dtype='<i2')
+    data = np.column_stack((left, right)).tobytes()
+
+    chunks = list(iter_pcm(io.BytesIO(data), audio_format, chunk_frames=3))
+    samples = np.concatenate(chunks)
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    np.testing.assert_allclose(samples, [0.0, 0.5, 0.0, 32767 / 32768], atol=1e-6)
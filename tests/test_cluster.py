@@ -0,0 +1,128 @@
+"""ClusterHardwareManager over NodeAgent processes on localhost, each serving fake hardware."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from aegis.hardware.cluster import ClusterHardwareManager, NodeAgent
+
+from benchmarks.fakes import FakeNVML, fake_backends
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _spawn(name, vram, gpus, listen='127.0.0.1:0', interval=0.1):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(REPO_ROOT / 'src'), str(REPO_ROOT)]))
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'benchmarks.bench_cluster', '--serve-node', '--name', name, '--listen', listen,
+            '--vram', str(vram), '--gpus', str(gpus), '--interval', str(interval),
+        ],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    address = process.stdout.readline().strip()
+    if not address:
+        process.kill()
+        raise RuntimeError(f"Node {name} failed to start.")
+    return process, address
+
+
+def _wait(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def nodes():
+    processes = {}
+    addresses = {}
+    try:
+        for index in range(3):
+            name = f'node{index}'
+            processes[name], addresses[name] = _spawn(name, vram=8.0 * (index + 1), gpus=1 + index % 2)
+        yield processes, addresses
+    finally:
+        for process in processes.values():
+            process.kill()
+            process.wait()
+
+
+def test_placement_staleness_and_reconnect(nodes):
+    processes, addresses = nodes
+    cluster = ClusterHardwareManager(addresses, backoff_initial=0.05, backoff_max=0.2)
+    try:
+        assert cluster.wait_until_ready(timeout=20.0)
+        best = cluster.node_with_most_free_vram()
+        assert best.node == 'node2' and best.free_vram_gb == 24.0 * 0.75
+        assert len(cluster.gpu_candidates()) == 1 + 2 + 1
+        assert cluster.node_with_most_free_vram(min_free_vram_gb=100.0) is None
+        assert set(cluster.nodes_with_device('NPU')) == set(addresses)
+
+        processes['node2'].kill()
+        processes['node2'].wait()
+        assert _wait(lambda: cluster.get_snapshot('node2') is None)
+        assert cluster.node_with_most_free_vram().node == 'node1'
+        assert cluster.get_snapshot('node2', allow_stale=True) is not None
+
+        processes['node2'], _ = _spawn('node2', vram=24.0, gpus=1, listen=addresses['node2'])
+        assert _wait(lambda: cluster.get_snapshot('node2') is not None)
+        assert cluster.node_with_most_free_vram().node == 'node2'
+        status = next(item for item in cluster.statuses() if item.name == 'node2')
+        assert status.connected and status.reconnects >= 1
+    finally:
+        cluster.close()
+
+
+def test_local_node_reuses_its_snapshot_within_the_window():
+    with fake_backends():
+        from aegis.hardware.manager import HardwareManager
+
+        local = HardwareManager(nvml=FakeNVML(gpu_count=1, vram_total_gb=48.0), use_static_cache=False)
+        cluster = ClusterHardwareManager({}, local=local)
+        try:
+            first = cluster.get_snapshot('local')
+            assert cluster.get_snapshot('local') is first
+            assert cluster.node_with_most_free_vram().node == 'local'
+        finally:
+            cluster.close()
+            local.close()
+
+
+def test_failed_greeting_sample_does_not_stop_the_agent():
+    class FlakyManager:
+        def __init__(self, real):
+            self.real = real
+            self.failures = 1
+
+        def get_snapshot(self, max_age=None):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("sampler broke")
+            return self.real.get_snapshot(max_age=max_age)
+
+    with fake_backends():
+        from aegis.hardware.manager import HardwareManager
+
+        real = HardwareManager(nvml=FakeNVML(), use_static_cache=False)
+        agent = NodeAgent(FlakyManager(real), ('127.0.0.1', 0), name='flaky', interval=0.05)
+        address = agent.start()
+        cluster = ClusterHardwareManager({'flaky': address}, backoff_initial=0.05, backoff_max=0.1)
+        try:
+            assert cluster.wait_until_ready(timeout=10.0)
+            assert cluster.get_snapshot('flaky') is not None
+        finally:
+            cluster.close()
+            agent.stop()
+            real.close()
@@ -0,0 +1,141 @@
+"""HardwareEventBus threshold, hysteresis and rate rules, and callback and queue delivery."""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from aegis.hardware.events import HardwareEventBus
+from aegis.hardware.manager import HardwareManager
+from aegis.hardware.models import ThresholdRule
+from aegis.hardware.snapshot import HardwareSnapshot, StaticHardwareFacts
+
+from benchmarks.fakes import FakeNVML, fake_backends
+
+STATIC = StaticHardwareFacts('Fake CPU', 'x86_64', 1, 2, 32.0, gpus=[(0, 'Fake GPU', 24.0)])
+
+
+def _snapshot(vram_used_gb=12.0, cpu=(10.0, 10.0), ram_available_gb=16.0, timestamp=0.0):
+    return HardwareSnapshot.build(STATIC, cpu, ram_available_gb, [(vram_used_gb, 50.0)], timestamp=timestamp)
+
+
+def _kinds(events):
+    return [(event.rule, event.kind) for event in events]
+
+
+def test_rule_triggers_once_and_clears_past_the_hysteresis_band():
+    bus = HardwareEventBus()
+    received = []
+    bus.subscribe(ThresholdRule(name='vram', metric='gpu0.vram_percent', threshold=90.0, clear_at=80.0), received.append)
+
+    assert bus.evaluate(_snapshot(12.0, timestamp=1.0)) == []
+    triggered = bus.evaluate(_snapshot(22.8, timestamp=2.0))
+    assert _kinds(triggered) == [('vram', 'triggered')]
+    assert triggered[0].value == pytest.approx(95.0)
+    assert bus.evaluate(_snapshot(23.0, timestamp=3.0)) == []
+    # Below the threshold but inside the band: still active.
+    assert bus.evaluate(_snapshot(21.0, timestamp=4.0)) == []
+    cleared = bus.evaluate(_snapshot(18.0, timestamp=5.0))
+    assert _kinds(cleared) == [('vram', 'cleared')]
+    assert cleared[0].threshold == 80.0
+    assert _kinds(bus.evaluate(_snapshot(22.8, timestamp=6.0))) == [('vram', 'triggered')]
+    assert [event.kind for event in received] == ['triggered', 'cleared', 'triggered']
+
+
+def test_below_rule_and_rule_already_holding_on_the_first_sample():
+    bus = HardwareEventBus()
+    bus.subscribe(ThresholdRule(name='ram', metric='ram_available_gb', condition='below', threshold=4.0), lambda event: None)
+
+    assert _kinds(bus.evaluate(_snapshot(ram_available_gb=2.0, timestamp=1.0))) == [('ram', 'triggered')]
+    assert bus.evaluate(_snapshot(ram_available_gb=3.0, timestamp=2.0)) == []
+    assert _kinds(bus.evaluate(_snapshot(ram_available_gb=8.0, timestamp=3.0))) == [('ram', 'cleared')]
+
+
+def test_rate_rule_uses_change_per_second_between_samples():
+    bus = HardwareEventBus()
+    bus.subscribe(ThresholdRule(name='cpu-spike', metric='cpu_mean', threshold=20.0, rate=True), lambda event: None)
+
+    assert bus.evaluate(_snapshot(cpu=(10.0, 10.0), timestamp=10.0)) == []
+    spike = bus.evaluate(_snapshot(cpu=(50.0, 50.0), timestamp=11.0))
+    assert _kinds(spike) == [('cpu-spike', 'triggered')]
+    assert spike[0].value == pytest.approx(40.0)
+    assert _kinds(bus.evaluate(_snapshot(cpu=(50.0, 50.0), timestamp=13.0))) == [('cpu-spike', 'cleared')]
+
+
+def test_identical_rules_share_one_event_across_subscribers():
+    bus = HardwareEventBus()
+    received = []
+    for _ in range(50):
+        bus.subscribe(ThresholdRule(name='busy', metric='cpu_max', threshold=80.0), received.append)
+    bus.subscribe(ThresholdRule(name='idle', metric='cpu1', condition='below', threshold=5.0), received.append)
+
+    events = bus.evaluate(_snapshot(cpu=(90.0, 1.0), timestamp=1.0))
+    assert sorted(_kinds(events)) == [('busy', 'triggered'), ('idle', 'triggered')]
+    assert len(received) == 51
+    assert len({id(event) for event in received}) == 2
+
+
+def test_unsubscribed_and_failing_callbacks_do_not_affect_the_others():
+    bus = HardwareEventBus()
+    received = []
+
+    def broken(event):
+        raise RuntimeError("subscriber bug")
+
+    rule = ThresholdRule(name='vram', metric='gpu_vram_percent_max', threshold=90.0)
+    bus.subscribe(rule, broken)
+    gone = bus.subscribe(rule, received.append)
+    kept = bus.subscribe(rule, received.append)
+    gone.close()
+
+    bus.evaluate(_snapshot(23.0, timestamp=1.0))
+    assert len(received) == 1
+    assert bus.subscription_count == 2
+    kept.close()
+
+
+def test_rules_are_validated():
+    bus = HardwareEventBus()
+    with pytest.raises(ValueError, match="unknown metric"):
+        bus.subscribe(ThresholdRule(name='bad', metric='gpu0.temperature', threshold=1.0), print)
+    with pytest.raises(ValueError, match="clear_at"):
+        bus.subscribe(ThresholdRule(name='bad', metric='cpu_mean', threshold=50.0, clear_at=60.0), print)
+    with pytest.raises(ValueError):
+        bus.subscribe([], print)
+
+
+def test_queue_subscribers_receive_events_through_their_loop():
+    async def main():
+        bus = HardwareEventBus()
+        subscription = bus.subscribe_queue(ThresholdRule(name='vram', metric='gpu0.vram_used_gb', threshold=20.0), maxsize=1)
+        # Samples arrive on another thread, as from the background sampler.
+        await asyncio.to_thread(bus.evaluate, _snapshot(22.0, timestamp=1.0))
+        await asyncio.to_thread(bus.evaluate, _snapshot(10.0, timestamp=2.0))
+        first = await asyncio.wait_for(subscription.queue.get(), 5.0)
+        await asyncio.sleep(0.01)
+        # The queue holds one event, so the clear was dropped.
+        assert subscription.queue.empty()
+        return first
+
+    event = asyncio.run(main())
+    assert (event.rule, event.kind, event.value) == ('vram', 'triggered', 22.0)
+
+
+def test_callback_may_query_the_manager():
+    with fake_backends():
+        manager = HardwareManager(nvml=FakeNVML(), use_static_cache=False)
+        values = []
+
+        def react(event):
+            # Re-sampling from a callback used to deadlock on the manager's sample lock.
+            values.append(manager.get_hardware_state(max_age=0).system.ram_available_gb)
+
+        manager.events.subscribe(ThresholdRule(name='any', metric='cpu_mean', threshold=-1.0), react)
+        worker = threading.Thread(target=manager.refresh, daemon=True)
+        worker.start()
+        worker.join(5.0)
+        manager.close()
+
+    assert not worker.is_alive(), "refresh() deadlocked in an event callback"
+    assert len(values) == 1 and np.isfinite(values[0])
@@ -0,0 +1,90 @@
+"""HttpFetcher against a local keep-alive server: caching, revalidation, decoding, redirects and size caps."""
+
+import pytest
+
+from aegis.tools.fetch import FetchError, HttpFetcher
+
+from benchmarks.fakes import FakeSite, serve_site
+
+
+@pytest.fixture
+def site():
+    site = FakeSite(max_age=0)
+    server, base = serve_site(site)
+    site.base = base
+    yield site
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = HttpFetcher(cache_root=str(tmp_path / 'cache'), max_bytes=1024 ** 2)
+    yield fetcher
+    fetcher.close()
+
+
+def test_stale_entry_is_revalidated_with_a_304(site, fetcher):
+    first = fetcher.fetch(f"{site.base}/page/1")
+    assert first.status == 200 and not first.from_cache
+    assert first.read() == site.pages['/page/1']
+
+    second = fetcher.fetch(f"{site.base}/page/1")
+    assert second.from_cache and second.revalidated
+    assert second.content_hash == first.content_hash and second.read() == site.pages['/page/1']
+    assert (site.full, site.not_modified) == (1, 1)
+    assert fetcher.stats().revalidated == 1
+
+
+def test_fresh_entry_is_served_without_a_request(site, fetcher):
+    site.max_age = 3600
+    fetcher.fetch(f"{site.base}/page/2")
+    cached = fetcher.fetch(f"{site.base}/page/2")
+    assert cached.from_cache and not cached.revalidated
+    assert site.full == 1 and site.not_modified == 0
+
+
+@pytest.mark.parametrize('path', ['/gzip', '/deflate', '/deflate-raw'])
+def test_compressed_bodies_are_decoded(site, fetcher, path):
+    assert fetcher.fetch(f"{site.base}{path}").read() == site.pages[path]
+
+
+def test_undecodable_body_is_a_fetch_error(site, fetcher):
+    with pytest.raises(FetchError, match="decode"):
+        fetcher.fetch(f"{site.base}/corrupt")
+
+    results = fetcher.fetch_many([f"{site.base}/page/0", f"{site.base}/corrupt", f"{site.base}/deflate-raw"])
+    assert results[0].read() == site.pages['/page/0']
+    assert isinstance(results[1], FetchError)
+    assert results[2].read() == site.pages['/deflate-raw']
+
+
+def test_redirect_is_followed(site, fetcher):
+    redirected = fetcher.fetch(f"{site.base}/redirect")
+    assert redirected.url == f"{site.base}/page/0"
+    assert redirected.read() == site.pages['/page/0']
+
+
+def test_oversized_body_is_truncated_and_not_cached(site, fetcher):
+    big = fetcher.fetch(f"{site.base}/big")
+    assert big.truncated and big.size == 1024 ** 2
+    assert not fetcher.fetch(f"{site.base}/big").from_cache
+    assert fetcher.stats().truncated == 2
+
+
+def test_missing_page_and_keep_alive_reuse(site, fetcher):
+    assert fetcher.fetch(f"{site.base}/missing").status == 404
+    for index in range(3):
+        fetcher.fetch(f"{site.base}/page/{index}")
+    assert fetcher.stats().connections_reused > 0
+
+
+def test_uncached_fetcher_always_downloads(site):
+    fetcher = HttpFetcher(use_cache=False)
+    try:
+        for _ in range(2):
+            response = fetcher.fetch(f"{site.base}/page/3")
+            assert not response.from_cache and response.read() == site.pages['/page/3']
+        assert site.full == 2
+    finally:
+        fetcher.close()
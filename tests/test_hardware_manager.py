@@ -0,0 +1,59 @@
+"""HardwareManager sampling and sample listeners against fake hardware backends."""
+
+import threading
+
+import pytest
+
+from aegis.hardware.manager import HardwareManager
+
+from benchmarks.fakes import FakeNVML, fake_backends
+
+
+@pytest.fixture
+def manager():
+    with fake_backends():
+        manager = HardwareManager(nvml=FakeNVML(), use_static_cache=False)
+        yield manager
+        manager.close()
+
+
+def test_listener_may_query_the_manager(manager):
+    seen = []
+
+    def listener(state):
+        seen.append(state)
+        if len(seen) == 1:
+            # Re-entering the HAL from a listener used to deadlock on the sample lock.
+            manager.refresh()
+            manager.get_hardware_state(max_age=0)
+
+    manager.add_sample_listener(listener)
+    worker = threading.Thread(target=manager.refresh, daemon=True)
+    worker.start()
+    worker.join(5.0)
+
+    assert not worker.is_alive(), "refresh() deadlocked in a re-entrant listener"
+    assert len(seen) == 3
+
+
+def test_failing_listener_does_not_block_the_others(manager):
+    received = []
+
+    def broken(snapshot):
+        raise RuntimeError("listener bug")
+
+    manager.add_sample_listener(broken, compact=True)
+    manager.add_sample_listener(received.append, compact=True)
+    snapshot = manager.refresh_snapshot()
+
+    assert received == [snapshot]
+    manager.remove_sample_listener(received.append)
+    manager.refresh_snapshot()
+    assert len(received) == 1
+
+
+def test_snapshot_is_reused_within_max_age(manager):
+    first = manager.get_snapshot(max_age=60.0)
+    assert manager.get_snapshot(max_age=60.0) is first
+    assert manager.latest_snapshot is first
+    assert manager.get_snapshot(max_age=0.0) is not first
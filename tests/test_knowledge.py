@@ -0,0 +1,218 @@
+"""VectorStore persistence, replacement, deletion, compaction, int8 quantisation and the IVF index."""
+
+import numpy as np
+import pytest
+
+from aegis.knowledge.ivf import IVFIndex, assign_lists, normalize_rows, train_centroids
+from aegis.knowledge.store import VectorStore
+
+DIM = 32
+
+
+def _clustered(count_per_cluster=40, clusters=16, seed=0):
+    """Unit vectors scattered around ``clusters`` random directions."""
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((clusters, DIM)))
+    vectors = np.repeat(centers, count_per_cluster, axis=0)
+    vectors += rng.standard_normal(vectors.shape).astype(np.float32) * 0.15
+    return normalize_rows(vectors), centers
+
+
+def _ids(count, prefix='doc'):
+    return [f'{prefix}{index}' for index in range(count)]
+
+
+def _store(path, vectors, dtype='float32'):
+    store = VectorStore(path, dim=DIM, dtype=dtype)
+    store.add(_ids(len(vectors)), vectors, texts=[f"text {index}" for index in range(len(vectors))],
+              metadata=[{'n': index} for index in range(len(vectors))])
+    return store
+
+
+def _ranking(store, queries, k=10, **options):
+    return [[(hit.id, round(hit.score, 5)) for hit in store.search(query, k, **options)] for query in queries]
+
+
+def test_exact_search_finds_each_vector_first(tmp_path):
+    vectors, _ = _clustered()
+    store = _store(tmp_path, vectors)
+
+    assert len(store) == len(vectors) and 'doc5' in store and 'nope' not in store
+    for index in (0, 123, 639):
+        hit = store.search(vectors[index], k=1)[0]
+        assert hit.id == f'doc{index}'
+        assert hit.score == pytest.approx(1.0, abs=1e-5)
+        assert hit.text == f"text {index}" and hit.metadata == {'n': index}
+    assert store.get('doc7').metadata == {'n': 7}
+    assert store.get('nope') is None
+    store.close()
+
+
+def test_add_replaces_entries_with_the_same_id(tmp_path):
+    vectors, _ = _clustered()
+    store = _store(tmp_path, vectors)
+    replacement = vectors[500]
+
+    store.add(['doc0'], replacement[None, :], texts=["replaced"])
+    stats = store.stats()
+    assert len(store) == len(vectors)
+    assert stats.rows == len(vectors) + 1
+    hits = store.search(replacement, k=2)
+    assert {hit.id for hit in hits} == {'doc0', 'doc500'}
+    assert store.get('doc0').text == "replaced"
+    # The old vector is gone: doc0 now sits in another cluster.
+    assert 'doc0' not in {hit.id for hit in store.search(vectors[0], k=5)}
+    with pytest.raises(ValueError):
+        store.add(['a', 'a'], vectors[:2])
+    store.close()
+
+
+def test_deleted_entries_are_not_returned(tmp_path):
+    vectors, _ = _clustered()
+    store = _store(tmp_path, vectors)
+
+    assert store.delete(['doc1', 'doc2', 'missing']) == 2
+    assert store.delete(['doc1']) == 0
+    assert len(store) == len(vectors) - 2
+    assert 'doc1' not in store
+    assert store.search(vectors[1], k=1)[0].id != 'doc1'
+    store.close()
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_compact_moves_rows_without_changing_results(tmp_path, indexed):
+    vectors, _ = _clustered()
+    store = _store(tmp_path, vectors)
+    if indexed:
+        store.build_index(n_lists=16, n_probe=4)
+    store.delete(_ids(len(vectors))[::3])
+    queries = vectors[1::37]
+    before, before_exact = _ranking(store, queries), _ranking(store, queries, exact=True)
+
+    reclaimed = store.compact()
+    stats = store.stats()
+    assert reclaimed == len(range(0, len(vectors), 3))
+    assert stats.rows == stats.count == len(vectors) - reclaimed
+    assert store.compact() == 0
+    # The index is reloaded from the rewritten row numbers.
+    assert (store.index is not None) == indexed
+    assert _ranking(store, queries) == before
+    assert _ranking(store, queries, exact=True) == before_exact
+
+    # New rows go after the compacted ones.
+    store.add(['fresh'], vectors[0][None, :])
+    assert store.search(vectors[0], k=1)[0].id == 'fresh'
+    store.close()
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'int8'])
+def test_reopened_store_has_the_same_entries_and_index(tmp_path, dtype):
+    vectors, _ = _clustered()
+    store = _store(tmp_path, vectors, dtype)
+    store.build_index(n_lists=16, n_probe=4)
+    store.delete(['doc3'])
+    store.add(['late'], vectors[10][None, :])
+    queries = vectors[::53]
+    before, stats = _ranking(store, queries), store.stats()
+    store.close()
+
+    reopened = VectorStore(tmp_path)
+    assert (reopened.dim, reopened.dtype) == (DIM, dtype)
+    assert reopened.stats() == stats
+    assert 'doc3' not in reopened and 'late' in reopened
+    assert _ranking(reopened, queries) == before
+    reopened.close()
+
+    with pytest.raises(ValueError):
+        VectorStore(tmp_path, dim=DIM + 1)
+
+
+def test_int8_scores_stay_close_to_float32(tmp_path):
+    vectors, _ = _clustered()
+    exact = _store(tmp_path / 'f32', vectors)
+    quantised = _store(tmp_path / 'i8', vectors, 'int8')
+
+    assert quantised.stats().dtype == 'int8'
+    assert (tmp_path / 'i8' / VectorStore.VECTOR_FILE).stat().st_size * 4 == (
+        (tmp_path / 'f32' / VectorStore.VECTOR_FILE).stat().st_size
+    )
+    for query in vectors[::41]:
+        reference = {hit.id: hit.score for hit in exact.search(query, k=5)}
+        hits = quantised.search(query, k=5)
+        assert hits[0].id == next(iter(reference))
+        for hit in hits:
+            if hit.id in reference:
+                assert hit.score == pytest.approx(reference[hit.id], abs=0.02)
+    exact.close()
+    quantised.close()
+
+
+def test_ivf_recall_against_exact_search(tmp_path):
+    vectors, centers = _clustered()
+    store = _store(tmp_path, vectors)
+    index = store.build_index(n_lists=16, n_probe=4)
+    assert index.n_lists == 16
+    assert store.stats().index_lists == 16 and store.stats().index_probe == 4
+
+    rng = np.random.default_rng(1)
+    queries = normalize_rows(centers[rng.integers(0, len(centers), 50)] + rng.standard_normal((50, DIM)) * 0.2)
+    found = total = 0
+    for query in queries:
+        truth = {hit.id for hit in store.search(query, k=10, exact=True)}
+        found += len(truth & {hit.id for hit in store.search(query, k=10)})
+        total += len(truth)
+    assert found / total >= 0.9
+
+    store.drop_index()
+    assert store.index is None and store.stats().index_lists == 0
+    store.close()
+
+
+def test_inserts_after_build_are_assigned_to_existing_lists(tmp_path):
+    vectors, centers = _clustered()
+    store = _store(tmp_path, vectors)
+    index = store.build_index(n_lists=16, n_probe=1)
+    home = int(index.assign(centers[:1])[0])
+    before = index.list_sizes()
+
+    rng = np.random.default_rng(2)
+    extra = normalize_rows(np.repeat(centers[:1], 30, axis=0) + rng.standard_normal((30, DIM)) * 0.05)
+    store.add(_ids(30, 'extra'), extra)
+
+    grown = index.list_sizes() - before
+    assert grown[home] == 30 and grown.sum() == 30
+    assert store.search(extra[7], k=1)[0].id == 'extra7'
+    store.close()
+
+    reopened = VectorStore(tmp_path)
+    assert reopened.search(extra[7], k=1)[0].id == 'extra7'
+    reopened.close()
+
+
+def test_layout_validation(tmp_path):
+    with pytest.raises(ValueError):
+        VectorStore(tmp_path / 'a')
+    with pytest.raises(ValueError):
+        VectorStore(tmp_path / 'b', dim=DIM, dtype='float16')
+    store = VectorStore(tmp_path / 'c', dim=DIM)
+    assert store.search(np.ones(DIM), k=3) == []
+    with pytest.raises(ValueError):
+        store.build_index()
+    store.close()
+
+
+def test_spherical_kmeans_separates_clusters():
+    vectors, centers = _clustered(clusters=4)
+    centroids = train_centroids(vectors, 4, seed=3)
+
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+    assignments = assign_lists(centroids, vectors, chunk_rows=7)
+    # Every true cluster lands in a single list of its own.
+    groups = assignments.reshape(4, -1)
+    assert all(len(set(group.tolist())) == 1 for group in groups)
+    assert len(set(groups[:, 0].tolist())) == 4
+
+    index = IVFIndex(centroids, n_probe=1)
+    index.add(np.arange(len(vectors)), assignments)
+    assert index.list_sizes().tolist() == [40] * 4
+    assert set(index.candidates(centers[2]).tolist()) == set(range(80, 120))
@@ -0,0 +1,136 @@
+"""LLMScheduler batching, prefix caching, cancellation and failure handling against StubLLMBackend."""
+
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+from aegis.agents.base import AegisAgent
+from aegis.inference.llm import LLMScheduler, StubLLMBackend, system_prompt
+
+
+class GatedBackend(StubLLMBackend):
+    """A stub whose decode steps block until ``gate`` is set."""
+
+    def __init__(self, **kwargs):
+        super().__init__(simulate_time=False, **kwargs)
+        self.gate = threading.Event()
+        self.decoding = threading.Event()
+
+    def decode(self, states):
+        self.decoding.set()
+        assert self.gate.wait(5.0)
+        return super().decode(states)
+
+
+class BrokenDetokenizer(StubLLMBackend):
+    """A stub whose first detokenize call raises."""
+
+    def __init__(self, **kwargs):
+        super().__init__(simulate_time=False, **kwargs)
+        self.failures = 1
+
+    def detokenize(self, tokens):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("detokenizer bug")
+        return super().detokenize(tokens)
+
+
+def _agent(index):
+    return AegisAgent(
+        role=f"Specialist {index}",
+        goal="Answer precisely.",
+        backstory=' '.join(f"fact{index}_{word}" for word in range(50)),
+    )
+
+
+def test_concurrent_requests_share_decode_steps():
+    backend = StubLLMBackend(decode_step_seconds=0.002, decode_sequence_seconds=0.0, prefill_call_seconds=0.0)
+    scheduler = LLMScheduler(backend, max_new_tokens=8)
+    futures = [scheduler.submit(f"Question {index}") for index in range(12)]
+    results = [future.result(5.0) for future in futures]
+    stats = scheduler.stats()
+    scheduler.close()
+
+    assert stats.completed == 12
+    assert stats.mean_batch_size > 1.0
+    assert all(0 < result.completion_tokens <= 8 for result in results)
+    assert backend.live_states == 0
+
+
+def test_batching_does_not_change_completions():
+    prompts = [f"Question {index}" for index in range(6)]
+    completions = []
+    for batch_size in (1, 16):
+        backend = StubLLMBackend(simulate_time=False)
+        scheduler = LLMScheduler(backend, max_batch_size=batch_size, max_new_tokens=8)
+        futures = [scheduler.submit(prompt) for prompt in prompts]
+        completions.append([future.result(5.0).tokens for future in futures])
+        scheduler.close()
+    assert completions[0] == completions[1]
+
+
+def test_agent_prefix_is_encoded_once():
+    backend = StubLLMBackend(simulate_time=False)
+    scheduler = LLMScheduler(backend, max_new_tokens=4)
+    agent = _agent(0)
+    first = scheduler.generate_for_agent(agent, "First task.", timeout=5.0)
+    second = scheduler.generate_for_agent(agent, "Second task.", timeout=5.0)
+    stats = scheduler.stats()
+    scheduler.close()
+
+    prefix_tokens = len(backend.tokenize(system_prompt(agent)))
+    assert not first.prefix_cached and second.prefix_cached
+    assert stats.prefix_misses == 1 and stats.prefix_hits == 1
+    assert stats.prefix_tokens_saved == prefix_tokens
+    assert stats.cached_prefixes == 1
+    assert backend.live_states == 0
+
+
+def test_cancelled_pending_request_is_dropped():
+    backend = GatedBackend()
+    scheduler = LLMScheduler(backend, max_batch_size=1, max_new_tokens=2)
+    running = scheduler.submit("Runs first.")
+    assert backend.decoding.wait(5.0)
+    pending = scheduler.submit("Cancelled while waiting.")
+    assert pending.cancel()
+    backend.gate.set()
+
+    assert running.result(5.0).completion_tokens > 0
+    assert scheduler.generate("Runs after the cancellation.", timeout=5.0).completion_tokens > 0
+    stats = scheduler.stats()
+    scheduler.close()
+    assert stats.completed == 2 and stats.failed == 0
+    assert backend.live_states == 0
+
+
+def test_generate_timeout_withdraws_the_request():
+    backend = GatedBackend()
+    scheduler = LLMScheduler(backend, max_batch_size=1, max_new_tokens=2)
+    running = scheduler.submit("Holds the only slot.")
+    assert backend.decoding.wait(5.0)
+    with pytest.raises(TimeoutError):
+        scheduler.generate("Never admitted.", timeout=0.05)
+    backend.gate.set()
+
+    running.result(5.0)
+    scheduler.close(timeout=5.0)
+    assert scheduler.stats().completed == 1
+    assert backend.live_states == 0
+
+
+def test_scheduler_survives_an_unexpected_error():
+    backend = BrokenDetokenizer()
+    scheduler = LLMScheduler(backend, max_batch_size=1, max_new_tokens=2)
+    failed = scheduler.submit("Hits the bug.")
+    following = scheduler.submit("Queued behind it.")
+    wait([failed, following], timeout=5.0)
+
+    with pytest.raises(RuntimeError, match="detokenizer bug"):
+        failed.result(0)
+    assert following.result(0).completion_tokens > 0
+    assert scheduler.generate("Still served.", timeout=5.0).completion_tokens > 0
+    scheduler.close()
+    assert scheduler.stats().failed == 1
+    assert backend.live_states == 0
@@ -0,0 +1,113 @@
+"""The shared queue-backed logging backend: message rendering, one-time setup, rotation and pruning."""
+
+import logging
+import os
+import queue
+import sys
+import time
+
+import pytest
+
+from aegis.utils import logger as logger_module
+from aegis.utils.logger import (
+    _RawQueueHandler,
+    _SizeAndTimeRotatingFileHandler,
+    prune_old_logs,
+    setup_logger,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """Run a fresh backend writing to ``tmp_path``, then restore the normal one for every logger."""
+    shutdown_logging()
+    monkeypatch.setattr(logger_module, 'LOG_DIR', str(tmp_path))
+    yield tmp_path
+    shutdown_logging()
+    monkeypatch.undo()
+    for name, (module_code, script_code) in list(logger_module._LOGGER_METADATA.items()):
+        setup_logger(name, module_code, script_code)
+
+
+def _record(msg, *args, exc_info=None):
+    return logging.LogRecord('test', logging.ERROR, __file__, 1, msg, args, exc_info)
+
+
+def test_prepare_renders_arguments_on_the_calling_thread():
+    handler = _RawQueueHandler(queue.SimpleQueue())
+    devices = ['CPU']
+    record = _record("Discovered Intel devices: %s", devices)
+
+    prepared = handler.prepare(record)
+    devices.append('GPU')
+
+    assert prepared.getMessage() == "Discovered Intel devices: ['CPU']"
+    assert prepared.args is None
+    # The caller's record is left untouched for any other handler.
+    assert record.args == (devices,)
+
+
+def test_prepare_renders_tracebacks_and_drops_the_exception():
+    handler = _RawQueueHandler(queue.SimpleQueue())
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        prepared = handler.prepare(_record("Failed: %d%%", 50, exc_info=sys.exc_info()))
+
+    assert prepared.exc_info is None
+    assert "RuntimeError: boom" in prepared.exc_text
+    formatted = logging.Formatter("%(message)s").format(prepared)
+    assert formatted.startswith("Failed: 50%\nTraceback")
+
+
+def test_backend_is_set_up_once_and_writes_rendered_messages(log_dir):
+    first = setup_logger('LoggerTestA', module_code='TEST', script_code='LOGA')
+    second = setup_logger('LoggerTestB', module_code='TEST', script_code='LOGB')
+    assert first.handlers == second.handlers and len(first.handlers) == 1
+    assert setup_logger('LoggerTestA', module_code='TEST', script_code='LOGA').handlers == first.handlers
+
+    items = [1]
+    first.info("Items: %s", items)
+    items.append(2)
+    second.warning("Coded", extra={'error_code': 'TEST-CODE'})
+    shutdown_logging()
+
+    files = list(log_dir.glob('aegis-run--*.log'))
+    assert len(files) == 1
+    lines = files[0].read_text(encoding='utf-8').splitlines()
+    assert any(line.endswith("| Items: [1]") and "TEST-LOGA" in line for line in lines)
+    assert any("TEST-CODE" in line and line.endswith("| Coded") for line in lines)
+    # After shutdown the loggers are detached until set up again.
+    assert first.handlers == []
+
+
+def test_file_handler_rotates_by_size_and_age(tmp_path):
+    path = tmp_path / 'run.log'
+    handler = _SizeAndTimeRotatingFileHandler(str(path), max_bytes=200, interval_seconds=3600, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for index in range(20):
+        handler.emit(_record(f"line {index:02d} " + 'x' * 40))
+    handler.flush()
+    assert sorted(item.name for item in tmp_path.iterdir()) == ['run.log', 'run.log.1', 'run.log.2']
+    assert path.stat().st_size <= 200
+
+    handler.interval_seconds = 0.01
+    handler.rollover_at = time.time() - 1
+    handler.emit(_record("after the interval"))
+    handler.close()
+    assert path.read_text(encoding='utf-8') == "after the interval\n"
+
+
+def test_prune_removes_only_old_log_files(tmp_path):
+    old = time.time() - 10 * 86400
+    for name in ('old.log', 'old.log.3', 'notes.txt'):
+        (tmp_path / name).write_text('x')
+        os.utime(tmp_path / name, (old, old))
+    (tmp_path / 'new.log').write_text('x')
+
+    prune_old_logs(str(tmp_path), max_age_days=0)
+    assert len(list(tmp_path.iterdir())) == 4
+    prune_old_logs(str(tmp_path), max_age_days=7)
+    assert sorted(item.name for item in tmp_path.iterdir()) == ['new.log', 'notes.txt']
+    prune_old_logs(str(tmp_path / 'missing'), max_age_days=7)
@@ -0,0 +1,95 @@
+"""NvidiaGpuMonitor against a fake NVML binding: shared session refcounting and cached static data."""
+
+from aegis.hardware.monitors.nvidia_monitor import NvidiaGpuMonitor
+from aegis.hardware.static_cache import StaticHardwareCache
+
+from benchmarks.fakes import FakeNVML
+
+
+class CountingNVML(FakeNVML):
+    """A FakeNVML that records how often the session and static queries are used."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.inits = 0
+        self.shutdowns = 0
+        self.static_queries = 0
+
+    def nvmlInit(self) -> None:
+        self.inits += 1
+
+    def nvmlShutdown(self) -> None:
+        self.shutdowns += 1
+
+    def nvmlDeviceGetName(self, handle: int) -> bytes:
+        self.static_queries += 1
+        return super().nvmlDeviceGetName(handle)
+
+
+def test_monitors_share_one_nvml_session():
+    nvml = CountingNVML(gpu_count=2)
+    first = NvidiaGpuMonitor(nvml=nvml)
+    second = NvidiaGpuMonitor(nvml=nvml)
+    assert nvml.inits == 1
+
+    first.close()
+    first.close()
+    assert nvml.shutdowns == 0
+
+    second.close()
+    assert nvml.shutdowns == 1
+
+    third = NvidiaGpuMonitor(nvml=nvml)
+    assert nvml.inits == 2
+    third.close()
+    assert nvml.shutdowns == 2
+
+
+def test_failed_enumeration_releases_the_session():
+    class BrokenNVML(CountingNVML):
+        def nvmlDeviceGetCount(self) -> int:
+            raise self.NVMLError("driver not loaded")
+
+    nvml = BrokenNVML()
+    monitor = NvidiaGpuMonitor(nvml=nvml)
+    assert monitor.devices == []
+    assert monitor.sample() == []
+    assert (nvml.inits, nvml.shutdowns) == (1, 1)
+
+
+def test_static_data_is_reused_from_the_cache(tmp_path):
+    path = tmp_path / 'hardware-static.json'
+    nvml = CountingNVML(gpu_count=2, vram_total_gb=16.0)
+    first = NvidiaGpuMonitor(nvml=nvml, static_cache=StaticHardwareCache(path=str(path)))
+    assert nvml.static_queries == 2
+    assert path.exists()
+
+    second = NvidiaGpuMonitor(nvml=nvml, static_cache=StaticHardwareCache(path=str(path)))
+    assert nvml.static_queries == 2
+    assert [(d.name, d.vram_total_gb) for d in second.devices] == [(d.name, d.vram_total_gb) for d in first.devices]
+    assert [d.name for d in second.devices] == ["Fake GPU 0", "Fake GPU 1"]
+    first.close()
+    second.close()
+
+
+def test_cache_for_a_different_gpu_count_is_ignored(tmp_path):
+    path = tmp_path / 'hardware-static.json'
+    NvidiaGpuMonitor(nvml=CountingNVML(gpu_count=1), static_cache=StaticHardwareCache(path=str(path))).close()
+
+    nvml = CountingNVML(gpu_count=3)
+    monitor = NvidiaGpuMonitor(nvml=nvml, static_cache=StaticHardwareCache(path=str(path)))
+    assert nvml.static_queries == 3
+    assert len(monitor.devices) == 3
+    monitor.close()
+
+
+def test_sample_reports_dynamic_metrics():
+    monitor = NvidiaGpuMonitor(nvml=CountingNVML(gpu_count=1, vram_total_gb=24.0, processes_per_gpu=2))
+    (reading,) = monitor.sample()
+    assert reading.vram_total_gb == 24.0
+    assert reading.vram_used_gb == 6.0
+    assert reading.utilization_percent == 37
+    assert list(reading.processes) == [(1000, 0.5), (1001, 0.5)]
+    assert monitor.process_vram_gb(1000) == 0.5
+    assert monitor.process_vram_gb(4242) == 0.0
+    monitor.close()
@@ -0,0 +1,110 @@
+"""PlanExecutor ordering, failure propagation, deduplication and cancellation with in-process runners."""
+
+import asyncio
+import threading
+
+import pytest
+
+from aegis.agents.base import AegisAgent, AegisTask
+from aegis.core.planner import NodeStatus, Plan, PlanExecutor
+
+AGENT = AegisAgent(role="Tester", goal="Exercise the planner.", backstory="Synthetic.")
+
+
+def _task(task_id, description=None, depends_on=()):
+    return AegisTask(
+        task_id=task_id,
+        description=description or f"do {task_id}",
+        expected_output="done",
+        agent=AGENT,
+        depends_on=list(depends_on),
+    )
+
+
+def test_dependencies_receive_upstream_outputs():
+    plan = Plan(tasks=[_task('a'), _task('b'), _task('c', depends_on=['a', 'b'])])
+
+    def runner(task, inputs):
+        return task.task_id + ''.join(sorted(inputs.values()))
+
+    result = PlanExecutor(runner).run_sync(plan)
+    assert result.succeeded
+    assert result.results['c'].output == 'cab'
+    assert result.critical_path[-1] == 'c'
+
+
+def test_failure_skips_transitive_dependents():
+    plan = Plan(tasks=[_task('a'), _task('b', depends_on=['a']), _task('c', depends_on=['b']), _task('d')])
+
+    def runner(task, inputs):
+        if task.task_id == 'a':
+            raise RuntimeError("boom")
+        return task.task_id
+
+    results = PlanExecutor(runner).run_sync(plan).results
+    assert results['a'].status == NodeStatus.FAILED
+    assert results['b'].status == NodeStatus.SKIPPED
+    assert results['c'].status == NodeStatus.SKIPPED
+    assert results['d'].status == NodeStatus.SUCCEEDED
+
+
+def test_identical_tasks_run_once():
+    calls = []
+
+    def runner(task, inputs):
+        calls.append(task.task_id)
+        return 'shared'
+
+    plan = Plan(tasks=[_task('a', description="same"), _task('b', description="same")])
+    results = PlanExecutor(runner).run_sync(plan).results
+    assert calls == ['a']
+    assert results['b'].reused_from == 'a' and results['b'].output == 'shared'
+
+
+def test_bad_graph_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        Plan(tasks=[_task('a', depends_on=['b']), _task('b', depends_on=['a'])]).topological_order()
+
+
+def test_cancel_running_task_skips_dependents_only():
+    async def main():
+        started = asyncio.Event()
+
+        async def runner(task, inputs):
+            if task.task_id == 'slow':
+                started.set()
+                await asyncio.sleep(30)
+            return task.task_id
+
+        executor = PlanExecutor(runner)
+        plan = Plan(tasks=[_task('slow'), _task('after', depends_on=['slow']), _task('other')])
+        run = asyncio.create_task(executor.run(plan))
+        await started.wait()
+        assert executor.cancel('slow')
+        return await asyncio.wait_for(run, 5.0), executor
+
+    result, executor = asyncio.run(main())
+    assert result.results['slow'].status == NodeStatus.CANCELLED
+    assert result.results['slow'].started_at is not None
+    assert result.results['after'].status == NodeStatus.SKIPPED
+    assert result.results['other'].status == NodeStatus.SUCCEEDED
+    assert not executor.cancel('slow')
+
+
+def test_cancel_waiting_task_from_another_thread():
+    gate = threading.Event()
+    executor = PlanExecutor(lambda task, inputs: gate.wait(5.0) and task.task_id)
+    plan = Plan(tasks=[_task('first'), _task('waiting', depends_on=['first'])])
+
+    def cancel_then_open():
+        while not executor.cancel('waiting'):
+            pass
+        gate.set()
+
+    canceller = threading.Thread(target=cancel_then_open)
+    canceller.start()
+    results = executor.run_sync(plan).results
+    canceller.join()
+    assert results['first'].status == NodeStatus.SUCCEEDED
+    assert results['waiting'].status == NodeStatus.CANCELLED
+    assert results['waiting'].started_at is None
@@ -0,0 +1,98 @@
+"""ProcStatSampler jiffy deltas and meminfo parsing, and SystemMonitor's psutil fallback without /proc."""
+
+import psutil
+import pytest
+
+from aegis.hardware.monitors import procfs, system_monitor
+from aegis.hardware.monitors.procfs import ProcStatSampler, create_sampler
+from aegis.hardware.monitors.system_monitor import SystemMonitor
+
+MEMINFO = "MemTotal:       32768000 kB\nMemFree:         1000000 kB\nMemAvailable:   16384000 kB\nBuffers: 1 kB\n"
+
+
+def _stat(*cores):
+    """A /proc/stat body; each core is ``(user, system, idle, iowait)`` jiffies."""
+    lines = ["cpu  " + " ".join(str(sum(core[field] for core in cores)) for field in range(4)) + " 0 0 0 0 0 0"]
+    for index, (user, system, idle, iowait) in enumerate(cores):
+        # guest and guest_nice are already counted in user, so the trailing 50s must be ignored.
+        lines.append(f"cpu{index} {user} 0 {system} {idle} {iowait} 0 0 0 50 50")
+    return "\n".join(lines + ["intr 12345 0 0", "ctxt 999", "btime 1700000000"]) + "\n"
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    (tmp_path / 'stat').write_text(_stat((100, 50, 800, 50), (10, 10, 970, 10)))
+    (tmp_path / 'meminfo').write_text(MEMINFO)
+    return tmp_path
+
+
+def test_per_core_utilisation_comes_from_deltas_between_reads(proc_root):
+    sampler = ProcStatSampler(str(proc_root))
+    # Core 0: 100 busy of 200 jiffies. Core 1: 40 busy and 10 iowait of 50.
+    (proc_root / 'stat').write_text(_stat((180, 70, 900, 50), (40, 10, 980, 20)))
+    assert sampler.cpu_percent_per_core() == [50.0, 60.0]
+
+    # Core 1 saw no jiffies since the last read and keeps its previous figure.
+    (proc_root / 'stat').write_text(_stat((180, 70, 1000, 50), (40, 10, 980, 20)))
+    assert sampler.cpu_percent_per_core() == [0.0, 60.0]
+    sampler.close()
+
+
+def test_cpu_count_change_restarts_the_window(proc_root):
+    sampler = ProcStatSampler(str(proc_root))
+    (proc_root / 'stat').write_text(_stat((200, 50, 800, 50), (10, 10, 970, 10), (0, 0, 100, 0)))
+    assert sampler.cpu_percent_per_core() == [0.0, 0.0, 0.0]
+
+    (proc_root / 'stat').write_text(_stat((300, 50, 800, 50), (10, 10, 1070, 10), (25, 25, 150, 0)))
+    assert sampler.cpu_percent_per_core() == [100.0, 0.0, 50.0]
+    sampler.close()
+
+
+def test_large_stat_files_are_read_whole(proc_root):
+    cores = [(index, 0, 1000, 0) for index in range(600)]
+    (proc_root / 'stat').write_text(_stat(*cores))
+    assert len(_stat(*cores)) > 16384
+
+    sampler = ProcStatSampler(str(proc_root))
+    (proc_root / 'stat').write_text(_stat(*[(user + 100, 0, 1100, 0) for user, _, _, _ in cores]))
+    assert sampler.cpu_percent_per_core() == [50.0] * 600
+    sampler.close()
+
+
+def test_memory_bytes_parses_meminfo(proc_root):
+    sampler = ProcStatSampler(str(proc_root))
+    assert sampler.memory_bytes() == (32768000 * 1024, 16384000 * 1024)
+    sampler.close()
+    # Closing twice, and again on collection, is harmless.
+    sampler.close()
+
+
+def test_create_sampler_needs_both_procfs_files(tmp_path, proc_root):
+    assert not ProcStatSampler.is_supported(str(tmp_path / 'missing'))
+    assert create_sampler(str(tmp_path / 'missing')) is None
+
+    (proc_root / 'meminfo').unlink()
+    assert create_sampler(str(proc_root)) is None
+    with pytest.raises(OSError):
+        ProcStatSampler(str(proc_root))
+
+
+def test_system_monitor_falls_back_to_psutil_without_proc(tmp_path, monkeypatch):
+    missing = str(tmp_path / 'missing')
+    monkeypatch.setattr(system_monitor, 'create_sampler', lambda: procfs.create_sampler(missing))
+    monkeypatch.setattr(psutil, 'cpu_percent', lambda interval=None, percpu=False: [12.5, 37.5])
+    monkeypatch.setattr(psutil, 'virtual_memory', lambda: type('Memory', (), {'total': 32 * 1024 ** 3, 'available': 8 * 1024 ** 3})())
+
+    monitor = SystemMonitor(use_procfs=True)
+    assert monitor.sampler is None
+    assert monitor.sample() == ([12.5, 37.5], 8.0)
+
+
+def test_system_monitor_reads_through_the_sampler(proc_root, monkeypatch):
+    monkeypatch.setattr(system_monitor, 'create_sampler', lambda: procfs.create_sampler(str(proc_root)))
+
+    monitor = SystemMonitor(use_procfs=True)
+    assert isinstance(monitor.sampler, ProcStatSampler)
+    (proc_root / 'stat').write_text(_stat((180, 70, 900, 50), (40, 10, 980, 20)))
+    assert monitor.sample() == ([50.0, 60.0], round(16384000 / 1024 ** 2, 2))
+    monitor.sampler.close()
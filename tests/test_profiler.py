@@ -0,0 +1,114 @@
+"""TaskProfiler measurements, tool attribution, GPU memory deltas and allocation sampling."""
+
+import time
+
+from aegis.core.orchestrator import Orchestrator
+from aegis.core.profiler import TaskProfiler, record_tool_usage
+
+
+class FakeGpuReadings:
+    """Hands out ``(gigabytes, sampled_at)`` readings, as the HAL snapshot would."""
+
+    def __init__(self, gigabytes=1.0):
+        self.reading = (gigabytes, time.time() - 1.0)
+
+    def sample(self, gigabytes):
+        self.reading = (gigabytes, time.time())
+
+    def __call__(self):
+        return self.reading
+
+
+def _busy(seconds):
+    deadline = time.thread_time() + seconds
+    while time.thread_time() < deadline:
+        pass
+
+
+def test_profile_records_time_and_tool_calls():
+    profiler = TaskProfiler()
+    with profiler.profile('t1', 'analyst'):
+        _busy(0.02)
+        record_tool_usage(0.5)
+        record_tool_usage(0.25)
+    # Outside a profile, tool usage is not attributed to anything.
+    record_tool_usage(9.0)
+
+    usage = profiler.get('t1')
+    assert usage.wall_seconds >= 0.02
+    assert usage.tool_calls == 2 and usage.tool_cpu_seconds == 0.75
+    assert usage.cpu_seconds >= 0.77
+    assert usage.gpu_memory_gb is None and usage.gpu_memory_delta_gb is None
+    assert usage.allocated_blocks_delta is None
+
+
+def test_gpu_delta_needs_a_sample_taken_during_the_task():
+    readings = FakeGpuReadings(1.0)
+    profiler = TaskProfiler(gpu_memory=readings)
+
+    with profiler.profile('unsampled', 'analyst'):
+        pass
+    with profiler.profile('sampled', 'analyst'):
+        time.sleep(0.01)
+        readings.sample(1.5)
+
+    unsampled = profiler.get('unsampled')
+    assert unsampled.gpu_memory_gb == 1.0 and unsampled.gpu_memory_delta_gb is None
+    sampled = profiler.get('sampled')
+    assert sampled.gpu_memory_gb == 1.5 and sampled.gpu_memory_delta_gb == 0.5
+
+
+def test_gpu_reader_failure_is_not_fatal():
+    def broken():
+        raise RuntimeError("NVML gone")
+
+    profiler = TaskProfiler(gpu_memory=broken)
+    with profiler.profile('t1', 'analyst'):
+        pass
+    assert profiler.get('t1').gpu_memory_gb is None
+
+
+def test_every_nth_task_traces_allocations():
+    profiler = TaskProfiler(trace_allocations_every=2)
+    for index in range(4):
+        with profiler.profile(f't{index}', 'analyst'):
+            blocks = [bytearray(1024) for _ in range(200)]
+        del blocks
+
+    traced = [profiler.get(f't{index}').traced_peak_kb for index in range(4)]
+    assert traced[0] is None and traced[2] is None
+    assert traced[1] >= 200 and traced[3] >= 200
+    assert profiler.get('t1').allocated_blocks_delta is not None
+
+
+def test_summary_rolls_up_per_role_and_old_tasks_are_evicted():
+    profiler = TaskProfiler(max_tasks=3, gpu_memory=FakeGpuReadings(2.0))
+    for index in range(4):
+        with profiler.profile(f'busy{index}', 'busy'):
+            _busy(0.005)
+    with profiler.profile('idle0', 'idle'):
+        pass
+
+    assert profiler.get('busy0') is None and profiler.get('busy1') is None
+    assert [profile.task_id for profile in profiler.recent()] == ['busy2', 'busy3', 'idle0']
+    summaries = profiler.summary()
+    assert [summary.agent_role for summary in summaries] == ['busy', 'idle']
+    assert summaries[0].tasks == 4 and summaries[0].gpu_memory_max_gb == 2.0
+    assert summaries[0].cpu_mean_seconds >= 0.005
+    assert profiler.summary('idle')[0].tasks == 1
+
+    profiler.reset()
+    assert profiler.summary() == [] and profiler.recent() == []
+
+
+def test_orchestrator_samples_allocations_by_default():
+    orchestrator = Orchestrator()
+    assert orchestrator.profiler.trace_allocations_every == Orchestrator.TRACE_ALLOCATIONS_EVERY > 0
+
+
+def test_allocation_tracing_can_be_disabled():
+    profiler = TaskProfiler(trace_allocations_every=0)
+    for index in range(3):
+        with profiler.profile(f't{index}', 'analyst'):
+            pass
+    assert all(profile.usage.traced_peak_kb is None for profile in profiler.recent())
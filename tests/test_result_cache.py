@@ -0,0 +1,140 @@
+"""TaskResultCache coalescing, per-route TTLs, the disk tier and invalidation."""
+
+import threading
+import time
+
+import pytest
+
+from aegis.core.result_cache import _MISS, TaskResultCache
+
+
+class Counting:
+    """A compute function that counts its calls and can be held until released."""
+
+    def __init__(self, value='result', cacheable=True):
+        self.value = value
+        self.cacheable = cacheable
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        assert self.release.wait(5.0)
+        return self.value, self.cacheable
+
+
+def test_concurrent_duplicates_share_one_execution():
+    cache = TaskResultCache()
+    compute = Counting()
+    compute.release.clear()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute('agent', 'key', compute)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        flight = cache._flight._flights.get('key')
+        if flight is not None and flight.waiters == 3:
+            break
+        time.sleep(0.001)
+    compute.release.set()
+    for thread in threads:
+        thread.join(5.0)
+
+    assert results == ['result'] * 4 and compute.calls == 1
+    stats = cache.stats()
+    assert (stats['misses'], stats['coalesced'], stats['hits'], stats['in_flight']) == (1, 3, 0, 0)
+    assert cache.get_or_compute('agent', 'key', compute) == 'result'
+    assert cache.stats()['hits'] == 1 and compute.calls == 1
+
+
+def test_result_stored_just_before_the_flight_is_not_recomputed():
+    cache = TaskResultCache()
+    cache.get_or_compute('agent', 'key', Counting('first'))
+    lookup = cache._lookup
+    calls = []
+
+    def miss_once(key):
+        # The caller's first lookup lands just before another flight stored the result.
+        calls.append(key)
+        return lookup(key) if len(calls) > 1 else _MISS
+
+    cache._lookup = miss_once
+    compute = Counting('second')
+
+    assert cache.get_or_compute('agent', 'key', compute) == 'first'
+    assert compute.calls == 0 and len(calls) == 2
+    assert cache.stats()['misses'] == 1
+
+
+def test_failures_are_shared_but_not_cached():
+    cache = TaskResultCache()
+    failing = Counting('Task failed', cacheable=False)
+    assert cache.get_or_compute('agent', 'key', failing) == 'Task failed'
+    assert cache.get_or_compute('agent', 'key', failing) == 'Task failed'
+    assert failing.calls == 2
+
+    def raising():
+        raise RuntimeError("compute bug")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('agent', 'other', raising)
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_route_ttls_override_the_default():
+    cache = TaskResultCache(default_ttl=3600.0, route_ttls={'short': 0.05, 'never': 0})
+    assert cache.ttl_for('short') == 0.05 and cache.ttl_for('agent') == 3600.0
+
+    uncached = Counting()
+    cache.get_or_compute('never', 'a', uncached)
+    cache.get_or_compute('never', 'a', uncached)
+    assert uncached.calls == 2
+
+    short = Counting()
+    cache.get_or_compute('short', 'b', short)
+    cache.get_or_compute('short', 'b', short)
+    assert short.calls == 1
+    time.sleep(0.1)
+    cache.get_or_compute('short', 'b', short)
+    assert short.calls == 2
+
+
+def test_disk_tier_survives_restarts_and_promotes_to_memory(tmp_path):
+    path = tmp_path / 'results.sqlite'
+    first = TaskResultCache(path=path)
+    first.get_or_compute('agent', 'text', Counting('stored on disk'))
+    first.get_or_compute('agent', 'object', Counting({'not': 'a string'}))
+    first.close()
+
+    second = TaskResultCache(path=path)
+    compute = Counting('recomputed')
+    assert second.get_or_compute('agent', 'text', compute) == 'stored on disk'
+    assert second.get_or_compute('agent', 'text', compute) == 'stored on disk'
+    assert compute.calls == 0
+    stats = second.stats()
+    assert (stats['hits'], stats['disk_hits'], stats['size']) == (2, 1, 1)
+    # Only string results reach the disk tier.
+    assert second.get_or_compute('agent', 'object', compute) == 'recomputed'
+    second.close()
+
+
+def test_invalidate_clears_memory_and_the_route_on_disk(tmp_path):
+    cache = TaskResultCache(path=tmp_path / 'results.sqlite')
+    cache.get_or_compute('alpha', 'a', Counting('a'))
+    cache.get_or_compute('beta', 'b', Counting('b'))
+
+    cache.invalidate('alpha')
+    assert cache.stats()['size'] == 0
+    again = Counting('new')
+    assert cache.get_or_compute('alpha', 'a', again) == 'new'
+    assert cache.get_or_compute('beta', 'b', again) == 'b'
+    assert again.calls == 1
+
+    cache.invalidate()
+    assert cache.get_or_compute('beta', 'b', again) == 'new'
+    cache.close()
@@ -0,0 +1,116 @@
+"""Aho-Corasick matching, TF-IDF scoring and TaskRouter ranking, registration and thread safety."""
+
+import threading
+
+import pytest
+
+from aegis.agents.base import AegisAgent
+from aegis.agents.registry import AgentRegistry
+from aegis.core.router import AhoCorasick, TaskRouter, TfidfScorer, tokenize
+
+
+def _found(matcher, text):
+    return sorted(matcher.patterns[pattern_id] for pattern_id in matcher.find(text))
+
+
+def test_aho_corasick_reports_overlapping_and_nested_patterns():
+    matcher = AhoCorasick(['he', 'she', 'his', 'hers', ''])
+
+    assert matcher.patterns == ['he', 'she', 'his', 'hers']
+    assert _found(matcher, 'ushers') == ['he', 'hers', 'she']
+    assert _found(matcher, 'HIS') == ['his']
+    assert _found(matcher, 'nothing here') == ['he']
+    assert _found(matcher, 'xyz') == []
+
+
+def test_aho_corasick_follows_failure_links_across_partial_matches():
+    matcher = AhoCorasick(['abcd', 'bcx', 'c', 'aab'])
+
+    # 'abc' fails into 'bc', which continues to 'bcx'; 'c' is an output of both branches.
+    assert _found(matcher, 'abcx') == ['bcx', 'c']
+    assert _found(matcher, 'aaabcd') == ['aab', 'abcd', 'c']
+    assert _found(matcher, 'xyz bd ab') == []
+
+
+def test_tfidf_prefers_documents_sharing_rare_terms():
+    scorer = TfidfScorer({
+        'vision': "Analyse images and video frames",
+        'audio': "Transcribe audio and speech recordings",
+        'generic': "Analyse data and write reports",
+    })
+
+    scores = scorer.score("transcribe these speech recordings")
+    assert max(scores, key=scores.get) == 'audio'
+    assert 0.0 < scores['audio'] <= 1.0 + 1e-9
+    assert scorer.score("analyse video")['vision'] > scorer.score("analyse video").get('generic', 0.0)
+    assert scorer.score("the and of") == {}
+    assert tokenize("The Video, and IMAGES!") == ['video', 'images']
+
+
+def test_router_ranks_keywords_then_similarity():
+    router = TaskRouter()
+    router.add_route('research', ['research', 'look up'], "Senior research analyst gathering web sources")
+    router.add_route('coder', ['python', 'refactor'], "Software engineer writing and fixing code")
+
+    best = router.route("Please look up and research recent papers")[0]
+    assert best.route == 'research' and best.matched_keywords == ['look up', 'research']
+    # No keyword matches; the description similarity routes it.
+    assert router.route("fixing broken code written by an engineer")[0].route == 'coder'
+    assert router.route("completely unrelated words") == []
+    assert len(router.route("research python", limit=1)) == 1
+
+
+def test_from_registry_skips_unroutable_agents():
+    agents = {
+        'orchestrator': AegisAgent(role="Master Orchestrator", goal="Plan and delegate work", backstory="b"),
+        'research_agent': AegisAgent(role="Research Analyst", goal="Investigate the web", backstory="b"),
+        'vision_agent': AegisAgent(role="Vision Specialist", goal="Describe images", backstory="b"),
+    }
+    configs = {
+        'orchestrator': {'routable': False, 'keywords': ['plan']},
+        'research_agent': {'keywords': ['investigate']},
+        'vision_agent': {'keywords': 'images'},
+    }
+    router = TaskRouter.from_registry(AgentRegistry(agents, configs))
+
+    assert 'orchestrator' not in {candidate.route for candidate in router.route("plan and delegate everything", limit=None)}
+    assert router.route("investigate this")[0].route == 'research_agent'
+    # A non-list keywords entry is ignored, but the description still routes.
+    vision = router.route("describe images for me")[0]
+    assert vision.route == 'vision_agent' and vision.matched_keywords == []
+
+
+def test_concurrent_registration_publishes_every_route():
+    router = TaskRouter()
+    errors = []
+
+    def register(worker):
+        try:
+            for index in range(25):
+                name = f'w{worker}r{index}'
+                router.add_route(name, [f'kw{name}end'], f"description token{name}")
+                assert router.route(f'kw{name}end')[0].route == name
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=register, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30.0)
+
+    assert errors == []
+    for worker in range(4):
+        for index in range(25):
+            name = f'w{worker}r{index}'
+            assert router.route(f'kw{name}end', limit=1)[0].route == name
+
+
+@pytest.mark.parametrize('weight', [0.5, 2.0])
+def test_add_routes_applies_the_weight(weight):
+    router = TaskRouter(similarity_weight=0.0)
+    router.add_routes([('a', ['alpha'], None), ('b', ['beta', 'alpha'], None)], weight=weight)
+
+    candidates = router.route("alpha beta")
+    assert [candidate.route for candidate in candidates] == ['b', 'a']
+    assert candidates[0].score == pytest.approx(2 * weight)
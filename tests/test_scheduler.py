@@ -0,0 +1,128 @@
+"""HardwareScheduler placement, reservations and rejection against fabricated hardware states."""
+
+import threading
+import time
+
+import pytest
+
+from aegis.agents.base import AegisAgent, AegisTask, DeviceKind, ResourceRequest
+from aegis.core.scheduler import AdmissionError, HardwareScheduler
+from aegis.hardware.models import GPUStatus, HardwareState, IntelComputeStatus, SystemStatus
+
+AGENT = AegisAgent(role="Tester", goal="Exercise the scheduler.", backstory="Synthetic.")
+
+
+def _state(ram_total=32.0, ram_available=16.0, gpus=(), intel=('CPU',)):
+    return HardwareState(
+        system=SystemStatus(
+            cpu_brand="Fake CPU",
+            cpu_arch="X86_64",
+            cpu_cores_physical=4,
+            cpu_cores_logical=8,
+            cpu_utilization_per_core=[0.0] * 8,
+            ram_total_gb=ram_total,
+            ram_available_gb=ram_available,
+        ),
+        gpus=[
+            GPUStatus(index=index, name=f"Fake GPU {index}", vram_total_gb=total, vram_used_gb=used, utilization_percent=0.0)
+            for index, (total, used) in enumerate(gpus)
+        ],
+        intel_devices=IntelComputeStatus(available_devices=list(intel)),
+    )
+
+
+def _task(**resources):
+    return AegisTask(description="work", expected_output="done", agent=AGENT, resources=ResourceRequest(**resources))
+
+
+def _scheduler(state, **kwargs):
+    kwargs.setdefault('recheck_interval', 0.01)
+    return HardwareScheduler(lambda: state, **kwargs)
+
+
+def test_places_on_the_gpu_with_most_free_vram():
+    scheduler = _scheduler(_state(gpus=[(8.0, 2.0), (24.0, 4.0)]))
+    placement = scheduler.admit(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=10.0))
+    assert (placement.device, placement.device_id, placement.vram_gb) == (DeviceKind.NVIDIA_GPU, '1', 10.0)
+
+
+def test_reservations_prevent_oversubscription():
+    scheduler = _scheduler(_state(gpus=[(24.0, 4.0)]))
+    first = scheduler.try_place(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=12.0))
+    assert first is not None
+    assert scheduler.try_place(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=12.0)) is None
+
+    scheduler.release(first)
+    assert scheduler.try_place(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=12.0)) is not None
+
+
+def test_ram_reservations_are_counted():
+    scheduler = _scheduler(_state(ram_available=9.0), ram_headroom_gb=1.0)
+    assert scheduler.try_place(_task(ram_gb=5.0)) is not None
+    assert scheduler.try_place(_task(ram_gb=5.0)) is None
+    assert scheduler.try_place(_task(ram_gb=3.0)) is not None
+    assert len(scheduler.reservations) == 2
+
+
+def test_reserve_releases_on_exit_even_after_an_error():
+    scheduler = _scheduler(_state())
+    with pytest.raises(ValueError):
+        with scheduler.reserve(_task(ram_gb=4.0)):
+            assert len(scheduler.reservations) == 1
+            raise ValueError("task failed")
+    assert scheduler.reservations == []
+
+
+def test_release_wakes_a_waiting_admission():
+    scheduler = _scheduler(_state(gpus=[(16.0, 0.0)]), recheck_interval=30.0)
+    held = scheduler.admit(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=10.0))
+    placed = []
+    waiter = threading.Thread(
+        target=lambda: placed.append(scheduler.admit(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=10.0), timeout=5.0))
+    )
+    waiter.start()
+    time.sleep(0.05)
+    assert not placed
+
+    started = time.perf_counter()
+    scheduler.release(held)
+    waiter.join(timeout=5.0)
+    assert placed and placed[0].device_id == '0'
+    assert time.perf_counter() - started < 1.0
+
+
+def test_task_that_can_never_fit_is_rejected_immediately():
+    scheduler = _scheduler(_state(gpus=[(8.0, 0.0)]))
+    started = time.perf_counter()
+    with pytest.raises(AdmissionError, match="can never fit"):
+        scheduler.admit(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=16.0), timeout=5.0)
+    assert time.perf_counter() - started < 1.0
+
+    with pytest.raises(AdmissionError, match="can never fit"):
+        scheduler.admit(_task(ram_gb=64.0))
+
+
+def test_admission_times_out_while_resources_are_held():
+    scheduler = _scheduler(_state(gpus=[(16.0, 0.0)]))
+    scheduler.admit(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=10.0))
+    with pytest.raises(AdmissionError, match="Timed out"):
+        scheduler.admit(_task(device=DeviceKind.NVIDIA_GPU, vram_gb=10.0), timeout=0.05)
+
+
+def test_accelerator_slots_and_cpu_fallback():
+    scheduler = _scheduler(_state(intel=('CPU', 'NPU')), accelerator_slots=1)
+    first = scheduler.admit(_task(device=DeviceKind.INTEL_NPU))
+    assert (first.device, first.device_id) == (DeviceKind.INTEL_NPU, 'NPU')
+
+    fallback = scheduler.admit(_task(device=DeviceKind.INTEL_NPU))
+    assert fallback.device == DeviceKind.CPU
+
+    with pytest.raises(AdmissionError, match="Timed out"):
+        scheduler.admit(_task(device=DeviceKind.INTEL_NPU, allow_cpu_fallback=False), timeout=0.05)
+
+
+def test_missing_device_without_fallback_is_rejected():
+    scheduler = _scheduler(_state(intel=('CPU',)))
+    with pytest.raises(AdmissionError, match="can never fit"):
+        scheduler.admit(_task(device=DeviceKind.INTEL_GPU, allow_cpu_fallback=False))
+    assert scheduler.admit(_task(device=DeviceKind.INTEL_GPU)).device == DeviceKind.CPU
@@ -0,0 +1,147 @@
+"""InferenceSessionManager caching and CompiledSession request pooling against a fake OpenVINO core."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from aegis.inference.session import InferenceSessionManager
+
+
+class FakePort:
+    def __init__(self, name):
+        self.name = name
+
+    def get_any_name(self):
+        return self.name
+
+
+class FakeRequest:
+    """An infer request that finishes on a background thread after ``delay`` seconds unless cancelled."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.results = {}
+        self._callback = None
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def set_callback(self, callback, userdata):
+        self._callback = (callback, userdata)
+
+    def infer(self, inputs):
+        self.results = {FakePort('out'): np.asarray(inputs) * 2}
+
+    def start_async(self, inputs):
+        self._cancelled.clear()
+
+        def work():
+            if not self._cancelled.wait(self.delay):
+                self.infer(inputs)
+                callback, userdata = self._callback
+                callback(userdata)
+
+        self._thread = threading.Thread(target=work)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self):
+        self._thread.join()
+
+
+class FakeCompiledModel:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.created = 0
+
+    def get_property(self, name):
+        return 2
+
+    def create_infer_request(self):
+        self.created += 1
+        return FakeRequest(self.delay)
+
+
+class FakeCore:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.compiled = []
+
+    def set_property(self, properties):
+        pass
+
+    def compile_model(self, path, device, config):
+        self.compiled.append((path, device))
+        return FakeCompiledModel(self.delay)
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    def make(delay=0.0, **kwargs):
+        monitor = SimpleNamespace(core=FakeCore(delay), get_status=lambda: SimpleNamespace(available_devices=['CPU']))
+        return InferenceSessionManager(monitor, model_cache_dir=tmp_path / 'blobs', **kwargs)
+
+    return make
+
+
+def _model(tmp_path, name, content=b'<net/>'):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+def test_sessions_are_compiled_once_and_reused(make_manager, tmp_path):
+    manager = make_manager()
+    model = _model(tmp_path, 'a.xml')
+    first = manager.session(model)
+    assert manager.session(model) is first
+    np.testing.assert_array_equal(manager.infer(model, [1, 2])['out'], [2, 4])
+    stats = manager.stats()
+    assert (stats.models, stats.hits, stats.misses) == (1, 2, 1)
+    assert len(manager.monitor.core.compiled) == 1
+
+
+def test_content_hash_memo_is_bounded(make_manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(InferenceSessionManager, '_CONTENT_HASH_ENTRIES', 3)
+    manager = make_manager()
+    paths = [_model(tmp_path, f'm{index}.xml', bytes([index])) for index in range(5)]
+    hashes = [manager._content_hash(path) for path in paths]
+    assert len(set(hashes)) == 5
+    assert len(manager._content_hashes) == 3
+    assert manager._content_hash(paths[-1]) == hashes[-1]
+
+
+def test_cancelled_async_inference_returns_its_request_to_the_pool(make_manager, tmp_path):
+    manager = make_manager(delay=5.0)
+    session = manager.session(_model(tmp_path, 'slow.xml'))
+
+    async def main():
+        call = asyncio.create_task(session.infer_async([1]))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        for _ in range(200):
+            if not session._idle.empty():
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert session.compiled_model.created == 1
+    assert session._idle.qsize() == 1
+
+
+def test_async_inference_reuses_pooled_requests(make_manager, tmp_path):
+    manager = make_manager(delay=0.01)
+    model = _model(tmp_path, 'fast.xml')
+
+    async def main():
+        return [await manager.infer_async(model, [index]) for index in range(3)]
+
+    outputs = asyncio.run(main())
+    assert [int(output['out'][0]) for output in outputs] == [0, 2, 4]
+    assert manager.session(model).compiled_model.created == 1
@@ -0,0 +1,98 @@
+"""TaskQueue deadlines and worker-slot accounting, using blocking handlers gated by events."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aegis.core.task_queue import PRIORITY_BATCH, PRIORITY_INTERACTIVE, TaskQueue
+
+
+def test_items_run_in_priority_order():
+    order = []
+
+    def handler(item):
+        order.append(item)
+        return item * 2
+
+    async def main():
+        gate = threading.Event()
+        queue = TaskQueue(lambda item: gate.wait(5.0) if item == 'gate' else handler(item), workers=1)
+        blocker = await queue.submit('gate')
+        batch = await queue.submit(1, priority=PRIORITY_BATCH)
+        interactive = await queue.submit(2, priority=PRIORITY_INTERACTIVE)
+        gate.set()
+        assert await blocker is True
+        assert await interactive == 4
+        assert await batch == 2
+        await queue.shutdown()
+
+    asyncio.run(main())
+    assert order == [2, 1]
+
+
+def test_deadline_fails_a_queued_item_without_a_free_worker():
+    async def main():
+        gate = threading.Event()
+        queue = TaskQueue(lambda item: gate.wait(5.0), workers=1)
+        running = await queue.submit('busy')
+        queued = await queue.submit('waiting', timeout=0.05)
+
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError, match="before it started"):
+            await asyncio.wait_for(queued, 2.0)
+        assert time.perf_counter() - started < 1.0
+
+        gate.set()
+        await running
+        await queue.shutdown()
+
+    asyncio.run(main())
+
+
+def test_timed_out_handler_keeps_its_worker_busy():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def handler(seconds):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(seconds)
+        with lock:
+            active -= 1
+        return seconds
+
+    async def main():
+        queue = TaskQueue(handler, workers=1)
+        slow = await queue.submit(0.3, timeout=0.05)
+        fast = await queue.submit(0.01)
+        with pytest.raises(asyncio.TimeoutError, match="while it was running"):
+            await slow
+        assert await fast == 0.01
+        await queue.shutdown()
+
+    asyncio.run(main())
+    assert peak == 1
+
+
+def test_cancelled_item_is_skipped():
+    ran = []
+
+    async def main():
+        gate = threading.Event()
+        queue = TaskQueue(lambda item: gate.wait(5.0) if item == 'gate' else ran.append(item), workers=1)
+        blocker = await queue.submit('gate')
+        cancelled = await queue.submit('cancelled')
+        kept = await queue.submit('kept')
+        cancelled.cancel()
+        gate.set()
+        await blocker
+        await kept
+        await queue.shutdown()
+
+    asyncio.run(main())
+    assert ran == ['kept']
@@ -0,0 +1,133 @@
+"""TelemetryBuffer ring wrap-around, windowed statistics, time-weighted EWMA and the ``.npy`` export."""
+
+import math
+
+import numpy as np
+import pytest
+
+from aegis.hardware.models import GPUStatus, HardwareState, SystemStatus
+from aegis.hardware.snapshot import HardwareSnapshot, StaticHardwareFacts
+from aegis.hardware.telemetry import TelemetryBuffer, load_telemetry
+
+STATIC = StaticHardwareFacts('Fake CPU', 'x86_64', 1, 2, 32.0, gpus=[(0, 'Fake GPU', 24.0), (1, 'Fake GPU', 24.0)])
+NO_GPU = StaticHardwareFacts('Fake CPU', 'x86_64', 1, 2, 32.0)
+
+
+def _snapshot(value, timestamp, static=STATIC):
+    gpus = [(value / 10, value), (value / 10, value + 10)] if static.gpus else []
+    return HardwareSnapshot.build(static, (value, value * 2), 16.0 + value, gpus, timestamp=timestamp)
+
+
+def _filled(values, capacity=8):
+    telemetry = TelemetryBuffer(capacity=capacity)
+    for timestamp, value in enumerate(values, start=1):
+        telemetry.record_snapshot(_snapshot(float(value), float(timestamp)))
+    return telemetry
+
+
+def test_snapshot_columns_and_gpu_aggregates():
+    telemetry = _filled([4.0])
+
+    assert telemetry.columns == ['cpu0', 'cpu1', 'ram_available_gb', 'gpu_utilization_percent', 'vram_used_gb']
+    assert telemetry.window('cpu').tolist() == [[4.0, 8.0]]
+    assert telemetry.window('ram_available_gb').tolist() == [20.0]
+    assert telemetry.window('gpu_utilization_percent').tolist() == [9.0]
+    assert telemetry.window('vram_used_gb').tolist() == pytest.approx([0.8])
+    with pytest.raises(KeyError):
+        telemetry.window('gpu9')
+
+
+def test_state_and_snapshot_write_the_same_row():
+    state = HardwareState(
+        gpus=[
+            GPUStatus(index=0, name='Fake GPU', vram_total_gb=24.0, vram_used_gb=1.5, utilization_percent=20.0),
+            GPUStatus(index=1, name='Fake GPU', vram_total_gb=24.0, vram_used_gb=2.5, utilization_percent=40.0),
+        ],
+        system=SystemStatus(
+            cpu_brand='Fake CPU', cpu_arch='x86_64', cpu_cores_physical=1, cpu_cores_logical=2,
+            cpu_utilization_per_core=[10.0, 30.0], ram_total_gb=32.0, ram_available_gb=12.0,
+        ),
+        timestamp=5.0,
+    )
+    from_state, from_snapshot = TelemetryBuffer(capacity=2), TelemetryBuffer(capacity=2)
+    from_state.record(state)
+    from_snapshot.record_snapshot(HardwareSnapshot.from_state(state))
+
+    for column in from_state.columns:
+        assert from_state.window(column).tolist() == from_snapshot.window(column).tolist()
+    assert from_state.window('vram_used_gb').tolist() == [4.0]
+
+
+def test_ring_overwrites_the_oldest_samples():
+    telemetry = _filled(range(1, 12), capacity=4)
+
+    assert len(telemetry) == 4
+    assert telemetry.window('cpu0').tolist() == [8.0, 9.0, 10.0, 11.0]
+    # The window is counted back from ``now`` across the wrapped segments.
+    assert telemetry.window('cpu0', seconds=2.5, now=11.0).tolist() == [9.0, 10.0, 11.0]
+    assert telemetry.window('cpu0', seconds=100.0, now=11.0).tolist() == [8.0, 9.0, 10.0, 11.0]
+    assert telemetry.window('cpu0', seconds=1.0, now=50.0).tolist() == []
+    assert telemetry.nbytes == 4 * 8 + 4 * 5 * 4
+
+
+def test_windowed_mean_max_and_percentiles():
+    telemetry = _filled(range(1, 11), capacity=16)
+
+    assert telemetry.mean('cpu0') == pytest.approx(5.5)
+    assert telemetry.mean('cpu0', seconds=4.5, now=10.0) == pytest.approx(8.0)
+    assert telemetry.max('cpu1', seconds=4.5, now=10.0) == 20.0
+    assert telemetry.mean('cpu', seconds=1.5, now=10.0).tolist() == [9.5, 19.0]
+    p50, p90 = telemetry.percentile('cpu0', (50, 90))
+    assert (p50, p90) == pytest.approx((5.5, 9.1))
+    assert math.isnan(telemetry.mean('cpu0', seconds=1.0, now=100.0))
+    assert telemetry.percentile('cpu', (50, 99), seconds=1.0, now=100.0).shape == (2, 2)
+
+    summary = telemetry.summary('cpu0')
+    assert set(summary) == {'mean', 'ewma', 'p50', 'p95', 'p99', 'max'}
+
+
+def test_missing_gpu_metrics_are_ignored():
+    telemetry = TelemetryBuffer(capacity=4)
+    telemetry.record_snapshot(_snapshot(1.0, 1.0, NO_GPU))
+    telemetry.record_snapshot(_snapshot(3.0, 2.0))
+
+    assert np.isnan(telemetry.window('vram_used_gb')[0])
+    assert telemetry.mean('gpu_utilization_percent') == pytest.approx(8.0)
+    assert math.isnan(TelemetryBuffer(capacity=4).mean('cpu0'))
+
+
+def test_ewma_weights_samples_by_elapsed_time():
+    telemetry = TelemetryBuffer(capacity=8)
+    for value, timestamp in ((0.0, 1.0), (0.0, 5.5), (100.0, 10.0)):
+        telemetry.record_snapshot(_snapshot(value, timestamp))
+
+    # The older samples are one and two halflives old, so they weigh 1/2 and 1/4.
+    assert telemetry.ewma('cpu0', halflife=4.5) == pytest.approx(100.0 / 1.75)
+    # A long halflife approaches the plain mean and a short one the latest sample.
+    assert telemetry.ewma('cpu0', halflife=1e6) == pytest.approx(100.0 / 3, rel=1e-4)
+    assert telemetry.ewma('cpu0', halflife=0.01) == pytest.approx(100.0)
+    assert telemetry.ewma('cpu', halflife=1e6).shape == (2,)
+    with pytest.raises(ValueError):
+        telemetry.ewma('cpu0', halflife=0)
+
+
+def test_export_round_trips_through_load_telemetry(tmp_path):
+    telemetry = _filled(range(1, 7), capacity=4)
+    path = tmp_path / 'telemetry.npy'
+
+    assert telemetry.export(str(path)) == 4
+    loaded = load_telemetry(str(path))
+    assert isinstance(loaded, np.memmap)
+    assert loaded.dtype.names == ('timestamp', *telemetry.columns)
+    assert loaded['timestamp'].tolist() == [3.0, 4.0, 5.0, 6.0]
+    for column in telemetry.columns:
+        assert loaded[column].tolist() == telemetry.window(column).tolist()
+
+    empty = tmp_path / 'empty.npy'
+    assert TelemetryBuffer(capacity=4).export(str(empty)) == 0
+    assert load_telemetry(str(empty)).shape == (0,)
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        TelemetryBuffer(capacity=0)
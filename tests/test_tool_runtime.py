@@ -0,0 +1,68 @@
+"""ToolRuntime timeouts, concurrency limits and result caching with plain thread-pool tools."""
+
+import threading
+import time
+
+from aegis.agents.base import AegisTool
+from aegis.tools.runtime import ToolRuntime
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_parallel_calls_keep_their_order():
+    runtime = ToolRuntime(max_threads=4)
+    tool = AegisTool(name='sleep', description="Sleep.", func=_sleep)
+    started = time.perf_counter()
+    results = runtime.run_many([(tool, {'seconds': seconds}) for seconds in (0.2, 0.15, 0.1, 0.05)])
+    assert time.perf_counter() - started < 0.5
+    assert [result.output for result in results] == [0.2, 0.15, 0.1, 0.05]
+    runtime.shutdown()
+
+
+def test_slow_call_times_out():
+    runtime = ToolRuntime()
+    tool = AegisTool(name='sleep', description="Sleep.", func=_sleep, timeout_seconds=0.05)
+    result = runtime.run(tool, {'seconds': 0.3})
+    assert not result.success and result.timed_out
+    runtime.shutdown()
+
+
+def test_waiting_for_a_concurrency_slot_times_out():
+    gate = threading.Event()
+    runtime = ToolRuntime(max_threads=4)
+    blocked = AegisTool(name='gate', description="Wait.", func=gate.wait, max_concurrency=1)
+    limited = AegisTool(name='gate', description="Wait.", func=gate.wait, max_concurrency=1, timeout_seconds=0.1)
+
+    holder = threading.Thread(target=runtime.run, args=(blocked, {'timeout': 5.0}))
+    holder.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    result = runtime.run(limited, {'timeout': 5.0})
+    assert time.perf_counter() - started < 1.0
+    assert not result.success and result.timed_out
+    assert "concurrency slot" in result.error
+
+    gate.set()
+    holder.join()
+    assert runtime.run(limited, {'timeout': 5.0}).success
+    runtime.shutdown()
+
+
+def test_cacheable_results_are_memoized():
+    calls = []
+
+    def record(value: int) -> int:
+        calls.append(value)
+        return value
+
+    runtime = ToolRuntime()
+    tool = AegisTool(name='record', description="Record.", func=record, cacheable=True)
+    first = runtime.run(tool, {'value': 3})
+    second = runtime.run(tool, {'value': 3})
+    assert (first.cached, second.cached, second.output) == (False, True, 3)
+    assert calls == [3]
+    runtime.shutdown()
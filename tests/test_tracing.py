@@ -0,0 +1,207 @@
+"""Span nesting, the disabled fast path, LatencyHistogram buckets and Chrome-trace export."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from aegis.utils import tracing
+from aegis.utils.tracing import (
+    LatencyHistogram,
+    Span,
+    disable_tracing,
+    enable_tracing,
+    get_tracer,
+    record_span,
+    span,
+    traced,
+    tracing_enabled,
+)
+
+SRC_DIR = str(Path(__file__).resolve().parents[1] / 'src')
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    """A fresh tracer for the test; the process-wide tracing state is restored afterwards."""
+    monkeypatch.setitem(tracing._STATE, 'tracer', None)
+    monkeypatch.setitem(tracing._STATE, 'enabled', False)
+    return enable_tracing(capacity=100)
+
+
+def _by_name(spans):
+    return {item.name: item for item in spans}
+
+
+def _empty_span(name):
+    with span(name):
+        pass
+
+
+def test_spans_nest_through_the_context_variable(tracer):
+    with span('outer', category='test', request='r1') as outer:
+        with span('inner') as inner:
+            pass
+        with span('sibling'):
+            pass
+    with span('root'):
+        pass
+
+    spans = _by_name(tracer.spans())
+    assert [item.name for item in tracer.spans()] == ['inner', 'sibling', 'outer', 'root']
+    assert outer.parent_id is None and outer.args == {'request': 'r1'} and outer.category == 'test'
+    assert inner.parent_id == outer.span_id and spans['sibling'].parent_id == outer.span_id
+    assert spans['root'].parent_id is None
+    assert outer.start_ns <= inner.start_ns <= inner.end_ns <= outer.end_ns
+
+
+def test_parentage_follows_tasks_and_threads_onto_their_own_tracks(tracer):
+    async def child(name):
+        with span(name):
+            await asyncio.sleep(0)
+
+    async def main():
+        with span('request') as parent:
+            await asyncio.gather(child('task-a'), child('task-b'))
+            await asyncio.to_thread(_empty_span, 'in-thread')
+        return parent
+
+    parent = asyncio.run(main())
+    spans = _by_name(tracer.spans())
+    assert {spans[name].parent_id for name in ('task-a', 'task-b', 'in-thread')} == {parent.span_id}
+    tracks = {spans[name].track[:2] for name in ('request', 'task-a', 'task-b', 'in-thread')}
+    assert len(tracks) == 4
+
+    # A plain thread starts without a parent.
+    thread = threading.Thread(target=_empty_span, args=('detached',))
+    with span('spawner'):
+        thread.start()
+        thread.join()
+    assert _by_name(tracer.spans())['detached'].parent_id is None
+
+
+def test_failing_spans_record_the_exception_type(tracer):
+    with pytest.raises(KeyError):
+        with span('lookup', key='k'):
+            raise KeyError('k')
+    assert tracer.spans()[0].args == {'key': 'k', 'error': 'KeyError'}
+
+
+def test_traced_wraps_functions_and_coroutines(tracer):
+    @traced()
+    def compute(value):
+        return value * 2
+
+    @traced('fetch', category='io')
+    async def fetch():
+        return compute(3)
+
+    assert asyncio.run(fetch()) == 6
+    spans = _by_name(tracer.spans())
+    fetched = spans['fetch']
+    assert fetched.category == 'io'
+    assert spans[compute.__qualname__].parent_id == fetched.span_id
+    assert compute.__name__ == 'compute'
+
+
+def test_disabled_tracing_hands_out_the_shared_noop_span(tracer):
+    calls = []
+
+    @traced()
+    def work():
+        calls.append(1)
+        return 'done'
+
+    disable_tracing()
+    assert not tracing_enabled()
+    first, second = span('a'), span('b', key='value')
+    assert first is second and not isinstance(first, Span)
+    with first as entered:
+        assert entered is first
+    assert work() == 'done' and calls == [1]
+    record_span('elsewhere', 'test', 0, 1000)
+    assert tracer.spans() == []
+
+    # Re-enabling keeps the same tracer.
+    assert enable_tracing() is tracer and get_tracer() is tracer
+
+
+@pytest.mark.parametrize('value, enabled', [(None, False), ('0', False), ('no', False), ('1', True), ('yes', True)])
+def test_aegis_trace_environment_variable_enables_tracing_at_import(value, enabled):
+    env = {key: item for key, item in os.environ.items() if key != 'AEGIS_TRACE'}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SRC_DIR, env.get('PYTHONPATH')]))
+    if value is not None:
+        env['AEGIS_TRACE'] = value
+    code = "from aegis.utils.tracing import tracing_enabled; print(tracing_enabled())"
+    result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == str(enabled)
+
+
+def test_histogram_uses_power_of_two_microsecond_buckets():
+    histogram = LatencyHistogram()
+    for duration_ns in (0, 999, 1_000, 1_999, 2_000, 3_999, 4_000, 1_000_000, 10 ** 30):
+        histogram.add(duration_ns)
+
+    assert histogram.counts[:4] == [2, 2, 2, 1]
+    assert histogram.counts[10] == 1
+    # Anything longer than the last bucket's bound lands in it.
+    assert histogram.counts[-1] == 1
+    assert histogram.count == 9 and histogram.max_ns == 10 ** 30
+
+
+def test_histogram_percentiles_are_bucket_upper_bounds():
+    histogram = LatencyHistogram()
+    assert histogram.percentile_us(50) == 0.0
+    for _ in range(99):
+        histogram.add(1_500)
+    histogram.add(1_000_000)
+
+    assert histogram.percentile_us(50) == 2.0
+    assert histogram.percentile_us(99) == 2.0
+    # The bound is capped at the exact maximum.
+    assert histogram.percentile_us(100) == 1000.0
+
+
+def test_summary_and_capacity(tracer):
+    record_span('slow', 'test', 0, 2_000_000)
+    for _ in range(3):
+        record_span('fast', 'test', 0, 1_000)
+
+    slow, fast = tracer.summary()
+    assert (slow.name, slow.count, slow.mean_us, slow.max_us) == ('slow', 1, 2000.0, 2000.0)
+    assert (fast.name, fast.count, fast.p50_us, fast.p99_us) == ('fast', 3, 1.0, 1.0)
+
+    for _ in range(150):
+        record_span('fast', 'test', 0, 1_000)
+    assert len(tracer.spans()) == 100
+    tracer.reset()
+    assert tracer.spans() == [] and tracer.summary() == []
+
+
+def test_chrome_trace_export(tracer, tmp_path):
+    with span('outer', payload={'nested': True}, retries=2):
+        with span('inner'):
+            pass
+    thread = threading.Thread(target=lambda: record_span('remote', 'io', 5_000, 9_000), name='worker-1')
+    thread.start()
+    thread.join()
+
+    path = tracer.export_chrome_trace(tmp_path / 'traces' / 'run.json')
+    trace = json.loads(path.read_text(encoding='utf-8'))
+    assert trace['displayTimeUnit'] == 'ms'
+    metadata = [event for event in trace['traceEvents'] if event['ph'] == 'M']
+    complete = {event['name']: event for event in trace['traceEvents'] if event['ph'] == 'X'}
+
+    assert sorted(event['args']['name'] for event in metadata) == sorted([threading.current_thread().name, 'worker-1'])
+    assert {event['pid'] for event in trace['traceEvents']} == {os.getpid()}
+    outer, inner, remote = complete['outer'], complete['inner'], complete['remote']
+    assert inner['args']['parent_id'] == outer['args']['span_id']
+    assert outer['args']['payload'] == "{'nested': True}" and outer['args']['retries'] == 2
+    assert outer['tid'] == inner['tid'] != remote['tid']
+    assert (remote['ts'], remote['dur'], remote['cat']) == (5.0, 4.0, 'io')
+    assert outer['ts'] <= inner['ts'] and inner['dur'] <= outer['dur']